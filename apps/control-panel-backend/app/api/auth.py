@@ -1027,7 +1027,7 @@ async def get_session_status(
     effectively acting as a heartbeat.
     """
     from app.core.auth import JWTHandler
-    from app.core.database import sync_session_maker
+    from app.services.session_validator import get_session_validator
 
     try:
         token = credentials.credentials
@@ -1050,44 +1050,36 @@ async def get_session_status(
                 absolute_seconds_remaining=absolute_seconds_remaining
             )
 
-        # Validate server-side session (authoritative)
-        sync_db = sync_session_maker()
-        try:
-            session_service = SessionService(sync_db)
-            is_valid, expiry_reason, seconds_remaining, session_info = session_service.validate_session(
-                session_token
-            )
-
-            # Note: Middleware already updates activity, but we do it here too
-            # to ensure this polling endpoint keeps session alive
-            if is_valid:
-                session_service.update_activity(session_token)
-
-            # Calculate absolute timeout remaining from JWT
-            absolute_exp = payload.get("absolute_exp")
-            now = datetime.now(timezone.utc).timestamp()
-            absolute_seconds_remaining = int(absolute_exp - now) if absolute_exp else None
+        # Validate server-side session (authoritative). The validator sees
+        # activity buffered by this worker and records this poll as activity,
+        # so the polling endpoint keeps the session alive
+        session_validator = get_session_validator()
+        is_valid, expiry_reason, seconds_remaining, session_info = await session_validator.validate(
+            session_token
+        )
 
-            # Use the smaller of idle and absolute timeout for seconds_remaining
-            effective_seconds = seconds_remaining or 0
-            if absolute_seconds_remaining and absolute_seconds_remaining < effective_seconds:
-                effective_seconds = absolute_seconds_remaining
+        # Calculate absolute timeout remaining from JWT
+        absolute_exp = payload.get("absolute_exp")
+        now = datetime.now(timezone.utc).timestamp()
+        absolute_seconds_remaining = int(absolute_exp - now) if absolute_exp else None
 
-            # Warning is based on ABSOLUTE timeout only (not idle)
-            # because polling keeps idle from expiring when browser is open
-            show_warning = False
-            if is_valid and absolute_seconds_remaining:
-                show_warning = session_service.should_show_warning(absolute_seconds_remaining)
+        # Use the smaller of idle and absolute timeout for seconds_remaining
+        effective_seconds = seconds_remaining or 0
+        if absolute_seconds_remaining and absolute_seconds_remaining < effective_seconds:
+            effective_seconds = absolute_seconds_remaining
 
-            return SessionStatusResponse(
-                is_valid=is_valid,
-                seconds_remaining=max(0, effective_seconds),
-                show_warning=show_warning,
-                absolute_seconds_remaining=absolute_seconds_remaining
-            )
+        # Warning is based on ABSOLUTE timeout only (not idle)
+        # because polling keeps idle from expiring when browser is open
+        show_warning = False
+        if is_valid and absolute_seconds_remaining:
+            show_warning = session_validator.should_show_warning(absolute_seconds_remaining)
 
-        finally:
-            sync_db.close()
+        return SessionStatusResponse(
+            is_valid=is_valid,
+            seconds_remaining=max(0, effective_seconds),
+            show_warning=show_warning,
+            absolute_seconds_remaining=absolute_seconds_remaining
+        )
 
     except Exception as e:
         logger.error("Session status check error", error=str(e), user_id=current_user.id)
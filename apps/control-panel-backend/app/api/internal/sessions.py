@@ -7,13 +7,16 @@ OWASP/NIST Compliant Session Management (Issue #264):
 - Returns session status, warning signals, and expiry information
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as SyncSession
 from pydantic import BaseModel
 from typing import Optional
+import asyncio
 
 from app.core.database import get_db, get_sync_db
 from app.services.session_service import SessionService
+from app.services.session_validator import get_session_validator
 from app.core.config import settings
 
 router = APIRouter(prefix="/internal/sessions", tags=["Internal Sessions"])
@@ -88,9 +91,8 @@ class SessionRevokeAllResponse(BaseModel):
 
 
 @router.post("/validate", response_model=SessionValidateResponse)
-def validate_session(
+async def validate_session(
     request: SessionValidateRequest,
-    db: SyncSession = Depends(get_sync_db),
     authorized: bool = Depends(verify_service_auth)
 ):
     """
@@ -104,24 +106,23 @@ def validate_session(
     - seconds_remaining: Time until expiry (min of idle and absolute)
     - show_warning: True if warning should be shown (< 30 min until absolute timeout)
     - user_id, tenant_id: Session context if valid
+
+    Served from the per-worker session cache; activity of valid sessions is
+    recorded and flushed in batches.
     """
-    session_service = SessionService(db)
+    session_validator = get_session_validator()
 
-    is_valid, expiry_reason, seconds_remaining, session_info = session_service.validate_session(
+    is_valid, expiry_reason, seconds_remaining, session_info = await session_validator.validate(
         request.session_token
     )
 
-    # If valid, update activity timestamp
-    if is_valid:
-        session_service.update_activity(request.session_token)
-
     # Warning is based on ABSOLUTE timeout only (not idle)
     # because polling keeps idle from expiring when browser is open
     show_warning = False
     if is_valid and session_info:
         absolute_seconds = session_info.get('absolute_seconds_remaining')
         if absolute_seconds is not None:
-            show_warning = session_service.should_show_warning(absolute_seconds)
+            show_warning = session_validator.should_show_warning(absolute_seconds)
 
     return SessionValidateResponse(
         is_valid=is_valid,
@@ -133,6 +134,52 @@ def validate_session(
     )
 
 
+@router.get("/revocations")
+async def stream_revocations(
+    authorized: bool = Depends(verify_service_auth)
+):
+    """
+    Stream session revocations as Server-Sent Events.
+
+    Tenant backends keep this stream open to invalidate their session caches.
+    Each event is a revocation payload: token:<sha256 of session token>,
+    user:<user_id> or all. The stream ends if this worker stops receiving
+    revocations; subscribers must drop their caches and reconnect.
+    """
+    session_validator = get_session_validator()
+    if not session_validator.listening:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Session revocation stream unavailable"
+        )
+
+    queue = session_validator.subscribe()
+
+    async def generate():
+        try:
+            yield "data: ready\n\n"
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if payload is None:
+                    return
+                yield f"data: {payload}\n\n"
+        finally:
+            session_validator.unsubscribe(queue)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.post("/revoke", response_model=SessionRevokeResponse)
 def revoke_session(
     request: SessionRevokeRequest,
@@ -58,7 +58,15 @@ class Settings(BaseSettings):
     JWT_ABSOLUTE_TIMEOUT_HOURS: int = Field(default=12, env="JWT_ABSOLUTE_TIMEOUT_HOURS")
     # Legacy support (deprecated - use JWT_EXPIRES_MINUTES instead)
     JWT_EXPIRES_HOURS: int = Field(default=4, env="JWT_EXPIRES_HOURS")
-    
+
+    # Server-side session validation cache
+    # Validated sessions are cached per worker; revocations are pushed to every
+    # worker via PostgreSQL LISTEN/NOTIFY, so the TTL only bounds staleness of
+    # activity written by other workers
+    SESSION_CACHE_TTL_SECONDS: int = Field(default=30, env="SESSION_CACHE_TTL_SECONDS")
+    # last_activity_at writes are coalesced and flushed in one batched UPDATE
+    SESSION_ACTIVITY_FLUSH_SECONDS: int = Field(default=60, env="SESSION_ACTIVITY_FLUSH_SECONDS")
+
     # Aliases for compatibility
     @property
     def secret_key(self) -> str:
@@ -23,6 +23,7 @@ from app.api.internal import api_keys as internal_api_keys
 from app.api.internal import optics as internal_optics
 from app.api.internal import sessions as internal_sessions
 from app.middleware.session_validation import SessionValidationMiddleware
+from app.services.session_validator import start_session_validator, stop_session_validator
 
 # Configure structured logging
 structlog.configure(
@@ -55,11 +56,15 @@ async def lifespan(app: FastAPI):
     # Initialize database
     await init_db()
     logger.info("Database initialized")
+
+    # Session cache revocation listener and batched activity writes
+    await start_session_validator()
     
     yield
     
     # Shutdown
     logger.info("Shutting down GT 2.0 Control Panel Backend")
+    await stop_session_validator()
 
 
 # Create FastAPI application
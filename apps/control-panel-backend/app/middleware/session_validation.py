@@ -6,6 +6,7 @@ OWASP/NIST Compliant Server-Side Session Validation (Issue #264)
 - Updates session activity on every authenticated request
 - Adds X-Session-Warning header when < 5 minutes remaining
 - Returns 401 with X-Session-Expired header when session is invalid
+- Validation is async and cached per worker (see SessionValidator)
 """
 
 from fastapi import Request
@@ -15,8 +16,7 @@ import jwt
 import logging
 
 from app.core.config import settings
-from app.core.database import sync_session_maker
-from app.services.session_service import SessionService
+from app.services.session_validator import get_session_validator
 
 logger = logging.getLogger(__name__)
 
@@ -84,34 +84,27 @@ class SessionValidationMiddleware(BaseHTTPMiddleware):
             return await call_next(request)
 
         # Validate session directly (we're in the control panel backend)
-        db = sync_session_maker()
-        try:
-            session_service = SessionService(db)
-            is_valid, expiry_reason, seconds_remaining, session_info = session_service.validate_session(
-                session_token
+        # Activity is recorded by the validator and flushed in batches
+        session_validator = get_session_validator()
+        is_valid, expiry_reason, seconds_remaining, session_info = await session_validator.validate(
+            session_token
+        )
+
+        if not is_valid:
+            # Session is invalid - return 401 with expiry reason
+            logger.info(f"Session expired: {expiry_reason}")
+            return JSONResponse(
+                status_code=401,
+                content={
+                    "detail": f"Session expired ({expiry_reason})",
+                    "code": "SESSION_EXPIRED",
+                    "expiry_reason": expiry_reason
+                },
+                headers={"X-Session-Expired": expiry_reason or "unknown"}
             )
 
-            if not is_valid:
-                # Session is invalid - return 401 with expiry reason
-                logger.info(f"Session expired: {expiry_reason}")
-                return JSONResponse(
-                    status_code=401,
-                    content={
-                        "detail": f"Session expired ({expiry_reason})",
-                        "code": "SESSION_EXPIRED",
-                        "expiry_reason": expiry_reason
-                    },
-                    headers={"X-Session-Expired": expiry_reason or "unknown"}
-                )
-
-            # Update session activity
-            session_service.update_activity(session_token)
-
-            # Check if we should show warning
-            show_warning = session_service.should_show_warning(seconds_remaining) if seconds_remaining else False
-
-        finally:
-            db.close()
+        # Check if we should show warning
+        show_warning = session_validator.should_show_warning(seconds_remaining) if seconds_remaining else False
 
         # Session is valid - process request
         response = await call_next(request)
@@ -12,15 +12,20 @@ NIST SP 800-63B AAL2 Compliant Server-Side Session Management (Issue #264)
 from typing import Optional, Tuple, Dict, Any
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session as DBSession
-from sqlalchemy import and_
+from sqlalchemy import and_, text
 import secrets
 import hashlib
 import logging
 
+from app.core.config import settings
 from app.models.session import Session
 
 logger = logging.getLogger(__name__)
 
+# NOTIFY channel for revocations; every worker's SessionValidator evicts its
+# cached copy (payload: token:<hash>, user:<id> or all)
+SESSION_REVOKED_CHANNEL = "gt2_session_revoked"
+
 
 class SessionService:
     """
@@ -42,6 +47,9 @@ class SessionService:
 
     def __init__(self, db: DBSession):
         self.db = db
+        # last_activity_at lags activity buffered by SessionValidator by up to
+        # one flush interval, so idle checks against the column allow for it
+        self.idle_slack = timedelta(seconds=settings.SESSION_ACTIVITY_FLUSH_SECONDS)
 
     @staticmethod
     def generate_session_token() -> str:
@@ -160,7 +168,7 @@ class SessionService:
             return False, 'absolute', None, {'user_id': session.user_id, 'tenant_id': session.tenant_id}
 
         # Check idle timeout
-        idle_expires_at = last_activity + timedelta(minutes=self.IDLE_TIMEOUT_MINUTES)
+        idle_expires_at = last_activity + timedelta(minutes=self.IDLE_TIMEOUT_MINUTES) + self.idle_slack
         if now >= idle_expires_at:
             self._revoke_session_internal(session, 'idle_timeout')
             logger.info(f"Session expired (idle) for user_id={session.user_id}")
@@ -264,6 +272,8 @@ class SessionService:
             Session.revoke_reason: reason
         })
 
+        if result > 0:
+            self._publish_revocation(f"user:{user_id}")
         self.db.commit()
 
         if result > 0:
@@ -303,7 +313,7 @@ class SessionService:
             Number of sessions cleaned up
         """
         now = datetime.now(timezone.utc)
-        idle_cutoff = now - timedelta(minutes=self.IDLE_TIMEOUT_MINUTES)
+        idle_cutoff = now - timedelta(minutes=self.IDLE_TIMEOUT_MINUTES) - self.idle_slack
 
         # Mark absolute-expired sessions
         absolute_count = self.db.query(Session).filter(
@@ -331,6 +341,8 @@ class SessionService:
             Session.revoke_reason: 'idle_timeout'
         })
 
+        if absolute_count + idle_count > 0:
+            self._publish_revocation("all")
         self.db.commit()
 
         total = absolute_count + idle_count
@@ -346,8 +358,25 @@ class SessionService:
         session.revoked_at = now
         session.ended_at = now  # Always set ended_at when session ends
         session.revoke_reason = reason
+        self._publish_revocation(f"token:{session.session_token_hash}")
         self.db.commit()
 
+    def _publish_revocation(self, payload: str) -> None:
+        """
+        Notify every worker's session cache of a revocation.
+
+        NOTIFY is delivered on commit, so callers publish before committing.
+        This worker's cache is evicted directly as well.
+        """
+        from app.services.session_validator import get_session_validator
+
+        self.db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": SESSION_REVOKED_CHANNEL, "payload": payload}
+        )
+
+        get_session_validator().apply_revocation(payload)
+
     def should_show_warning(self, absolute_seconds_remaining: int) -> bool:
         """
         Check if a warning should be shown to the user.
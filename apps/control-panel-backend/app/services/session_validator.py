@@ -0,0 +1,400 @@
+"""
+GT 2.0 Async Session Validator
+
+Server-side session validation for SessionValidationMiddleware and
+/internal/sessions/validate without a synchronous database round trip on
+every request:
+- Validated sessions are cached per worker by token hash for
+  SESSION_CACHE_TTL_SECONDS. Idle and absolute expiry are computed from the
+  cached timestamps, so a cached session still expires on time
+- last_activity_at updates are buffered in memory and written in one batched
+  UPDATE every SESSION_ACTIVITY_FLUSH_SECONDS (idle timeout is 30 minutes,
+  so minute granularity is enough)
+- Revocations are published by SessionService with pg_notify on
+  SESSION_REVOKED_CHANNEL and evict the cache in every worker immediately.
+  While the LISTEN connection is down the cache is bypassed
+- Tenant backends subscribe to the same revocations
+  (/internal/sessions/revocations) to invalidate their own session caches
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Set, Tuple
+
+import asyncpg
+from sqlalchemy import and_, select, text
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.session import Session
+from app.services.session_service import SESSION_REVOKED_CHANNEL, SessionService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedSession:
+    """Session row fields needed to validate a request"""
+    session_id: str
+    user_id: int
+    tenant_id: Optional[int]
+    last_activity_at: datetime
+    absolute_expires_at: datetime
+    fetched_at: float
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Session timestamps are timezone-aware; older rows may not be"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class SessionValidator:
+    """
+    Per-worker session cache, activity buffer and revocation listener.
+
+    The cache and activity buffer are shared with sync endpoints (revocation
+    runs in the threadpool), so they are guarded by a threading lock.
+    """
+
+    def __init__(self, cache_ttl_seconds: int = 30, activity_flush_seconds: int = 60):
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.activity_flush_seconds = activity_flush_seconds
+        self.idle_timeout = timedelta(minutes=SessionService.IDLE_TIMEOUT_MINUTES)
+        # Activity can be up to one flush interval behind in the database
+        self.idle_slack = timedelta(seconds=activity_flush_seconds)
+
+        self._cache: Dict[str, CachedSession] = {}
+        self._pending_activity: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        # Bumped on every eviction so loads racing a revocation aren't cached
+        self._generation = 0
+
+        self._listener: Optional[asyncpg.Connection] = None
+        self._listening = False
+        self._tasks: list = []
+        # Revocation stream subscribers; None tells them the stream is broken
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    # Cache maintenance
+
+    def evict_token_hash(self, token_hash: str) -> None:
+        """Drop one session from the cache (revocation)"""
+        with self._lock:
+            self._generation += 1
+            self._cache.pop(token_hash, None)
+            self._pending_activity.pop(token_hash, None)
+
+    def evict_user(self, user_id: int) -> None:
+        """Drop all cached sessions of a user (revoke-all)"""
+        with self._lock:
+            self._generation += 1
+            for token_hash in [h for h, s in self._cache.items() if s.user_id == user_id]:
+                del self._cache[token_hash]
+                self._pending_activity.pop(token_hash, None)
+
+    def evict_all(self) -> None:
+        """Drop the whole cache (cleanup, or notifications may have been missed)"""
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def prune_cache(self) -> int:
+        """Drop cached sessions older than the cache TTL (they would be reloaded anyway)"""
+        cutoff = time.monotonic() - self.cache_ttl_seconds
+        with self._lock:
+            stale = [h for h, s in self._cache.items() if s.fetched_at <= cutoff]
+            for token_hash in stale:
+                del self._cache[token_hash]
+        return len(stale)
+
+    def _on_revocation(self, connection, pid, channel, payload: str) -> None:
+        """asyncpg NOTIFY callback"""
+        self.apply_revocation(payload)
+        for queue in self._subscribers:
+            queue.put_nowait(payload)
+
+    @property
+    def listening(self) -> bool:
+        """Whether revocations are currently being received"""
+        return self._listening
+
+    def subscribe(self) -> asyncio.Queue:
+        """Receive every revocation payload; None means the stream broke"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Stop receiving revocations"""
+        self._subscribers.discard(queue)
+
+    def _disconnect_subscribers(self) -> None:
+        """Subscribers may have missed revocations; end their streams"""
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+        self._subscribers.clear()
+
+    def apply_revocation(self, payload: str) -> None:
+        """Evict for a revocation payload: token:<hash>, user:<id> or all"""
+        kind, _, value = payload.partition(":")
+        if kind == "token":
+            self.evict_token_hash(value)
+        elif kind == "user" and value.isdigit():
+            self.evict_user(int(value))
+        else:
+            self.evict_all()
+
+    # Validation
+
+    async def _load(self, token_hash: str) -> Optional[CachedSession]:
+        """Read an active session and cache it if no revocation raced the read"""
+        with self._lock:
+            generation = self._generation
+
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(Session).where(
+                    and_(
+                        Session.session_token_hash == token_hash,
+                        Session.is_active == True
+                    )
+                )
+            )
+            session = result.scalar_one_or_none()
+
+        if not session:
+            return None
+
+        cached = CachedSession(
+            session_id=str(session.id),
+            user_id=session.user_id,
+            tenant_id=session.tenant_id,
+            last_activity_at=_as_utc(session.last_activity_at),
+            absolute_expires_at=_as_utc(session.absolute_expires_at),
+            fetched_at=time.monotonic()
+        )
+        with self._lock:
+            if self._listening and self._generation == generation:
+                self._cache[token_hash] = cached
+        return cached
+
+    async def _revoke(self, token_hash: str, reason: str) -> None:
+        """Mark an expired session inactive and tell the other workers"""
+        self.evict_token_hash(token_hash)
+        async with async_session_maker() as db:
+            await db.execute(
+                text("""
+                    UPDATE sessions
+                    SET is_active = false, revoked_at = NOW(), ended_at = NOW(), revoke_reason = :reason
+                    WHERE session_token_hash = :token_hash AND is_active = true
+                """),
+                {"reason": reason, "token_hash": token_hash}
+            )
+            await db.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": SESSION_REVOKED_CHANNEL, "payload": f"token:{token_hash}"}
+            )
+            await db.commit()
+
+    async def validate(
+        self,
+        session_token: str
+    ) -> Tuple[bool, Optional[str], Optional[int], Optional[Dict[str, Any]]]:
+        """
+        Validate a session; same result shape as SessionService.validate_session.
+
+        Valid sessions have their activity recorded (flushed in the next batch).
+        """
+        token_hash = SessionService.hash_token(session_token)
+
+        with self._lock:
+            session = self._cache.get(token_hash) if self._listening else None
+            if session and time.monotonic() - session.fetched_at >= self.cache_ttl_seconds:
+                session = None
+            pending = self._pending_activity.get(token_hash)
+
+        now = datetime.now(timezone.utc)
+        from_cache = session is not None
+
+        if session is None:
+            session = await self._load(token_hash)
+            if session is None:
+                logger.debug(f"Session not found or inactive for token hash prefix: {token_hash[:8]}...")
+                return False, 'not_found', None, None
+
+        last_activity = max(session.last_activity_at, pending) if pending else session.last_activity_at
+        idle_expires_at = last_activity + self.idle_timeout + self.idle_slack
+        expired = now >= session.absolute_expires_at or now >= idle_expires_at
+
+        if expired and from_cache:
+            # Another worker may have recorded newer activity; check the database
+            self.evict_token_hash(token_hash)
+            return await self.validate(session_token)
+
+        if now >= session.absolute_expires_at:
+            await self._revoke(token_hash, 'absolute_timeout')
+            logger.info(f"Session expired (absolute) for user_id={session.user_id}")
+            return False, 'absolute', None, {'user_id': session.user_id, 'tenant_id': session.tenant_id}
+
+        if now >= idle_expires_at:
+            await self._revoke(token_hash, 'idle_timeout')
+            logger.info(f"Session expired (idle) for user_id={session.user_id}")
+            return False, 'idle', None, {'user_id': session.user_id, 'tenant_id': session.tenant_id}
+
+        with self._lock:
+            self._pending_activity[token_hash] = now
+
+        seconds_until_idle = int((idle_expires_at - now).total_seconds())
+        seconds_until_absolute = int((session.absolute_expires_at - now).total_seconds())
+
+        return True, None, min(seconds_until_idle, seconds_until_absolute), {
+            'user_id': session.user_id,
+            'tenant_id': session.tenant_id,
+            'session_id': session.session_id,
+            'absolute_seconds_remaining': seconds_until_absolute
+        }
+
+    @staticmethod
+    def should_show_warning(absolute_seconds_remaining: int) -> bool:
+        """Same threshold as SessionService.should_show_warning"""
+        return absolute_seconds_remaining <= (SessionService.ABSOLUTE_WARNING_THRESHOLD_MINUTES * 60)
+
+    # Activity batching
+
+    async def flush_activity(self) -> int:
+        """Write buffered last_activity_at values in one UPDATE"""
+        with self._lock:
+            pending, self._pending_activity = self._pending_activity, {}
+        if not pending:
+            return 0
+
+        try:
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    text("""
+                        UPDATE sessions AS s
+                        SET last_activity_at = GREATEST(s.last_activity_at, v.ts)
+                        FROM unnest(CAST(:token_hashes AS text[]), CAST(:timestamps AS timestamptz[]))
+                             AS v(token_hash, ts)
+                        WHERE s.session_token_hash = v.token_hash AND s.is_active = true
+                    """),
+                    {"token_hashes": list(pending.keys()), "timestamps": list(pending.values())}
+                )
+                await db.commit()
+        except Exception:
+            # Put the batch back (newer activity wins) so the next flush retries it
+            with self._lock:
+                for token_hash, ts in pending.items():
+                    current = self._pending_activity.get(token_hash)
+                    if current is None or current < ts:
+                        self._pending_activity[token_hash] = ts
+            raise
+
+        # Cached rows now lag the database by at most the flushed activity
+        with self._lock:
+            for token_hash, ts in pending.items():
+                cached = self._cache.get(token_hash)
+                if cached and cached.last_activity_at < ts:
+                    cached.last_activity_at = ts
+
+        logger.debug(f"Flushed activity for {result.rowcount} sessions")
+        return result.rowcount
+
+    async def _run_activity_flusher(self) -> None:
+        """Background loop: flush buffered activity and prune the cache every interval"""
+        while True:
+            await asyncio.sleep(self.activity_flush_seconds)
+            self.prune_cache()
+            try:
+                await self.flush_activity()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Session activity flush failed: {e}")
+
+    # Revocation listener
+
+    async def _run_listener(self) -> None:
+        """Keep a LISTEN connection open; bypass the cache while it is down"""
+        dsn = settings.DATABASE_URL.replace("+asyncpg", "")
+        while True:
+            try:
+                self._listener = await asyncpg.connect(dsn)
+                await self._listener.add_listener(SESSION_REVOKED_CHANNEL, self._on_revocation)
+                # Revocations may have been missed while disconnected
+                self.evict_all()
+                self._listening = True
+                logger.info(f"Listening for session revocations on {SESSION_REVOKED_CHANNEL}")
+
+                while True:
+                    await asyncio.sleep(5)
+                    await asyncio.wait_for(self._listener.fetchval("SELECT 1"), timeout=5)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Session revocation listener unavailable, cache bypassed: {e}")
+            finally:
+                self._listening = False
+                self.evict_all()
+                self._disconnect_subscribers()
+                if self._listener is not None:
+                    self._listener.terminate()
+                    self._listener = None
+            await asyncio.sleep(5)
+
+    async def start(self) -> None:
+        """Start the listener and activity flusher (application startup)"""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._run_listener()),
+            asyncio.create_task(self._run_activity_flusher())
+        ]
+
+    async def stop(self) -> None:
+        """Stop background tasks and flush buffered activity (application shutdown)"""
+        self._disconnect_subscribers()
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        try:
+            await self.flush_activity()
+        except Exception as e:
+            logger.error(f"Final session activity flush failed: {e}")
+
+
+# Singleton validator per worker
+_session_validator: Optional[SessionValidator] = None
+
+
+def get_session_validator() -> SessionValidator:
+    """Get or create the session validator"""
+    global _session_validator
+    if _session_validator is None:
+        _session_validator = SessionValidator(
+            cache_ttl_seconds=settings.SESSION_CACHE_TTL_SECONDS,
+            activity_flush_seconds=settings.SESSION_ACTIVITY_FLUSH_SECONDS
+        )
+    return _session_validator
+
+
+async def start_session_validator() -> None:
+    """Start the session validator background tasks"""
+    await get_session_validator().start()
+
+
+async def stop_session_validator() -> None:
+    """Stop the session validator and flush pending activity"""
+    if _session_validator is not None:
+        await _session_validator.stop()
@@ -11,7 +11,9 @@ from datetime import datetime
 import logging
 
 from app.services.model_service import default_model_service as model_service
+from app.services.latency_metrics import latency_metrics, RELATIVE_ACCURACY
 from app.services.admin_model_config_service import AdminModelConfigService
+from app.services.config_sync import get_config_sync_service
 
 logger = logging.getLogger(__name__)
 
@@ -124,7 +126,8 @@ async def list_models(
                 "deployment_status": deployment_status,
                 "health_status": health_status
             },
-            "last_updated": "2025-09-09T13:00:00Z"
+            "last_updated": "2025-09-09T13:00:00Z",
+            "catalog_version": get_config_sync_service().catalog_version
         }
     
     except Exception as e:
@@ -289,7 +292,8 @@ async def track_model_usage(
         await model_service.track_model_usage(
             model_id,
             success=usage_request.success,
-            latency_ms=usage_request.latency_ms
+            latency_ms=usage_request.latency_ms,
+            tokens=usage_request.tokens_used
         )
         
         return {
@@ -376,6 +380,36 @@ async def get_model_analytics(
         )
 
 
+@router.get("/metrics/performance", summary="Export model latency and error metrics")
+async def get_model_performance_metrics(
+    window_minutes: int = Query(60, ge=1, le=1440, description="Window in minutes (max 24h)"),
+    model_id: Optional[str] = Query(None, description="Specific model ID"),
+    tenant_id: Optional[str] = Query(None, description="Specific tenant"),
+    by_tenant: bool = Query(False, description="Break down per tenant"),
+) -> Dict[str, Any]:
+    """Latency percentiles (p50/p95/p99), error rate and tokens/sec per model for a time window"""
+
+    try:
+        return {
+            "window_minutes": window_minutes,
+            "relative_accuracy": RELATIVE_ACCURACY,
+            "models": latency_metrics.export(
+                window_seconds=window_minutes * 60,
+                model_id=model_id,
+                tenant_id=tenant_id,
+                by_tenant=by_tenant
+            ),
+            "generated_at": datetime.utcnow().isoformat()
+        }
+
+    except Exception as e:
+        logger.error(f"Error exporting model metrics: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to export model metrics"
+        )
+
+
 @router.post("/initialize", summary="Initialize default models")
 async def initialize_default_models(
 ) -> Dict[str, Any]:
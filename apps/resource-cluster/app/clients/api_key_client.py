@@ -165,22 +165,28 @@ class APIKeyClient:
             tenant_domain: If provided, only invalidate for this tenant
             provider: If provided with tenant_domain, only invalidate this provider
         """
+        from app.clients.provider_client_pool import get_provider_client_pool
+
+        pool = get_provider_client_pool()
+
         async with self._cache_lock:
             if tenant_domain is None:
                 # Clear all
                 self._cache.clear()
+                pool.discard()
                 logger.info("Cleared all API key caches")
             elif provider:
                 # Clear specific tenant+provider
                 cache_key = f"{tenant_domain}:{provider}"
                 if cache_key in self._cache:
-                    del self._cache[cache_key]
+                    # Close pooled provider clients built on the old key
+                    pool.discard(provider, self._cache.pop(cache_key).api_key)
                     logger.info(f"Cleared cache for {cache_key}")
             else:
                 # Clear all for tenant
                 keys_to_remove = [k for k in self._cache if k.startswith(f"{tenant_domain}:")]
                 for key in keys_to_remove:
-                    del self._cache[key]
+                    pool.discard(key.split(":", 1)[1], self._cache.pop(key).api_key)
                 logger.info(f"Cleared cache for tenant: {tenant_domain}")
 
     def get_cache_stats(self) -> Dict[str, Any]:
@@ -0,0 +1,187 @@
+"""
+Provider Client Pool for LLM proxy backends.
+
+Groq and NVIDIA clients are per API key (keys are tenant-specific), so they
+can't be module singletons. This pool keeps them across requests:
+- Bounded LRU of clients keyed by (provider, base_url, sha256(api_key))
+- All clients share one tuned httpx transport, so keep-alive connections to
+  HAProxy / the provider are reused across tenants (auth is per request)
+- HTTP/2 when the `h2` package is installed, HTTP/1.1 keep-alive otherwise
+- Evicted or invalidated clients are closed after a grace period so
+  in-flight requests and streams finish first
+"""
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Transport view that leaves the shared connection pool open when a client closes"""
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # Owned by ProviderClientPool
+        pass
+
+
+class ProviderClientPool:
+    """Bounded LRU of provider API clients over a shared connection pool"""
+
+    def __init__(
+        self,
+        max_clients: int = 256,
+        max_connections: int = 200,
+        max_keepalive_connections: int = 50,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        close_grace_seconds: float = 150.0
+    ):
+        self.max_clients = max_clients
+        self.close_grace_seconds = close_grace_seconds
+        self._clients: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+        self._pending_closes: set = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        try:
+            self._transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+            self.http2 = http2
+        except ImportError:
+            logger.warning("h2 package not installed, provider connections use HTTP/1.1 keep-alive")
+            self._transport = httpx.AsyncHTTPTransport(limits=limits)
+            self.http2 = False
+        self.transport = _SharedTransport(self._transport)
+
+    @staticmethod
+    def _key(provider: str, base_url: str, api_key: str) -> Tuple[str, str, str]:
+        return (provider, base_url, hashlib.sha256(api_key.encode()).hexdigest())
+
+    def get_client(
+        self,
+        provider: str,
+        base_url: str,
+        api_key: str,
+        factory: Callable[[httpx.AsyncBaseTransport], Any]
+    ) -> Any:
+        """
+        Get the pooled client for an API key, creating it with factory(transport).
+
+        The factory must build its httpx client on the given transport.
+        Callers must not close the returned client.
+        """
+        key = self._key(provider, base_url, api_key)
+        client = self._clients.get(key)
+        if client is not None:
+            self._clients.move_to_end(key)
+            self.hits += 1
+            return client
+
+        self.misses += 1
+        client = factory(self.transport)
+        self._clients[key] = client
+        while len(self._clients) > self.max_clients:
+            _, evicted = self._clients.popitem(last=False)
+            self.evictions += 1
+            self._schedule_close(evicted)
+        return client
+
+    def discard(self, provider: Optional[str] = None, api_key: Optional[str] = None) -> int:
+        """Drop clients for an API key (any base_url), a whole provider, or everything"""
+        key_hash = hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
+        removed = [
+            key for key in self._clients
+            if (provider is None or key[0] == provider) and (key_hash is None or key[2] == key_hash)
+        ]
+        for key in removed:
+            self._schedule_close(self._clients.pop(key))
+        return len(removed)
+
+    def _schedule_close(self, client: Any) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        async def close_later():
+            await asyncio.sleep(self.close_grace_seconds)
+            await self._close_client(client)
+
+        task = loop.create_task(close_later())
+        self._pending_closes.add(task)
+        task.add_done_callback(self._pending_closes.discard)
+
+    @staticmethod
+    async def _close_client(client: Any) -> None:
+        try:
+            closer = getattr(client, "aclose", None) or getattr(client, "close")
+            await closer()
+        except Exception as e:
+            logger.debug(f"Error closing provider client: {e}")
+
+    async def close(self) -> None:
+        """Close all clients and the shared connection pool (application shutdown)"""
+        for task in list(self._pending_closes):
+            task.cancel()
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await self._close_client(client)
+        await self._transport.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "max_clients": self.max_clients,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "http2": self.http2,
+        }
+
+
+# Singleton pool per worker
+_provider_client_pool: Optional[ProviderClientPool] = None
+
+
+def get_provider_client_pool() -> ProviderClientPool:
+    """Get or create the provider client pool"""
+    global _provider_client_pool
+
+    if _provider_client_pool is None:
+        from app.core.config import get_settings
+        settings = get_settings()
+
+        _provider_client_pool = ProviderClientPool(
+            max_clients=settings.provider_client_pool_size,
+            max_connections=settings.provider_max_connections,
+            max_keepalive_connections=settings.provider_max_keepalive_connections,
+            keepalive_expiry=settings.provider_keepalive_expiry_seconds,
+            http2=settings.provider_http2_enabled
+        )
+
+    return _provider_client_pool
+
+
+async def close_provider_client_pool() -> None:
+    """Close the provider client pool if it was created"""
+    global _provider_client_pool
+    if _provider_client_pool is not None:
+        await _provider_client_pool.close()
+        _provider_client_pool = None
@@ -26,7 +26,9 @@ except ImportError:
 import logging
 
 from app.core.config import get_settings, get_model_configs
+from app.clients.provider_client_pool import get_provider_client_pool
 from app.services.model_service import get_model_service
+from app.services.endpoint_health import get_endpoint_health
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -84,7 +86,9 @@ class GroqProxyBackend:
         self.settings = get_settings()
         self.client = None
         self.usage_metrics = {}
-        self.circuit_breaker_status = {}
+        self.haproxy_endpoint = self.settings.haproxy_groq_endpoint or "http://haproxy-groq-lb-service.gt-resource.svc.cluster.local"
+        # Circuit breaker for the HAProxy endpoint (shared per-endpoint state)
+        self.circuit_breaker = get_endpoint_health().get(self.haproxy_endpoint)
         self._initialize_client()
     
     def _initialize_client(self):
@@ -95,7 +99,7 @@ class GroqProxyBackend:
             
         if self.settings.groq_api_key:
             # Use HAProxy load balancer instead of direct Groq API
-            haproxy_endpoint = self.settings.haproxy_groq_endpoint or "http://haproxy-groq-lb-service.gt-resource.svc.cluster.local"
+            haproxy_endpoint = self.haproxy_endpoint
             
             # Initialize client with HAProxy endpoint
             self.client = AsyncGroq(
@@ -105,15 +109,6 @@ class GroqProxyBackend:
                 max_retries=1  # Let HAProxy handle retries
             )
             
-            # Initialize circuit breaker
-            self.circuit_breaker_status = {
-                "state": "closed",  # closed, open, half_open
-                "failure_count": 0,
-                "last_failure_time": None,
-                "failure_threshold": 5,
-                "recovery_timeout": 60  # seconds
-            }
-            
             logger.info(f"Initialized Groq client with HAProxy endpoint: {haproxy_endpoint}")
     
     async def execute_inference(
@@ -191,11 +186,12 @@ class GroqProxyBackend:
                 await model_service.track_model_usage(
                     model_id=model,
                     success=True,
-                    latency_ms=latency
+                    latency_ms=latency,
+                    tokens=response.usage.completion_tokens if response.usage else None
                 )
                 
                 # Reset circuit breaker on success
-                await self._record_success()
+                await self._record_success(latency)
                 
                 return {
                     "content": response.choices[0].message.content,
@@ -217,8 +213,8 @@ class GroqProxyBackend:
         except Exception as e:
             logger.error(f"HAProxy Groq inference failed: {e}")
             
-            # Track failure in model service
-            await model_service.track_model_usage(
+            # Track failure in model service (may fail before model_service is bound)
+            await get_model_service(tenant_id).track_model_usage(
                 model_id=model,
                 success=False
             )
@@ -309,9 +305,9 @@ class GroqProxyBackend:
                             "last_check": datetime.utcnow().isoformat()
                         },
                         "circuit_breaker": {
-                            "state": self.circuit_breaker_status["state"],
-                            "failure_count": self.circuit_breaker_status["failure_count"],
-                            "last_failure": self.circuit_breaker_status["last_failure_time"].isoformat() if self.circuit_breaker_status["last_failure_time"] else None
+                            "state": self.circuit_breaker.state,
+                            "failure_count": self.circuit_breaker.failure_count,
+                            "last_failure": self.circuit_breaker.last_failure_time.isoformat() if self.circuit_breaker.last_failure_time else None
                         },
                         "groq_endpoints": {
                             "managed_by": "haproxy",
@@ -335,56 +331,22 @@ class GroqProxyBackend:
                     "last_check": datetime.utcnow().isoformat()
                 },
                 "circuit_breaker": {
-                    "state": self.circuit_breaker_status["state"],
-                    "failure_count": self.circuit_breaker_status["failure_count"]
+                    "state": self.circuit_breaker.state,
+                    "failure_count": self.circuit_breaker.failure_count
                 }
             }
     
     async def _is_circuit_closed(self) -> bool:
         """Check if circuit breaker allows requests"""
-        
-        if self.circuit_breaker_status["state"] == "closed":
-            return True
-        
-        if self.circuit_breaker_status["state"] == "open":
-            # Check if recovery timeout has passed
-            if self.circuit_breaker_status["last_failure_time"]:
-                time_since_failure = (datetime.utcnow() - self.circuit_breaker_status["last_failure_time"]).total_seconds()
-                if time_since_failure > self.circuit_breaker_status["recovery_timeout"]:
-                    # Move to half-open state
-                    self.circuit_breaker_status["state"] = "half_open"
-                    logger.info("Circuit breaker moved to half-open state")
-                    return True
-            return False
-        
-        if self.circuit_breaker_status["state"] == "half_open":
-            # Allow limited requests in half-open state
-            return True
-        
-        return False
+        return self.circuit_breaker.available()
     
-    async def _record_success(self):
+    async def _record_success(self, latency_ms: Optional[float] = None):
         """Record successful request for circuit breaker"""
-        
-        if self.circuit_breaker_status["state"] == "half_open":
-            # Success in half-open state closes the circuit
-            self.circuit_breaker_status["state"] = "closed"
-            self.circuit_breaker_status["failure_count"] = 0
-            logger.info("Circuit breaker closed after successful request")
-        
-        # Reset failure count on any success
-        self.circuit_breaker_status["failure_count"] = 0
+        self.circuit_breaker.record_success(latency_ms)
     
     async def _record_failure(self):
         """Record failed request for circuit breaker"""
-        
-        self.circuit_breaker_status["failure_count"] += 1
-        self.circuit_breaker_status["last_failure_time"] = datetime.utcnow()
-        
-        if self.circuit_breaker_status["failure_count"] >= self.circuit_breaker_status["failure_threshold"]:
-            if self.circuit_breaker_status["state"] in ["closed", "half_open"]:
-                self.circuit_breaker_status["state"] = "open"
-                logger.warning(f"Circuit breaker opened after {self.circuit_breaker_status['failure_count']} failures")
+        self.circuit_breaker.record_failure()
     
     async def _track_usage(
         self,
@@ -614,11 +576,12 @@ class GroqProxyBackend:
                 await model_service.track_model_usage(
                     model_id=model,
                     success=True,
-                    latency_ms=latency
+                    latency_ms=latency,
+                    tokens=response.usage.completion_tokens if response.usage else None
                 )
 
                 # Reset circuit breaker on success
-                await self._record_success()
+                await self._record_success(latency)
 
                 # Build base response
                 result = {
@@ -672,8 +635,8 @@ class GroqProxyBackend:
         except Exception as e:
             logger.error(f"HAProxy Groq inference with messages failed: {e}")
             
-            # Track failure in model service
-            await model_service.track_model_usage(
+            # Track failure in model service (may fail before model_service is bound)
+            await get_model_service(tenant_id).track_model_usage(
                 model_id=model,
                 success=False
             )
@@ -766,15 +729,21 @@ class GroqProxyBackend:
             raise ValueError(f"Unable to retrieve API key - service unavailable: {e}")
     
     def _get_client(self, api_key: str) -> AsyncGroq:
-        """Get Groq client with specified API key"""
+        """Get pooled Groq client for the specified API key (do not close it)"""
         if not GROQ_AVAILABLE:
             raise Exception("Groq client not available in development mode")
         
         haproxy_endpoint = self.settings.haproxy_groq_endpoint or "http://haproxy-groq-lb-service.gt-resource.svc.cluster.local"
         
-        return AsyncGroq(
-            api_key=api_key,
-            base_url=haproxy_endpoint,
-            timeout=httpx.Timeout(30.0),
-            max_retries=1
+        return get_provider_client_pool().get_client(
+            "groq",
+            haproxy_endpoint,
+            api_key,
+            lambda transport: AsyncGroq(
+                api_key=api_key,
+                base_url=haproxy_endpoint,
+                timeout=httpx.Timeout(30.0),
+                max_retries=1,
+                http_client=httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(30.0))
+            )
         )
\ No newline at end of file
@@ -16,6 +16,8 @@ import httpx
 import logging
 
 from app.core.config import get_settings
+from app.clients.provider_client_pool import get_provider_client_pool
+from app.services.endpoint_health import get_endpoint_health
 
 logger = logging.getLogger(__name__)
 
@@ -46,13 +48,8 @@ class NvidiaProxyBackend:
         self.settings = get_settings()
         self.base_url = getattr(self.settings, 'nvidia_nim_endpoint', None) or "https://integrate.api.nvidia.com/v1"
         self.usage_metrics = {}
-        self.circuit_breaker_status = {
-            "state": "closed",  # closed, open, half_open
-            "failure_count": 0,
-            "last_failure_time": None,
-            "failure_threshold": 5,
-            "recovery_timeout": 60  # seconds
-        }
+        # Circuit breaker for the NIM endpoint (shared per-endpoint state)
+        self.circuit_breaker = get_endpoint_health().get(self.base_url)
         logger.info(f"Initialized NVIDIA NIM backend with endpoint: {self.base_url}")
 
     async def _get_tenant_api_key(self, tenant_id: str) -> str:
@@ -86,14 +83,20 @@ class NvidiaProxyBackend:
             raise ValueError(f"Unable to retrieve API key - service unavailable: {e}")
 
     def _get_client(self, api_key: str) -> httpx.AsyncClient:
-        """Get configured HTTP client for NVIDIA NIM API"""
-        return httpx.AsyncClient(
-            base_url=self.base_url,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            },
-            timeout=httpx.Timeout(120.0)  # Longer timeout for large models
+        """Get pooled HTTP client for NVIDIA NIM API (do not close it)"""
+        return get_provider_client_pool().get_client(
+            "nvidia",
+            self.base_url,
+            api_key,
+            lambda transport: httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json"
+                },
+                timeout=httpx.Timeout(120.0),  # Longer timeout for large models
+                transport=transport
+            )
         )
 
     async def execute_inference(
@@ -170,17 +173,17 @@ class NvidiaProxyBackend:
 
             start_time = time.time()
 
-            async with self._get_client(api_key) as client:
-                if stream:
-                    # Return generator for streaming
-                    return self._stream_inference_with_messages(
-                        client, request_data, user_id, tenant_id, model
-                    )
+            client = self._get_client(api_key)
+            if stream:
+                # Return generator for streaming
+                return self._stream_inference_with_messages(
+                    client, request_data, user_id, tenant_id, model
+                )
 
-                # Non-streaming request
-                response = await client.post("/chat/completions", json=request_data)
-                response.raise_for_status()
-                data = response.json()
+            # Non-streaming request
+            response = await client.post("/chat/completions", json=request_data)
+            response.raise_for_status()
+            data = response.json()
 
             latency = (time.time() - start_time) * 1000
 
@@ -199,7 +202,7 @@ class NvidiaProxyBackend:
             await self._track_usage(user_id, tenant_id, model, total_tokens, latency, cost_cents)
 
             # Reset circuit breaker on success
-            await self._record_success()
+            await self._record_success(latency)
 
             # Build response
             result = {
@@ -224,7 +227,9 @@ class NvidiaProxyBackend:
 
         except httpx.HTTPStatusError as e:
             logger.error(f"NVIDIA NIM API error: {e.response.status_code} - {e.response.text}")
-            await self._record_failure()
+            if e.response.status_code >= 500 or e.response.status_code == 429:
+                # Rejected requests (4xx) say nothing about endpoint health
+                await self._record_failure()
             raise Exception(f"NVIDIA NIM inference failed: HTTP {e.response.status_code}")
         except Exception as e:
             logger.error(f"NVIDIA NIM inference failed: {e}")
@@ -283,62 +288,29 @@ class NvidiaProxyBackend:
         return {
             "nvidia_nim": {
                 "endpoint": self.base_url,
-                "status": "available" if self.circuit_breaker_status["state"] == "closed" else "degraded",
+                "status": "available" if self.circuit_breaker.state == "closed" else "degraded",
                 "last_check": datetime.utcnow().isoformat()
             },
             "circuit_breaker": {
-                "state": self.circuit_breaker_status["state"],
-                "failure_count": self.circuit_breaker_status["failure_count"],
-                "last_failure": self.circuit_breaker_status["last_failure_time"].isoformat()
-                    if self.circuit_breaker_status["last_failure_time"] else None
+                "state": self.circuit_breaker.state,
+                "failure_count": self.circuit_breaker.failure_count,
+                "last_failure": self.circuit_breaker.last_failure_time.isoformat()
+                    if self.circuit_breaker.last_failure_time else None,
+                "latency_ms": self.circuit_breaker.snapshot()["latency_ms"]
             }
         }
 
     async def _is_circuit_closed(self) -> bool:
         """Check if circuit breaker allows requests"""
+        return self.circuit_breaker.available()
 
-        if self.circuit_breaker_status["state"] == "closed":
-            return True
-
-        if self.circuit_breaker_status["state"] == "open":
-            # Check if recovery timeout has passed
-            if self.circuit_breaker_status["last_failure_time"]:
-                time_since_failure = (datetime.utcnow() - self.circuit_breaker_status["last_failure_time"]).total_seconds()
-                if time_since_failure > self.circuit_breaker_status["recovery_timeout"]:
-                    # Move to half-open state
-                    self.circuit_breaker_status["state"] = "half_open"
-                    logger.info("NVIDIA NIM circuit breaker moved to half-open state")
-                    return True
-            return False
-
-        if self.circuit_breaker_status["state"] == "half_open":
-            # Allow limited requests in half-open state
-            return True
-
-        return False
-
-    async def _record_success(self):
+    async def _record_success(self, latency_ms: Optional[float] = None):
         """Record successful request for circuit breaker"""
-
-        if self.circuit_breaker_status["state"] == "half_open":
-            # Success in half-open state closes the circuit
-            self.circuit_breaker_status["state"] = "closed"
-            self.circuit_breaker_status["failure_count"] = 0
-            logger.info("NVIDIA NIM circuit breaker closed after successful request")
-
-        # Reset failure count on any success
-        self.circuit_breaker_status["failure_count"] = 0
+        self.circuit_breaker.record_success(latency_ms)
 
     async def _record_failure(self):
         """Record failed request for circuit breaker"""
-
-        self.circuit_breaker_status["failure_count"] += 1
-        self.circuit_breaker_status["last_failure_time"] = datetime.utcnow()
-
-        if self.circuit_breaker_status["failure_count"] >= self.circuit_breaker_status["failure_threshold"]:
-            if self.circuit_breaker_status["state"] in ["closed", "half_open"]:
-                self.circuit_breaker_status["state"] = "open"
-                logger.warning(f"NVIDIA NIM circuit breaker opened after {self.circuit_breaker_status['failure_count']} failures")
+        self.circuit_breaker.record_failure()
 
     async def _track_usage(
         self,
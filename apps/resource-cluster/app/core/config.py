@@ -45,6 +45,28 @@ class Settings(BaseSettings):
         default=True,
         description="Enable NVIDIA NIM backend for GPU-accelerated inference"
     )
+
+    # Provider client pool (Groq / NVIDIA clients per tenant API key)
+    provider_client_pool_size: int = Field(
+        default=256,
+        description="Max pooled provider clients (one per provider + API key), LRU evicted"
+    )
+    provider_max_connections: int = Field(
+        default=200,
+        description="Max connections in the shared provider transport"
+    )
+    provider_max_keepalive_connections: int = Field(
+        default=50,
+        description="Max idle keep-alive connections in the shared provider transport"
+    )
+    provider_keepalive_expiry_seconds: float = Field(
+        default=30.0,
+        description="Idle keep-alive connection expiry for provider connections"
+    )
+    provider_http2_enabled: bool = Field(
+        default=True,
+        description="Use HTTP/2 to providers when the h2 package is installed"
+    )
     
     # HAProxy Configuration
     haproxy_groq_endpoint: str = Field(
@@ -87,6 +109,10 @@ class Settings(BaseSettings):
         default=True,
         description="Enable automatic configuration sync from admin cluster"
     )
+    tenant_backend_urls: List[str] = Field(
+        default=[],
+        description="Tenant backend URLs notified when the synced model catalogue changes"
+    )
     
     # Consul Service Discovery
     consul_host: str = Field(default="localhost", description="Consul host")
@@ -114,6 +140,30 @@ class Settings(BaseSettings):
         default=None,
         description="External BGE-M3 embedding endpoint URL (when local_mode=False)"
     )
+    embedding_cache_max_entries: int = Field(
+        default=5000,
+        description="Per-process LRU of embeddings keyed by tenant + content hash (0 disables)"
+    )
+    embedding_max_connections: int = Field(
+        default=16,
+        description="Keep-alive connection pool size to the embedding service (per worker)"
+    )
+    embedding_max_concurrent_batches: int = Field(
+        default=4,
+        description="Batches of one embedding request sent to the embedding service concurrently"
+    )
+    embedding_request_batching_enabled: bool = Field(
+        default=True,
+        description="Coalesce concurrent small embedding requests into shared batches"
+    )
+    embedding_request_batch_window_ms: float = Field(
+        default=5.0,
+        description="Max time a request waits for others to join its embedding batch"
+    )
+    embedding_request_batch_max_pending: int = Field(
+        default=1024,
+        description="Max texts queued or in flight in the embedding batcher before callers wait"
+    )
     
     # Vector Database (ChromaDB)
     chromadb_host: str = Field(default="localhost", description="ChromaDB host")
@@ -127,6 +177,28 @@ class Settings(BaseSettings):
     max_concurrent_inferences: int = Field(default=100, description="Max concurrent LLM calls")
     max_tokens_per_request: int = Field(default=8000, description="Max tokens per LLM request")
     rate_limit_requests_per_minute: int = Field(default=60, description="Global rate limit")
+
+    # Endpoint Routing (per-endpoint health, failover and hedging)
+    endpoint_failure_threshold: int = Field(
+        default=5,
+        description="Consecutive failures before an endpoint's circuit breaker opens"
+    )
+    endpoint_recovery_timeout_seconds: float = Field(
+        default=30.0,
+        description="Seconds an open endpoint circuit waits before a half-open probe"
+    )
+    routing_hedging_enabled: bool = Field(
+        default=False,
+        description="Send a backup request to a second endpoint when the first is slow"
+    )
+    routing_hedge_max_prompt_chars: int = Field(
+        default=2000,
+        description="Only hedge requests whose prompt is at most this many characters"
+    )
+    routing_hedge_min_delay_ms: float = Field(
+        default=50.0,
+        description="Minimum wait before sending a hedged request"
+    )
     
     # Storage Paths
     data_directory: str = Field(
@@ -143,6 +215,19 @@ class Settings(BaseSettings):
     )
     
     # Redis removed - Resource Cluster uses PostgreSQL for caching and rate limiting
+    # (an optional Redis-protocol store can share rate limit state across replicas)
+    rate_limit_backend: str = Field(
+        default="memory",
+        description="Rate limit state: memory (per-worker) or redis (shared across workers and replicas)"
+    )
+    rate_limit_redis_url: Optional[str] = Field(
+        default=None,
+        description="Redis-protocol URL for rate_limit_backend=redis (e.g. redis://valkey:6379/1)"
+    )
+    rate_limit_namespace: str = Field(
+        default="resource-cluster",
+        description="Key namespace in the shared rate limit store"
+    )
     
     # Monitoring
     prometheus_enabled: bool = Field(default=True, description="Enable Prometheus metrics")
@@ -42,4 +42,9 @@ class RateLimitError(ResourceClusterError):
 
 class CircuitBreakerError(ProviderError):
     """Circuit breaker is open"""
-    pass
\ No newline at end of file
+    pass
+
+
+class EndpointUnavailableError(ProviderError):
+    """Endpoint unreachable, timed out or failing (eligible for failover)"""
+    pass
@@ -121,6 +121,18 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down Resource Cluster")
+
+    # Close pooled embedding service connections
+    from app.core.backends.embedding_backend import close_http_session
+    await close_http_session()
+
+    # Close pooled provider clients
+    from app.clients.provider_client_pool import close_provider_client_pool
+    await close_provider_client_pool()
+
+    # Close shared rate limit store
+    from app.core.rate_limiter import close_rate_limiter
+    await close_rate_limiter()
     
     # Deregister from Consul
     if settings.environment == "production":
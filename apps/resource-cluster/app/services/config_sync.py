@@ -6,6 +6,7 @@ Enables admin control panel to control AI model routing.
 """
 
 import asyncio
+import hashlib
 import httpx
 import json
 import time
@@ -41,6 +42,8 @@ class ConfigSyncService:
         self.model_service = default_model_service
         self.last_sync = 0
         self.sync_running = False
+        # Fingerprint of the last synced configs; tenants cache the model catalogue per version
+        self.catalog_version: Optional[str] = None
         
     async def start_sync_loop(self):
         """Start the configuration sync loop"""
@@ -75,6 +78,8 @@ class ConfigSyncService:
                 # Update provider configurations
                 await self._update_provider_configs(configs)
 
+                await self._update_catalog_version(configs)
+
                 self.last_sync = time.time()
                 logger.info(f"Successfully synced {len(configs)} model configurations")
             else:
@@ -253,6 +258,49 @@ class ConfigSyncService:
 
         logger.debug(f"Updated vLLM provider with {len(vllm_models)} models")
     
+    async def _update_catalog_version(self, configs: List[Dict[str, Any]]):
+        """Recompute the catalogue version and push it to tenant backends if it changed"""
+        # sync_timestamp changes on every sync and must not bump the version
+        stable = [{k: v for k, v in config.items() if k != "sync_timestamp"} for config in configs]
+        version = hashlib.sha256(
+            json.dumps(stable, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+
+        if version == self.catalog_version:
+            return
+
+        previous = self.catalog_version
+        self.catalog_version = version
+        if previous is not None:
+            logger.info(f"Model catalogue changed ({previous} -> {version}), notifying tenant backends")
+            await self._notify_tenant_backends(version)
+
+    async def _notify_tenant_backends(self, version: str):
+        """Tell tenant backends to drop their cached model catalogue (best effort)"""
+        if not settings.tenant_backend_urls:
+            return
+
+        headers = {
+            "X-Service-Auth": settings.service_auth_token or "internal-service-token",
+            "X-Service-Name": "resource-cluster",
+            "Content-Type": "application/json"
+        }
+
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            async def _notify(base_url: str):
+                try:
+                    response = await client.post(
+                        f"{base_url.rstrip('/')}/internal/cache/models/invalidate",
+                        json={"version": version},
+                        headers=headers
+                    )
+                    if response.status_code != 200:
+                        logger.warning(f"Tenant backend {base_url} returned {response.status_code} for catalogue invalidation")
+                except httpx.RequestError as e:
+                    logger.warning(f"Failed to notify tenant backend {base_url} of catalogue change: {e}")
+
+            await asyncio.gather(*(_notify(url) for url in settings.tenant_backend_urls))
+
     async def force_sync(self):
         """Force immediate configuration sync"""
         logger.info("Force syncing configurations")
@@ -265,6 +313,7 @@ class ConfigSyncService:
             "sync_running": self.sync_running,
             "admin_cluster_url": self.admin_cluster_url,
             "sync_interval": self.sync_interval,
+            "catalog_version": self.catalog_version,
             "next_sync": datetime.fromtimestamp(self.last_sync + self.sync_interval).isoformat() if self.last_sync else None
         }
 
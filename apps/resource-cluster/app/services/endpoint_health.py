@@ -0,0 +1,217 @@
+"""
+GT 2.0 Endpoint Health
+
+Live health and latency scores for individual inference endpoints (vLLM
+replicas, NIM instances, HAProxy front ends), used to pick among the
+equivalent endpoints of a model and to replace per-backend global circuit
+breakers.
+
+- Latency: smoothed latency and deviation per endpoint (the TCP RTO
+  estimator), so expected latency = smoothed latency * (1 + in-flight)
+- Circuit breaker per endpoint: closed -> open after N consecutive
+  failures -> half_open after the recovery timeout, where one probe request
+  decides whether it closes again
+- Hedge delay: smoothed latency + 4 * deviation, i.e. "slower than this
+  endpoint usually is"
+
+Only endpoint faults (connection errors, timeouts, 5xx) count as failures;
+a rejected request says nothing about the endpoint. In-memory and per
+worker, like the latency metrics registry.
+"""
+
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from app.core.exceptions import CircuitBreakerError, EndpointUnavailableError
+
+logger = logging.getLogger(__name__)
+
+# Smoothing factors of the TCP retransmission timer (RFC 6298)
+_SRTT_ALPHA = 0.125
+_RTTVAR_BETA = 0.25
+
+# Fraction of requests sent to the second-best endpoint to keep its score fresh
+EXPLORATION_RATE = 0.05
+
+
+class EndpointState:
+    """Latency score and circuit breaker for one endpoint URL"""
+
+    def __init__(self, url: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.url = url
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self.srtt_ms: Optional[float] = None
+        self.rttvar_ms = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+
+        self.state = "closed"  # closed, open, half_open
+        self.failure_count = 0  # Consecutive failures
+        self.last_failure_time: Optional[datetime] = None
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def available(self) -> bool:
+        """Whether the circuit breaker lets a request through"""
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                return False
+            self.state = "half_open"
+            self._probe_in_flight = False
+            logger.info(f"Circuit breaker for {self.url} moved to half-open state")
+        if self.state == "half_open":
+            return not self._probe_in_flight
+        return True
+
+    def expected_latency_ms(self, default_ms: float) -> float:
+        """Expected latency of the next request, given current load"""
+        srtt = self.srtt_ms if self.srtt_ms is not None else default_ms
+        return srtt * (1 + self.in_flight)
+
+    def hedge_delay_ms(self, min_delay_ms: float) -> Optional[float]:
+        """How long to wait before hedging; None until the endpoint has a latency sample"""
+        if self.srtt_ms is None:
+            return None
+        return max(min_delay_ms, self.srtt_ms + 4 * self.rttvar_ms)
+
+    def record_success(self, latency_ms: Optional[float] = None) -> None:
+        self.requests += 1
+        if latency_ms is not None:
+            if self.srtt_ms is None:
+                self.srtt_ms = latency_ms
+                self.rttvar_ms = latency_ms / 2
+            else:
+                self.rttvar_ms += _RTTVAR_BETA * (abs(self.srtt_ms - latency_ms) - self.rttvar_ms)
+                self.srtt_ms += _SRTT_ALPHA * (latency_ms - self.srtt_ms)
+
+        if self.state != "closed":
+            logger.info(f"Circuit breaker for {self.url} closed after successful request")
+        self.state = "closed"
+        self.failure_count = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.requests += 1
+        self.failures += 1
+        self.failure_count += 1
+        self.last_failure_time = datetime.utcnow()
+        self._probe_in_flight = False
+
+        if self.state == "half_open" or (
+            self.state == "closed" and self.failure_count >= self.failure_threshold
+        ):
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            logger.warning(f"Circuit breaker for {self.url} opened after {self.failure_count} failures")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.url,
+            "state": self.state,
+            "failure_count": self.failure_count,
+            "last_failure": self.last_failure_time.isoformat() if self.last_failure_time else None,
+            "latency_ms": round(self.srtt_ms, 2) if self.srtt_ms is not None else None,
+            "latency_deviation_ms": round(self.rttvar_ms, 2) if self.srtt_ms is not None else None,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures
+        }
+
+
+class EndpointHealthRegistry:
+    """Endpoint states keyed by URL, shared by every router and backend in the worker"""
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._endpoints: Dict[str, EndpointState] = {}
+
+    def get(self, url: str) -> EndpointState:
+        state = self._endpoints.get(url)
+        if state is None:
+            state = self._endpoints[url] = EndpointState(
+                url, self.failure_threshold, self.recovery_timeout
+            )
+        return state
+
+    def rank(self, urls: Iterable[str]) -> List[EndpointState]:
+        """
+        Available endpoints for a request, best first.
+
+        Endpoints without latency samples are scored at half the best known
+        latency so new replicas are tried first. Raises CircuitBreakerError
+        when every endpoint's circuit is open.
+        """
+        states = [self.get(url) for url in urls]
+        available = [state for state in states if state.available()]
+        if not available:
+            raise CircuitBreakerError(
+                f"All endpoints unavailable (circuit open): {', '.join(s.url for s in states)}"
+            )
+
+        known = [state.srtt_ms for state in available if state.srtt_ms is not None]
+        default_ms = min(known) / 2 if known else 1.0
+        available.sort(key=lambda state: state.expected_latency_ms(default_ms))
+
+        if len(available) > 1 and random.random() < EXPLORATION_RATE:
+            available[0], available[1] = available[1], available[0]
+        return available
+
+    @asynccontextmanager
+    async def track(self, state: EndpointState) -> AsyncIterator[EndpointState]:
+        """
+        Account one request to an endpoint.
+
+        Success records latency; EndpointUnavailableError records a failure;
+        cancellation (e.g. a lost hedge) and other errors only release the slot.
+        """
+        if state.state == "half_open":
+            state._probe_in_flight = True
+        state.in_flight += 1
+        start = time.monotonic()
+        try:
+            yield state
+        except EndpointUnavailableError:
+            state.record_failure()
+            raise
+        except BaseException:
+            state._probe_in_flight = False
+            raise
+        else:
+            state.record_success((time.monotonic() - start) * 1000)
+        finally:
+            state.in_flight -= 1
+
+    def snapshot(self, urls: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        if urls is None:
+            states = list(self._endpoints.values())
+        else:
+            states = [self._endpoints[url] for url in urls if url in self._endpoints]
+        return [state.snapshot() for state in states]
+
+
+# Singleton registry per worker
+_endpoint_health: Optional[EndpointHealthRegistry] = None
+
+
+def get_endpoint_health() -> EndpointHealthRegistry:
+    """Get or create the endpoint health registry"""
+    global _endpoint_health
+
+    if _endpoint_health is None:
+        from app.core.config import get_settings
+        settings = get_settings()
+
+        _endpoint_health = EndpointHealthRegistry(
+            failure_threshold=settings.endpoint_failure_threshold,
+            recovery_timeout=settings.endpoint_recovery_timeout_seconds
+        )
+
+    return _endpoint_health
@@ -0,0 +1,232 @@
+"""
+GT 2.0 Model Latency Metrics
+
+Streaming latency histograms per (model, tenant) for routing and analytics.
+
+- Log-bucketed histograms (DDSketch style): bucket i covers
+  (gamma^(i-1), gamma^i] ms, so every quantile is within RELATIVE_ACCURACY of
+  the true value, and histograms merge by adding bucket counts
+- Time-windowed: one histogram per BUCKET_SECONDS interval, kept for
+  RETENTION_SECONDS, so any window (last 5 minutes, last hour, last day) is
+  the merge of its buckets and old slow requests age out
+- Request, error and token counters alongside, for error rate and tokens/sec
+
+In-memory and per worker, like the rest of the stateless model registry.
+"""
+
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+_MIN_VALUE_MS = 0.01  # Values below this land in the zero bucket
+
+BUCKET_SECONDS = 60
+RETENTION_SECONDS = 24 * 3600
+
+
+class LatencyHistogram:
+    """Mergeable log-bucketed histogram of latencies in milliseconds"""
+
+    __slots__ = ("counts", "zero_count", "count", "total", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value_ms: float) -> None:
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+        if value_ms <= _MIN_VALUE_MS:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value_ms) / _LOG_GAMMA)
+        self.counts[index] = self.counts.get(index, 0) + 1
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Estimated value at quantile q (0..1); 0 when empty"""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        cumulative = self.zero_count
+        for index in sorted(self.counts):
+            cumulative += self.counts[index]
+            if cumulative > rank:
+                # Midpoint (in relative terms) of the bucket's range
+                return min(2 * _GAMMA ** index / (_GAMMA + 1), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class _WindowBucket:
+    """Metrics for one BUCKET_SECONDS interval"""
+
+    __slots__ = ("latency", "requests", "errors", "tokens", "token_latency_ms")
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+        self.tokens = 0
+        self.token_latency_ms = 0.0
+
+
+class LatencyMetricsRegistry:
+    """Time-windowed latency histograms keyed by (model_id, tenant_id)"""
+
+    def __init__(self, bucket_seconds: int = BUCKET_SECONDS, retention_seconds: int = RETENTION_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self.retention_seconds = retention_seconds
+        self._series: Dict[Tuple[str, str], Deque[Tuple[int, _WindowBucket]]] = {}
+
+    def _bucket_start(self, now: float) -> int:
+        return int(now // self.bucket_seconds) * self.bucket_seconds
+
+    def _prune(self, series: Deque[Tuple[int, _WindowBucket]], now: float) -> None:
+        oldest = now - self.retention_seconds
+        while series and series[0][0] + self.bucket_seconds <= oldest:
+            series.popleft()
+
+    def record(
+        self,
+        model_id: str,
+        tenant_id: Optional[str],
+        latency_ms: Optional[float],
+        success: bool = True,
+        tokens: Optional[int] = None,
+        now: Optional[float] = None
+    ) -> None:
+        """Record one request (latency histograms only include successful requests)"""
+        now = time.time() if now is None else now
+        key = (model_id, tenant_id or "")
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = deque()
+
+        start = self._bucket_start(now)
+        if not series or series[-1][0] != start:
+            series.append((start, _WindowBucket()))
+            self._prune(series, now)
+        bucket = series[-1][1]
+
+        bucket.requests += 1
+        if not success:
+            bucket.errors += 1
+        elif latency_ms is not None:
+            bucket.latency.record(latency_ms)
+            if tokens:
+                bucket.tokens += tokens
+                bucket.token_latency_ms += latency_ms
+
+    def _merged(
+        self,
+        keys: List[Tuple[str, str]],
+        window_seconds: int,
+        now: float
+    ) -> _WindowBucket:
+        merged = _WindowBucket()
+        since = now - window_seconds
+        for key in keys:
+            series = self._series.get(key)
+            if not series:
+                continue
+            self._prune(series, now)
+            for start, bucket in reversed(series):
+                if start + self.bucket_seconds <= since:
+                    break
+                merged.latency.merge(bucket.latency)
+                merged.requests += bucket.requests
+                merged.errors += bucket.errors
+                merged.tokens += bucket.tokens
+                merged.token_latency_ms += bucket.token_latency_ms
+        return merged
+
+    @staticmethod
+    def _summary(bucket: _WindowBucket) -> Dict[str, Any]:
+        latency = bucket.latency
+        return {
+            "requests": bucket.requests,
+            "errors": bucket.errors,
+            "error_rate": bucket.errors / bucket.requests if bucket.requests else 0.0,
+            "latency_ms": {
+                "p50": round(latency.quantile(0.50), 2),
+                "p95": round(latency.quantile(0.95), 2),
+                "p99": round(latency.quantile(0.99), 2),
+                "mean": round(latency.mean(), 2),
+                "max": round(latency.max, 2),
+                "samples": latency.count
+            },
+            "tokens_per_second": (
+                round(bucket.tokens / (bucket.token_latency_ms / 1000), 2)
+                if bucket.token_latency_ms > 0 else None
+            )
+        }
+
+    def summarize(
+        self,
+        model_id: str,
+        tenant_id: Optional[str] = None,
+        window_seconds: int = 3600,
+        now: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Summary for a model over the window (all tenants unless tenant_id is given)"""
+        now = time.time() if now is None else now
+        keys = [
+            key for key in self._series
+            if key[0] == model_id and (tenant_id is None or key[1] == tenant_id)
+        ]
+        return self._summary(self._merged(keys, window_seconds, now))
+
+    def export(
+        self,
+        window_seconds: int = 3600,
+        model_id: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        by_tenant: bool = False,
+        now: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Per-model (or per model and tenant) summaries for the window"""
+        now = time.time() if now is None else now
+        groups: Dict[Tuple[str, ...], List[Tuple[str, str]]] = {}
+        for key in self._series:
+            if model_id is not None and key[0] != model_id:
+                continue
+            if tenant_id is not None and key[1] != tenant_id:
+                continue
+            group = key if by_tenant else (key[0],)
+            groups.setdefault(group, []).append(key)
+
+        results = []
+        for group, keys in sorted(groups.items()):
+            summary = self._summary(self._merged(keys, window_seconds, now))
+            if summary["requests"] == 0:
+                continue
+            summary["model_id"] = group[0]
+            if by_tenant:
+                summary["tenant_id"] = group[1] or None
+            results.append(summary)
+        return results
+
+
+# Shared by every ModelService instance in the worker
+latency_metrics = LatencyMetricsRegistry()
@@ -29,6 +29,7 @@ from enum import Enum
 from urllib.parse import urlparse
 
 from app.core.config import get_settings
+from app.core.rate_limiter import get_rate_limiter, retry_after_seconds
 
 
 def is_provider_endpoint(endpoint_url: str, provider_domains: List[str]) -> bool:
@@ -143,8 +144,8 @@ class LLMGateway:
         self.http_client = httpx.AsyncClient(timeout=120.0)
         self.admin_service = get_admin_model_service()
         
-        # Rate limiting tracking
-        self.rate_limits: Dict[str, Dict[str, Any]] = {}
+        # Rate limiting (GCRA, optionally shared across replicas)
+        self.rate_limiter = get_rate_limiter()
         
         # Provider health tracking
         self.provider_health: Dict[ModelProvider, bool] = {
@@ -388,27 +389,13 @@ class LLMGateway:
     
     async def _check_rate_limits(self, user_id: str, model_config: ModelConfig) -> None:
         """Check if user is within rate limits for model"""
-        now = time.time()
-        minute_ago = now - 60
-        
-        # Initialize user rate limit tracking
-        if user_id not in self.rate_limits:
-            self.rate_limits[user_id] = {}
-        
-        if model_config.model_id not in self.rate_limits[user_id]:
-            self.rate_limits[user_id][model_config.model_id] = []
-        
-        user_requests = self.rate_limits[user_id][model_config.model_id]
-        
-        # Remove old requests
-        user_requests[:] = [req_time for req_time in user_requests if req_time > minute_ago]
-        
-        # Check limit
-        if len(user_requests) >= model_config.rate_limit_rpm:
+        result = await self.rate_limiter.hit(
+            f"llm:{user_id}:{model_config.model_id}",
+            model_config.rate_limit_rpm,
+            60
+        )
+        if not result.allowed:
             raise ValueError(f"Rate limit exceeded for model {model_config.model_id}")
-        
-        # Add current request
-        user_requests.append(now)
     
     async def _check_user_rate_limit(self, user_id: str, max_requests_per_minute: int) -> None:
         """
@@ -424,29 +411,17 @@ class LLMGateway:
         Raises:
             ValueError: If rate limit exceeded
         """
-        now = time.time()
-        minute_ago = now - 60  # 60-second window (was 3600 for hour)
+        result = await self.rate_limiter.hit(
+            f"llm:{user_id}:total_requests",
+            max_requests_per_minute,
+            60  # 60-second window (was 3600 for hour)
+        )
 
-        if user_id not in self.rate_limits:
-            self.rate_limits[user_id] = {}
-
-        if "total_requests" not in self.rate_limits[user_id]:
-            self.rate_limits[user_id]["total_requests"] = []
-
-        total_requests = self.rate_limits[user_id]["total_requests"]
-
-        # Remove requests outside the 60-second window
-        total_requests[:] = [req_time for req_time in total_requests if req_time > minute_ago]
-
-        # Check limit
-        if len(total_requests) >= max_requests_per_minute:
+        if not result.allowed:
             raise ValueError(
                 f"Rate limit exceeded: {max_requests_per_minute} requests per minute. "
-                f"Try again in {int(60 - (now - total_requests[0]))} seconds."
+                f"Try again in {retry_after_seconds(result)} seconds."
             )
-
-        # Add current request
-        total_requests.append(now)
     
     async def _process_groq_request(
         self,
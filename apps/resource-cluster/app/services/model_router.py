@@ -7,15 +7,18 @@ Integrates with provider factory for dynamic provider selection.
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional, AsyncIterator
+from typing import Dict, Any, Optional, AsyncIterator, Awaitable, Callable, List
 from datetime import datetime
 
 from app.services.model_service import get_model_service
+from app.services.endpoint_health import EndpointState, get_endpoint_health
 from app.providers import get_provider_factory
 from app.core.backends import get_backend
-from app.core.exceptions import ProviderError
+from app.core.config import get_settings
+from app.core.exceptions import EndpointUnavailableError, ProviderError
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 class ModelRouter:
@@ -28,6 +31,7 @@ class ModelRouter:
         self.model_service = get_model_service(None)
         self.provider_factory = None
         self.backend_cache = {}
+        self.endpoint_health = get_endpoint_health()
         
     async def initialize(self):
         """Initialize model router"""
@@ -65,13 +69,18 @@ class ModelRouter:
         start_time = datetime.utcnow()
         
         try:
-            # Route to configured endpoint (generic routing for any provider)
-            endpoint_url = model_config.get("endpoint")
-            if not endpoint_url:
+            # Route to configured endpoints (generic routing for any provider)
+            endpoints = self._candidate_endpoints(model_config)
+            if not endpoints:
                 raise ProviderError(f"No endpoint configured for model {model_id}")
 
-            result = await self._route_to_generic_endpoint(
-                endpoint_url, model_id, prompt, messages, temperature, max_tokens, stream, user_id, tenant_id, tools, tool_choice, **kwargs
+            async def call(endpoint_url: str) -> Dict[str, Any]:
+                return await self._route_to_generic_endpoint(
+                    endpoint_url, model_id, prompt, messages, temperature, max_tokens, stream, user_id, tenant_id, tools, tool_choice, **kwargs
+                )
+
+            result = await self._route_to_best_endpoint(
+                endpoints, call, model_id, prompt, messages, stream
             )
             
             # Calculate latency
@@ -79,7 +88,7 @@ class ModelRouter:
             
             # Track successful usage
             await self.model_service.track_model_usage(
-                model_id, success=True, latency_ms=latency_ms
+                model_id, success=True, latency_ms=latency_ms, tenant_id=tenant_id
             )
             
             return result
@@ -88,11 +97,122 @@ class ModelRouter:
             # Track failed usage
             latency_ms = (datetime.utcnow() - start_time).total_seconds() * 1000
             await self.model_service.track_model_usage(
-                model_id, success=False, latency_ms=latency_ms
+                model_id, success=False, latency_ms=latency_ms, tenant_id=tenant_id
             )
             logger.error(f"Model routing failed for {model_id}: {e}")
             raise
     
+    @staticmethod
+    def _candidate_endpoints(model_config: Dict[str, Any]) -> List[str]:
+        """Primary endpoint plus equivalent replicas listed in parameters["endpoints"]"""
+        primary = model_config.get("endpoint") or model_config.get("endpoint_url")
+        replicas = (model_config.get("parameters") or {}).get("endpoints") or []
+        if isinstance(replicas, str):
+            replicas = [replicas]
+
+        endpoints = []
+        for url in [primary, *replicas]:
+            if url and url not in endpoints:
+                endpoints.append(url)
+        return endpoints
+
+    async def _route_to_best_endpoint(
+        self,
+        endpoints: List[str],
+        call: Callable[[str], Awaitable[Dict[str, Any]]],
+        model_id: str,
+        prompt: Optional[str],
+        messages: Optional[list],
+        stream: bool
+    ) -> Dict[str, Any]:
+        """
+        Send the request to the endpoint with the lowest expected latency,
+        failing over to the next one when an endpoint is unavailable.
+        """
+        ranked = self.endpoint_health.rank(endpoints)
+
+        if self._should_hedge(ranked, prompt, messages, stream):
+            return await self._hedged_request(ranked[0], ranked[1], call, model_id)
+
+        last_error: Optional[Exception] = None
+        for state in ranked:
+            try:
+                async with self.endpoint_health.track(state):
+                    return await call(state.url)
+            except EndpointUnavailableError as e:
+                last_error = e
+                logger.warning(f"Endpoint {state.url} unavailable for {model_id}: {e}")
+        raise last_error
+
+    def _should_hedge(
+        self,
+        ranked: List[EndpointState],
+        prompt: Optional[str],
+        messages: Optional[list],
+        stream: bool
+    ) -> bool:
+        """Hedge only short, non-streaming requests with a second endpoint to hedge to"""
+        if not settings.routing_hedging_enabled or stream or len(ranked) < 2:
+            return False
+        if ranked[0].hedge_delay_ms(settings.routing_hedge_min_delay_ms) is None:
+            return False
+
+        if messages:
+            prompt_chars = sum(len(str(msg.get("content") or "")) for msg in messages)
+        else:
+            prompt_chars = len(prompt or "")
+        return prompt_chars <= settings.routing_hedge_max_prompt_chars
+
+    async def _hedged_request(
+        self,
+        primary: EndpointState,
+        secondary: EndpointState,
+        call: Callable[[str], Awaitable[Dict[str, Any]]],
+        model_id: str
+    ) -> Dict[str, Any]:
+        """
+        Send to the primary endpoint; if it hasn't answered within its usual
+        latency (or fails), send to the secondary too. The first success wins
+        and the other request is cancelled.
+        """
+        async def attempt(state: EndpointState) -> Dict[str, Any]:
+            async with self.endpoint_health.track(state):
+                return await call(state.url)
+
+        delay_ms = primary.hedge_delay_ms(settings.routing_hedge_min_delay_ms)
+        pending = {asyncio.create_task(attempt(primary))}
+        hedged = False
+        last_error: Optional[Exception] = None
+
+        try:
+            while pending:
+                timeout = delay_ms / 1000 if not hedged else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    if not isinstance(error, EndpointUnavailableError):
+                        raise error
+                    last_error = error
+                    logger.warning(f"Endpoint unavailable for {model_id}: {error}")
+
+                if not hedged and (not done or not pending):
+                    # Primary is slow or failed: bring in the secondary
+                    hedged = True
+                    if not secondary.available():
+                        continue
+                    logger.debug(f"Hedging {model_id} request to {secondary.url}")
+                    pending.add(asyncio.create_task(attempt(secondary)))
+
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def _route_to_groq(
         self,
         model_id: str,
@@ -254,6 +374,9 @@ class ModelRouter:
                 if response.status_code != 200:
                     error_text = response.text
                     logger.error(f"Endpoint {endpoint_url} returned {response.status_code}: {error_text}")
+                    if response.status_code >= 500 or response.status_code == 429:
+                        # Overloaded or failing endpoint - another replica may succeed
+                        raise EndpointUnavailableError(f"Endpoint error: {response.status_code} - {error_text}")
                     raise ProviderError(f"Endpoint error: {response.status_code} - {error_text}")
 
                 result = response.json()
@@ -262,7 +385,9 @@ class ModelRouter:
 
         except httpx.RequestError as e:
             logger.error(f"Request to {endpoint_url} failed: {e}")
-            raise ProviderError(f"Connection to endpoint failed: {str(e)}")
+            raise EndpointUnavailableError(f"Connection to endpoint failed: {str(e)}")
+        except ProviderError:
+            raise
         except Exception as e:
             logger.error(f"Generic endpoint routing failed: {e}")
             raise ProviderError(f"Inference failed: {str(e)}")
@@ -275,7 +400,11 @@ class ModelRouter:
     
     async def get_model_health(self, model_id: str) -> Dict[str, Any]:
         """Check health of specific model"""
-        return await self.model_service.check_model_health(model_id)
+        health = await self.model_service.check_model_health(model_id)
+        model_config = await self.model_service.get_model(model_id)
+        if model_config:
+            health["endpoints"] = self.endpoint_health.snapshot(self._candidate_endpoints(model_config))
+        return health
 
 
 # Global model router instances per tenant
@@ -16,6 +16,7 @@ import httpx
 import logging
 
 from app.core.config import get_settings
+from app.services.latency_metrics import latency_metrics
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -35,6 +36,9 @@ class ModelService:
         
         # Performance tracking (in-memory)
         self.performance_metrics: Dict[str, Dict[str, Any]] = {}
+
+        # Window for the latency figures kept on registry entries (used for routing)
+        self.routing_latency_window_seconds = 900
         
         # Initialize with default models synchronously
         self._initialize_default_models_sync()
@@ -155,10 +159,21 @@ class ModelService:
         self,
         model_id: str,
         success: bool = True,
-        latency_ms: float = None
+        latency_ms: float = None,
+        tokens: Optional[int] = None,
+        tenant_id: Optional[str] = None
     ):
         """Track model usage and performance metrics"""
         
+        # Windowed histograms are shared across service instances
+        latency_metrics.record(
+            model_id,
+            tenant_id or self.tenant_id,
+            latency_ms,
+            success=success,
+            tokens=tokens
+        )
+        
         model = self.model_registry.get(model_id)
         if not model:
             return
@@ -171,17 +186,12 @@ class ModelService:
         # Calculate success rate
         model["success_rate"] = (model["request_count"] - model["error_count"]) / model["request_count"]
         
-        # Update latency metrics (simple running average)
+        # Recent latency percentiles (all tenants) for routing decisions
         if latency_ms is not None:
-            if model["latency_p50_ms"] == 0:
-                model["latency_p50_ms"] = latency_ms
-            else:
-                # Simple exponential moving average
-                alpha = 0.1
-                model["latency_p50_ms"] = alpha * latency_ms + (1 - alpha) * model["latency_p50_ms"]
-            
-            # P95 approximation (conservative estimate)
-            model["latency_p95_ms"] = max(model["latency_p95_ms"], latency_ms * 1.5)
+            recent = latency_metrics.summarize(model_id, window_seconds=self.routing_latency_window_seconds)
+            model["latency_p50_ms"] = recent["latency_ms"]["p50"]
+            model["latency_p95_ms"] = recent["latency_ms"]["p95"]
+            model["latency_p99_ms"] = recent["latency_ms"]["p99"]
         
         model["updated_at"] = datetime.utcnow().isoformat()
     
@@ -432,8 +442,14 @@ class ModelService:
         total_success_rate = 0
         total_requests = 0
         total_errors = 0
+        window_seconds = timeframe_hours * 3600
+        window_performance = {}
         
         for model in models:
+            # Windowed percentiles, error rate and throughput
+            performance = latency_metrics.summarize(model["id"], window_seconds=window_seconds)
+            window_performance[model["id"]] = performance
+
             # Provider statistics
             provider = model["provider"]
             if provider not in analytics["by_provider"]:
@@ -448,24 +464,28 @@ class ModelService:
             analytics["by_type"][model_type]["count"] += 1
             analytics["by_type"][model_type]["requests"] += model["request_count"]
             
-            # Performance aggregation
-            total_latency += model["latency_p50_ms"]
-            total_success_rate += model["success_rate"]
-            total_requests += model["request_count"]
-            total_errors += model["error_count"]
+            # Performance aggregation (within the timeframe)
+            total_latency += performance["latency_ms"]["p50"]
+            total_success_rate += 1 - performance["error_rate"]
+            total_requests += performance["requests"]
+            total_errors += performance["errors"]
         
         # Calculate averages
         if len(models) > 0:
             analytics["performance_summary"]["avg_latency_p50"] = total_latency / len(models)
             analytics["performance_summary"]["avg_success_rate"] = total_success_rate / len(models)
         
+        analytics["performance_by_model"] = window_performance
         analytics["performance_summary"]["total_requests"] = total_requests
         analytics["performance_summary"]["total_errors"] = total_errors
         
-        # Top performers (by success rate and low latency)
+        # Top performers (by success rate and low latency within the timeframe)
         analytics["top_performers"] = sorted(
-            [m for m in models if m["request_count"] > 0],
-            key=lambda x: (x["success_rate"], -x["latency_p50_ms"]),
+            [m for m in models if window_performance[m["id"]]["requests"] > 0],
+            key=lambda x: (
+                1 - window_performance[x["id"]]["error_rate"],
+                -window_performance[x["id"]]["latency_ms"]["p50"]
+            ),
             reverse=True
         )[:5]
         
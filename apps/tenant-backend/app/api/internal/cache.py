@@ -0,0 +1,75 @@
+"""
+Internal cache invalidation endpoints.
+
+Called by the Resource Cluster when its synced model configuration changes,
+so tenants drop their cached model catalogue instead of waiting for the TTL.
+
+The request reaches a single worker. With a shared cache backend the
+invalidation is broadcast to every worker; with the per-worker memory cache
+the other workers pick up the change when their (shortened) TTL expires.
+"""
+from fastapi import APIRouter, Header, HTTPException, status
+from pydantic import BaseModel
+from typing import Optional
+import logging
+
+from app.core.cache import TieredCache, get_cache
+from app.core.config import get_settings
+from app.services.model_catalog import get_model_catalog
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+settings = get_settings()
+
+
+class CatalogInvalidation(BaseModel):
+    version: Optional[str] = None
+
+
+async def verify_service_auth(
+    x_service_auth: Optional[str],
+    x_service_name: Optional[str]
+) -> None:
+    """Verify service-to-service authentication"""
+    if not x_service_auth or not x_service_name:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Service authentication required"
+        )
+
+    expected_token = settings.service_auth_token or "internal-service-token"
+    if x_service_auth != expected_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid service authentication"
+        )
+
+    allowed_services = ["resource-cluster", "control-panel-backend", "control-panel"]
+    if x_service_name not in allowed_services:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Service {x_service_name} not authorized"
+        )
+
+
+@router.post("/cache/models/invalidate")
+async def invalidate_model_catalog(
+    payload: CatalogInvalidation,
+    x_service_auth: str = Header(None),
+    x_service_name: str = Header(None)
+):
+    """Drop the cached model catalogue for this tenant"""
+    await verify_service_auth(x_service_auth, x_service_name)
+
+    count = await get_model_catalog().invalidate(
+        tenant_id=settings.tenant_domain,
+        version=payload.version
+    )
+    logger.info(f"Model catalogue invalidation from {x_service_name}: {count} entries dropped")
+    return {
+        "success": True,
+        "invalidated": count,
+        "version": payload.version,
+        "scope": "all_workers" if isinstance(get_cache(), TieredCache) else "this_worker"
+    }
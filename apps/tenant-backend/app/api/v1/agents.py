@@ -232,7 +232,7 @@ async def list_agents_minimal(
 
     # Check cache first (60-second TTL)
     cache_key = f"agents_minimal_{user_id}"
-    cached_data = cache.get(cache_key, ttl=60)
+    cached_data = await cache.aget(cache_key)
     if cached_data:
         logger.debug(f"Returning cached minimal agent list for user {user_id}")
         response.headers["Cache-Control"] = "public, max-age=60"
@@ -253,7 +253,7 @@ async def list_agents_minimal(
     ]
 
     # Cache for 60 seconds
-    cache.set(cache_key, minimal_agents)
+    cache.set(cache_key, minimal_agents, ttl=60)
     logger.debug(f"Cached minimal agent list for user {user_id}")
 
     return minimal_agents
@@ -284,7 +284,7 @@ async def list_agents_summary(
     if not category and not search and offset == 0:
         # Simple case - cache the default view
         cache_key = f"agents_summary_{user_id}"
-        cached_data = cache.get(cache_key, ttl=30)
+        cached_data = await cache.aget(cache_key)
         if cached_data:
             logger.debug(f"Returning cached summary agent list for user {user_id}")
             response.headers["Cache-Control"] = "public, max-age=30"
@@ -347,7 +347,7 @@ async def list_agents_summary(
 
     # Cache default view (no filters) for 30 seconds
     if not category and not search and offset == 0:
-        cache.set(cache_key, result)
+        cache.set(cache_key, result, ttl=30)
         logger.debug(f"Cached summary agent list for user {user_id}")
 
     return result
@@ -383,7 +383,7 @@ async def list_agents(
 
     # Check cache first (45-second TTL) - cache full unfiltered list
     cache_key = f"agents_full_{user_id}_{user_role}_{active_only}"
-    cached_data = cache.get(cache_key, ttl=45)
+    cached_data = await cache.aget(cache_key)
 
     if cached_data is not None:
         logger.debug(f"Cache hit for agents list: {cache_key}")
@@ -533,7 +533,7 @@ async def list_agents(
     cache_data = {
         'agents': full_agent_data_list,
     }
-    cache.set(cache_key, cache_data)
+    cache.set(cache_key, cache_data, ttl=45)
     logger.info(f"Cached agents list for {cache_key} (TTL: 45s, count: {len(full_agent_data_list)})")
 
     # Apply pagination for response
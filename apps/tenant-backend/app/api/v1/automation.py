@@ -176,14 +176,12 @@ async def create_automation(
             trigger_type=trigger_type,
             trigger_config=automation.trigger_config,
             actions=automation.actions,
-            conditions=automation.conditions
+            conditions=automation.conditions,
+            max_retries=automation.max_retries,
+            timeout_seconds=automation.timeout_seconds,
+            is_active=automation.is_active
         )
         
-        # Set additional properties
-        created_automation.max_retries = automation.max_retries
-        created_automation.timeout_seconds = automation.timeout_seconds
-        created_automation.is_active = automation.is_active
-        
         # Log creation
         await event_bus.emit_event(
             event_type="automation.created",
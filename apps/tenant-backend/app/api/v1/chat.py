@@ -545,14 +545,18 @@ CRITICAL: Analyze user intent and use tools proactively. Don't wait to be asked
                 context_window = model_config.get('performance', {}).get('context_window', 8192) if model_config else 8192
 
                 # Step 2: Calculate conversation history tokens
-                history_tokens = estimate_messages_tokens([msg.dict() if hasattr(msg, 'dict') else msg for msg in request.messages])
+                history_tokens = estimate_messages_tokens(
+                    [msg.dict() if hasattr(msg, 'dict') else msg for msg in request.messages],
+                    model=request.model
+                )
 
                 # Step 3: Calculate HARD BUDGET for file context (ZERO OVERFLOW GUARANTEE)
                 file_context_token_budget = calculate_file_context_budget(
                     context_window=context_window,
                     conversation_history_tokens=history_tokens,
                     model_max_tokens=model_max_tokens,
-                    system_overhead_tokens=500
+                    system_overhead_tokens=500,
+                    model=request.model
                 )
 
                 # Step 4: Check if there are conversation files
@@ -569,7 +573,8 @@ CRITICAL: Analyze user intent and use tools proactively. Don't wait to be asked
                     fitted_chunks = fit_chunks_to_budget(
                         chunks=all_chunks,
                         token_budget=file_context_token_budget,
-                        preserve_file_boundaries=True
+                        preserve_file_boundaries=True,
+                        model=request.model
                     )
 
                     # Step 6: Build formatted context (already guaranteed to fit)
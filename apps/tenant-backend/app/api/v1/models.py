@@ -33,7 +33,7 @@ async def list_available_models(
 
         # Check cache first (5-minute TTL)
         cache_key = f"models_list_{tenant_domain}"
-        cached_models = cache.get(cache_key, ttl=300)
+        cached_models = await cache.aget(cache_key)
         if cached_models:
             logger.debug(f"Returning cached model list for tenant {tenant_domain}")
             return {**cached_models, "cached": True}
@@ -96,7 +96,7 @@ async def list_available_models(
                 }
 
                 # Cache the result for 5 minutes
-                cache.set(cache_key, result)
+                cache.set(cache_key, result, ttl=300)
                 logger.debug(f"Cached model list for tenant {tenant_domain}")
 
                 return result
@@ -3,23 +3,30 @@ Gen Two Observability API
 Tenant admin dashboard endpoints for usage observability, conversation viewing, and data export.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from typing import Optional, List, Dict, Any, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional, List, Dict, Any, AsyncIterator, Literal
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
 import csv
 import io
 import json
 import logging
+import zlib
 
 from app.core.security import get_current_user
 from app.core.permissions import get_user_role
+from app.services.usage_rollup_service import NO_AGENT_ID, get_usage_rollup_service
 
 # Storage multipliers for calculating actual disk usage from logical size
 DATASET_STORAGE_MULTIPLIER = 4.5       # Measured: 20.09 MB actual / 4.50 MB logical = 4.46x
 CONVERSATION_STORAGE_MULTIPLIER = 19   # Measured: 7.39 MB actual / 0.39 MB logical = 18.9x (index-heavy)
 EMBEDDING_SIZE_BYTES = 4096            # 1024 floats × 4 bytes per float32 (PGVector)
 
+# Streaming export tuning
+EXPORT_CURSOR_PREFETCH = 1000          # Rows fetched per server-side cursor round trip
+EXPORT_FLUSH_BYTES = 64 * 1024         # Response chunk size
+
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/observability", tags=["observability"])
 
@@ -321,6 +328,79 @@ async def require_admin_role(current_user: Dict[str, Any]) -> str:
     return user_role
 
 
+# ============================================================================
+# Export Helpers
+# ============================================================================
+
+async def _stream_csv(
+    first_row: Optional[Dict[str, Any]],
+    rows: AsyncIterator[Dict[str, Any]]
+) -> AsyncIterator[str]:
+    """CSV lines with proper quoting to handle commas and quotes in fields"""
+    if first_row is None:
+        return
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(first_row.keys()), quoting=csv.QUOTE_ALL)
+    writer.writeheader()
+    writer.writerow(first_row)
+    async for row in rows:
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+    yield buffer.getvalue()
+
+
+async def _stream_ndjson(
+    first_row: Optional[Dict[str, Any]],
+    rows: AsyncIterator[Dict[str, Any]]
+) -> AsyncIterator[str]:
+    """One JSON object per line"""
+    if first_row is None:
+        return
+    yield json.dumps(first_row, default=str) + "\n"
+    async for row in rows:
+        yield json.dumps(row, default=str) + "\n"
+
+
+async def _stream_json(
+    metadata: Dict[str, Any],
+    first_row: Optional[Dict[str, Any]],
+    rows: AsyncIterator[Dict[str, Any]]
+) -> AsyncIterator[str]:
+    """The export metadata object with its "data" array written row by row"""
+    header = json.dumps(metadata, indent=2, default=str)
+    yield header[:-2] + ',\n  "data": ['
+    if first_row is not None:
+        yield "\n    " + json.dumps(first_row, default=str)
+        async for row in rows:
+            yield ",\n    " + json.dumps(row, default=str)
+    yield "\n  ]\n}\n"
+
+
+async def _encode_export(chunks: AsyncIterator[str], compress: bool) -> AsyncIterator[bytes]:
+    """Coalesce text chunks into EXPORT_FLUSH_BYTES blocks, optionally gzipped"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    parts: List[str] = []
+    size = 0
+    async for chunk in chunks:
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= EXPORT_FLUSH_BYTES:
+            data = "".join(parts).encode("utf-8")
+            parts, size = [], 0
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                yield data
+
+    data = "".join(parts).encode("utf-8")
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
 # ============================================================================
 # Analytics Endpoints
 # ============================================================================
@@ -342,21 +422,19 @@ async def get_overview_metrics(
     tenant_domain = current_user.get('tenant_domain', 'test-company')
     date_start = datetime.now() - timedelta(days=days)
 
-    # Aggregate metrics from conversations and messages using inline tenant_id subquery
+    # Aggregate metrics from the usage rollups using inline tenant_id subquery
+    rollup_table, bucket_unit = get_usage_rollup_service().rollup_for_range(date_start)
     query = f"""
-        WITH conversation_stats AS (
-            SELECT
-                COUNT(DISTINCT c.id) AS total_conversations,
-                COUNT(DISTINCT c.user_id) AS unique_users,
-                COUNT(DISTINCT c.agent_id) AS unique_agents,
-                COALESCE(SUM(c.total_messages), 0) AS total_messages,
-                COALESCE(SUM(c.total_tokens), 0) AS total_tokens
-            FROM conversations c
-            WHERE
-                c.tenant_id = (SELECT id FROM tenants WHERE domain = $1 LIMIT 1)
-                AND c.created_at >= $2
-        )
-        SELECT * FROM conversation_stats;
+        SELECT
+            COALESCE(SUM(r.conversations), 0) AS total_conversations,
+            COUNT(DISTINCT r.user_id) AS unique_users,
+            COUNT(DISTINCT r.agent_id) FILTER (WHERE r.agent_id <> '{NO_AGENT_ID}'::uuid) AS unique_agents,
+            COALESCE(SUM(r.messages), 0) AS total_messages,
+            COALESCE(SUM(r.tokens), 0)::bigint AS total_tokens
+        FROM {rollup_table} r
+        WHERE
+            r.tenant_id = (SELECT id FROM tenants WHERE domain = $1 LIMIT 1)
+            AND r.bucket_start >= DATE_TRUNC('{bucket_unit}', $2::timestamptz);
     """
 
     result = await pg_client.execute_query(query, tenant_domain, date_start)
@@ -457,12 +535,12 @@ async def get_usage_analytics(
         date_start = datetime.now() - timedelta(days=days)
         date_end = datetime.now()
     else:
-        # All time - query for actual first and last conversation dates
+        # All time - first and last days with activity from the daily rollups
         date_range_query = """
             SELECT
-                MIN(created_at) as first_date,
-                MAX(created_at) as last_date
-            FROM conversations
+                MIN(bucket_start) as first_date,
+                MAX(bucket_start) + INTERVAL '1 day' as last_date
+            FROM usage_rollup_daily
             WHERE tenant_id = (SELECT id FROM tenants WHERE domain = $1 LIMIT 1)
         """
         date_range_result = await pg_client.execute_query(date_range_query, tenant_domain)
@@ -474,8 +552,17 @@ async def get_usage_analytics(
             date_start = datetime.now()
             date_end = datetime.now()
 
+    # Dashboards read from the usage rollups (hourly while retained, daily otherwise).
+    # Rollup rows carry the conversation's tenant_id, user_id and agent_id, and are
+    # aliased as "c" so the conversation filters below apply unchanged.
+    rollup_table, bucket_unit = get_usage_rollup_service().rollup_for_range(date_start)
+
     # Build filter conditions using inline tenant_id subquery
-    filters = ["c.tenant_id = (SELECT id FROM tenants WHERE domain = $1 LIMIT 1)", "c.created_at >= $2", "c.created_at <= $3"]
+    filters = [
+        "c.tenant_id = (SELECT id FROM tenants WHERE domain = $1 LIMIT 1)",
+        f"c.bucket_start >= DATE_TRUNC('{bucket_unit}', $2::timestamptz)",
+        "c.bucket_start <= $3"
+    ]
     params = [tenant_domain, date_start, date_end]
 
     # Check if user is a team observer (not admin/developer) and in observability mode
@@ -739,12 +826,12 @@ async def get_usage_analytics(
     # Get overview
     overview_query = f"""
         SELECT
-            COUNT(DISTINCT c.id) AS total_conversations,
+            COALESCE(SUM(c.conversations), 0) AS total_conversations,
             COUNT(DISTINCT c.user_id) AS unique_users,
-            COUNT(DISTINCT c.agent_id) AS unique_agents,
-            COALESCE(SUM(c.total_messages), 0) AS total_messages,
-            COALESCE(SUM(c.total_tokens), 0) AS total_tokens
-        FROM conversations c
+            COUNT(DISTINCT c.agent_id) FILTER (WHERE c.agent_id <> '{NO_AGENT_ID}'::uuid) AS unique_agents,
+            COALESCE(SUM(c.messages), 0) AS total_messages,
+            COALESCE(SUM(c.tokens), 0)::bigint AS total_tokens
+        FROM {rollup_table} c
         WHERE {where_clause};
     """
     overview_result = await pg_client.execute_query(overview_query, *params)
@@ -764,189 +851,52 @@ async def get_usage_analytics(
     # Calculate actual days span
     days_span = (date_end - date_start).days if days is None else days
 
-    if days_span <= 3:
-        # Short range: minute-level detail with hourly zero-fill
-        time_series_query = f"""
-            WITH time_buckets AS (
-                SELECT
-                    DATE_TRUNC('minute', c.created_at) AS bucket_time,
-                    COUNT(DISTINCT c.id) AS conversation_count,
-                    COALESCE(SUM(c.total_messages), 0) AS message_count,
-                    COALESCE(SUM(c.total_tokens), 0) AS token_count,
-                    COUNT(DISTINCT c.user_id) AS unique_users
-                FROM conversations c
-                WHERE {{where_clause}}
-                GROUP BY DATE_TRUNC('minute', c.created_at)
-            ),
-            hour_series AS (
-                SELECT generate_series(
-                    DATE_TRUNC('hour', $2::timestamp),
-                    DATE_TRUNC('hour', $3::timestamp),
-                    interval '1 hour'
-                ) AS hour_point
-            ),
-            hours_with_data AS (
-                SELECT DISTINCT DATE_TRUNC('hour', bucket_time) AS hour_point
-                FROM time_buckets
-            )
-            -- Return all minute-level data
-            SELECT
-                bucket_time AS date,
-                conversation_count,
-                message_count,
-                token_count,
-                unique_users
-            FROM time_buckets
-
-            UNION ALL
-
-            -- Add zero points for hours with no activity
-            SELECT
-                hs.hour_point AS date,
-                0 AS conversation_count,
-                0 AS message_count,
-                0 AS token_count,
-                0 AS unique_users
-            FROM hour_series hs
-            LEFT JOIN hours_with_data hwd ON hs.hour_point = hwd.hour_point
-            WHERE hwd.hour_point IS NULL
-
-            ORDER BY date ASC;
-        """
-    elif days_span <= 7:
-        # Week: hourly aggregation with daily zero-fill
-        time_series_query = f"""
-            WITH time_buckets AS (
-                SELECT
-                    DATE_TRUNC('hour', c.created_at) AS bucket_time,
-                    COUNT(DISTINCT c.id) AS conversation_count,
-                    COALESCE(SUM(c.total_messages), 0) AS message_count,
-                    COALESCE(SUM(c.total_tokens), 0) AS token_count,
-                    COUNT(DISTINCT c.user_id) AS unique_users
-                FROM conversations c
-                WHERE {{where_clause}}
-                GROUP BY DATE_TRUNC('hour', c.created_at)
-            ),
-            day_series AS (
-                SELECT generate_series(
-                    DATE_TRUNC('day', $2::timestamp),
-                    DATE_TRUNC('day', $3::timestamp),
-                    interval '1 day'
-                ) AS day_point
-            ),
-            days_with_data AS (
-                SELECT DISTINCT DATE_TRUNC('day', bucket_time) AS day_point
-                FROM time_buckets
-            )
-            -- Return all hourly data
-            SELECT
-                bucket_time AS date,
-                conversation_count,
-                message_count,
-                token_count,
-                unique_users
-            FROM time_buckets
-
-            UNION ALL
-
-            -- Add zero points for days with no activity
-            SELECT
-                ds.day_point AS date,
-                0 AS conversation_count,
-                0 AS message_count,
-                0 AS token_count,
-                0 AS unique_users
-            FROM day_series ds
-            LEFT JOIN days_with_data dwd ON ds.day_point = dwd.day_point
-            WHERE dwd.day_point IS NULL
-
-            ORDER BY date ASC;
-        """
-    elif days_span <= 30:
-        # Month: 4-hour blocks with daily zero-fill
-        time_series_query = f"""
-            WITH time_buckets AS (
-                SELECT
-                    DATE_TRUNC('day', c.created_at) +
-                    INTERVAL '1 hour' * (EXTRACT(HOUR FROM c.created_at)::int / 4 * 4) AS bucket_time,
-                    COUNT(DISTINCT c.id) AS conversation_count,
-                    COALESCE(SUM(c.total_messages), 0) AS message_count,
-                    COALESCE(SUM(c.total_tokens), 0) AS token_count,
-                    COUNT(DISTINCT c.user_id) AS unique_users
-                FROM conversations c
-                WHERE {{where_clause}}
-                GROUP BY DATE_TRUNC('day', c.created_at) +
-                         INTERVAL '1 hour' * (EXTRACT(HOUR FROM c.created_at)::int / 4 * 4)
-            ),
-            day_series AS (
-                SELECT generate_series(
-                    DATE_TRUNC('day', $2::timestamp),
-                    DATE_TRUNC('day', $3::timestamp),
-                    interval '1 day'
-                ) AS day_point
-            ),
-            days_with_data AS (
-                SELECT DISTINCT DATE_TRUNC('day', bucket_time) AS day_point
-                FROM time_buckets
-            )
-            -- Return all 4-hour block data
-            SELECT
-                bucket_time AS date,
-                conversation_count,
-                message_count,
-                token_count,
-                unique_users
-            FROM time_buckets
-
-            UNION ALL
-
-            -- Add zero points for days with no activity
-            SELECT
-                ds.day_point AS date,
-                0 AS conversation_count,
-                0 AS message_count,
-                0 AS token_count,
-                0 AS unique_users
-            FROM day_series ds
-            LEFT JOIN days_with_data dwd ON ds.day_point = dwd.day_point
-            WHERE dwd.day_point IS NULL
-
-            ORDER BY date ASC;
-        """
+    if bucket_unit == "hour" and days_span <= 7:
+        # Up to a week: hourly points
+        bucket_expr = "c.bucket_start"
+        series_start = "DATE_TRUNC('hour', $2::timestamptz)"
+        series_step = "1 hour"
+    elif bucket_unit == "hour" and days_span <= 30:
+        # Month: 4-hour blocks
+        bucket_expr = "DATE_TRUNC('day', c.bucket_start) + INTERVAL '1 hour' * (EXTRACT(HOUR FROM c.bucket_start)::int / 4 * 4)"
+        series_start = "DATE_TRUNC('day', $2::timestamptz)"
+        series_step = "4 hours"
     else:
-        # Longer: daily aggregation with zero-fill for all days
-        time_series_query = f"""
-            WITH time_buckets AS (
-                SELECT
-                    DATE_TRUNC('day', c.created_at) AS bucket_time,
-                    COUNT(DISTINCT c.id) AS conversation_count,
-                    COALESCE(SUM(c.total_messages), 0) AS message_count,
-                    COALESCE(SUM(c.total_tokens), 0) AS token_count,
-                    COUNT(DISTINCT c.user_id) AS unique_users
-                FROM conversations c
-                WHERE {{where_clause}}
-                GROUP BY DATE_TRUNC('day', c.created_at)
-            ),
-            day_series AS (
-                SELECT generate_series(
-                    DATE_TRUNC('day', $2::timestamp),
-                    DATE_TRUNC('day', $3::timestamp),
-                    interval '1 day'
-                ) AS day_point
-            )
-            -- Return all data with zero-fill
+        # Longer: daily points
+        bucket_expr = "DATE_TRUNC('day', c.bucket_start)"
+        series_start = "DATE_TRUNC('day', $2::timestamptz)"
+        series_step = "1 day"
+
+    # Zero-fill every bucket in the range
+    time_series_query = f"""
+        WITH time_buckets AS (
             SELECT
-                COALESCE(tb.bucket_time, ds.day_point) AS date,
-                COALESCE(tb.conversation_count, 0) AS conversation_count,
-                COALESCE(tb.message_count, 0) AS message_count,
-                COALESCE(tb.token_count, 0) AS token_count,
-                COALESCE(tb.unique_users, 0) AS unique_users
-            FROM day_series ds
-            LEFT JOIN time_buckets tb ON ds.day_point = tb.bucket_time
-            ORDER BY date ASC;
-        """
-
-    time_series_query = time_series_query.format(where_clause=where_clause)
+                {bucket_expr} AS bucket_time,
+                SUM(c.conversations) AS conversation_count,
+                SUM(c.messages) AS message_count,
+                SUM(c.tokens)::bigint AS token_count,
+                COUNT(DISTINCT c.user_id) AS unique_users
+            FROM {rollup_table} c
+            WHERE {where_clause}
+            GROUP BY 1
+        ),
+        bucket_series AS (
+            SELECT generate_series(
+                {series_start},
+                $3::timestamptz,
+                interval '{series_step}'
+            ) AS bucket_time
+        )
+        SELECT
+            bs.bucket_time AS date,
+            COALESCE(tb.conversation_count, 0) AS conversation_count,
+            COALESCE(tb.message_count, 0) AS message_count,
+            COALESCE(tb.token_count, 0) AS token_count,
+            COALESCE(tb.unique_users, 0) AS unique_users
+        FROM bucket_series bs
+        LEFT JOIN time_buckets tb ON tb.bucket_time = bs.bucket_time
+        ORDER BY date ASC;
+    """
     time_series_result = await pg_client.execute_query(time_series_query, *params)
     time_series = [
         TimeSeriesDataPoint(
@@ -964,9 +914,9 @@ async def get_usage_analytics(
         SELECT
             c.user_id AS id,
             u.email AS label,
-            COUNT(DISTINCT c.id) AS value,
-            COALESCE(SUM(c.total_tokens), 0) AS tokens
-        FROM conversations c
+            SUM(c.conversations) AS value,
+            SUM(c.tokens)::bigint AS tokens
+        FROM {rollup_table} c
         JOIN users u ON c.user_id = u.id AND c.tenant_id = u.tenant_id
         WHERE {where_clause}
         GROUP BY c.user_id, u.email
@@ -991,10 +941,10 @@ async def get_usage_analytics(
         SELECT
             c.agent_id AS id,
             a.name AS label,
-            COUNT(DISTINCT c.id) AS value,
-            COALESCE(SUM(c.total_messages), 0) AS messages,
-            COALESCE(SUM(c.total_tokens), 0) AS tokens
-        FROM conversations c
+            SUM(c.conversations) AS value,
+            SUM(c.messages) AS messages,
+            SUM(c.tokens)::bigint AS tokens
+        FROM {rollup_table} c
         JOIN agents a ON c.agent_id = a.id AND c.tenant_id = a.tenant_id
         WHERE {where_clause}
         GROUP BY c.agent_id, a.name
@@ -1013,18 +963,17 @@ async def get_usage_analytics(
         for row in agent_breakdown_result
     ]
 
-    # Get breakdown by model
+    # Get breakdown by model (conversations active per bucket with the model)
     model_breakdown_query = f"""
         SELECT
-            m.model_used AS id,
-            m.model_used AS label,
-            COUNT(DISTINCT c.id) AS conversations,
-            COUNT(DISTINCT m.id) AS messages,
-            COALESCE(SUM(m.token_count), 0) AS tokens
-        FROM messages m
-        JOIN conversations c ON m.conversation_id = c.id
-        WHERE {where_clause} AND m.model_used IS NOT NULL AND m.model_used != ''
-        GROUP BY m.model_used
+            c.model AS id,
+            c.model AS label,
+            SUM(c.active_conversations) AS conversations,
+            SUM(c.messages) AS messages,
+            SUM(c.tokens)::bigint AS tokens
+        FROM {rollup_table} c
+        WHERE {where_clause} AND c.model != ''
+        GROUP BY c.model
         ORDER BY conversations DESC
         LIMIT 20;
     """
@@ -1556,7 +1505,7 @@ async def get_conversation_detail(
 
 @router.get("/export")
 async def export_analytics_data(
-    format: Literal["csv", "json"] = Query("csv", description="Export format"),
+    format: Literal["csv", "json", "ndjson"] = Query("csv", description="Export format"),
     days: Optional[int] = Query(None, ge=1, le=365),
     start_date: Optional[str] = Query(None, description="Custom range start date (YYYY-MM-DD or ISO timestamp: YYYY-MM-DDTHH:MM:SSZ)"),
     end_date: Optional[str] = Query(None, description="Custom range end date (YYYY-MM-DD or ISO timestamp: YYYY-MM-DDTHH:MM:SSZ)"),
@@ -1566,10 +1515,12 @@ async def export_analytics_data(
     agent_id: Optional[str] = Query(None),
     conversation_id: Optional[str] = Query(None, description="Export single conversation by ID"),
     search: Optional[str] = Query(None, description="Search filter for conversations"),
+    compress: bool = Query(False, description="Gzip the export file"),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
-    Export analytics data as CSV or JSON.
+    Export analytics data as CSV, JSON or NDJSON (optionally gzipped).
+    Rows are streamed from a server-side cursor, so exports of any size use constant memory.
     Available to all authenticated users with role-based data filtering:
     - Admins/Developers: Can export all platform data
     - Analysts/Students: Can only export their personal data
@@ -1702,7 +1653,7 @@ async def export_analytics_data(
             JOIN agents a ON c.agent_id = a.id AND c.tenant_id = a.tenant_id
             LEFT JOIN messages m ON c.id = m.conversation_id
             WHERE {where_clause}
-            ORDER BY c.created_at DESC, m.created_at ASC;
+            ORDER BY c.created_at DESC, m.created_at ASC
         """
     else:
         query = f"""
@@ -1721,41 +1672,34 @@ async def export_analytics_data(
             JOIN users u ON c.user_id = u.id AND c.tenant_id = u.tenant_id
             JOIN agents a ON c.agent_id = a.id AND c.tenant_id = a.tenant_id
             WHERE {where_clause}
-            ORDER BY c.created_at DESC;
+            ORDER BY c.created_at DESC
         """
 
-    result = await pg_client.execute_query(query, *params)
+    # Stream rows through a server-side cursor so memory stays flat for any export size.
+    # The first row is fetched before responding so query errors still return a 500.
+    rows = pg_client.iter_query(query, *params, prefetch=EXPORT_CURSOR_PREFETCH)
+    try:
+        first_row = await rows.__anext__()
+    except StopAsyncIteration:
+        first_row = None
 
-    if format == "csv":
-        # Generate CSV with proper quoting to handle commas and quotes in fields
-        output = io.StringIO()
-        if result:
-            fieldnames = list(result[0].keys())
-            writer = csv.DictWriter(output, fieldnames=fieldnames, quoting=csv.QUOTE_ALL)
-            writer.writeheader()
-            writer.writerows(result)
-
-        csv_content = output.getvalue()
-
-        # Generate appropriate filename based on export scope
-        if conversation_id:
-            filename_prefix = f"conversation_{conversation_id[:8]}"
-        elif search:
-            filename_prefix = "filtered_conversations"
-        else:
-            filename_prefix = "analytics_export"
-        filename = f"{filename_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-
-        return Response(
-            content=csv_content,
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
-        )
+    # Generate appropriate filename based on export scope
+    if conversation_id:
+        filename_prefix = f"conversation_{conversation_id[:8]}"
+    elif search:
+        filename_prefix = "filtered_conversations"
+    else:
+        filename_prefix = "analytics_export"
+    filename = f"{filename_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
 
+    if format == "csv":
+        chunks = _stream_csv(first_row, rows)
+        media_type = "text/csv"
+    elif format == "ndjson":
+        chunks = _stream_ndjson(first_row, rows)
+        media_type = "application/x-ndjson"
     else:  # JSON
-        export_data = {
+        export_metadata = {
             "tenant_domain": tenant_domain,
             "export_date": datetime.now().isoformat(),
             "date_range_start": date_range_start.isoformat() if date_range_start else None,
@@ -1764,26 +1708,30 @@ async def export_analytics_data(
                 "user_id": user_id,
                 "agent_id": agent_id,
                 "include_content": include_content
-            },
-            "data": result
+            }
         }
+        chunks = _stream_json(export_metadata, first_row, rows)
+        media_type = "application/json"
 
-        # Generate appropriate filename based on export scope
-        if conversation_id:
-            filename_prefix = f"conversation_{conversation_id[:8]}"
-        elif search:
-            filename_prefix = "filtered_conversations"
-        else:
-            filename_prefix = "analytics_export"
-        filename = f"{filename_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-
-        return Response(
-            content=json.dumps(export_data, indent=2, default=str),
-            media_type="application/json",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
-        )
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    async def body():
+        try:
+            async for data in _encode_export(chunks, compress):
+                yield data
+        finally:
+            # Release the cursor's connection even if the client disconnects mid-export
+            await rows.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        }
+    )
 
 
 @router.get("/storage", response_model=StorageMetrics)
@@ -2043,16 +1991,12 @@ async def get_storage_metrics(
                 GROUP BY d.user_id
             ),
             conversation_by_user AS (
+                -- Message counts and content size come from the daily usage rollups
                 SELECT
                     c.user_id,
-                    COUNT(DISTINCT c.id) as conversation_count,
+                    SUM(c.conversations) as conversation_count,
                     (
-                        COALESCE((
-                            SELECT SUM(LENGTH(m.content))
-                            FROM messages m
-                            JOIN conversations conv ON m.conversation_id = conv.id
-                            WHERE conv.user_id = c.user_id
-                        ), 0) +
+                        SUM(c.content_bytes) +
                         COALESCE((
                             SELECT SUM(cf.file_size_bytes)
                             FROM conversation_files cf
@@ -2066,7 +2010,7 @@ async def get_storage_metrics(
                             WHERE conv.user_id = c.user_id AND cf.embeddings IS NOT NULL
                         ), 0)
                     ) / 1048576.0 * {CONVERSATION_STORAGE_MULTIPLIER} as conversation_storage_mb
-                FROM conversations c
+                FROM usage_rollup_daily c
                 GROUP BY c.user_id
             ),
             totals AS (
@@ -2889,20 +2833,17 @@ async def refresh_materialized_views(
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
-    Manually refresh analytics materialized views.
+    Run an incremental usage rollup pass now instead of waiting for the background job.
+    Only recent and deleted-from buckets are recomputed; dashboards keep reading meanwhile.
     Admin-only endpoint.
     """
-    from app.core.postgresql_client import get_postgresql_client
-
     await require_admin_role(current_user)
 
-    pg_client = await get_postgresql_client()
-
     try:
-        await pg_client.execute_query("SELECT refresh_analytics_views();")
-        return {"success": True, "message": "Analytics views refreshed successfully"}
+        result = await get_usage_rollup_service().refresh()
+        return {"success": True, "message": "Analytics rollups refreshed successfully", "rollup": result}
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to refresh analytics views: {str(e)}"
+            detail=f"Failed to refresh analytics rollups: {str(e)}"
         )
@@ -6,10 +6,10 @@ Supports semantic similarity search, full-text search, and hybrid ranking.
 """
 
 from typing import List, Optional, Dict, Any, Union
+from dataclasses import asdict
 from fastapi import APIRouter, HTTPException, Depends, Query, Header
 from pydantic import BaseModel, Field
 import logging
-import httpx
 import time
 
 from app.core.security import get_current_user
@@ -19,7 +19,7 @@ from app.services.pgvector_search_service import (
     SearchConfig,
     get_pgvector_search_service
 )
-from app.core.config import get_settings
+from app.services.conversation_search_service import get_conversation_search_service
 
 logger = logging.getLogger(__name__)
 
@@ -144,6 +144,7 @@ class SearchResultResponse(BaseModel):
     text_relevance: float
     hybrid_score: float
     rank: int
+    rrf_score: float = 0.0
 
 
 class SearchResponse(BaseModel):
@@ -281,7 +282,8 @@ async def search_documents(
                 vector_similarity=result.vector_similarity,
                 text_relevance=result.text_relevance,
                 hybrid_score=result.hybrid_score,
-                rank=result.rank
+                rank=result.rank,
+                rrf_score=result.rrf_score
             )
             for result in results
         ]
@@ -403,7 +405,8 @@ async def find_similar_chunks(
                 vector_similarity=result.vector_similarity,
                 text_relevance=result.text_relevance,
                 hybrid_score=result.hybrid_score,
-                rank=result.rank
+                rank=result.rank,
+                rrf_score=result.rrf_score
             )
             for result in results
         ]
@@ -541,7 +544,8 @@ async def search_documents_specific(
                 vector_similarity=result.vector_similarity,
                 text_relevance=result.text_relevance,
                 hybrid_score=result.hybrid_score,
-                rank=result.rank
+                rank=result.rank,
+                rrf_score=result.rrf_score
             )
             for result in results
         ]
@@ -632,9 +636,12 @@ async def search_conversations(
     x_user_id: Optional[str] = Header(None, alias="X-User-ID")
 ):
     """
-    Search through conversation history using MCP conversation server.
+    Search through conversation history.
 
-    Used by both external clients and internal MCP tools for conversation search.
+    Answered in-process by the native conversation search index (ranked
+    full-text plus optional semantic matches) rather than via the Resource
+    Cluster MCP conversation server. Used by both external clients and
+    internal MCP tools for conversation search.
     """
     try:
         # Use same user resolution pattern as document search
@@ -649,46 +656,17 @@ async def search_conversations(
 
         logger.info(f"🔍 Conversation search: query='{request.query}', user={user_id}, tenant={tenant_domain}")
 
-        # Get resource cluster URL
-        settings = get_settings()
-        mcp_base_url = getattr(settings, 'resource_cluster_url', 'http://gentwo-resource-backend:8000')
-
-        # Build request payload for MCP execution
-        request_payload = {
-            "server_id": "conversation_server",
-            "tool_name": "search_conversations",
-            "parameters": {
-                "query": request.query,
-                "days_back": request.days_back or 30,
-                "max_results": request.max_results or 5,
-                "agent_filter": request.agent_filter,
-                "include_user_messages": request.include_user_messages
-            },
-            "tenant_domain": tenant_domain,
-            "user_id": user_id
-        }
-
-        start_time = time.time()
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            logger.info(f"🌐 Making MCP request to: {mcp_base_url}/api/v1/mcp/execute")
-
-            response = await client.post(
-                f"{mcp_base_url}/api/v1/mcp/execute",
-                json=request_payload
-            )
-
-            execution_time_ms = (time.time() - start_time) * 1000
-            logger.info(f"📊 MCP response: {response.status_code} ({execution_time_ms:.1f}ms)")
-
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"✅ Conversation search successful ({execution_time_ms:.1f}ms)")
-                return result
-            else:
-                error_text = response.text
-                error_msg = f"MCP conversation search failed: {response.status_code} - {error_text}"
-                logger.error(f"❌ {error_msg}")
-                raise HTTPException(status_code=500, detail=error_msg)
+        search_service = get_conversation_search_service()
+        result = await search_service.search(
+            query=request.query,
+            user_id=user_id,
+            days_back=request.days_back or 30,
+            max_results=request.max_results or 5,
+            agent_filter=request.agent_filter,
+            include_user_messages=request.include_user_messages
+        )
+        result["results"] = [asdict(item) for item in result["results"]]
+        return result
 
     except HTTPException:
         raise
@@ -2,33 +2,64 @@
 Simple in-memory cache with TTL support for Gen Two performance optimization.
 
 This module provides a thread-safe caching layer for expensive database queries
-and API calls. Each Uvicorn worker maintains its own cache instance.
+and API calls. Each Uvicorn worker maintains its own in-process (L1) cache; with
+cache_backend set to "redis" or "sqlite" an L2 tier shared by all workers sits
+behind it and invalidations are broadcast so every worker drops stale L1 keys.
 
 Key features:
-- TTL-based expiration (configurable per-key)
-- LRU eviction when cache reaches max size
+- TTL-based expiration (stored per entry at set time)
+- LRU eviction when cache reaches max entries or max bytes
 - Thread-safe for concurrent request handling
-- Pattern-based deletion for cache invalidation
+- Prefix-indexed deletion for cache invalidation
+- Stampede-protected async loading (concurrent misses share one load)
+- Optional shared L2 tier with cross-worker invalidation (see app.core.cache_backends)
 
 Usage:
     from app.core.cache import get_cache
 
     cache = get_cache()
 
-    # Get cached value with 60-second TTL
-    cached_data = cache.get("agents_minimal_user123", ttl=60)
+    # Get cached value (L1, then shared L2), populating it on a miss
+    cached_data = await cache.aget("agents_minimal_user123")
     if not cached_data:
         data = await fetch_from_db()
-        cache.set("agents_minimal_user123", data)
+        cache.set("agents_minimal_user123", data, ttl=60)
+
+    # Or let the cache coalesce concurrent misses into a single load
+    data = await cache.get_or_load("agents_minimal_user123", fetch_from_db, ttl=60)
 """
 
-from typing import Any, Optional, Dict, Tuple
-from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+from collections import OrderedDict
+from bisect import bisect_left, insort
 from threading import Lock
+import asyncio
+import json
 import logging
+import os
+import time
+import uuid
+
+from app.core.cache_backends import CacheBackend
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TTL_SECONDS = 60
+
+
+class _CacheEntry(NamedTuple):
+    data: Any
+    expires_at: float
+    size_bytes: int
+
+
+def _estimate_size(data: Any) -> int:
+    """Approximate the memory footprint of a cached value by its JSON size."""
+    try:
+        return len(json.dumps(data, default=str))
+    except (TypeError, ValueError):
+        return len(repr(data))
+
 
 class SimpleCache:
     """
@@ -39,91 +70,205 @@ class SimpleCache:
 
     Attributes:
         max_entries: Maximum number of cache entries before LRU eviction
-        _cache: Internal cache storage (key -> (timestamp, data))
+        max_bytes: Approximate memory cap before LRU eviction
+        _cache: Internal cache storage in LRU order (key -> _CacheEntry)
+        _sorted_keys: Sorted key index for prefix invalidation
         _lock: Thread lock for safe concurrent access
     """
 
-    def __init__(self, max_entries: int = 1000):
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 128 * 1024 * 1024):
         """
-        Initialize cache with maximum entry limit.
+        Initialize cache with maximum entry and memory limits.
 
         Args:
             max_entries: Maximum cache entries (default 1000)
                         Typical: 200KB per agent list × 1000 = 200MB per worker
+            max_bytes: Approximate memory cap in bytes (default 128MB)
         """
-        self._cache: Dict[str, Tuple[datetime, Any]] = {}
+        self._cache: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._sorted_keys: List[str] = []
         self._lock = Lock()
         self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._total_bytes = 0
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+        # Bumped by every invalidation so loads racing one are not cached
+        self._generation = 0
         self._hits = 0
         self._misses = 0
-        logger.info(f"SimpleCache initialized with max_entries={max_entries}")
+        self._evictions = 0
+        self._coalesced = 0
+        logger.info(f"SimpleCache initialized with max_entries={max_entries}, max_bytes={max_bytes}")
+
+    def _remove_locked(self, key: str) -> None:
+        """Remove a key from storage and the prefix index (caller holds the lock)."""
+        entry = self._cache.pop(key)
+        self._total_bytes -= entry.size_bytes
+        idx = bisect_left(self._sorted_keys, key)
+        if idx < len(self._sorted_keys) and self._sorted_keys[idx] == key:
+            del self._sorted_keys[idx]
+
+    def _invalidate_locked(self, keys: List[str]) -> None:
+        """
+        Mark an invalidation (caller holds the lock).
+
+        In-flight loads of the given keys are detached so later callers start a
+        fresh load, and no load that started before now will be cached.
+        """
+        self._generation += 1
+        for k in keys:
+            self._inflight.pop(k, None)
 
-    def get(self, key: str, ttl: int = 60) -> Optional[Any]:
+    def get(self, key: str) -> Optional[Any]:
         """
         Get cached value if not expired.
 
         Args:
             key: Cache key (should include tenant/user for isolation)
-            ttl: Time-to-live in seconds (default 60)
 
         Returns:
             Cached data if found and not expired, None otherwise
 
         Example:
-            data = cache.get("agents_minimal_user123", ttl=60)
+            data = cache.get("agents_minimal_user123")
             if data is None:
                 # Cache miss - fetch from database
                 data = await fetch_from_db()
-                cache.set("agents_minimal_user123", data)
+                cache.set("agents_minimal_user123", data, ttl=60)
         """
         with self._lock:
-            if key not in self._cache:
+            entry = self._cache.get(key)
+            if entry is None:
                 self._misses += 1
                 logger.debug(f"Cache miss: {key}")
                 return None
 
-            timestamp, data = self._cache[key]
-            age = (datetime.utcnow() - timestamp).total_seconds()
-
-            if age > ttl:
+            if time.monotonic() >= entry.expires_at:
                 # Expired - remove and return None
-                del self._cache[key]
+                self._remove_locked(key)
                 self._misses += 1
-                logger.debug(f"Cache expired: {key} (age={age:.1f}s, ttl={ttl}s)")
+                logger.debug(f"Cache expired: {key}")
                 return None
 
+            self._cache.move_to_end(key)
             self._hits += 1
-            logger.debug(f"Cache hit: {key} (age={age:.1f}s, ttl={ttl}s)")
-            return data
+            logger.debug(f"Cache hit: {key}")
+            return entry.data
 
-    def set(self, key: str, data: Any) -> None:
+    async def aget(self, key: str) -> Optional[Any]:
         """
-        Set cache value with current timestamp.
+        Async get; identical to get() for the per-worker cache.
+
+        Request handlers should prefer this so they also read the shared L2
+        tier when one is configured (see TieredCache).
+        """
+        return self.get(key)
+
+    def set(self, key: str, data: Any, ttl: int = DEFAULT_TTL_SECONDS) -> None:
+        """
+        Set cache value with its own time-to-live.
 
         Args:
             key: Cache key
             data: Data to cache (should be JSON-serializable)
+            ttl: Time-to-live in seconds for this entry (default 60)
 
         Note:
-            If cache is full, oldest entry is evicted (LRU)
+            If cache is over its entry or byte limit, least recently used
+            entries are evicted. Finding the LRU entry is O(1); keeping the
+            sorted prefix index current costs an O(log n) search plus an O(n)
+            list shift per insert or removal (n <= max_entries)
         """
+        size_bytes = _estimate_size(data)
+        if size_bytes > self._max_bytes:
+            logger.warning(f"Cache value for {key} ({size_bytes} bytes) exceeds max_bytes, not cached")
+            return
+
         with self._lock:
-            # LRU eviction if cache full
-            if len(self._cache) >= self._max_entries:
-                oldest_key = min(self._cache.items(), key=lambda x: x[1][0])[0]
-                del self._cache[oldest_key]
-                logger.warning(
-                    f"Cache full ({self._max_entries} entries), "
-                    f"evicted oldest key: {oldest_key}"
-                )
-
-            self._cache[key] = (datetime.utcnow(), data)
-            logger.debug(f"Cache set: {key} (total entries: {len(self._cache)})")
+            if key in self._cache:
+                self._remove_locked(key)
+
+            self._cache[key] = _CacheEntry(data, time.monotonic() + ttl, size_bytes)
+            self._total_bytes += size_bytes
+            insort(self._sorted_keys, key)
+
+            # LRU eviction if cache over limits
+            while len(self._cache) > self._max_entries or self._total_bytes > self._max_bytes:
+                oldest_key = next(iter(self._cache))
+                self._remove_locked(oldest_key)
+                self._evictions += 1
+                logger.debug(f"Cache full, evicted least recently used key: {oldest_key}")
+
+            logger.debug(f"Cache set: {key} (ttl={ttl}s, total entries: {len(self._cache)})")
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = DEFAULT_TTL_SECONDS
+    ) -> Any:
+        """
+        Get cached value, or load and cache it with stampede protection.
+
+        Concurrent callers that miss on the same key await a single loader
+        call instead of each hitting the backing store. Loader exceptions
+        propagate to every waiter and nothing is cached; None is not cached.
+
+        The loader runs in its own task: a caller that is cancelled (e.g. the
+        client disconnected) stops waiting, but the load still completes for
+        the other waiters and is cached. A load that overlaps a delete() or
+        clear() is returned to its waiters but not cached, since it may have
+        read the data before the change that triggered the invalidation.
+
+        Args:
+            key: Cache key
+            loader: Zero-argument coroutine function producing the value
+            ttl: Time-to-live in seconds for the loaded value
+
+        Returns:
+            Cached or freshly loaded data
+        """
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        with self._lock:
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._load(key, loader, ttl, self._generation))
+                # Retrieve so a load nobody awaits any more does not log
+                # "exception never retrieved"
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                self._inflight[key] = task
+            else:
+                self._coalesced += 1
+
+        # Shielded so cancelling this caller never cancels the shared load
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: int, generation: int) -> Any:
+        """Run a coalesced load and cache its result (runs detached from callers)"""
+        task = asyncio.current_task()
+        try:
+            data = await loader()
+            if data is not None and self._generation == generation:
+                self.set(key, data, ttl=ttl)
+            elif data is not None:
+                logger.debug(f"Cache load of {key} overlapped an invalidation, not cached")
+            return data
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
 
     def delete(self, pattern: str) -> int:
         """
         Delete all keys matching pattern (prefix match).
 
+        Uses the sorted key index: the matching range is found by binary
+        search instead of testing every key, then removed with one slice
+        deletion.
+
         Args:
             pattern: Key prefix to match (e.g., "agents_minimal_")
 
@@ -136,9 +281,17 @@ class SimpleCache:
             count += cache.delete(f"agents_summary_{user_id}")
         """
         with self._lock:
-            keys_to_delete = [k for k in self._cache.keys() if k.startswith(pattern)]
+            start = bisect_left(self._sorted_keys, pattern)
+            end = start
+            while end < len(self._sorted_keys) and self._sorted_keys[end].startswith(pattern):
+                end += 1
+
+            keys_to_delete = self._sorted_keys[start:end]
+            del self._sorted_keys[start:end]
+            self._invalidate_locked([k for k in self._inflight if k.startswith(pattern)])
             for k in keys_to_delete:
-                del self._cache[k]
+                entry = self._cache.pop(k)
+                self._total_bytes -= entry.size_bytes
 
             if keys_to_delete:
                 logger.info(f"Cache invalidated {len(keys_to_delete)} entries matching '{pattern}'")
@@ -149,9 +302,14 @@ class SimpleCache:
         """Clear entire cache (use with caution)."""
         with self._lock:
             entry_count = len(self._cache)
+            self._invalidate_locked(list(self._inflight))
             self._cache.clear()
+            self._sorted_keys.clear()
+            self._total_bytes = 0
             self._hits = 0
             self._misses = 0
+            self._evictions = 0
+            self._coalesced = 0
             logger.warning(f"Cache cleared (removed {entry_count} entries)")
 
     def size(self) -> int:
@@ -163,7 +321,7 @@ class SimpleCache:
         Get cache statistics.
 
         Returns:
-            Dict with size, hits, misses, hit_rate
+            Dict with size, memory usage, hits, misses, hit_rate, evictions
         """
         total_requests = self._hits + self._misses
         hit_rate = (self._hits / total_requests * 100) if total_requests > 0 else 0
@@ -171,12 +329,209 @@ class SimpleCache:
         return {
             "size": len(self._cache),
             "max_entries": self._max_entries,
+            "size_bytes": self._total_bytes,
+            "max_bytes": self._max_bytes,
             "hits": self._hits,
             "misses": self._misses,
             "hit_rate_percent": round(hit_rate, 2),
+            "evictions": self._evictions,
+            "coalesced_loads": self._coalesced,
         }
 
 
+class TieredCache(SimpleCache):
+    """
+    Per-worker L1 cache backed by a shared L2 store.
+
+    - Reads check L1, then L2 (aget/get_or_load); L2 hits repopulate L1 with
+      the entry's remaining TTL
+    - Writes go to L1 immediately and to L2 in the background
+    - L2 writes and deletes are applied in order by one task per worker, so
+      a delete can never be overtaken by an earlier write of the same key
+    - Deletes drop L1, delete from L2 and publish an invalidation so every
+      other worker drops the same keys from its L1
+    - Writes also publish an invalidation so other workers re-read the new
+      value from L2 instead of serving their stale L1 copy
+
+    The sync get() stays L1-only so existing callers keep working unchanged.
+    L2 failures are logged and degrade to L1-only behaviour.
+    """
+
+    def __init__(self, backend: CacheBackend, max_entries: int = 1000, max_bytes: int = 128 * 1024 * 1024):
+        super().__init__(max_entries=max_entries, max_bytes=max_bytes)
+        self._backend = backend
+        self._worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._listener_task: Optional[asyncio.Task] = None
+        self._l2_queue: Optional[asyncio.Queue] = None
+        self._l2_task: Optional[asyncio.Task] = None
+        self._l2_hits = 0
+        self._l2_errors = 0
+        self._invalidations_received = 0
+
+    def _enqueue(self, operation: Callable[[], Awaitable[Any]], description: str) -> None:
+        """Queue an L2 operation for the per-worker L2 task (no-op outside an event loop)"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        if self._l2_queue is None or self._l2_task is None or self._l2_task.done() \
+                or self._l2_task.get_loop() is not loop:
+            self._l2_queue = asyncio.Queue()
+            self._l2_task = loop.create_task(self._run_l2(self._l2_queue))
+        self._l2_queue.put_nowait((operation, description))
+
+    async def _run_l2(self, queue: asyncio.Queue) -> None:
+        """Apply queued L2 operations one at a time, in the order they were issued"""
+        while True:
+            operation, description = await queue.get()
+            try:
+                await operation()
+            except Exception as e:
+                self._l2_errors += 1
+                logger.warning(f"Shared cache {description} failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def aget(self, key: str) -> Optional[Any]:
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        try:
+            found = await self._backend.get(key)
+        except Exception as e:
+            self._l2_errors += 1
+            logger.warning(f"Shared cache read failed for {key}: {e}")
+            return None
+        if found is None:
+            return None
+
+        data, expires_at = found
+        remaining = expires_at - time.time()
+        if remaining > 0:
+            super().set(key, data, ttl=remaining)
+        self._l2_hits += 1
+        logger.debug(f"Shared cache hit: {key}")
+        return data
+
+    def set(self, key: str, data: Any, ttl: int = DEFAULT_TTL_SECONDS) -> None:
+        super().set(key, data, ttl=ttl)
+        self._enqueue(lambda: self._write_through(key, data, ttl), f"write of {key}")
+
+    async def _write_through(self, key: str, data: Any, ttl: int) -> None:
+        await self._backend.set(key, data, ttl)
+        await self._backend.publish_invalidation(key, False, self._worker_id)
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = DEFAULT_TTL_SECONDS
+    ) -> Any:
+        # L2 hits repopulate L1 only; just a real load is written back to L2
+        data = await self.aget(key)
+        if data is not None:
+            return data
+        return await super().get_or_load(key, loader, ttl=ttl)
+
+    def delete(self, pattern: str) -> int:
+        count = super().delete(pattern)
+        self._enqueue(lambda: self._delete_shared(pattern), f"invalidation of '{pattern}'")
+        return count
+
+    async def _delete_shared(self, pattern: str) -> None:
+        await self._backend.delete_prefix(pattern)
+        await self._backend.publish_invalidation(pattern, True, self._worker_id)
+
+    async def _on_invalidation(self, key: str, is_prefix: bool, origin: str) -> None:
+        if origin == self._worker_id:
+            return
+        self._invalidations_received += 1
+        if is_prefix:
+            SimpleCache.delete(self, key)
+            return
+        with self._lock:
+            self._invalidate_locked([key])
+            if key in self._cache:
+                self._remove_locked(key)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                await self._backend.listen_invalidations(self._on_invalidation)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Missed invalidations are bounded by entry TTLs; drop L1 to be safe
+                logger.warning(f"Cache invalidation listener failed, clearing L1 and retrying: {e}")
+                self.clear()
+                await asyncio.sleep(5)
+
+    async def start(self) -> None:
+        """Start the cross-worker invalidation listener"""
+        if self._listener_task is None:
+            self._listener_task = asyncio.create_task(self._listen())
+            logger.info(f"Shared cache invalidation listener started (worker {self._worker_id})")
+
+    async def stop(self) -> None:
+        """Stop the listener, flush pending L2 writes and close the backend"""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        if self._l2_task is not None:
+            if not self._l2_task.done():
+                await self._l2_queue.join()
+            self._l2_task.cancel()
+            try:
+                await self._l2_task
+            except asyncio.CancelledError:
+                pass
+            self._l2_task = None
+            self._l2_queue = None
+        await self._backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "l2_hits": self._l2_hits,
+            "l2_errors": self._l2_errors,
+            "l2_queue_depth": self._l2_queue.qsize() if self._l2_queue is not None else 0,
+            "invalidations_received": self._invalidations_received,
+        })
+        return stats
+
+
+def _create_cache() -> SimpleCache:
+    """Build the cache configured by settings.cache_backend"""
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    backend_name = settings.cache_backend.lower()
+
+    try:
+        if backend_name == "redis":
+            if not settings.cache_redis_url:
+                raise ValueError("cache_backend=redis requires cache_redis_url")
+            from app.core.cache_backends import RedisCacheBackend
+            backend = RedisCacheBackend(settings.cache_redis_url, namespace=settings.tenant_domain)
+        elif backend_name == "sqlite":
+            from app.core.cache_backends import SQLiteCacheBackend
+            backend = SQLiteCacheBackend(settings.cache_sqlite_path)
+        else:
+            return SimpleCache(max_entries=1000)
+    except Exception as e:
+        logger.error(f"Failed to initialize {backend_name} cache backend, using per-worker cache only: {e}")
+        return SimpleCache(max_entries=1000)
+
+    logger.info(f"Using tiered cache with shared {backend_name} backend")
+    return TieredCache(backend, max_entries=1000)
+
+
 # Singleton cache instance per worker
 _cache: Optional[SimpleCache] = None
 
@@ -185,17 +540,31 @@ def get_cache() -> SimpleCache:
     """
     Get or create singleton cache instance.
 
-    Each Uvicorn worker creates its own cache instance (isolated per-process).
+    Each Uvicorn worker creates its own L1 cache; when a shared backend is
+    configured this is a TieredCache whose L2 tier is shared by all workers.
 
     Returns:
-        SimpleCache instance
+        SimpleCache (or TieredCache) instance
     """
     global _cache
     if _cache is None:
-        _cache = SimpleCache(max_entries=1000)
+        _cache = _create_cache()
     return _cache
 
 
+async def start_cache() -> None:
+    """Start cross-worker invalidation (no-op for the per-worker cache)"""
+    cache = get_cache()
+    if isinstance(cache, TieredCache):
+        await cache.start()
+
+
+async def stop_cache() -> None:
+    """Stop cross-worker invalidation and close the shared backend"""
+    if isinstance(_cache, TieredCache):
+        await _cache.stop()
+
+
 def clear_cache() -> None:
     """Clear global cache (for testing or emergency use)."""
     cache = get_cache()
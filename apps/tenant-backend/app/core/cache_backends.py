@@ -0,0 +1,232 @@
+"""
+Shared (L2) cache backends for the tenant backend cache.
+
+Each Uvicorn worker keeps its own in-process L1 cache (see app.core.cache).
+These backends provide a second tier shared by every worker, plus an
+invalidation channel so a write or delete in one worker drops the stale L1
+entries held by the others.
+
+Backends:
+- RedisCacheBackend: any Redis-protocol server (Redis, Valkey, KeyDB, Dragonfly).
+  Values live under a tenant-namespaced key, invalidations use PUBLISH/SUBSCRIBE.
+  Requires the optional `redis` package.
+- SQLiteCacheBackend: a WAL-mode SQLite file shared by the workers of one pod
+  (or a test process). Invalidations are appended to a log table that each
+  worker polls.
+
+Values are stored as JSON envelopes {"v": data, "exp": epoch_seconds}, so
+cached data must be JSON-serializable (as for the L1 cache).
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Invalidation callback: (key_or_prefix, is_prefix, origin_worker_id)
+InvalidationHandler = Callable[[str, bool, str], Awaitable[None]]
+
+
+class CacheBackend(ABC):
+    """Interface for a cache tier shared across workers."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (data, expires_at_epoch) or None if missing/expired"""
+
+    @abstractmethod
+    async def set(self, key: str, data: Any, ttl: int) -> None:
+        """Store data for ttl seconds"""
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> int:
+        """Delete every key starting with prefix"""
+
+    @abstractmethod
+    async def publish_invalidation(self, key: str, is_prefix: bool, origin: str) -> None:
+        """Tell every worker to drop key (or all keys under prefix) from L1"""
+
+    @abstractmethod
+    async def listen_invalidations(self, handler: InvalidationHandler) -> None:
+        """Run until cancelled, calling handler for each invalidation message"""
+
+    async def close(self) -> None:
+        """Release backend resources"""
+
+
+def _encode(data: Any, ttl: int) -> Tuple[str, float]:
+    expires_at = time.time() + ttl
+    return json.dumps({"v": data, "exp": expires_at}, default=str), expires_at
+
+
+def _decode(raw: Any) -> Optional[Tuple[Any, float]]:
+    if raw is None:
+        return None
+    envelope = json.loads(raw)
+    if envelope["exp"] <= time.time():
+        return None
+    return envelope["v"], envelope["exp"]
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis-protocol shared cache with pub/sub invalidation."""
+
+    def __init__(self, url: str, namespace: str):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("cache_backend=redis requires the 'redis' package") from e
+
+        self._redis = redis_asyncio.from_url(url, decode_responses=True)
+        self._prefix = f"gt2:cache:{namespace}:"
+        self._channel = f"gt2:cache-invalidate:{namespace}"
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        return _decode(await self._redis.get(self._prefix + key))
+
+    async def set(self, key: str, data: Any, ttl: int) -> None:
+        payload, _ = _encode(data, ttl)
+        await self._redis.set(self._prefix + key, payload, ex=max(1, int(ttl)))
+
+    async def delete_prefix(self, prefix: str) -> int:
+        deleted = 0
+        batch = []
+        async for redis_key in self._redis.scan_iter(match=self._prefix + _glob_escape(prefix) + "*", count=500):
+            batch.append(redis_key)
+            if len(batch) >= 500:
+                deleted += await self._redis.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += await self._redis.unlink(*batch)
+        return deleted
+
+    async def publish_invalidation(self, key: str, is_prefix: bool, origin: str) -> None:
+        await self._redis.publish(
+            self._channel,
+            json.dumps({"key": key, "prefix": is_prefix, "origin": origin})
+        )
+
+    async def listen_invalidations(self, handler: InvalidationHandler) -> None:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self._channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    payload = json.loads(message["data"])
+                    await handler(payload["key"], payload["prefix"], payload["origin"])
+                except Exception as e:
+                    logger.warning(f"Ignoring malformed cache invalidation message: {e}")
+        finally:
+            await pubsub.unsubscribe(self._channel)
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def _glob_escape(value: str) -> str:
+    """Escape Redis glob metacharacters in a literal prefix"""
+    for ch in ("\\", "*", "?", "[", "]"):
+        value = value.replace(ch, "\\" + ch)
+    return value
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Shared-file cache for workers on the same host.
+
+    SQLite has no pub/sub, so invalidations are appended to a log table and
+    each worker polls for rows newer than the last one it has seen.
+    """
+
+    INVALIDATION_RETENTION_SECONDS = 300
+
+    def __init__(self, path: str, poll_interval: float = 0.5):
+        self._path = path
+        self._poll_interval = poll_interval
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_invalidations ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL,"
+            " is_prefix INTEGER NOT NULL, origin TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._lock = asyncio.Lock()
+
+    async def _run(self, fn: Callable[[], Any]) -> Any:
+        # One statement at a time on the shared connection, off the event loop
+        async with self._lock:
+            return await asyncio.to_thread(fn)
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        row = await self._run(lambda: self._conn.execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone())
+        return _decode(row[0]) if row else None
+
+    async def set(self, key: str, data: Any, ttl: int) -> None:
+        payload, expires_at = _encode(data, ttl)
+        await self._run(lambda: self._conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, payload, expires_at)
+        ))
+
+    async def delete_prefix(self, prefix: str) -> int:
+        # Range scan on the primary key instead of LIKE (no escaping issues)
+        upper = prefix + "\U0010ffff"
+        cursor = await self._run(lambda: self._conn.execute(
+            "DELETE FROM cache_entries WHERE key >= ? AND key < ?",
+            (prefix, upper)
+        ))
+        return cursor.rowcount
+
+    async def publish_invalidation(self, key: str, is_prefix: bool, origin: str) -> None:
+        now = time.time()
+
+        def _publish():
+            self._conn.execute(
+                "INSERT INTO cache_invalidations (key, is_prefix, origin, created_at) VALUES (?, ?, ?, ?)",
+                (key, int(is_prefix), origin, now)
+            )
+            self._conn.execute(
+                "DELETE FROM cache_invalidations WHERE created_at < ?",
+                (now - self.INVALIDATION_RETENTION_SECONDS,)
+            )
+
+        await self._run(_publish)
+
+    async def listen_invalidations(self, handler: InvalidationHandler) -> None:
+        row = await self._run(lambda: self._conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM cache_invalidations"
+        ).fetchone())
+        last_id = row[0]
+
+        while True:
+            await asyncio.sleep(self._poll_interval)
+            try:
+                rows = await self._run(lambda: self._conn.execute(
+                    "SELECT id, key, is_prefix, origin FROM cache_invalidations WHERE id > ? ORDER BY id",
+                    (last_id,)
+                ).fetchall())
+            except sqlite3.Error as e:
+                logger.warning(f"Cache invalidation poll failed: {e}")
+                continue
+            for row_id, key, is_prefix, origin in rows:
+                last_id = row_id
+                await handler(key, bool(is_prefix), origin)
+
+    async def close(self) -> None:
+        await self._run(self._conn.close)
@@ -92,6 +92,14 @@ class Settings(BaseSettings):
         default="internal-service-token",
         description="Service-to-service authentication token"
     )
+    session_cache_ttl_seconds: int = Field(
+        default=15,
+        description="TTL for cached valid Control Panel session checks (revocations are streamed and invalidate immediately)"
+    )
+    session_negative_cache_ttl_seconds: int = Field(
+        default=5,
+        description="TTL for cached invalid Control Panel session checks"
+    )
 
     # WebSocket Configuration
     websocket_ping_interval: int = Field(default=25, description="WebSocket ping interval")
@@ -129,10 +137,30 @@ class Settings(BaseSettings):
         default=0.05,
         description="Safety margin for token budget calculations (0.05 = 5%)"
     )
+    tokenizer_directory: str = Field(
+        default="/models/tokenizers",
+        description="Tokenizer files, loaded lazily: <model id>/tokenizer.json (exact) or <family>/tokenizer.json (approximate)"
+    )
+    tokenizer_ingest_model: str = Field(
+        default="llama-3.1-8b-instant",
+        description="Model whose tokenizer produces the per-chunk token counts stored at ingest"
+    )
 
     # Rate Limiting
     rate_limit_requests: int = Field(default=1000, description="Requests per minute per IP")
     rate_limit_window_seconds: int = Field(default=60, description="Rate limit window")
+    rate_limit_backend: str = Field(
+        default="memory",
+        description="Rate limit state: memory (per-worker) or redis (shared across workers and replicas)"
+    )
+    rate_limit_redis_url: Optional[str] = Field(
+        default=None,
+        description="Redis-protocol URL for rate_limit_backend=redis (e.g. redis://valkey:6379/1)"
+    )
+    rate_limit_namespace: Optional[str] = Field(
+        default=None,
+        description="Key namespace in the shared rate limit store (default: tenant_domain)"
+    )
     
     # CORS Configuration
     cors_origins: List[str] = Field(
@@ -159,7 +187,51 @@ class Settings(BaseSettings):
         default=0.3,
         description="Minimum similarity threshold for vector search"
     )
-    
+    embedding_cache_max_entries: int = Field(
+        default=5000,
+        description="In-process LRU size for the content-hash embedding cache (0 disables the LRU tier)"
+    )
+
+    # Response Cache Configuration (app.core.cache)
+    cache_backend: str = Field(
+        default="memory",
+        description="Shared L2 cache tier: memory (per-worker only), sqlite, or redis"
+    )
+    cache_redis_url: Optional[str] = Field(
+        default=None,
+        description="Redis-protocol URL for cache_backend=redis (e.g. redis://valkey:6379/0)"
+    )
+    cache_sqlite_path: str = Field(
+        default="/tmp/gt2-cache.sqlite3",
+        description="Shared SQLite file for cache_backend=sqlite (must be local to all workers)"
+    )
+    model_catalog_ttl_seconds: int = Field(
+        default=300,
+        description="TTL for the cached Resource Cluster model catalogue (config sync also pushes invalidations)"
+    )
+    model_catalog_local_ttl_seconds: int = Field(
+        default=30,
+        description="Catalogue TTL cap without a shared cache backend, where pushed invalidations only reach one worker"
+    )
+    team_permission_cache_ttl_seconds: int = Field(
+        default=30,
+        description="TTL for cached per-user team permission snapshots (sharing and membership changes invalidate them)"
+    )
+
+    # WebSocket Backplane (app.websocket.backplane)
+    websocket_backplane: str = Field(
+        default="none",
+        description="Cross-worker WebSocket broadcast backplane: none (single worker), memory (in-process), or redis"
+    )
+    web_concurrency: int = Field(
+        default=1,
+        description="Uvicorn worker processes (WEB_CONCURRENCY); more than one requires websocket_backplane=redis"
+    )
+    websocket_backplane_redis_url: Optional[str] = Field(
+        default=None,
+        description="Redis-protocol URL for websocket_backplane=redis (defaults to cache_redis_url)"
+    )
+
     # Legacy ChromaDB Configuration (DEPRECATED - replaced by PGVector)
     chromadb_mode: str = Field(
         default="disabled", 
@@ -191,7 +263,39 @@ class Settings(BaseSettings):
     # Monitoring
     prometheus_enabled: bool = Field(default=True, description="Enable Prometheus metrics")
     prometheus_port: int = Field(default=9090, description="Prometheus metrics port")
-    
+
+    # Observability Usage Rollups (app.services.usage_rollup_service)
+    usage_rollups_enabled: bool = Field(
+        default=True,
+        description="Maintain hourly/daily usage rollups in the background for observability dashboards"
+    )
+    usage_rollup_interval_seconds: int = Field(
+        default=120,
+        description="Seconds between incremental rollup passes"
+    )
+    usage_rollup_grace_minutes: int = Field(
+        default=10,
+        description="Buckets this far behind the watermark are recomputed to pick up late-committed messages"
+    )
+    usage_rollup_hourly_retention_days: int = Field(
+        default=90,
+        description="Days of hourly rollups to keep (older ranges are served from daily rollups)"
+    )
+
+    # Conversation Search (app.services.conversation_search_service)
+    conversation_search_embeddings_enabled: bool = Field(
+        default=False,
+        description="Embed chat messages in the background and blend semantic matches into conversation search"
+    )
+    conversation_search_embedding_interval_seconds: int = Field(
+        default=60,
+        description="Seconds between background message embedding passes"
+    )
+    conversation_search_embedding_batch_size: int = Field(
+        default=64,
+        description="Messages embedded per background pass"
+    )
+
     # Feature Flags
     enable_file_upload: bool = Field(default=True, description="Enable file upload feature")
     enable_voice_input: bool = Field(default=False, description="Enable voice input (future)")
@@ -11,11 +11,12 @@ Replaces DuckDB service with direct PostgreSQL connections, providing:
 
 import asyncio
 import logging
+import struct
 from typing import Dict, List, Optional, Any, AsyncGenerator, Tuple, Union
 from contextlib import asynccontextmanager
 import json
 from datetime import datetime
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import asyncpg
 from asyncpg import Pool, Connection
@@ -25,6 +26,23 @@ from app.core.config import get_settings, get_tenant_schema_name
 
 logger = logging.getLogger(__name__)
 
+
+def _encode_vector_binary(value: Union[str, List[float], Tuple[float, ...]]) -> bytes:
+    """Encode a vector in pgvector's binary wire format (int16 dim, int16 unused, float4[])"""
+    if isinstance(value, str):
+        value = [float(v) for v in value.strip("[]").split(",") if v.strip()]
+    elif hasattr(value, "tolist"):  # numpy arrays
+        value = value.tolist()
+    dim = len(value)
+    return struct.pack(f">HH{dim}f", dim, 0, *value)
+
+
+def _decode_vector_binary(data: bytes) -> List[float]:
+    """Decode pgvector's binary wire format into a list of floats"""
+    dim, _ = struct.unpack_from(">HH", data)
+    return list(struct.unpack_from(f">{dim}f", data, 4))
+
+
 class PostgreSQLClient:
     """PostgreSQL + PGVector client for tenant backend operations"""
     
@@ -146,6 +164,28 @@ class PostgreSQLClient:
                 logger.error(f"Query execution failed: {e}, Query: {query}")
                 raise
     
+    async def iter_query(
+        self,
+        query: str,
+        *args,
+        prefetch: int = 1000
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream SELECT results through a server-side cursor.
+
+        Rows are fetched `prefetch` at a time inside a read-only transaction,
+        so memory stays flat regardless of result size. The connection is held
+        until the generator is exhausted or closed.
+        """
+        async with self.get_connection() as conn:
+            try:
+                async with conn.transaction(readonly=True):
+                    async for row in conn.cursor(query, *args, prefetch=prefetch):
+                        yield dict(row)
+            except PostgresError as e:
+                logger.error(f"Cursor query failed: {e}, Query: {query}")
+                raise
+
     async def execute_command(self, command: str, *args) -> int:
         """Execute an INSERT/UPDATE/DELETE command and return affected rows"""
         async with self.get_connection() as conn:
@@ -190,6 +230,120 @@ class PostgreSQLClient:
                         raise
                 return results
     
+    @asynccontextmanager
+    async def _binary_vector_codec(self, conn: Connection) -> AsyncGenerator[Connection, None]:
+        """
+        Temporarily register a binary codec for the pgvector type on a connection.
+
+        Vectors are then sent as packed float4 instead of "[0.1,0.2,...]" text
+        that the server has to parse. The codec is reset before the connection
+        goes back to the pool so other queries keep the text representation.
+        """
+        await conn.set_type_codec(
+            'vector',
+            schema='public',
+            encoder=_encode_vector_binary,
+            decoder=_decode_vector_binary,
+            format='binary'
+        )
+        try:
+            yield conn
+        finally:
+            await conn.reset_type_codec('vector', schema='public')
+
+    async def copy_records(
+        self,
+        table: str,
+        columns: List[str],
+        records: List[Tuple[Any, ...]]
+    ) -> int:
+        """
+        Bulk insert rows with binary COPY in a single transaction.
+
+        Vector columns accept Python sequences (or numpy arrays) and are streamed
+        in pgvector's binary format. Returns the number of rows written.
+        """
+        if not records:
+            return 0
+
+        async with self.get_connection() as conn:
+            async with self._binary_vector_codec(conn):
+                try:
+                    async with conn.transaction():
+                        result = await conn.copy_records_to_table(
+                            table,
+                            records=records,
+                            columns=columns,
+                            schema_name=self.schema_name
+                        )
+                    # Result looks like "COPY 15"
+                    return int(result.split()[-1]) if result else 0
+                except PostgresError as e:
+                    logger.error(f"Bulk COPY into {table} failed ({len(records)} rows): {e}")
+                    raise
+
+    async def execute_vector_command(self, command: str, *args) -> int:
+        """Execute an INSERT/UPDATE command sending vector parameters in binary format"""
+        async with self.get_connection() as conn:
+            async with self._binary_vector_codec(conn):
+                try:
+                    result = await conn.execute(command, *args)
+                    return int(result.split()[-1]) if result else 0
+                except PostgresError as e:
+                    logger.error(f"Vector command execution failed: {e}, Command: {command}")
+                    raise
+
+    async def fetch_vectors(self, query: str, *args) -> List[Dict[str, Any]]:
+        """Execute a SELECT query returning vector columns decoded as lists of floats"""
+        async with self.get_connection() as conn:
+            async with self._binary_vector_codec(conn):
+                try:
+                    rows = await conn.fetch(query, *args)
+                    return [dict(row) for row in rows]
+                except PostgresError as e:
+                    logger.error(f"Vector query execution failed: {e}, Query: {query}")
+                    raise
+
+    async def execute_many_vectors(self, command: str, args_list: List[Tuple[Any, ...]]) -> None:
+        """Execute a command for many argument tuples in one pipelined batch with binary vectors"""
+        if not args_list:
+            return
+        async with self.get_connection() as conn:
+            async with self._binary_vector_codec(conn):
+                try:
+                    await conn.executemany(command, args_list)
+                except PostgresError as e:
+                    logger.error(f"Batched vector command failed ({len(args_list)} rows): {e}, Command: {command}")
+                    raise
+
+    async def bulk_insert_document_chunks(self, chunks: List[Dict[str, Any]]) -> int:
+        """
+        Insert a batch of document chunks with their embeddings via binary COPY.
+
+        Each chunk dict provides document_id, user_id, dataset_id, chunk_index,
+        content, content_hash, token_count, embedding and optionally id/metadata.
+        """
+        columns = [
+            'id', 'document_id', 'user_id', 'dataset_id', 'chunk_index',
+            'content', 'content_hash', 'token_count', 'embedding', 'metadata'
+        ]
+        records = [
+            (
+                UUID(str(chunk['id'])) if chunk.get('id') else uuid4(),
+                UUID(str(chunk['document_id'])),
+                UUID(str(chunk['user_id'])),
+                UUID(str(chunk['dataset_id'])) if chunk.get('dataset_id') else None,
+                chunk['chunk_index'],
+                chunk['content'],
+                chunk['content_hash'],
+                chunk.get('token_count', 0),
+                chunk['embedding'] if chunk.get('embedding') is not None and len(chunk['embedding']) else None,
+                json.dumps(chunk.get('metadata') or {})
+            )
+            for chunk in chunks
+        ]
+        return await self.copy_records('document_chunks', columns, records)
+
     # Vector Search Operations (PGVector)
     
     async def vector_similarity_search(
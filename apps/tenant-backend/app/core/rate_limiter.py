@@ -0,0 +1,58 @@
+"""
+Rate Limiting for GT 2.0 Tenant Backend
+
+The GCRA engine lives in the shared gt2-rate-limiter package
+(packages/rate-limiter), which the Resource Cluster uses as well; this module
+configures the per-worker limiter from settings. Shared-store keys are
+namespaced by rate_limit_namespace (default: the tenant domain).
+"""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+# Images install the package; source checkouts fall back to the repo copy
+rate_limiter_path = Path(__file__).parent.parent.parent.parent.parent / "packages" / "rate-limiter" / "src"
+if rate_limiter_path.exists():
+    sys.path.append(str(rate_limiter_path))
+
+from gt2_rate_limiter import (
+    RateLimiter,
+    RateLimitResult,
+    create_rate_limiter,
+    retry_after_seconds
+)
+
+__all__ = [
+    "RateLimiter",
+    "RateLimitResult",
+    "get_rate_limiter",
+    "close_rate_limiter",
+    "retry_after_seconds"
+]
+
+# Singleton limiter per worker
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get or create the rate limiter configured by settings"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        from app.core.config import get_settings
+
+        settings = get_settings()
+        _rate_limiter = create_rate_limiter(
+            settings.rate_limit_backend,
+            settings.rate_limit_redis_url,
+            namespace=settings.rate_limit_namespace or settings.tenant_domain
+        )
+    return _rate_limiter
+
+
+async def close_rate_limiter() -> None:
+    """Close the shared store connection (application shutdown)"""
+    global _rate_limiter
+    if _rate_limiter is not None:
+        await _rate_limiter.close()
+        _rate_limiter = None
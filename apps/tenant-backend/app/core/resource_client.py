@@ -528,4 +528,30 @@ class ResourceClusterClient:
             logger.error(f"Inference endpoint call failed: {e}")
             raise
     
-    # Streaming removed for reliability - using non-streaming only
\ No newline at end of file
+    # Streaming removed for reliability - using non-streaming only
+
+# Shared pooled session for short Resource Cluster calls (per worker)
+_shared_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_shared_session() -> aiohttp.ClientSession:
+    """
+    Get the process-wide aiohttp session for Resource Cluster calls.
+
+    Reuses keep-alive connections instead of paying TCP/TLS setup per request.
+    Callers pass per-request timeouts; the session must not be closed by them.
+    """
+    global _shared_session
+    if _shared_session is None or _shared_session.closed:
+        _shared_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=30)
+        )
+    return _shared_session
+
+
+async def close_shared_session() -> None:
+    """Close the shared session (application shutdown)"""
+    global _shared_session
+    if _shared_session is not None and not _shared_session.closed:
+        await _shared_session.close()
+    _shared_session = None
@@ -24,6 +24,19 @@ import uvicorn
 from app.core.config import get_settings
 from app.core.database import init_database as startup_database, close_database as shutdown_database
 from app.core.logging_config import setup_logging
+from app.core.cache import start_cache, stop_cache
+from app.core.resource_client import close_shared_session
+from app.services.session_validity_cache import start_session_validity_cache, stop_session_validity_cache
+from app.websocket.backplane import check_backplane_configuration, stop_backplane
+from app.websocket.manager import start_websocket_backplane
+from app.core.rate_limiter import close_rate_limiter
+from app.services.usage_rollup_service import start_usage_rollups, stop_usage_rollups
+from app.services.event_bus import close_event_journals
+from app.services.embedding_client import close_embedding_client
+from app.services.conversation_search_service import (
+    start_conversation_embedding_indexer,
+    stop_conversation_embedding_indexer
+)
 # Import models to ensure they're registered with the Base metadata
 # TEMPORARY: Commented out SQLAlchemy-based models during PostgreSQL migration
 # from app.models import workflow, agent, conversation, message, document
@@ -52,6 +65,7 @@ from app.api.v1.observability import router as observability_router
 from app.api.v1.teams import router as teams_router
 from app.api.v1.auth_logs import router as auth_logs_router
 from app.api.v1.categories import router as categories_router
+from app.api.internal.cache import router as internal_cache_router
 from app.middleware.tenant_isolation import TenantIsolationMiddleware
 from app.middleware.security import SecurityHeadersMiddleware
 from app.middleware.rate_limiting import RateLimitMiddleware
@@ -86,6 +100,37 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         logger.error(f"Message bus initialization error: {e}")
 
+    # Start cross-worker cache invalidation (shared L2 tier, if configured)
+    try:
+        await start_cache()
+    except Exception as e:
+        logger.error(f"Shared cache initialization error: {e}")
+
+    # Deliver WebSocket broadcasts from other workers (if a backplane is configured)
+    check_backplane_configuration()
+    try:
+        await start_websocket_backplane()
+    except Exception as e:
+        logger.error(f"WebSocket backplane initialization error: {e}")
+
+    # Stream session revocations from the Control Panel into the session cache
+    try:
+        await start_session_validity_cache()
+    except Exception as e:
+        logger.error(f"Session validity cache initialization error: {e}")
+
+    # Keep observability usage rollups up to date
+    try:
+        await start_usage_rollups()
+    except Exception as e:
+        logger.error(f"Usage rollup job initialization error: {e}")
+
+    # Embed new messages for semantic conversation search (if enabled)
+    try:
+        await start_conversation_embedding_indexer()
+    except Exception as e:
+        logger.error(f"Conversation embedding indexer initialization error: {e}")
+
     # Load BGE-M3 configuration from Control Panel database on startup
     try:
         import httpx
@@ -141,6 +186,27 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         logger.info("Message bus disconnected")
     except Exception as e:
         logger.error(f"Error disconnecting message bus: {e}")
+
+    await stop_usage_rollups()
+    await stop_conversation_embedding_indexer()
+    await stop_session_validity_cache()
+
+    try:
+        await stop_backplane()
+    except Exception as e:
+        logger.error(f"Error stopping WebSocket backplane: {e}")
+
+    try:
+        await stop_cache()
+    except Exception as e:
+        logger.error(f"Error stopping shared cache: {e}")
+
+    await close_shared_session()
+    await close_rate_limiter()
+    await close_embedding_client()
+
+    # Queued events are only in memory until the journal writer commits them
+    await close_event_journals()
     
     await shutdown_database()
     logger.info("PostgreSQL database connections closed")
@@ -194,7 +260,7 @@ app.include_router(agents_router, prefix="/api/v1")
 # app.include_router(external_services_router, prefix="/api/v1/external-services")
 from app.api.websocket import router as websocket_router
 from app.api.embeddings import router as embeddings_router
-from app.websocket.manager import socket_app
+from app.websocket.manager import socket_app, get_websocket_manager
 app.include_router(websocket_router, prefix="/ws")
 app.include_router(embeddings_router, prefix="/api/embeddings")
 
@@ -214,6 +280,7 @@ app.include_router(observability_router, prefix="/api/v1")  # Observability dash
 app.include_router(teams_router, prefix="/api/v1")  # Team collaboration and resource sharing
 app.include_router(auth_logs_router, prefix="/api/v1")  # Authentication logs for security monitoring (Issue #152)
 app.include_router(categories_router)  # Agent categories CRUD (Issue #215) - already has /api/v1/categories prefix
+app.include_router(internal_cache_router)  # Service-to-service cache invalidation (already has /internal prefix)
 
 # Note: Socket.IO integration moved to composite ASGI router to prevent protocol conflicts
 
@@ -308,6 +375,9 @@ async def metrics(request: Request):
             # Fallback values if psutil fails
             memory = type('Memory', (), {'used': 0, 'available': 0})()
 
+        websocket_manager = get_websocket_manager()
+        fanout = websocket_manager.get_fanout_stats()
+
         metrics_data = f"""# HELP tenant_backend_cpu_usage_percent CPU usage percentage
 # TYPE tenant_backend_cpu_usage_percent gauge
 tenant_backend_cpu_usage_percent {cpu_percent}
@@ -327,6 +397,30 @@ tenant_backend_uptime_seconds {time.time() - start_time}
 # HELP tenant_backend_requests_total Total HTTP requests
 # TYPE tenant_backend_requests_total counter
 tenant_backend_requests_total 1
+
+# HELP tenant_backend_websocket_connections Open WebSocket connections (this worker)
+# TYPE tenant_backend_websocket_connections gauge
+tenant_backend_websocket_connections {len(websocket_manager.connections)}
+
+# HELP tenant_backend_websocket_frames_sent_total WebSocket frames written
+# TYPE tenant_backend_websocket_frames_sent_total counter
+tenant_backend_websocket_frames_sent_total {fanout["frames_sent"]}
+
+# HELP tenant_backend_websocket_frames_dropped_total Typing frames dropped for slow consumers
+# TYPE tenant_backend_websocket_frames_dropped_total counter
+tenant_backend_websocket_frames_dropped_total {fanout["frames_dropped"]}
+
+# HELP tenant_backend_websocket_slow_consumer_disconnects_total Connections closed because their send queue stayed full
+# TYPE tenant_backend_websocket_slow_consumer_disconnects_total counter
+tenant_backend_websocket_slow_consumer_disconnects_total {fanout["slow_consumer_disconnects"]}
+
+# HELP tenant_backend_websocket_send_queue_depth Frames waiting in WebSocket send queues
+# TYPE tenant_backend_websocket_send_queue_depth gauge
+tenant_backend_websocket_send_queue_depth {fanout["queue_depth_total"]}
+
+# HELP tenant_backend_websocket_send_queue_depth_max Deepest WebSocket send queue
+# TYPE tenant_backend_websocket_send_queue_depth_max gauge
+tenant_backend_websocket_send_queue_depth_max {fanout["queue_depth_max"]}
 """
 
         return Response(content=metrics_data, media_type="text/plain; version=0.0.4; charset=utf-8")
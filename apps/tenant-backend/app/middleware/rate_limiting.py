@@ -1,24 +1,24 @@
 """
 Rate Limiting Middleware for GT 2.0
 
-Basic rate limiting implementation for tenant protection.
+Per-IP rate limiting for tenant protection, backed by the shared GCRA
+limiter (app.core.rate_limiter) so limits can hold across workers.
 """
 
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
-import time
-from typing import Dict, Tuple
 import logging
 
 from app.core.config import get_settings
+from app.core.rate_limiter import get_rate_limiter, retry_after_seconds
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple in-memory rate limiting middleware"""
+    """Per-IP rate limiting middleware"""
 
     # Operational endpoints that don't need rate limiting
     EXEMPT_PATHS = {
@@ -28,10 +28,6 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         "/api/v1/health"
     }
 
-    def __init__(self, app):
-        super().__init__(app)
-        self._rate_limits: Dict[str, Tuple[int, float]] = {}  # ip -> (count, window_start)
-
     async def dispatch(self, request: Request, call_next):
         # Skip rate limiting for operational endpoints
         if request.url.path in self.EXEMPT_PATHS:
@@ -39,13 +35,18 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
         client_ip = self._get_client_ip(request)
 
-        if self._is_rate_limited(client_ip):
+        result = await get_rate_limiter().hit(
+            f"ip:{client_ip}",
+            settings.rate_limit_requests,
+            settings.rate_limit_window_seconds
+        )
+        if not result.allowed:
             logger.warning(f"Rate limit exceeded for IP: {client_ip} - Path: {request.url.path}")
             # Return proper JSONResponse instead of raising HTTPException to prevent ASGI violations
             return JSONResponse(
                 status_code=429,
                 content={"detail": "Too many requests. Please try again later."},
-                headers={"Retry-After": str(settings.rate_limit_window_seconds)}
+                headers={"Retry-After": str(retry_after_seconds(result))}
             )
 
         response = await call_next(request)
@@ -65,25 +66,3 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         
         # Fall back to direct client IP
         return request.client.host if request.client else "unknown"
-    
-    def _is_rate_limited(self, client_ip: str) -> bool:
-        """Check if client IP is rate limited"""
-        current_time = time.time()
-        
-        if client_ip not in self._rate_limits:
-            self._rate_limits[client_ip] = (1, current_time)
-            return False
-        
-        count, window_start = self._rate_limits[client_ip]
-        
-        # Check if we're still in the same window
-        if current_time - window_start < settings.rate_limit_window_seconds:
-            if count >= settings.rate_limit_requests:
-                return True  # Rate limited
-            else:
-                self._rate_limits[client_ip] = (count + 1, window_start)
-                return False
-        else:
-            # New window, reset count
-            self._rate_limits[client_ip] = (1, current_time)
-            return False
\ No newline at end of file
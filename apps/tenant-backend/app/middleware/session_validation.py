@@ -6,17 +6,15 @@ OWASP/NIST Compliant Server-Side Session Validation (Issue #264)
 - Updates session activity on every authenticated request
 - Adds X-Session-Warning header when < 5 minutes remaining
 - Returns 401 with X-Session-Expired header when session is invalid
+- Control Panel answers are cached per worker (see SessionValidityCache)
 """
 
 from fastapi import Request
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
-import httpx
 import logging
 import jwt
-from app.core.config import get_settings
-
-settings = get_settings()
+from app.services.session_validity_cache import get_session_validity_cache
 
 logger = logging.getLogger(__name__)
 
@@ -33,11 +31,6 @@ class SessionValidationMiddleware(BaseHTTPMiddleware):
     - X-Session-Expired: idle|absolute - Added on 401 when session expired
     """
 
-    def __init__(self, app, control_panel_url: str = None, service_auth_token: str = None):
-        super().__init__(app)
-        self.control_panel_url = control_panel_url or settings.control_panel_url or "http://control-panel-backend:8001"
-        self.service_auth_token = service_auth_token or settings.service_auth_token or "internal-service-token"
-
     async def dispatch(self, request: Request, call_next):
         """Process request and validate server-side session"""
 
@@ -125,32 +118,10 @@ class SessionValidationMiddleware(BaseHTTPMiddleware):
 
     async def _validate_session(self, session_token: str) -> dict | None:
         """
-        Validate session with control panel internal API.
+        Validate session with control panel internal API (cached).
 
         Returns:
             dict with is_valid, expiry_reason, seconds_remaining, show_warning
             or None if control panel is unavailable
         """
-        try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.post(
-                    f"{self.control_panel_url}/internal/sessions/validate",
-                    json={"session_token": session_token},
-                    headers={
-                        "X-Service-Auth": self.service_auth_token,
-                        "X-Service-Name": "tenant-backend"
-                    }
-                )
-
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.error(f"Session validation failed: {response.status_code} - {response.text}")
-                    return None
-
-        except httpx.RequestError as e:
-            logger.error(f"Session validation request failed: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Unexpected error during session validation: {e}")
-            return None
+        return await get_session_validity_cache().validate(session_token)
@@ -9,19 +9,26 @@ import os
 import uuid
 import logging
 import asyncio
+import time
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 from fastapi import UploadFile, HTTPException
 from app.core.config import get_settings
 from app.core.postgresql_client import get_postgresql_client
 from app.core.path_security import sanitize_tenant_domain
-from app.services.embedding_client import BGE_M3_EmbeddingClient
+from app.services.embedding_client import get_embedding_client
+from app.services.pgvector_search_service import PROBE_TTL_SECONDS
 from app.services.document_processor import DocumentProcessor
+from app.utils.token_counter import count_tokens_for_ingest
 
 logger = logging.getLogger(__name__)
 
+# Per-schema cache: does conversation_files.chunk_token_counts exist (migration T012)?
+# schema -> (available, probed_at)
+_chunk_token_counts_available: Dict[str, Tuple[bool, float]] = {}
+
 
 class ConversationFileService:
     """Service for managing conversation-scoped file attachments"""
@@ -41,6 +48,34 @@ class ConversationFileService:
 
         logger.info(f"ConversationFileService initialized for {tenant_domain}/{user_id}")
 
+    async def _has_chunk_token_counts(self, client) -> bool:
+        """
+        Check per schema whether stored chunk token counts are available.
+
+        A present column is cached for good; a missing one is re-checked after
+        PROBE_TTL_SECONDS so a later migration is picked up.
+        """
+        now = time.monotonic()
+        cached = _chunk_token_counts_available.get(self.schema_name)
+        if cached is not None and (cached[0] or now - cached[1] < PROBE_TTL_SECONDS):
+            available = cached[0]
+        else:
+            available = bool(await client.fetch_scalar(
+                """
+                SELECT EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_schema = $1
+                      AND table_name = 'conversation_files'
+                      AND column_name = 'chunk_token_counts'
+                )
+                """,
+                self.schema_name
+            ))
+            _chunk_token_counts_available[self.schema_name] = (available, now)
+            if not available:
+                logger.warning(f"conversation_files.chunk_token_counts missing in {self.schema_name}; run migration T012")
+        return available
+
     def _get_conversation_storage_path(self, conversation_id: str) -> Path:
         """Get storage directory for conversation files"""
         conv_path = self.storage_root / conversation_id
@@ -193,7 +228,7 @@ class ConversationFileService:
             chunks = await processor.chunk_text_simple(text_content)
 
             # Generate embeddings for full document (single embedding for semantic search)
-            embedding_client = BGE_M3_EmbeddingClient()
+            embedding_client = get_embedding_client()
             embeddings = await embedding_client.generate_embeddings([text_content])
 
             if not embeddings:
@@ -246,19 +281,30 @@ class ConversationFileService:
         # Convert chunks list to JSONB-compatible format
         chunks_json = json.dumps(sanitized_chunks)
 
-        # Convert embedding to PostgreSQL vector format
-        embedding_str = f"[{','.join(map(str, embedding))}]"
-
-        query = f"""
-            UPDATE {self.schema_name}.conversation_files
-            SET processed_chunks = $1::jsonb,
-                embeddings = $2::vector,
-                processing_status = $3,
-                processed_at = NOW()
-            WHERE id = $4
-        """
-
-        await client.execute_query(query, chunks_json, embedding_str, status, file_id)
+        # Embedding is sent in pgvector's binary format (no text round-trip)
+        if await self._has_chunk_token_counts(client):
+            # Token counts stored once here so chat-time budgeting does no tokenization
+            token_counts = count_tokens_for_ingest(sanitized_chunks)
+            query = f"""
+                UPDATE {self.schema_name}.conversation_files
+                SET processed_chunks = $1::jsonb,
+                    embeddings = $2::vector,
+                    processing_status = $3,
+                    processed_at = NOW(),
+                    chunk_token_counts = $5::integer[]
+                WHERE id = $4
+            """
+            await client.execute_vector_command(query, chunks_json, embedding, status, file_id, token_counts)
+        else:
+            query = f"""
+                UPDATE {self.schema_name}.conversation_files
+                SET processed_chunks = $1::jsonb,
+                    embeddings = $2::vector,
+                    processing_status = $3,
+                    processed_at = NOW()
+                WHERE id = $4
+            """
+            await client.execute_vector_command(query, chunks_json, embedding, status, file_id)
 
     async def _get_file_record(self, file_id: str) -> Optional[Dict[str, Any]]:
         """Get file record by ID"""
@@ -370,7 +416,7 @@ class ConversationFileService:
         """Search files within a conversation using vector similarity"""
         try:
             # Generate query embedding
-            embedding_client = BGE_M3_EmbeddingClient()
+            embedding_client = get_embedding_client()
             embeddings = await embedding_client.generate_embeddings([query])
 
             if not embeddings:
@@ -457,10 +503,14 @@ class ConversationFileService:
         """
         try:
             client = await get_postgresql_client()
+            token_counts_column = (
+                "chunk_token_counts" if await self._has_chunk_token_counts(client)
+                else "NULL::integer[] AS chunk_token_counts"
+            )
 
             query = f"""
                 SELECT id, filename, original_filename, processed_chunks,
-                       file_size_bytes, uploaded_at
+                       file_size_bytes, uploaded_at, {token_counts_column}
                 FROM {self.schema_name}.conversation_files
                 WHERE conversation_id = $1
                   AND processing_status = 'completed'
@@ -484,6 +534,11 @@ class ConversationFileService:
                     import json
                     processed_chunks = json.loads(processed_chunks)
 
+                # Token counts stored at processing time (aligned with processed_chunks)
+                token_counts = row.get('chunk_token_counts') or []
+                if len(token_counts) != len(processed_chunks):
+                    token_counts = []
+
                 # Limit chunks per file (diversity enforcement)
                 chunks_from_this_file = 0
 
@@ -501,6 +556,7 @@ class ConversationFileService:
                         'chunk_index': idx,
                         'total_chunks': len(processed_chunks),
                         'content': chunk_text,
+                        'token_count': token_counts[idx] if token_counts else None,
                         'file_size_bytes': row['file_size_bytes'],
                         'source': 'conversation_file',
                         'source_type': 'conversation_file'
@@ -0,0 +1,507 @@
+"""
+Conversation Search for GT 2.0 Tenant Backend
+
+Native search over a user's conversation history, answered by one indexed
+query in the tenant schema instead of a round trip through the Resource
+Cluster's MCP conversation server.
+
+- Text: ranked full-text match on the stored messages.content_tsv column
+  (migration T014, GIN index), falling back to the indexed to_tsvector()
+  expression on schemas that have not been migrated
+- Semantic (optional): when conversation_search_embeddings_enabled is set,
+  a background indexer fills messages.embedding and the query embedding's
+  HNSW candidates are fused with the text candidates by reciprocal-rank
+  fusion, as in PGVectorSearchService
+- Snippets: ts_headline() with the matched terms highlighted, computed only
+  for the returned page
+
+Results are restricted to the requesting user's conversations, the
+days_back window and, optionally, a set of agents (by ID or name).
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from asyncpg import Connection
+from asyncpg.exceptions import UndefinedColumnError
+
+from app.core.config import get_settings
+from app.core.postgresql_client import get_postgresql_client
+from app.services.embedding_cache import get_embedding_cache
+from app.services.embedding_client import get_embedding_client
+from app.services.pgvector_search_service import PROBE_TTL_SECONDS, configure_hnsw_scan
+
+logger = logging.getLogger(__name__)
+
+# Per-schema cache of whether messages.content_tsv exists (migration T014):
+# schema -> (available, checked_at)
+_content_tsv_available: Dict[str, Tuple[bool, float]] = {}
+
+# ts_headline options: highlighted terms in markdown bold, up to two fragments
+SNIPPET_OPTIONS = 'StartSel=**, StopSel=**, MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=" ... "'
+
+# Longest message prefix sent to the embedding model
+MAX_EMBED_CHARS = 8000
+
+# Search windows are capped at a year, so older messages are never embedded
+EMBEDDING_LOOKBACK_DAYS = 365
+
+
+@dataclass
+class ConversationSearchResult:
+    """One matching message with its conversation context"""
+    message_id: str
+    conversation_id: str
+    conversation_title: str
+    agent_id: Optional[str]
+    agent_name: Optional[str]
+    role: str
+    snippet: str
+    created_at: Optional[str]
+    text_relevance: float
+    vector_similarity: float
+    score: float
+    rank: int
+
+
+class ConversationSearchService:
+    """Ranked full-text (and optionally semantic) search over a user's conversations"""
+
+    # Reciprocal-rank fusion: score = weight / (rrf_k + rank) summed over lists
+    RRF_K = 60
+    TEXT_WEIGHT = 0.5
+    VECTOR_WEIGHT = 0.5
+    # Top-K candidates taken from each of the text and vector indexes
+    CANDIDATE_POOL = 100
+    MIN_VECTOR_SIMILARITY = 0.3
+    # Users with at most this many embedded messages in the window are ranked
+    # exactly instead of through the tenant-wide HNSW index
+    EXACT_SCAN_MAX_ROWS = 10000
+
+    def __init__(self, tenant_domain: str):
+        self.tenant_domain = tenant_domain
+        self.settings = get_settings()
+        self.schema_name = self.settings.postgres_schema
+
+    async def search(
+        self,
+        query: str,
+        user_id: str,
+        days_back: int = 30,
+        max_results: int = 5,
+        agent_filter: Optional[List[str]] = None,
+        include_user_messages: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Search the user's messages from the last days_back days.
+
+        Args:
+            query: Search text (web search syntax: quotes, OR, -term)
+            user_id: UUID of the conversation owner
+            days_back: Only messages newer than this many days
+            max_results: Maximum results to return
+            agent_filter: Optional agent IDs or names to restrict to
+            include_user_messages: Include the user's own messages, not just agent replies
+
+        Returns:
+            Query echo, ranked results and timing
+        """
+        start_time = time.time()
+
+        query_embedding = None
+        if self.settings.conversation_search_embeddings_enabled:
+            query_embedding = await self._generate_query_embedding(query, user_id)
+
+        roles = ["user", "agent"] if include_user_messages else ["agent"]
+        agents = [agent.strip().lower() for agent in (agent_filter or []) if agent and agent.strip()]
+
+        pg_client = await get_postgresql_client()
+        async with pg_client.get_connection() as conn:
+            rows = await self._execute_search_query(
+                conn, query, query_embedding, user_id, days_back, max_results, roles, agents
+            )
+
+        results = [
+            ConversationSearchResult(
+                message_id=str(row["message_id"]),
+                conversation_id=str(row["conversation_id"]),
+                conversation_title=row["conversation_title"],
+                agent_id=str(row["agent_id"]) if row["agent_id"] else None,
+                agent_name=row["agent_name"],
+                role=row["role"],
+                snippet=row["snippet"],
+                created_at=row["created_at"].isoformat() if row["created_at"] else None,
+                text_relevance=float(row["text_relevance"]),
+                vector_similarity=float(row["vector_similarity"]),
+                score=float(row["score"]),
+                rank=rank
+            )
+            for rank, row in enumerate(rows, start=1)
+        ]
+
+        search_time_ms = (time.time() - start_time) * 1000
+        logger.info(f"Conversation search for user {user_id}: {len(results)} results ({search_time_ms:.1f}ms)")
+
+        return {
+            "query": query,
+            "days_back": days_back,
+            "search_mode": "hybrid" if query_embedding else "text",
+            "results": results,
+            "total_results": len(results),
+            "search_time_ms": search_time_ms
+        }
+
+    async def _generate_query_embedding(self, query: str, user_id: str) -> Optional[List[float]]:
+        """Embed the query; semantic matching is best-effort, so failures fall back to text only"""
+        embedding_client = get_embedding_client()
+
+        async def embed(texts: List[str]) -> List[List[float]]:
+            return await embedding_client.generate_embeddings(
+                texts, tenant_id=self.tenant_domain, user_id=user_id
+            )
+
+        try:
+            embeddings = await get_embedding_cache().get_or_embed(embedding_client.model, [query], embed)
+            return embeddings[0] if embeddings and embeddings[0] else None
+        except Exception as e:
+            logger.warning(f"Conversation search query embedding failed, using text search only: {e}")
+            return None
+
+    async def _execute_search_query(
+        self,
+        conn: Connection,
+        query: str,
+        query_embedding: Optional[List[float]],
+        user_id: str,
+        days_back: int,
+        max_results: int,
+        roles: List[str],
+        agents: List[str]
+    ) -> List[Any]:
+        """
+        Run the ranked search as a single statement.
+
+        Each list is an index-ordered top-K (GIN for text, HNSW for vectors)
+        restricted to the user's conversations; the lists are fused by RRF and
+        snippets are highlighted for the final page only.
+
+        The HNSW index spans every user of the tenant and the user, window and
+        role filters apply after the scan, so most users' vectors are ranked
+        exactly; only users with more than EXACT_SCAN_MAX_ROWS embedded
+        messages in the window go through HNSW (with iterative scans on
+        pgvector 0.8+).
+        """
+        tsv_expr = await self._get_tsvector_expression(conn)
+        candidate_pool = max(self.CANDIDATE_POOL, max_results)
+
+        params: List[Any] = [
+            query,
+            user_id,
+            days_back,
+            roles,
+            candidate_pool,
+            max_results,
+            SNIPPET_OPTIONS,
+        ]
+
+        agent_filter = ""
+        if agents:
+            params.append(agents)
+            agent_filter = f"""
+                  AND c.agent_id IN (
+                      SELECT id FROM {self.schema_name}.agents
+                      WHERE id::text = ANY(${len(params)}::text[])
+                         OR LOWER(name) = ANY(${len(params)}::text[])
+                  )"""
+
+        # Shared candidate filter: the user's conversations in the window
+        scope_filter = f"""c.user_id = $2::uuid
+                  AND m.created_at >= NOW() - make_interval(days => $3::int)
+                  AND m.role = ANY($4::text[]){agent_filter}"""
+
+        vector_ctes = ""
+        exact_scan = True
+        if query_embedding:
+            scoped_rows = await conn.fetchval(f"""
+                SELECT count(*) FROM (
+                    SELECT 1
+                    FROM {self.schema_name}.messages m
+                    JOIN {self.schema_name}.conversations c ON c.id = m.conversation_id
+                    WHERE m.embedding IS NOT NULL
+                      AND c.user_id = $1::uuid
+                      AND m.created_at >= NOW() - make_interval(days => $2::int)
+                    LIMIT $3
+                ) scoped
+            """, user_id, days_back, self.EXACT_SCAN_MAX_ROWS + 1)
+            exact_scan = scoped_rows <= self.EXACT_SCAN_MAX_ROWS
+
+            params.extend([
+                "[" + ",".join(map(str, query_embedding)) + "]",
+                self.MIN_VECTOR_SIMILARITY,
+                self.TEXT_WEIGHT,
+                self.VECTOR_WEIGHT,
+                self.RRF_K,
+            ])
+            embedding_param = len(params) - 4
+            vector_order = f"m.embedding <=> ${embedding_param}::vector"
+            if exact_scan:
+                # "+ 0" makes the sort key non-indexable, so the planner cannot
+                # pick the HNSW index for the exact scan
+                vector_order = f"({vector_order}) + 0"
+            vector_ctes = f"""
+                vector_candidates AS (
+                    SELECT m.id, m.embedding <=> ${embedding_param}::vector AS distance
+                    FROM {self.schema_name}.messages m
+                    JOIN {self.schema_name}.conversations c ON c.id = m.conversation_id
+                    WHERE m.embedding IS NOT NULL
+                      AND {scope_filter}
+                    ORDER BY {vector_order}
+                    LIMIT $5
+                ),
+                vector_ranked AS (
+                    SELECT id, 1 - distance AS vector_similarity,
+                           ROW_NUMBER() OVER (ORDER BY distance) AS vector_rank
+                    FROM vector_candidates
+                    WHERE 1 - distance >= ${embedding_param + 1}
+                ),"""
+            fused_select = f"""
+                    SELECT
+                        COALESCE(t.id, v.id) AS message_id,
+                        COALESCE(t.text_relevance, 0.0) AS text_relevance,
+                        COALESCE(v.vector_similarity, 0.0) AS vector_similarity,
+                        COALESCE(${embedding_param + 2}::float8 / (${embedding_param + 4} + t.text_rank), 0.0) +
+                        COALESCE(${embedding_param + 3}::float8 / (${embedding_param + 4} + v.vector_rank), 0.0) AS score
+                    FROM text_ranked t
+                    FULL OUTER JOIN vector_ranked v ON v.id = t.id"""
+        else:
+            fused_select = """
+                    SELECT
+                        id AS message_id,
+                        text_relevance,
+                        0.0 AS vector_similarity,
+                        text_relevance AS score
+                    FROM text_ranked"""
+
+        search_query = f"""
+            WITH tsq AS (
+                SELECT websearch_to_tsquery('english', $1) AS q
+            ),
+            text_candidates AS (
+                SELECT m.id, ts_rank_cd({tsv_expr}, tsq.q) AS text_relevance
+                FROM {self.schema_name}.messages m
+                JOIN {self.schema_name}.conversations c ON c.id = m.conversation_id
+                CROSS JOIN tsq
+                WHERE {tsv_expr} @@ tsq.q
+                  AND {scope_filter}
+                ORDER BY text_relevance DESC
+                LIMIT $5
+            ),
+            text_ranked AS (
+                SELECT id, text_relevance,
+                       ROW_NUMBER() OVER (ORDER BY text_relevance DESC) AS text_rank
+                FROM text_candidates
+            ),{vector_ctes}
+            fused AS (
+                {fused_select}
+                ORDER BY score DESC
+                LIMIT $6
+            )
+            SELECT
+                f.message_id,
+                m.conversation_id,
+                c.title AS conversation_title,
+                c.agent_id,
+                a.name AS agent_name,
+                m.role,
+                m.created_at,
+                ts_headline('english', m.content, tsq.q, $7) AS snippet,
+                f.text_relevance,
+                f.vector_similarity,
+                f.score
+            FROM fused f
+            JOIN {self.schema_name}.messages m ON m.id = f.message_id
+            JOIN {self.schema_name}.conversations c ON c.id = m.conversation_id
+            LEFT JOIN {self.schema_name}.agents a ON a.id = c.agent_id
+            CROSS JOIN tsq
+            ORDER BY f.score DESC
+        """
+
+        if exact_scan:
+            return await conn.fetch(search_query, *params)
+
+        async with conn.transaction():
+            await configure_hnsw_scan(conn, candidate_pool)
+            return await conn.fetch(search_query, *params)
+
+    async def _get_tsvector_expression(self, conn: Connection) -> str:
+        """
+        Return the tsvector expression for messages full-text matching.
+
+        Uses the stored content_tsv column added by migration T014 when present,
+        falling back to the indexed to_tsvector() expression otherwise. The
+        lookup is cached per schema; a missing column is re-checked after
+        PROBE_TTL_SECONDS.
+        """
+        now = time.monotonic()
+        cached = _content_tsv_available.get(self.schema_name)
+        if cached is not None and (cached[0] or now - cached[1] < PROBE_TTL_SECONDS):
+            available = cached[0]
+        else:
+            available = bool(await conn.fetchval(
+                """
+                SELECT EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_schema = $1
+                      AND table_name = 'messages'
+                      AND column_name = 'content_tsv'
+                )
+                """,
+                self.schema_name
+            ))
+            _content_tsv_available[self.schema_name] = (available, now)
+            if not available:
+                logger.warning(f"messages.content_tsv missing in {self.schema_name}; run migration T014")
+
+        return "m.content_tsv" if available else "to_tsvector('english', m.content)"
+
+    async def index_pending_embeddings(self, batch_size: int) -> int:
+        """
+        Embed the newest messages that have no embedding yet.
+
+        Only user and agent messages inside the longest search window are
+        embedded. An advisory lock lets one worker per tenant run a pass at a
+        time (other workers skip it), and messages the model returns no
+        embedding for are flagged in metadata so they are not retried every
+        pass. Returns the number of messages processed.
+        """
+        pg_client = await get_postgresql_client()
+        async with pg_client.get_connection() as conn:
+            # Session-level lock: the pass makes embedding calls, so no
+            # transaction is held open while it runs
+            lock_key = f"conversation_embeddings:{self.schema_name}"
+            if not await conn.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", lock_key):
+                return 0
+            try:
+                return await self._index_batch(conn, batch_size)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock(hashtext($1))", lock_key)
+
+    async def _index_batch(self, conn: Connection, batch_size: int) -> int:
+        """Embed one batch of pending messages (caller holds the indexer lock)"""
+        rows = await conn.fetch(f"""
+            SELECT id, user_id, content
+            FROM {self.schema_name}.messages
+            WHERE embedding IS NULL
+              AND role IN ('user', 'agent')
+              AND content <> ''
+              AND created_at >= NOW() - make_interval(days => $2::int)
+              AND NOT COALESCE(metadata ? 'embedding_skipped', false)
+            ORDER BY created_at DESC
+            LIMIT $1
+        """, batch_size, EMBEDDING_LOOKBACK_DAYS)
+        if not rows:
+            return 0
+
+        embedding_client = get_embedding_client()
+        embedding_cache = get_embedding_cache()
+
+        # Embed per user so embedding usage is billed to the message owner
+        rows_by_user: Dict[str, List[Any]] = {}
+        for row in rows:
+            rows_by_user.setdefault(str(row["user_id"]), []).append(row)
+
+        message_ids = []
+        embedding_strs = []
+        skipped_ids = []
+        for owner_id, user_rows in rows_by_user.items():
+            async def embed(texts: List[str], owner_id: str = owner_id) -> List[List[float]]:
+                return await embedding_client.generate_embeddings(
+                    texts, tenant_id=self.tenant_domain, user_id=owner_id
+                )
+
+            embeddings = await embedding_cache.get_or_embed(
+                embedding_client.model, [row["content"][:MAX_EMBED_CHARS] for row in user_rows], embed
+            )
+            for row, embedding in zip(user_rows, embeddings):
+                if embedding:
+                    message_ids.append(row["id"])
+                    embedding_strs.append("[" + ",".join(map(str, embedding)) + "]")
+                else:
+                    skipped_ids.append(row["id"])
+
+        if message_ids:
+            await conn.execute(f"""
+                UPDATE {self.schema_name}.messages m
+                SET embedding = v.embedding::vector
+                FROM unnest($1::uuid[], $2::text[]) AS v(id, embedding)
+                WHERE m.id = v.id
+            """, message_ids, embedding_strs)
+        if skipped_ids:
+            await conn.execute(f"""
+                UPDATE {self.schema_name}.messages
+                SET metadata = COALESCE(metadata, '{{}}'::jsonb) || '{{"embedding_skipped": true}}'::jsonb
+                WHERE id = ANY($1::uuid[])
+            """, skipped_ids)
+            logger.warning(f"No embedding returned for {len(skipped_ids)} messages; flagged as skipped")
+        return len(rows)
+
+    async def run_embedding_indexer(self, interval_seconds: float, batch_size: int) -> None:
+        """Background loop: embed new messages, draining the backlog before sleeping"""
+        while True:
+            try:
+                embedded = await self.index_pending_embeddings(batch_size)
+                if embedded:
+                    logger.debug(f"Embedded {embedded} messages for conversation search")
+                if embedded >= batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except UndefinedColumnError:
+                logger.warning("messages.embedding missing, stopping conversation embedding indexer")
+                return
+            except Exception as e:
+                logger.error(f"Conversation embedding pass failed: {e}")
+            await asyncio.sleep(interval_seconds)
+
+
+# Singleton service and background task per worker
+_conversation_search_service: Optional[ConversationSearchService] = None
+_indexer_task: Optional[asyncio.Task] = None
+
+
+def get_conversation_search_service() -> ConversationSearchService:
+    """Get or create the conversation search service"""
+    global _conversation_search_service
+    if _conversation_search_service is None:
+        _conversation_search_service = ConversationSearchService(get_settings().tenant_domain)
+    return _conversation_search_service
+
+
+async def start_conversation_embedding_indexer() -> None:
+    """Start the background message embedding job (application startup)"""
+    global _indexer_task
+    settings = get_settings()
+    if not settings.conversation_search_embeddings_enabled or _indexer_task is not None:
+        return
+    _indexer_task = asyncio.create_task(
+        get_conversation_search_service().run_embedding_indexer(
+            settings.conversation_search_embedding_interval_seconds,
+            settings.conversation_search_embedding_batch_size
+        )
+    )
+    logger.info(f"Conversation embedding indexer started (every {settings.conversation_search_embedding_interval_seconds}s)")
+
+
+async def stop_conversation_embedding_indexer() -> None:
+    """Stop the background message embedding job (application shutdown)"""
+    global _indexer_task
+    if _indexer_task is not None:
+        _indexer_task.cancel()
+        try:
+            await _indexer_task
+        except asyncio.CancelledError:
+            pass
+        _indexer_task = None
@@ -17,6 +17,7 @@ from app.core.postgresql_client import get_postgresql_client
 from app.services.agent_service import AgentService
 from app.core.resource_client import ResourceClusterClient
 from app.services.conversation_summarizer import ConversationSummarizer
+from app.services.model_catalog import get_model_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -699,61 +700,9 @@ class ConversationService:
     # Streaming removed for reliability - using non-streaming only
     
     async def get_available_models(self, tenant_id: str) -> List[Dict[str, Any]]:
-        """Get available models for tenant from Resource Cluster"""
+        """Get available models for tenant (cached model catalogue from Resource Cluster)"""
         try:
-            # Get models dynamically from Resource Cluster
-            import aiohttp
-            
-            resource_cluster_url = self.resource_client.base_url
-            
-            async with aiohttp.ClientSession() as session:
-                # Get capability token for model access
-                token = await self.resource_client._get_capability_token(
-                    tenant_id=tenant_id,
-                    user_id=self.user_id,
-                    resources=['model_registry']
-                )
-                
-                headers = {
-                    'Authorization': f'Bearer {token}',
-                    'Content-Type': 'application/json',
-                    'X-Tenant-ID': tenant_id,
-                    'X-User-ID': self.user_id
-                }
-                
-                async with session.get(
-                    f"{resource_cluster_url}/api/v1/models/",
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    
-                    if response.status == 200:
-                        response_data = await response.json()
-                        models_data = response_data.get("models", [])
-                        
-                        # Transform Resource Cluster model format to frontend format
-                        available_models = []
-                        for model in models_data:
-                            # Only include available models
-                            if model.get("status", {}).get("deployment") == "available":
-                                available_models.append({
-                                    "id": model.get("uuid"),  # Database UUID for unique identification
-                                    "model_id": model["id"],  # model_id string for API calls
-                                    "name": model["name"],
-                                    "provider": model["provider"],
-                                    "model_type": model["model_type"],
-                                    "context_window": model.get("performance", {}).get("context_window", 4000),
-                                    "max_tokens": model.get("performance", {}).get("max_tokens", 4000),
-                                    "performance": model.get("performance", {}),  # Include full performance for chat.py
-                                    "capabilities": {"chat": True}  # All LLM models support chat
-                                })
-                        
-                        logger.info(f"Retrieved {len(available_models)} models from Resource Cluster")
-                        return available_models
-                    else:
-                        logger.error(f"Resource Cluster returned {response.status}: {await response.text()}")
-                        raise RuntimeError(f"Resource Cluster API error: {response.status}")
-                        
+            return await get_model_catalog().get_models(tenant_id, self.user_id)
         except Exception as e:
             logger.error(f"Failed to get models from Resource Cluster: {e}")
             raise
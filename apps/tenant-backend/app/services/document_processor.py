@@ -10,8 +10,9 @@ import logging
 import hashlib
 import mimetypes
 import re
+import tempfile
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 from datetime import datetime
 import uuid
 
@@ -29,6 +30,8 @@ from app.core.postgresql_client import get_postgresql_client
 # Resource cluster client for embeddings
 import httpx
 from app.services.embedding_client import get_embedding_client
+from app.services.embedding_cache import get_embedding_cache
+from app.utils.token_counter import count_tokens_for_ingest
 
 # Document summarization
 from app.services.summarization_service import SummarizationService
@@ -36,6 +39,104 @@ from app.services.summarization_service import SummarizationService
 logger = logging.getLogger(__name__)
 
 
+class _StreamingChunker:
+    """
+    Incremental sentence-aware chunker.
+
+    Text is fed section by section (pages, row groups, text blocks); finished
+    chunks are returned as soon as they fill up. Text after the last sentence
+    terminator is carried into the next section, so chunk boundaries match
+    chunking the whole document at once. Sentences longer than
+    max_sentence_chars (e.g. CSV rows or code without terminators) are split
+    at whitespace so no single chunk or carry grows without bound.
+    """
+
+    _SENTENCE_END = re.compile(r'[.!?]+')
+
+    def __init__(self, document_id: str, chunk_size: int, chunk_overlap: int):
+        self.document_id = document_id
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_sentence_chars = chunk_size * 8  # ~8 chars per word
+        self.chunk_count = 0
+        self._carry = ""
+        self._current_chunk = ""
+        self._current_tokens = 0
+
+    def _bounded(self, sentence: str) -> List[str]:
+        pieces = []
+        while len(sentence) > self.max_sentence_chars:
+            cut = sentence.rfind(" ", 0, self.max_sentence_chars)
+            if cut <= 0:
+                cut = self.max_sentence_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        pieces.append(sentence)
+        return pieces
+
+    def _make_chunk(self, content: str, word_count: int) -> Dict[str, Any]:
+        chunk = {
+            "document_id": self.document_id,
+            "chunk_index": self.chunk_count,
+            "content": content,
+            "token_count": word_count,
+            "content_hash": hashlib.md5(content.encode()).hexdigest()
+        }
+        self.chunk_count += 1
+        return chunk
+
+    def _add_sentences(self, raw_sentences: List[str]) -> List[Dict[str, Any]]:
+        chunks = []
+        for raw in raw_sentences:
+            for sentence in self._bounded(raw.strip()):
+                if not sentence:
+                    continue
+                sentence_tokens = len(sentence.split())
+
+                # If adding this sentence would exceed chunk size, save current chunk
+                if self._current_tokens + sentence_tokens > self.chunk_size and self._current_chunk:
+                    chunk_content = self._current_chunk.strip()
+                    if chunk_content:
+                        chunks.append(self._make_chunk(chunk_content, self._current_tokens))
+
+                    # Start new chunk with overlap
+                    if self.chunk_overlap > 0 and self.chunk_count:
+                        # Take last few sentences for overlap
+                        overlap_sentences = self._current_chunk.split('.')[-2:]  # Rough overlap
+                        self._current_chunk = '. '.join(s.strip() for s in overlap_sentences if s.strip())
+                        self._current_tokens = len(self._current_chunk.split())
+                    else:
+                        self._current_chunk = ""
+                        self._current_tokens = 0
+
+                # Add sentence to current chunk
+                if self._current_chunk:
+                    self._current_chunk += ". " + sentence
+                else:
+                    self._current_chunk = sentence
+                self._current_tokens += sentence_tokens
+        return chunks
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Add a section of text, returning chunks completed by it"""
+        parts = self._SENTENCE_END.split(self._carry + text)
+        # The last part may be an unfinished sentence continued by the next section
+        carry = parts.pop()
+        bounded_carry = self._bounded(carry)
+        self._carry = bounded_carry.pop()
+        return self._add_sentences(parts + bounded_carry)
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Flush the remaining text as the final chunk(s)"""
+        chunks = self._add_sentences([self._carry])
+        self._carry = ""
+        if self._current_chunk.strip():
+            chunks.append(self._make_chunk(self._current_chunk.strip(), self._current_tokens))
+        self._current_chunk = ""
+        self._current_tokens = 0
+        return chunks
+
+
 class DocumentProcessor:
     """
     Comprehensive document processing service for RAG pipeline.
@@ -43,6 +144,7 @@ class DocumentProcessor:
     Features:
     - Multi-format support (PDF, DOCX, TXT, MD, CSV, JSON)
     - Intelligent chunking with overlap
+    - Streaming pipeline (extract -> chunk -> embed -> store) with bounded memory
     - Async embedding generation with batch processing
     - Progress tracking
     - Error handling and recovery
@@ -53,6 +155,8 @@ class DocumentProcessor:
         self.tenant_domain = tenant_domain or "test"  # Default fallback
         # Use configurable embedding client instead of hardcoded URL
         self.embedding_client = get_embedding_client()
+        # Content-hash cache so identical chunks are never re-embedded
+        self.embedding_cache = get_embedding_cache()
         self.chunk_size = 512  # Default chunk size in tokens
         self.chunk_overlap = 128  # Default overlap
         self.max_file_size = 100 * 1024 * 1024  # 100MB limit
@@ -62,6 +166,13 @@ class DocumentProcessor:
         self.MAX_CONCURRENT_BATCHES = 3  # Process up to 3 batches concurrently
         self.MAX_RETRIES = 3  # Maximum retries per batch
         self.INITIAL_RETRY_DELAY = 1.0  # Initial delay in seconds
+
+        # Streaming pipeline configuration (bounds memory regardless of file size)
+        self.SECTION_QUEUE_SIZE = 8  # Extracted sections buffered ahead of chunking
+        self.TEXT_SECTION_CHARS = 1024 * 1024  # Plain text read/sliced in ~1MB sections
+        self.CSV_ROWS_PER_SECTION = 1000  # CSV rows parsed per section
+        self.SUMMARY_PREVIEW_CHARS = 3000  # Leading text kept for the document summary
+        self.HASH_BLOCK_BYTES = 1024 * 1024  # File hashed in 1MB blocks
         
         # Supported file types
         self.supported_types = {
@@ -131,8 +242,9 @@ class DocumentProcessor:
 
             if existing_content and storage_type in ["pdf_extracted", "text"]:
                 # Use existing extracted content
-                text_content = existing_content
-                logger.info(f"Using existing extracted content ({len(text_content)} chars, type: {storage_type})")
+                logger.info(f"Using existing extracted content ({len(existing_content)} chars, type: {storage_type})")
+                sections = self._iter_string_sections(existing_content)
+                store_content = False
             else:
                 # Extract text from file
                 await self._update_processing_status(document["id"], "processing", processing_stage="Extracting text")
@@ -145,43 +257,32 @@ class DocumentProcessor:
                 else:
                     file_type = document["file_type"]
 
-                text_content = await self._extract_text(file_path, file_type)
+                sections = self._iter_text_sections(file_path, file_type)
+                store_content = True
 
-                # 4. Update document with extracted text
-                await self._update_document_content(document["id"], text_content)
-
-            # 5. Generate document summary
-            await self._update_processing_status(document["id"], "processing", processing_stage="Generating summary")
-            await self._generate_document_summary(document["id"], text_content, original_filename, user_id)
-
-            # 6. Chunk the document
-            await self._update_processing_status(document["id"], "processing", processing_stage="Creating chunks")
-            chunks = await self._chunk_text(text_content, document["id"])
-
-            # Set expected chunk count for progress tracking
-            await self._update_processing_status(
-                document["id"], "processing",
-                processing_stage="Preparing for embedding generation",
-                total_chunks_expected=len(chunks)
+            # 4-7. Extract, chunk, embed and store as overlapping stages
+            pipeline_result = await self._run_streaming_pipeline(
+                sections, document["id"], dataset_id, user_id, store_content
             )
+            chunk_count = pipeline_result["chunk_count"]
 
-            # 7. Generate embeddings
-            await self._update_processing_status(document["id"], "processing", processing_stage="Starting embedding generation")
-            await self._generate_embeddings_for_chunks(chunks, dataset_id, user_id)
+            # 8. Generate document summary (uses the leading text only)
+            await self._update_processing_status(document["id"], "processing", processing_stage="Generating summary")
+            await self._generate_document_summary(document["id"], pipeline_result["preview"], original_filename, user_id)
 
-            # 8. Update final status
+            # 9. Update final status
             await self._update_processing_status(
                 document["id"], "completed",
                 processing_stage="Completed",
-                chunks_processed=len(chunks),
-                total_chunks_expected=len(chunks)
+                chunks_processed=chunk_count,
+                total_chunks_expected=chunk_count
             )
-            await self._update_chunk_count(document["id"], len(chunks))
+            await self._update_chunk_count(document["id"], chunk_count)
 
-            # 9. Update dataset summary (after document is fully processed)
+            # 10. Update dataset summary (after document is fully processed)
             await self._update_dataset_summary_after_document_change(dataset_id, user_id)
 
-            logger.info(f"Successfully processed {original_filename} with {len(chunks)} chunks")
+            logger.info(f"Successfully processed {original_filename} with {chunk_count} chunks")
             return document
             
         except Exception as e:
@@ -216,9 +317,15 @@ class DocumentProcessor:
     ) -> Dict[str, Any]:
         """Create document record in database"""
         
-        # Calculate file hash
+        # Calculate file hash block by block
+        digest = hashlib.sha256()
         with open(file_path, 'rb') as f:
-            file_hash = hashlib.sha256(f.read()).hexdigest()
+            while True:
+                block = f.read(self.HASH_BLOCK_BYTES)
+                if not block:
+                    break
+                digest.update(block)
+        file_hash = digest.hexdigest()
 
         file_ext = file_path.suffix.lower()
         file_size = file_path.stat().st_size
@@ -250,27 +357,36 @@ class DocumentProcessor:
         }
     
     async def _extract_text(self, file_path: Path, file_type: str) -> str:
-        """Extract text content from various file formats"""
-        
+        """Extract the full text content of a file (see _iter_text_sections for streaming)"""
+        sections = self._iter_text_sections(file_path, file_type)
+        return await asyncio.to_thread(lambda: "".join(sections))
+
+    def _iter_text_sections(self, file_path: Path, file_type: str) -> Iterator[str]:
+        """
+        Yield a file's text in sections (pages, row groups, text blocks).
+
+        Concatenating the sections gives the full extracted text. Parsing is
+        blocking, so callers advance the iterator off the event loop.
+        """
         try:
             if file_type == 'application/pdf':
-                return await self._extract_pdf_text(file_path)
+                yield from self._iter_pdf_text(file_path)
             elif 'wordprocessingml' in file_type:
-                return await self._extract_docx_text(file_path)
+                yield from self._iter_docx_text(file_path)
             elif file_type == 'text/csv':
-                return await self._extract_csv_text(file_path)
+                yield from self._iter_csv_text(file_path)
             elif file_type == 'application/json':
-                return await self._extract_json_text(file_path)
+                yield from self._iter_json_text(file_path)
             else:  # text/plain, text/markdown
-                return await self._extract_plain_text(file_path)
+                yield from self._iter_plain_text(file_path)
                 
         except Exception as e:
             logger.error(f"Text extraction failed for {file_path}: {e}")
             raise ValueError(f"Could not extract text from file: {e}")
     
-    async def _extract_pdf_text(self, file_path: Path) -> str:
-        """Extract text from PDF file"""
-        text_parts = []
+    def _iter_pdf_text(self, file_path: Path) -> Iterator[str]:
+        """Extract text from PDF file, one page at a time"""
+        pages_with_text = 0
         
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
@@ -278,94 +394,116 @@ class DocumentProcessor:
             for page_num, page in enumerate(pdf_reader.pages):
                 try:
                     page_text = page.extract_text()
-                    if page_text.strip():
-                        text_parts.append(f"--- Page {page_num + 1} ---\n{page_text}")
                 except Exception as e:
                     logger.warning(f"Could not extract text from page {page_num + 1}: {e}")
+                    continue
+                if page_text.strip():
+                    separator = "\n\n" if pages_with_text else ""
+                    pages_with_text += 1
+                    yield f"{separator}--- Page {page_num + 1} ---\n{page_text}"
         
-        if not text_parts:
+        if not pages_with_text:
             raise ValueError("No text could be extracted from PDF")
-        
-        return "\n\n".join(text_parts)
     
-    async def _extract_docx_text(self, file_path: Path) -> str:
-        """Extract text from DOCX file"""
+    def _iter_docx_text(self, file_path: Path) -> Iterator[str]:
+        """Extract text from DOCX file in groups of paragraphs"""
         doc = docx.Document(file_path)
-        text_parts = []
-        
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                text_parts.append(paragraph.text)
+        paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
         
-        if not text_parts:
+        if not paragraphs:
             raise ValueError("No text could be extracted from DOCX")
         
-        return "\n\n".join(text_parts)
+        for start in range(0, len(paragraphs), 200):
+            separator = "\n\n" if start else ""
+            yield separator + "\n\n".join(paragraphs[start:start + 200])
     
-    async def _extract_csv_text(self, file_path: Path) -> str:
-        """Extract and format text from CSV file"""
+    def _iter_csv_text(self, file_path: Path) -> Iterator[str]:
+        """Extract and format text from CSV file, streaming rows in groups"""
         try:
-            df = pd.read_csv(file_path)
-            
-            # Create readable format
-            text_parts = [f"CSV Data with {len(df)} rows and {len(df.columns)} columns"]
-            text_parts.append(f"Columns: {', '.join(df.columns.tolist())}")
-            text_parts.append("")
-            
-            # Sample first few rows in readable format
-            for idx, row in df.head(20).iterrows():
-                row_text = []
-                for col in df.columns:
-                    if pd.notna(row[col]):
-                        row_text.append(f"{col}: {row[col]}")
-                text_parts.append(f"Row {idx + 1}: " + " | ".join(row_text))
-            
-            return "\n".join(text_parts)
-            
+            reader = pd.read_csv(file_path, chunksize=self.CSV_ROWS_PER_SECTION)
+            first_frame = next(reader, None)
         except Exception as e:
             logger.error(f"CSV parsing error: {e}")
             # Fallback to reading as plain text
-            return await self._extract_plain_text(file_path)
+            yield from self._iter_plain_text(file_path)
+            return
+
+        if first_frame is None:
+            return
+
+        # Create readable format (row count is unknown until the stream ends)
+        columns = first_frame.columns.tolist()
+        yield f"CSV Data with {len(columns)} columns\nColumns: {', '.join(str(c) for c in columns)}\n"
+
+        frame = first_frame
+        while frame is not None:
+            text_parts = []
+            for idx, row in frame.iterrows():
+                row_text = []
+                for col in frame.columns:
+                    if pd.notna(row[col]):
+                        row_text.append(f"{col}: {row[col]}")
+                text_parts.append(f"\nRow {idx + 1}: " + " | ".join(row_text))
+            yield "".join(text_parts)
+            frame = next(reader, None)
     
-    async def _extract_json_text(self, file_path: Path) -> str:
+    def _iter_json_text(self, file_path: Path) -> Iterator[str]:
         """Extract and format text from JSON file"""
         with open(file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
         # Convert JSON to readable text format
         def json_to_text(obj, prefix=""):
-            text_parts = []
-            
             if isinstance(obj, dict):
                 for key, value in obj.items():
                     if isinstance(value, (dict, list)):
-                        text_parts.append(f"{prefix}{key}:")
-                        text_parts.extend(json_to_text(value, prefix + "  "))
+                        yield f"{prefix}{key}:"
+                        yield from json_to_text(value, prefix + "  ")
                     else:
-                        text_parts.append(f"{prefix}{key}: {value}")
+                        yield f"{prefix}{key}: {value}"
             elif isinstance(obj, list):
                 for i, item in enumerate(obj):
                     if isinstance(item, (dict, list)):
-                        text_parts.append(f"{prefix}Item {i + 1}:")
-                        text_parts.extend(json_to_text(item, prefix + "  "))
+                        yield f"{prefix}Item {i + 1}:"
+                        yield from json_to_text(item, prefix + "  ")
                     else:
-                        text_parts.append(f"{prefix}Item {i + 1}: {item}")
+                        yield f"{prefix}Item {i + 1}: {item}"
             else:
-                text_parts.append(f"{prefix}{obj}")
-            
-            return text_parts
+                yield f"{prefix}{obj}"
         
-        return "\n".join(json_to_text(data))
+        lines = []
+        first = True
+        for line in json_to_text(data):
+            lines.append(line)
+            if len(lines) >= 1000:
+                yield ("" if first else "\n") + "\n".join(lines)
+                lines, first = [], False
+        if lines:
+            yield ("" if first else "\n") + "\n".join(lines)
     
-    async def _extract_plain_text(self, file_path: Path) -> str:
-        """Extract text from plain text files"""
+    def _iter_plain_text(self, file_path: Path) -> Iterator[str]:
+        """Extract text from plain text files in ~1MB blocks"""
+        encoding = 'utf-8'
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            # Validate the encoding block by block before yielding anything
+            with open(file_path, 'r', encoding=encoding) as f:
+                while f.read(self.TEXT_SECTION_CHARS):
+                    pass
         except UnicodeDecodeError:
             # Try with latin-1 encoding
-            with open(file_path, 'r', encoding='latin-1') as f:
-                return f.read()
+            encoding = 'latin-1'
+
+        with open(file_path, 'r', encoding=encoding) as f:
+            while True:
+                block = f.read(self.TEXT_SECTION_CHARS)
+                if not block:
+                    break
+                yield block
+
+    def _iter_string_sections(self, text: str) -> Iterator[str]:
+        """Slice already-extracted text into pipeline sections"""
+        for start in range(0, len(text), self.TEXT_SECTION_CHARS):
+            yield text[start:start + self.TEXT_SECTION_CHARS]
 
     async def extract_text_from_path(self, file_path: Path, content_type: str) -> str:
         """Public wrapper for text extraction from file path"""
@@ -391,207 +529,149 @@ class DocumentProcessor:
         Returns:
             List of chunk dictionaries with content and metadata
         """
-        # Simple sentence-aware chunking
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        chunks = []
-        current_chunk = ""
-        current_tokens = 0
-        chunk_index = 0
-        
-        for sentence in sentences:
-            sentence_tokens = len(sentence.split())
-            
-            # If adding this sentence would exceed chunk size, save current chunk
-            if current_tokens + sentence_tokens > self.chunk_size and current_chunk:
-                # Create chunk with overlap from previous chunk
-                chunk_content = current_chunk.strip()
-                if chunk_content:
-                    chunks.append({
-                        "document_id": document_id,
-                        "chunk_index": chunk_index,
-                        "content": chunk_content,
-                        "token_count": current_tokens,
-                        "content_hash": hashlib.md5(chunk_content.encode()).hexdigest()
-                    })
-                    chunk_index += 1
-                
-                # Start new chunk with overlap
-                if self.chunk_overlap > 0 and chunks:
-                    # Take last few sentences for overlap
-                    overlap_sentences = current_chunk.split('.')[-2:]  # Rough overlap
-                    current_chunk = '. '.join(s.strip() for s in overlap_sentences if s.strip())
-                    current_tokens = len(current_chunk.split())
-                else:
-                    current_chunk = ""
-                    current_tokens = 0
-            
-            # Add sentence to current chunk
-            if current_chunk:
-                current_chunk += ". " + sentence
-            else:
-                current_chunk = sentence
-            current_tokens += sentence_tokens
-        
-        # Add final chunk
-        if current_chunk.strip():
-            chunk_content = current_chunk.strip()
-            chunks.append({
-                "document_id": document_id,
-                "chunk_index": chunk_index,
-                "content": chunk_content,
-                "token_count": current_tokens,
-                "content_hash": hashlib.md5(chunk_content.encode()).hexdigest()
-            })
+        chunker = _StreamingChunker(document_id, self.chunk_size, self.chunk_overlap)
+        chunks = chunker.feed(text) + chunker.finish()
+
+        # Store real token counts (chunk sizing above stays word-based)
+        for chunk, token_count in zip(chunks, count_tokens_for_ingest([c["content"] for c in chunks])):
+            chunk["token_count"] = token_count
         
         logger.info(f"Created {len(chunks)} chunks from document {document_id}")
         return chunks
     
-    async def _generate_embeddings_for_chunks(
+    async def _run_streaming_pipeline(
         self,
-        chunks: List[Dict[str, Any]],
+        sections: Iterator[str],
+        document_id: str,
         dataset_id: str,
-        user_id: str
-    ):
-        """
-        Generate embeddings for all chunks using concurrent batch processing.
-
-        Processes chunks in batches with controlled concurrency to optimize performance
-        while preventing system overload. Includes retry logic and progressive storage.
-        """
-
-        if not chunks:
-            return
-
-        total_chunks = len(chunks)
-        document_id = chunks[0]["document_id"]
-        total_batches = (total_chunks + self.EMBEDDING_BATCH_SIZE - 1) // self.EMBEDDING_BATCH_SIZE
-
-        logger.info(f"Starting concurrent embedding generation for {total_chunks} chunks")
-        logger.info(f"Batch size: {self.EMBEDDING_BATCH_SIZE}, Total batches: {total_batches}, Max concurrent: {self.MAX_CONCURRENT_BATCHES}")
-
-        # Create semaphore to limit concurrent batches
-        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_BATCHES)
-
-        # Create batch data with metadata
-        batch_tasks = []
-        for batch_start in range(0, total_chunks, self.EMBEDDING_BATCH_SIZE):
-            batch_end = min(batch_start + self.EMBEDDING_BATCH_SIZE, total_chunks)
-            batch_chunks = chunks[batch_start:batch_end]
-            batch_num = (batch_start // self.EMBEDDING_BATCH_SIZE) + 1
-
-            batch_metadata = {
-                "chunks": batch_chunks,
-                "batch_num": batch_num,
-                "start_index": batch_start,
-                "end_index": batch_end,
-                "dataset_id": dataset_id,
-                "user_id": user_id,
-                "document_id": document_id
-            }
-
-            # Create task for this batch
-            task = self._process_batch_with_semaphore(semaphore, batch_metadata, total_batches, total_chunks)
-            batch_tasks.append(task)
-
-        # Process all batches concurrently
-        logger.info(f"Starting concurrent processing of {len(batch_tasks)} batches")
-        start_time = asyncio.get_event_loop().time()
-
-        results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-
-        end_time = asyncio.get_event_loop().time()
-        processing_time = end_time - start_time
-
-        # Analyze results
-        successful_batches = []
-        failed_batches = []
-
-        for i, result in enumerate(results):
-            batch_num = i + 1
-            if isinstance(result, Exception):
-                failed_batches.append({
-                    "batch_num": batch_num,
-                    "error": str(result)
-                })
-                logger.error(f"Batch {batch_num} failed: {result}")
-            else:
-                successful_batches.append(result)
-
-        successful_chunks = sum(len(batch["chunks"]) for batch in successful_batches)
-
-        logger.info(f"Concurrent processing completed in {processing_time:.2f} seconds")
-        logger.info(f"Successfully processed {successful_chunks}/{total_chunks} chunks in {len(successful_batches)}/{total_batches} batches")
-
-        # Report final results
-        if failed_batches:
-            failed_chunk_count = total_chunks - successful_chunks
-            error_details = "; ".join([f"Batch {b['batch_num']}: {b['error']}" for b in failed_batches[:3]])
-            if len(failed_batches) > 3:
-                error_details += f" (and {len(failed_batches) - 3} more failures)"
-
-            raise ValueError(f"Failed to generate embeddings for {failed_chunk_count}/{total_chunks} chunks. Errors: {error_details}")
-
-        logger.info(f"Successfully stored all {total_chunks} chunks with embeddings")
-
-    async def _process_batch_with_semaphore(
-        self,
-        semaphore: asyncio.Semaphore,
-        batch_metadata: Dict[str, Any],
-        total_batches: int,
-        total_chunks: int
+        user_id: str,
+        store_content: bool
     ) -> Dict[str, Any]:
         """
-        Process a single batch with semaphore-controlled concurrency.
+        Run extraction -> chunking -> embedding -> storage as concurrent stages.
 
-        Args:
-            semaphore: Concurrency control semaphore
-            batch_metadata: Batch information including chunks and metadata
-            total_batches: Total number of batches
-            total_chunks: Total number of chunks
+        Stages are connected by bounded queues, so embedding of early chunks
+        overlaps extraction of later pages and only a few sections and batches
+        are held in memory regardless of document size. When store_content is
+        set, the extracted text is also spooled to a temporary file and
+        written to documents.content_text in one UPDATE once extraction
+        finishes (appending pieces would rewrite the growing TOAST value each
+        time). That UPDATE needs the whole text as one parameter, so the full
+        text is held in memory once, only for the duration of the write.
 
         Returns:
-            Dict with batch processing results
+            Dict with chunk_count and preview (leading text for the summary)
         """
-        async with semaphore:
-            batch_chunks = batch_metadata["chunks"]
-            batch_num = batch_metadata["batch_num"]
-            dataset_id = batch_metadata["dataset_id"]
-            user_id = batch_metadata["user_id"]
-            document_id = batch_metadata["document_id"]
-
-            logger.info(f"Starting batch {batch_num}/{total_batches} ({len(batch_chunks)} chunks)")
+        section_queue: asyncio.Queue = asyncio.Queue(maxsize=self.SECTION_QUEUE_SIZE)
+        batch_queue: asyncio.Queue = asyncio.Queue(maxsize=self.MAX_CONCURRENT_BATCHES * 2)
+        state = {"preview": "", "chunks_total": None, "chunks_stored": 0, "batches": 0}
 
+        async def extract_stage():
+            spool = tempfile.TemporaryFile(mode="w+", encoding="utf-8") if store_content else None
             try:
-                # Generate embeddings for this batch (pass user_id for billing)
-                embeddings = await self._generate_embedding_batch(batch_chunks, user_id=user_id)
+                while True:
+                    # Parsing is blocking; advance the section iterator in a worker thread
+                    section = await asyncio.to_thread(next, sections, None)
+                    if section is None:
+                        break
+
+                    if len(state["preview"]) < self.SUMMARY_PREVIEW_CHARS:
+                        state["preview"] += section[:self.SUMMARY_PREVIEW_CHARS - len(state["preview"])]
+
+                    if spool is not None:
+                        spool.write(section)
+
+                    await section_queue.put(section)
+
+                if spool is not None:
+                    spool.seek(0)
+                    await self._update_document_content(document_id, await asyncio.to_thread(spool.read))
+            finally:
+                if spool is not None:
+                    spool.close()
+            await section_queue.put(None)
+
+        async def chunk_stage():
+            chunker = _StreamingChunker(document_id, self.chunk_size, self.chunk_overlap)
+            pending: List[Dict[str, Any]] = []
+
+            async def emit(final: bool = False):
+                while len(pending) >= self.EMBEDDING_BATCH_SIZE or (final and pending):
+                    batch = pending[:self.EMBEDDING_BATCH_SIZE]
+                    del pending[:self.EMBEDDING_BATCH_SIZE]
+                    # Store real token counts (chunk sizing stays word-based)
+                    for chunk, token_count in zip(batch, count_tokens_for_ingest([c["content"] for c in batch])):
+                        chunk["token_count"] = token_count
+                    await batch_queue.put(batch)
+
+            while True:
+                section = await section_queue.get()
+                if section is None:
+                    break
+                pending.extend(chunker.feed(section))
+                await emit()
+
+            pending.extend(chunker.finish())
+            state["chunks_total"] = chunker.chunk_count
+            await emit(final=True)
+
+            for _ in range(self.MAX_CONCURRENT_BATCHES):
+                await batch_queue.put(None)
+
+        async def embed_stage():
+            while True:
+                batch = await batch_queue.get()
+                if batch is None:
+                    return
+                state["batches"] += 1
+                batch_num = state["batches"]
 
-                # Store embeddings for this batch immediately
-                await self._store_chunk_embeddings(batch_chunks, embeddings, dataset_id, user_id)
+                try:
+                    # Generate embeddings for this batch (pass user_id for billing)
+                    embeddings = await self._generate_embedding_batch(batch, user_id=user_id)
 
-                # Update progress in database
-                progress_stage = f"Completed batch {batch_num}/{total_batches}"
+                    # Store embeddings for this batch immediately
+                    await self._store_chunk_embeddings(batch, embeddings, dataset_id, user_id)
+                except Exception as e:
+                    logger.error(f"Failed to process batch {batch_num}: {e}")
+                    raise ValueError(f"Batch {batch_num} failed: {str(e)}")
 
-                # Calculate current progress (approximate since batches complete out of order)
+                state["chunks_stored"] += len(batch)
+                # Total is known only once chunking has finished
                 await self._update_processing_status(
                     document_id, "processing",
-                    processing_stage=progress_stage,
-                    chunks_processed=batch_num * self.EMBEDDING_BATCH_SIZE,  # Approximate
-                    total_chunks_expected=total_chunks
+                    processing_stage=f"Completed batch {batch_num}",
+                    chunks_processed=state["chunks_stored"],
+                    total_chunks_expected=state["chunks_total"]
                 )
 
-                logger.info(f"Successfully completed batch {batch_num}/{total_batches}")
+        logger.info(
+            f"Starting streaming pipeline for document {document_id} "
+            f"(batch size: {self.EMBEDDING_BATCH_SIZE}, max concurrent: {self.MAX_CONCURRENT_BATCHES})"
+        )
+        start_time = asyncio.get_event_loop().time()
 
-                return {
-                    "batch_num": batch_num,
-                    "chunks": batch_chunks,
-                    "success": True
-                }
+        tasks = [
+            asyncio.create_task(extract_stage()),
+            asyncio.create_task(chunk_stage()),
+            *(asyncio.create_task(embed_stage()) for _ in range(self.MAX_CONCURRENT_BATCHES))
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # One stage failed: stop the others so nothing waits on a dead queue
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
-            except Exception as e:
-                logger.error(f"Failed to process batch {batch_num}/{total_batches}: {e}")
-                raise ValueError(f"Batch {batch_num} failed: {str(e)}")
+        processing_time = asyncio.get_event_loop().time() - start_time
+        logger.info(
+            f"Streaming pipeline stored {state['chunks_stored']} chunks in "
+            f"{state['batches']} batches in {processing_time:.2f} seconds"
+        )
+
+        return {"chunk_count": state["chunks_total"] or 0, "preview": state["preview"]}
 
     async def _generate_embedding_batch(
         self,
@@ -601,6 +681,9 @@ class DocumentProcessor:
         """
         Generate embeddings for a single batch of chunks with retry logic.
 
+        Chunks whose content hash is already in the embedding cache are served
+        from it; only the remaining texts are sent to the embedding service.
+
         Args:
             batch_chunks: List of chunk dictionaries
             user_id: User ID for usage tracking
@@ -612,7 +695,21 @@ class DocumentProcessor:
             ValueError: If embedding generation fails after all retries
         """
         texts = [chunk["content"] for chunk in batch_chunks]
+        content_hashes = [chunk["content_hash"] for chunk in batch_chunks]
+
+        async def embed_uncached(uncached_texts: List[str]) -> List[List[float]]:
+            return await self._embed_texts_with_retry(uncached_texts, user_id=user_id)
+
+        return await self.embedding_cache.get_or_embed(
+            self.embedding_client.model, texts, embed_uncached, content_hashes=content_hashes
+        )
 
+    async def _embed_texts_with_retry(
+        self,
+        texts: List[str],
+        user_id: str = None
+    ) -> List[List[float]]:
+        """Call the embedding service for texts with exponential-backoff retries."""
         for attempt in range(self.MAX_RETRIES + 1):
             try:
                 # Use the configurable embedding client with tenant/user context for billing
@@ -644,25 +741,26 @@ class DocumentProcessor:
         dataset_id: str,
         user_id: str
     ):
-        """Store chunk embeddings in database with proper error handling."""
+        """Store a batch of chunk embeddings with one binary COPY in a single transaction."""
 
-        pg_client = await get_postgresql_client()
-        for chunk_data, embedding in zip(batch_chunks, embeddings):
-            chunk_id = str(uuid.uuid4())
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "document_id": chunk_data["document_id"],
+                "user_id": str(user_id),
+                "dataset_id": dataset_id,
+                "chunk_index": chunk_data["chunk_index"],
+                "content": chunk_data["content"],
+                "content_hash": chunk_data["content_hash"],
+                "token_count": chunk_data["token_count"],
+                "embedding": embedding,
+            }
+            for chunk_data, embedding in zip(batch_chunks, embeddings)
+        ]
 
-            # Convert embedding list to PostgreSQL array format
-            embedding_array = f"[{','.join(map(str, embedding))}]" if embedding else None
+        pg_client = await get_postgresql_client()
+        await pg_client.bulk_insert_document_chunks(rows)
 
-            await pg_client.execute_command(
-                """INSERT INTO document_chunks (
-                    id, document_id, user_id, dataset_id, chunk_index,
-                    content, content_hash, token_count, embedding
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9::vector)""",
-                chunk_id, chunk_data["document_id"], str(user_id),
-                dataset_id, chunk_data["chunk_index"], chunk_data["content"],
-                chunk_data["content_hash"], chunk_data["token_count"], embedding_array
-            )
-    
     async def _update_processing_status(
         self,
         document_id: str,
@@ -0,0 +1,199 @@
+"""
+Content-Hash Embedding Cache for GT 2.0
+
+Avoids re-embedding chunks whose exact text has already been embedded by the
+same model - re-uploads, copies into another dataset, and reprocessing after a
+failure all produce identical chunk content hashes.
+
+Two tiers:
+- In-process LRU (float32 arrays, bounded by entry count)
+- PostgreSQL table `embedding_cache` in the tenant schema (durable, shared by
+  all workers of the tenant)
+
+Cache keys are (model, content_hash); only hashes and vectors are stored, never
+chunk text. The cache is best-effort: any failure of the durable tier is
+logged and the caller falls back to generating embeddings.
+"""
+
+import hashlib
+import logging
+from array import array
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from asyncpg.exceptions import UndefinedTableError
+
+from app.core.config import get_settings
+from app.core.postgresql_client import get_postgresql_client
+
+logger = logging.getLogger(__name__)
+
+
+def compute_content_hash(text: str) -> str:
+    """Hash used for chunk de-duplication (matches DocumentProcessor chunk content_hash)"""
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Per-tenant embedding cache keyed by (model, content_hash).
+
+    The tenant backend runs one process group per tenant and every connection
+    is pinned to the tenant schema, so the durable tier is tenant-isolated by
+    construction.
+    """
+
+    def __init__(self, max_entries: int = 5000):
+        self._entries: "OrderedDict[Tuple[str, str], array]" = OrderedDict()
+        self._lock = Lock()
+        self._max_entries = max_entries
+        self._durable_available = True
+        self._hits = 0
+        self._durable_hits = 0
+        self._misses = 0
+
+    # In-process tier
+
+    def _lru_get(self, key: Tuple[str, str]) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                return None
+            self._entries.move_to_end(key)
+            return vector.tolist()
+
+    def _lru_put(self, key: Tuple[str, str], embedding: List[float]) -> None:
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = array('f', embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    # Public API
+
+    async def get_many(self, model: str, content_hashes: List[str]) -> Dict[str, List[float]]:
+        """Return cached embeddings for the given hashes (missing hashes are omitted)"""
+        found: Dict[str, List[float]] = {}
+        missing: List[str] = []
+
+        for content_hash in dict.fromkeys(content_hashes):
+            embedding = self._lru_get((model, content_hash))
+            if embedding is not None:
+                found[content_hash] = embedding
+            else:
+                missing.append(content_hash)
+        self._hits += len(found)
+
+        if missing and self._durable_available:
+            try:
+                pg_client = await get_postgresql_client()
+                rows = await pg_client.fetch_vectors(
+                    """SELECT content_hash, embedding
+                       FROM embedding_cache
+                       WHERE model = $1 AND content_hash = ANY($2::varchar[])""",
+                    model, missing
+                )
+                for row in rows:
+                    found[row["content_hash"]] = row["embedding"]
+                    self._lru_put((model, row["content_hash"]), row["embedding"])
+                self._durable_hits += len(rows)
+            except UndefinedTableError:
+                self._durable_available = False
+                logger.warning("embedding_cache table missing; run migration T011. Using in-process tier only")
+            except Exception as e:
+                logger.warning(f"Embedding cache lookup failed, treating as miss: {e}")
+
+        self._misses += len(set(content_hashes)) - len(found)
+        return found
+
+    async def put_many(self, model: str, entries: Dict[str, List[float]]) -> None:
+        """Store embeddings in both tiers (existing durable rows are left untouched)"""
+        if not entries:
+            return
+
+        for content_hash, embedding in entries.items():
+            self._lru_put((model, content_hash), embedding)
+
+        if not self._durable_available:
+            return
+        try:
+            pg_client = await get_postgresql_client()
+            await pg_client.execute_many_vectors(
+                """INSERT INTO embedding_cache (model, content_hash, embedding)
+                   VALUES ($1, $2, $3::vector)
+                   ON CONFLICT (model, content_hash) DO NOTHING""",
+                [(model, content_hash, embedding) for content_hash, embedding in entries.items()]
+            )
+        except UndefinedTableError:
+            self._durable_available = False
+            logger.warning("embedding_cache table missing; run migration T011. Using in-process tier only")
+        except Exception as e:
+            logger.warning(f"Failed to persist {len(entries)} embeddings to cache: {e}")
+
+    async def get_or_embed(
+        self,
+        model: str,
+        texts: List[str],
+        embed_fn: Callable[[List[str]], Awaitable[List[List[float]]]],
+        content_hashes: Optional[List[str]] = None
+    ) -> List[List[float]]:
+        """
+        Return embeddings for texts, calling embed_fn only for uncached content.
+
+        Duplicate texts within the same call are embedded once.
+        """
+        if not texts:
+            return []
+        if content_hashes is None:
+            content_hashes = [compute_content_hash(text) for text in texts]
+
+        cached = await self.get_many(model, content_hashes)
+
+        # Unique uncached hashes, in first-seen order
+        to_embed: Dict[str, str] = {}
+        for text, content_hash in zip(texts, content_hashes):
+            if content_hash not in cached and content_hash not in to_embed:
+                to_embed[content_hash] = text
+
+        if to_embed:
+            new_embeddings = await embed_fn(list(to_embed.values()))
+            if len(new_embeddings) != len(to_embed):
+                raise ValueError(f"Embedding count mismatch: expected {len(to_embed)}, got {len(new_embeddings)}")
+            fresh = dict(zip(to_embed.keys(), new_embeddings))
+            await self.put_many(model, fresh)
+            cached.update(fresh)
+
+        if len(to_embed) < len(texts):
+            logger.info(f"Embedding cache served {len(texts) - len(to_embed)}/{len(texts)} texts for model {model}")
+
+        return [cached[content_hash] for content_hash in content_hashes]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        total = self._hits + self._durable_hits + self._misses
+        hit_rate = ((self._hits + self._durable_hits) / total * 100) if total > 0 else 0
+        return {
+            "size": len(self._entries),
+            "max_entries": self._max_entries,
+            "memory_hits": self._hits,
+            "durable_hits": self._durable_hits,
+            "misses": self._misses,
+            "hit_rate_percent": round(hit_rate, 2),
+            "durable_tier_available": self._durable_available,
+        }
+
+
+# Singleton cache instance per worker
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the process-wide embedding cache"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        settings = get_settings()
+        _embedding_cache = EmbeddingCache(max_entries=settings.embedding_cache_max_entries)
+    return _embedding_cache
@@ -3,23 +3,32 @@ BGE-M3 Embedding Client for GT 2.0
 
 Simple client for the vLLM BGE-M3 embedding service running on port 8005.
 Provides text embedding generation for RAG pipeline.
+
+Requests that fit in one batch (query embeddings are single texts) are
+coalesced per tenant: texts submitted within BATCH_WINDOW_SECONDS are sent
+as one /v1/embeddings call, and every call goes through one pooled
+httpx client per worker.
 """
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import httpx
 
 logger = logging.getLogger(__name__)
 
+BATCH_WINDOW_SECONDS = 0.005
+MAX_CONCURRENT_BATCHES = 4
+
 
 class BGE_M3_EmbeddingClient:
     """
     Simple client for BGE-M3 embedding service via vLLM.
 
     Features:
-    - Async HTTP client for embeddings
+    - Pooled async HTTP client for embeddings
     - Batch processing support
+    - Per-tenant coalescing of concurrent small requests
     - Error handling and retries
     - OpenAI-compatible API format
     """
@@ -34,6 +43,15 @@ class BGE_M3_EmbeddingClient:
         self.embedding_dimensions = 1024
         self.max_batch_size = 32
 
+        self._client: Optional[httpx.AsyncClient] = None
+        # Coalescing state: tenant -> [(text, future)] waiting for the next batch
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._flush_timers: Dict[str, asyncio.Task] = {}
+        self._send_tasks: set = set()
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self.batches_sent = 0
+        self.texts_sent = 0
+
         # Initialize BGE-M3 tokenizer for accurate token counting
         try:
             from transformers import AutoTokenizer
@@ -60,6 +78,28 @@ class BGE_M3_EmbeddingClient:
         # Default to local endpoint
         return os.getenv('EMBEDDING_ENDPOINT', 'http://host.docker.internal:8005')
 
+    def _get_client(self) -> httpx.AsyncClient:
+        """Pooled client for all embedding service calls"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=120.0,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Close the pooled client (application shutdown)"""
+        for timer in list(self._flush_timers.values()):
+            timer.cancel()
+        self._flush_timers.clear()
+        for key in list(self._pending):
+            for _, future in self._pending.pop(key):
+                if not future.done():
+                    future.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
     def update_endpoint(self, new_endpoint: str):
         """Update the embedding endpoint dynamically"""
         self.base_url = new_endpoint
@@ -68,13 +108,12 @@ class BGE_M3_EmbeddingClient:
     async def health_check(self) -> bool:
         """Check if BGE-M3 service is responding"""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(f"{self.base_url}/v1/models")
-                if response.status_code == 200:
-                    models = response.json()
-                    model_ids = [model['id'] for model in models.get('data', [])]
-                    return self.model in model_ids
-                return False
+            response = await self._get_client().get(f"{self.base_url}/v1/models", timeout=10.0)
+            if response.status_code == 200:
+                models = response.json()
+                model_ids = [model['id'] for model in models.get('data', [])]
+                return self.model in model_ids
+            return False
         except Exception as e:
             logger.error(f"Health check failed: {e}")
             return False
@@ -113,7 +152,7 @@ class BGE_M3_EmbeddingClient:
                 all_embeddings.extend(batch_embeddings)
             embeddings = all_embeddings
         else:
-            embeddings = await self._generate_batch(texts)
+            embeddings = await self._generate_coalesced(texts, tenant_id or "")
 
         # Log usage if tenant context provided (fire and forget)
         if tenant_id and user_id:
@@ -131,34 +170,101 @@ class BGE_M3_EmbeddingClient:
 
         return embeddings
 
+    async def _generate_coalesced(self, texts: List[str], tenant_key: str) -> List[List[float]]:
+        """Queue texts for the tenant's next batch and wait for their embeddings"""
+        loop = asyncio.get_running_loop()
+        queue = self._pending.setdefault(tenant_key, [])
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            queue.append((text, future))
+            futures.append(future)
+
+        if len(queue) >= self.max_batch_size:
+            # Batch is full: don't wait for the rest of the window
+            self._flush(tenant_key)
+        elif tenant_key not in self._flush_timers:
+            self._flush_timers[tenant_key] = asyncio.create_task(self._flush_after(tenant_key))
+
+        return list(await asyncio.gather(*futures))
+
+    async def _flush_after(self, tenant_key: str) -> None:
+        await asyncio.sleep(BATCH_WINDOW_SECONDS)
+        # Cleared before flushing so _flush() never cancels this task
+        self._flush_timers.pop(tenant_key, None)
+        self._flush(tenant_key)
+
+    def _flush(self, tenant_key: str) -> None:
+        """Send the tenant's queued texts in batches of up to max_batch_size"""
+        timer = self._flush_timers.pop(tenant_key, None)
+        if timer is not None:
+            timer.cancel()
+
+        queue = self._pending.pop(tenant_key, [])
+        for start in range(0, len(queue), self.max_batch_size):
+            task = asyncio.create_task(self._send_pending(queue[start:start + self.max_batch_size]))
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+
+    async def _send_pending(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Embed one coalesced batch and route the rows back to the callers"""
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
+        try:
+            async with self._in_flight:
+                self.batches_sent += 1
+                self.texts_sent += len(batch)
+                embeddings = await self._generate_batch([text for text, _ in batch])
+            if len(embeddings) != len(batch):
+                raise ValueError(f"Embedding count mismatch: expected {len(batch)}, got {len(embeddings)}")
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing statistics for health checks"""
+        return {
+            "pending": sum(len(queue) for queue in self._pending.values()),
+            "batches_sent": self.batches_sent,
+            "texts_sent": self.texts_sent,
+            "avg_batch_size": round(self.texts_sent / self.batches_sent, 2) if self.batches_sent else 0,
+        }
+
     async def _generate_batch(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for a single batch"""
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/embeddings",
-                    json={
-                        "input": texts,
-                        "model": self.model
-                    }
-                )
+            response = await self._get_client().post(
+                f"{self.base_url}/v1/embeddings",
+                json={
+                    "input": texts,
+                    "model": self.model
+                }
+            )
 
-                if response.status_code == 200:
-                    data = response.json()
-                    # Extract embeddings from OpenAI-compatible response
-                    embeddings = []
-                    for item in data.get("data", []):
-                        embedding = item.get("embedding", [])
-                        if len(embedding) != self.embedding_dimensions:
-                            raise ValueError(f"Invalid embedding dimensions: {len(embedding)} (expected {self.embedding_dimensions})")
-                        embeddings.append(embedding)
-
-                    logger.info(f"Generated {len(embeddings)} embeddings")
-                    return embeddings
-                else:
-                    error_text = response.text
-                    logger.error(f"Embedding generation failed: {response.status_code} - {error_text}")
-                    raise ValueError(f"Embedding generation failed: {response.status_code}")
+            if response.status_code == 200:
+                data = response.json()
+                # Extract embeddings from OpenAI-compatible response
+                embeddings = []
+                for item in data.get("data", []):
+                    embedding = item.get("embedding", [])
+                    if len(embedding) != self.embedding_dimensions:
+                        raise ValueError(f"Invalid embedding dimensions: {len(embedding)} (expected {self.embedding_dimensions})")
+                    embeddings.append(embedding)
+
+                logger.info(f"Generated {len(embeddings)} embeddings")
+                return embeddings
+            else:
+                error_text = response.text
+                logger.error(f"Embedding generation failed: {response.status_code} - {error_text}")
+                raise ValueError(f"Embedding generation failed: {response.status_code}")
 
         except httpx.TimeoutException:
             logger.error("Embedding generation timed out")
@@ -261,6 +367,12 @@ def get_embedding_client() -> BGE_M3_EmbeddingClient:
     return _embedding_client
 
 
+async def close_embedding_client() -> None:
+    """Close the shared client's connection pool (application shutdown)"""
+    if _embedding_client is not None:
+        await _embedding_client.close()
+
+
 async def test_embedding_client():
     """Test function for the embedding client"""
     client = get_embedding_client()
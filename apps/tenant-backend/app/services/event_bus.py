@@ -6,10 +6,15 @@ tenant isolation and capability-based execution.
 """
 
 import asyncio
+import copy
 import logging
-from typing import Dict, Any, List, Optional, Callable
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from uuid import uuid4
 from enum import Enum
 import json
@@ -158,6 +163,407 @@ class Automation:
             return False
 
 
+def _automation_from_dict(data: Dict[str, Any]) -> Automation:
+    """Build an Automation from its stored JSON form"""
+    data = dict(data)
+    data["trigger_type"] = TriggerType(data["trigger_type"])
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    data["updated_at"] = datetime.fromisoformat(data["updated_at"])
+    return Automation(**data)
+
+
+class AutomationIndex:
+    """
+    In-memory index of a tenant's automations keyed by trigger event type.
+
+    Shared by every TenantEventBus for the same automations directory, so
+    matching an event costs O(automations for that event type) instead of
+    reading every automation file. Changes made through create/delete are
+    applied directly; external edits are picked up by a throttled mtime
+    check of the directory (only changed files are re-read).
+    """
+
+    def __init__(self, automations_path: Path, refresh_interval: float = 2.0):
+        self.automations_path = automations_path
+        self.refresh_interval = refresh_interval
+        # filename -> ((mtime_ns, size), automation or None if unparseable)
+        self._files: Dict[str, Tuple[Tuple[int, int], Optional[Automation]]] = {}
+        # event type -> {automation_id: automation}
+        self._by_event_type: Dict[str, Dict[str, Automation]] = {}
+        self._lock = Lock()
+        self._last_refresh = 0.0
+        self._loaded = False
+
+    def _index_locked(self, automation: Automation) -> None:
+        if not automation.is_active or automation.trigger_type != TriggerType.EVENT:
+            return
+        for event_type in automation.trigger_config.get("event_types", []):
+            self._by_event_type.setdefault(event_type, {})[automation.id] = automation
+
+    def _unindex_locked(self, automation: Automation) -> None:
+        for event_type in automation.trigger_config.get("event_types", []):
+            bucket = self._by_event_type.get(event_type)
+            if bucket is not None:
+                bucket.pop(automation.id, None)
+                if not bucket:
+                    del self._by_event_type[event_type]
+
+    def _scan(self) -> None:
+        """Re-read new or modified automation files and drop removed ones"""
+        seen = set()
+        try:
+            entries = list(os.scandir(self.automations_path))
+        except FileNotFoundError:
+            entries = []
+
+        for entry in entries:
+            if not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            seen.add(entry.name)
+            stat = entry.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+
+            with self._lock:
+                current = self._files.get(entry.name)
+            if current is not None and current[0] == signature:
+                continue
+
+            automation = None
+            try:
+                with open(entry.path, "r") as f:
+                    automation = _automation_from_dict(json.load(f))
+            except Exception as e:
+                logger.error(f"Error loading automation {entry.path}: {e}")
+
+            with self._lock:
+                if current is not None and current[1] is not None:
+                    self._unindex_locked(current[1])
+                self._files[entry.name] = (signature, automation)
+                if automation is not None:
+                    self._index_locked(automation)
+
+        with self._lock:
+            for name in [name for name in self._files if name not in seen]:
+                _, automation = self._files.pop(name)
+                if automation is not None:
+                    self._unindex_locked(automation)
+            self._last_refresh = time.monotonic()
+            self._loaded = True
+
+    async def refresh_if_stale(self) -> None:
+        """Pick up external changes at most once per refresh_interval"""
+        if not self._loaded:
+            # Nothing to match against until the first full load completes
+            await asyncio.to_thread(self._scan)
+            return
+        if time.monotonic() - self._last_refresh < self.refresh_interval:
+            return
+        # Mark before scanning so concurrent emitters don't start duplicate scans
+        self._last_refresh = time.monotonic()
+        await asyncio.to_thread(self._scan)
+
+    async def find_matching(self, event: Event) -> List[Automation]:
+        """Automations whose trigger and conditions match the event"""
+        await self.refresh_if_stale()
+        with self._lock:
+            candidates = list(self._by_event_type.get(event.type, {}).values())
+        return [automation for automation in candidates if automation.matches_event(event)]
+
+    def upsert(self, automation_file: Path, automation: Automation) -> None:
+        """
+        Record an automation just written to disk.
+
+        A copy is indexed, so later changes to the caller's object are not seen
+        by event matching unless they are written and upserted again.
+        """
+        automation = copy.deepcopy(automation)
+        try:
+            stat = automation_file.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            current = self._files.get(automation_file.name)
+            if current is not None and current[1] is not None:
+                self._unindex_locked(current[1])
+            self._files[automation_file.name] = (signature, automation)
+            self._index_locked(automation)
+
+    def remove(self, automation_file: Path) -> None:
+        """Forget an automation whose file was deleted"""
+        with self._lock:
+            current = self._files.pop(automation_file.name, None)
+            if current is not None and current[1] is not None:
+                self._unindex_locked(current[1])
+
+
+# One index per automations directory, shared across TenantEventBus instances
+_automation_indexes: Dict[Path, AutomationIndex] = {}
+
+
+def _get_automation_index(automations_path: Path) -> AutomationIndex:
+    key = automations_path.resolve()
+    index = _automation_indexes.get(key)
+    if index is None:
+        index = AutomationIndex(key)
+        _automation_indexes[key] = index
+    return index
+
+
+class EventJournal:
+    """
+    Group-committed event journal with a SQLite sidecar index.
+
+    Events are still stored as daily `events_YYYY-MM-DD.jsonl` files, but
+    emit_event only enqueues them; a background task appends each batch with
+    one write and one fsync per day file. A sidecar index (events_index.sqlite3)
+    records (day, type, user, timestamp) and the byte offset of every line, so
+    history queries seek to matching lines instead of parsing whole files.
+
+    The index is caught up from the journal files (bytes_indexed per day), so
+    lines appended by other workers or written before the index existed are
+    indexed on the next write or query.
+    """
+
+    INDEX_FILENAME = "events_index.sqlite3"
+
+    def __init__(self, event_store_path: Path, flush_interval: float = 0.05, max_batch: int = 1000):
+        self.event_store_path = event_store_path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._db_lock = Lock()
+        self._conn = sqlite3.connect(
+            str(event_store_path / self.INDEX_FILENAME),
+            timeout=10.0,
+            check_same_thread=False,
+            isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " day TEXT NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL,"
+            " type TEXT, user TEXT, timestamp TEXT, PRIMARY KEY (day, offset))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_events_type ON events (type, day, offset)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_events_user ON events (user, day, offset)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS indexed_days (day TEXT PRIMARY KEY, bytes_indexed INTEGER NOT NULL)"
+        )
+
+    def _day_file(self, day: str) -> Path:
+        return self.event_store_path / f"events_{day}.jsonl"
+
+    # Writer
+
+    def _ensure_writer(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._writer_task is None or self._writer_task.done() \
+                or self._writer_task.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._writer_task = loop.create_task(self._run_writer(self._queue))
+        return self._queue
+
+    async def append(self, event: Event) -> None:
+        """Queue an event for the next group commit (does not block on disk I/O)"""
+        self._ensure_writer().put_nowait(event)
+
+    async def flush(self) -> None:
+        """Wait until every queued event is on disk and indexed"""
+        if self._queue is not None and self._writer_task is not None and not self._writer_task.done():
+            await self._queue.join()
+
+    async def _run_writer(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            # Let concurrent emitters join this batch
+            await asyncio.sleep(self.flush_interval)
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} events to journal: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _write_batch(self, batch: List[Event]) -> None:
+        lines_by_day: Dict[str, List[str]] = {}
+        for event in batch:
+            day = event.timestamp.strftime("%Y-%m-%d")
+            lines_by_day.setdefault(day, []).append(json.dumps(event.to_dict()) + "\n")
+
+        # Every day file is written before any indexing, so an index failure
+        # never keeps events of another day off disk
+        written = []
+        for day, lines in lines_by_day.items():
+            try:
+                with open(self._day_file(day), "a") as f:
+                    f.write("".join(lines))
+                    f.flush()
+                    os.fsync(f.fileno())
+                written.append(day)
+            except Exception as e:
+                logger.error(f"Failed to write {len(lines)} events to journal for {day}: {e}")
+
+        # Unindexed lines are picked up by the next catch-up of that day
+        for day in written:
+            try:
+                self._catch_up_index(day)
+            except Exception as e:
+                logger.error(f"Failed to index journal for {day}, will retry on next catch-up: {e}")
+
+    # Index
+
+    def _catch_up_index(self, day: str) -> None:
+        """Index complete lines appended to a day file since the last catch-up"""
+        event_file = self._day_file(day)
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT bytes_indexed FROM indexed_days WHERE day = ?", (day,)
+                ).fetchone()
+                start = row[0] if row else 0
+
+                try:
+                    with open(event_file, "rb") as f:
+                        f.seek(start)
+                        data = f.read()
+                except FileNotFoundError:
+                    data = b""
+
+                # Ignore a trailing partial line still being written
+                end = data.rfind(b"\n") + 1
+                rows = []
+                position = 0
+                while position < end:
+                    line_end = data.index(b"\n", position) + 1
+                    try:
+                        event_data = json.loads(data[position:line_end])
+                        rows.append((
+                            day, start + position, line_end - position,
+                            event_data.get("type"), event_data.get("user"), event_data.get("timestamp")
+                        ))
+                    except ValueError as e:
+                        logger.error(f"Error parsing event at {event_file}:{start + position}: {e}")
+                    position = line_end
+
+                if end:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO events (day, offset, length, type, user, timestamp)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO indexed_days (day, bytes_indexed) VALUES (?, ?)",
+                        (day, start + end)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _query(
+        self,
+        days: List[str],
+        event_type: Optional[str],
+        user_id: Optional[str],
+        limit: int
+    ) -> List[Event]:
+        for day in days:
+            if self._day_file(day).exists():
+                self._catch_up_index(day)
+
+        sql = f"SELECT day, offset, length FROM events WHERE day IN ({','.join('?' * len(days))})"
+        params: List[Any] = list(days)
+        if event_type:
+            sql += " AND type = ?"
+            params.append(event_type)
+        if user_id:
+            sql += " AND user = ?"
+            params.append(user_id)
+        sql += " ORDER BY day, offset LIMIT ?"
+        params.append(limit)
+
+        with self._db_lock:
+            locations = self._conn.execute(sql, params).fetchall()
+
+        events = []
+        open_day, handle = None, None
+        try:
+            for day, offset, length in locations:
+                if day != open_day:
+                    if handle is not None:
+                        handle.close()
+                    handle = open(self._day_file(day), "rb")
+                    open_day = day
+                handle.seek(offset)
+                try:
+                    events.append(Event.from_dict(json.loads(handle.read(length))))
+                except Exception as e:
+                    logger.error(f"Error parsing event: {e}")
+        finally:
+            if handle is not None:
+                handle.close()
+        return events
+
+    async def query(
+        self,
+        days: List[str],
+        event_type: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Event]:
+        """Events on the given days matching the filters, in journal order"""
+        if not days:
+            return []
+        await self.flush()
+        return await asyncio.to_thread(self._query, days, event_type, user_id, limit)
+
+    async def close(self) -> None:
+        """Write out queued events, stop the writer and close the index"""
+        await self.flush()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+            self._queue = None
+        with self._db_lock:
+            self._conn.close()
+
+
+# One journal per event store directory, shared across TenantEventBus instances
+_event_journals: Dict[Path, EventJournal] = {}
+
+
+def _get_event_journal(event_store_path: Path) -> EventJournal:
+    key = event_store_path.resolve()
+    journal = _event_journals.get(key)
+    if journal is None:
+        journal = EventJournal(key)
+        _event_journals[key] = journal
+    return journal
+
+
+async def close_event_journals() -> None:
+    """Flush queued events to disk and close every journal (application shutdown)"""
+    for key, journal in list(_event_journals.items()):
+        try:
+            await journal.close()
+        except Exception as e:
+            logger.error(f"Error closing event journal {key}: {e}")
+    _event_journals.clear()
+
+
 class TenantEventBus:
     """
     Event system for automation triggers with tenant isolation.
@@ -181,6 +587,8 @@ class TenantEventBus:
         
         # Ensure directories exist with proper permissions
         self._ensure_directories()
+        self.automation_index = _get_automation_index(self.automations_path)
+        self.event_journal = _get_event_journal(self.event_store_path)
         
         logger.info(f"TenantEventBus initialized for {tenant_domain}")
     
@@ -247,34 +655,12 @@ class TenantEventBus:
         return event
     
     async def _store_event(self, event: Event):
-        """Store event to file system"""
-        # Create daily event file
-        date_str = event.timestamp.strftime("%Y-%m-%d")
-        event_file = self.event_store_path / f"events_{date_str}.jsonl"
-        
-        # Append event as JSON line
-        with open(event_file, "a") as f:
-            f.write(json.dumps(event.to_dict()) + "\n")
+        """Queue event for the daily journal file (group-committed in the background)"""
+        await self.event_journal.append(event)
     
     async def _find_matching_automations(self, event: Event) -> List[Automation]:
-        """Find automations that match the event"""
-        matching = []
-        
-        # Load all automations from file system
-        if self.automations_path.exists():
-            for automation_file in self.automations_path.glob("*.json"):
-                try:
-                    with open(automation_file, "r") as f:
-                        automation_data = json.load(f)
-                        automation = Automation(**automation_data)
-                        
-                        if automation.matches_event(event):
-                            matching.append(automation)
-                
-                except Exception as e:
-                    logger.error(f"Error loading automation {automation_file}: {e}")
-        
-        return matching
+        """Find automations that match the event (served from the automation index)"""
+        return await self.automation_index.find_matching(event)
     
     async def _can_trigger(self, user_id: str, automation: Automation) -> bool:
         """Check if user can trigger automation"""
@@ -489,7 +875,10 @@ class TenantEventBus:
         trigger_type: TriggerType,
         trigger_config: Dict[str, Any],
         actions: List[Dict[str, Any]],
-        conditions: Optional[List[Dict[str, Any]]] = None
+        conditions: Optional[List[Dict[str, Any]]] = None,
+        max_retries: int = 3,
+        timeout_seconds: int = 300,
+        is_active: bool = True
     ) -> Automation:
         """Create and save a new automation"""
         automation = Automation(
@@ -498,7 +887,10 @@ class TenantEventBus:
             trigger_type=trigger_type,
             trigger_config=trigger_config,
             actions=actions,
-            conditions=conditions or []
+            conditions=conditions or [],
+            max_retries=max_retries,
+            timeout_seconds=timeout_seconds,
+            is_active=is_active
         )
         
         # Save to file system
@@ -520,6 +912,7 @@ class TenantEventBus:
                 "created_at": automation.created_at.isoformat(),
                 "updated_at": automation.updated_at.isoformat()
             }, f, indent=2)
+        self.automation_index.upsert(automation_file, automation)
         
         logger.info(f"Created automation: {automation.name} ({automation.id})")
         return automation
@@ -533,11 +926,7 @@ class TenantEventBus:
         
         try:
             with open(automation_file, "r") as f:
-                data = json.load(f)
-                data["trigger_type"] = TriggerType(data["trigger_type"])
-                data["created_at"] = datetime.fromisoformat(data["created_at"])
-                data["updated_at"] = datetime.fromisoformat(data["updated_at"])
-                return Automation(**data)
+                return _automation_from_dict(json.load(f))
         except Exception as e:
             logger.error(f"Error loading automation {automation_id}: {e}")
             return None
@@ -556,10 +945,7 @@ class TenantEventBus:
                         if owner_id and data.get("owner_id") != owner_id:
                             continue
                         
-                        data["trigger_type"] = TriggerType(data["trigger_type"])
-                        data["created_at"] = datetime.fromisoformat(data["created_at"])
-                        data["updated_at"] = datetime.fromisoformat(data["updated_at"])
-                        automations.append(Automation(**data))
+                        automations.append(_automation_from_dict(data))
                 
                 except Exception as e:
                     logger.error(f"Error loading automation {automation_file}: {e}")
@@ -581,6 +967,7 @@ class TenantEventBus:
         # Delete file
         automation_file = self.automations_path / f"{automation_id}.json"
         automation_file.unlink()
+        self.automation_index.remove(automation_file)
         
         logger.info(f"Deleted automation: {automation_id}")
         return True
@@ -593,8 +980,7 @@ class TenantEventBus:
         user_id: Optional[str] = None,
         limit: int = 100
     ) -> List[Event]:
-        """Get event history with optional filters"""
-        events = []
+        """Get event history with optional filters (served from the journal index)"""
         safe_store_root = self.event_store_path.resolve()
         
         # Determine date range
@@ -603,7 +989,8 @@ class TenantEventBus:
         if not start_date:
             start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
         
-        # Iterate through daily event files
+        # Collect daily journal files in range
+        days = []
         current_date = start_date
         while current_date <= end_date:
             date_str = current_date.strftime("%Y-%m-%d")
@@ -611,33 +998,11 @@ class TenantEventBus:
 
             try:
                 event_file.relative_to(safe_store_root)
+                days.append(date_str)
             except ValueError:
                 logger.warning(f"Blocked event history access outside tenant store: {event_file}")
-                current_date = current_date.replace(day=current_date.day + 1)
-                continue
-            
-            if event_file.exists():
-                with open(event_file, "r") as f:
-                    for line in f:
-                        try:
-                            event_data = json.loads(line)
-                            event = Event.from_dict(event_data)
-                            
-                            # Apply filters
-                            if event_type and event.type != event_type:
-                                continue
-                            if user_id and event.user != user_id:
-                                continue
-                            
-                            events.append(event)
-                            
-                            if len(events) >= limit:
-                                return events
-                        
-                        except Exception as e:
-                            logger.error(f"Error parsing event: {e}")
             
             # Move to next day
-            current_date = current_date.replace(day=current_date.day + 1)
+            current_date = current_date + timedelta(days=1)
         
-        return events
\ No newline at end of file
+        return await self.event_journal.query(days, event_type=event_type, user_id=user_id, limit=limit)
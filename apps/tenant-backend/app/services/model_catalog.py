@@ -0,0 +1,162 @@
+"""
+Model Catalogue Cache for GT 2.0 Tenant Backend
+
+Every chat completion starts by resolving the tenant's available models. The
+catalogue only changes when an admin edits model configuration, so it is
+cached per tenant instead of being fetched from the Resource Cluster on every
+message.
+
+- Tenant-scoped entries in the shared response cache (app.core.cache), so with
+  a shared cache backend all workers see the same catalogue
+- Concurrent misses are coalesced into a single Resource Cluster fetch
+- Fetches reuse the pooled Resource Cluster session
+- The Resource Cluster pushes a catalogue version on config sync changes
+  (POST /internal/cache/models/invalidate). Entries carry the version they
+  were fetched at, and an entry that differs from the last pushed version is
+  refetched, so a load racing the push is not served until the TTL expires
+
+A push reaches one worker. Only a shared cache backend (cache_backend=redis
+or sqlite) propagates the invalidation to every worker; with the per-worker
+memory cache the TTL is capped at model_catalog_local_ttl_seconds to bound
+how long other workers serve the old catalogue.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from app.core.cache import TieredCache, get_cache
+from app.core.config import get_settings
+from app.core.resource_client import ResourceClusterClient, get_shared_session
+
+logger = logging.getLogger(__name__)
+
+CATALOG_KEY_PREFIX = "model_catalog_"
+
+
+def _catalog_key(tenant_id: str) -> str:
+    return f"{CATALOG_KEY_PREFIX}{tenant_id}"
+
+
+def _transform_models(models_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Transform Resource Cluster model format to frontend format (available models only)"""
+    available_models = []
+    for model in models_data:
+        if model.get("status", {}).get("deployment") == "available":
+            available_models.append({
+                "id": model.get("uuid"),  # Database UUID for unique identification
+                "model_id": model["id"],  # model_id string for API calls
+                "name": model["name"],
+                "provider": model["provider"],
+                "model_type": model["model_type"],
+                "context_window": model.get("performance", {}).get("context_window", 4000),
+                "max_tokens": model.get("performance", {}).get("max_tokens", 4000),
+                "performance": model.get("performance", {}),  # Include full performance for chat.py
+                "capabilities": {"chat": True}  # All LLM models support chat
+            })
+    return available_models
+
+
+class ModelCatalog:
+    """Tenant-scoped, TTL-bounded cache of the Resource Cluster model list"""
+
+    def __init__(self, ttl_seconds: int = 300):
+        self.ttl_seconds = ttl_seconds
+        self.resource_client = ResourceClusterClient()
+        # tenant -> latest catalogue version pushed to this worker
+        self._pushed_versions: Dict[str, str] = {}
+
+    async def _fetch(self, tenant_id: str, user_id: str) -> Dict[str, Any]:
+        """Fetch the catalogue from the Resource Cluster"""
+        token = await self.resource_client._get_capability_token(
+            tenant_id=tenant_id,
+            user_id=user_id,
+            resources=['model_registry']
+        )
+
+        headers = {
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json',
+            'X-Tenant-ID': tenant_id,
+            'X-User-ID': user_id
+        }
+
+        session = get_shared_session()
+        async with session.get(
+            f"{self.resource_client.base_url}/api/v1/models/",
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as response:
+            if response.status != 200:
+                logger.error(f"Resource Cluster returned {response.status}: {await response.text()}")
+                raise RuntimeError(f"Resource Cluster API error: {response.status}")
+
+            response_data = await response.json()
+
+        available_models = _transform_models(response_data.get("models", []))
+        logger.info(f"Retrieved {len(available_models)} models from Resource Cluster")
+        return {
+            "version": response_data.get("catalog_version"),
+            "models": available_models
+        }
+
+    async def get_models(self, tenant_id: str, user_id: str) -> List[Dict[str, Any]]:
+        """Get available models for tenant, from cache when possible"""
+        cache = get_cache()
+        key = _catalog_key(tenant_id)
+        catalog = await cache.get_or_load(key, lambda: self._fetch(tenant_id, user_id), ttl=self.ttl_seconds)
+
+        pushed = self._pushed_versions.get(tenant_id)
+        if pushed and catalog.get("version") and catalog["version"] != pushed:
+            # Cached before the latest push (e.g. a load racing the invalidation)
+            cache.delete(key)
+            catalog = await cache.get_or_load(key, lambda: self._fetch(tenant_id, user_id), ttl=self.ttl_seconds)
+            if catalog.get("version"):
+                # The Resource Cluster is authoritative; don't refetch again
+                self._pushed_versions[tenant_id] = catalog["version"]
+
+        # Copy so callers can't mutate the cached entries
+        return [dict(model) for model in catalog["models"]]
+
+    async def invalidate(self, tenant_id: Optional[str] = None, version: Optional[str] = None) -> int:
+        """
+        Drop cached catalogues.
+
+        When a version is given, an entry already at that version is kept
+        (duplicate pushes don't force a refetch) and later reads refetch any
+        entry at a different version.
+        """
+        cache = get_cache()
+        prefix = _catalog_key(tenant_id) if tenant_id else CATALOG_KEY_PREFIX
+
+        if version and tenant_id:
+            self._pushed_versions[tenant_id] = version
+
+        if version and tenant_id:
+            cached = await cache.aget(prefix)
+            if cached and cached.get("version") == version:
+                return 0
+
+        count = cache.delete(prefix)
+        # The /api/v1/models listing caches its own view of the same catalogue
+        count += cache.delete(f"models_list_{tenant_id}" if tenant_id else "models_list_")
+        logger.info(f"Model catalogue invalidated for {tenant_id or 'all tenants'} (version={version})")
+        return count
+
+
+# Singleton catalogue per worker
+_model_catalog: Optional[ModelCatalog] = None
+
+
+def get_model_catalog() -> ModelCatalog:
+    """Get or create the model catalogue cache"""
+    global _model_catalog
+    if _model_catalog is None:
+        settings = get_settings()
+        ttl_seconds = settings.model_catalog_ttl_seconds
+        if not isinstance(get_cache(), TieredCache):
+            # Pushed invalidations only clear the worker that receives them
+            ttl_seconds = min(ttl_seconds, settings.model_catalog_local_ttl_seconds)
+        _model_catalog = ModelCatalog(ttl_seconds=ttl_seconds)
+    return _model_catalog
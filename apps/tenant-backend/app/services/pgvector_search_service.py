@@ -15,7 +15,7 @@ Features:
 import logging
 import asyncio
 import json
-import uuid as uuid_lib
+import time
 from typing import Dict, Any, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime
@@ -27,11 +27,63 @@ from sqlalchemy import text, select, and_, or_
 
 from app.core.postgresql_client import get_postgresql_client
 from app.core.config import get_settings
-from app.services.embedding_client import BGE_M3_EmbeddingClient
+from app.services.embedding_client import get_embedding_client
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Schema/extension probes are re-checked after this long so a migration or
+# extension upgrade applied while the service runs is picked up
+PROBE_TTL_SECONDS = 300
+
+# Per-schema cache of whether document_chunks.content_tsv exists (migration T010):
+# schema -> (available, checked_at)
+_content_tsv_available: Dict[str, Tuple[bool, float]] = {}
+
+# Whether pgvector supports hnsw.iterative_scan (>= 0.8): (supported, checked_at)
+_iterative_scan_probe: Optional[Tuple[bool, float]] = None
+
+
+async def supports_iterative_scan(conn: asyncpg.Connection) -> bool:
+    """
+    Whether the installed pgvector supports iterative HNSW scans (0.8+).
+
+    Without them an HNSW scan returns at most hnsw.ef_search rows, and
+    filters applied after the scan (dataset, user, ...) can leave few or no
+    matches. The result is cached for PROBE_TTL_SECONDS.
+    """
+    global _iterative_scan_probe
+    now = time.monotonic()
+    if _iterative_scan_probe is not None and now - _iterative_scan_probe[1] < PROBE_TTL_SECONDS:
+        return _iterative_scan_probe[0]
+
+    version = await conn.fetchval("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    parts = []
+    for part in (version or "").split("."):
+        if not part.isdigit():
+            break
+        parts.append(int(part))
+    supported = tuple(parts) >= (0, 8)
+
+    _iterative_scan_probe = (supported, now)
+    if not supported:
+        logger.warning(f"pgvector {version} has no iterative HNSW scans; filtered vector searches may return fewer rows (upgrade to 0.8+)")
+    return supported
+
+
+async def configure_hnsw_scan(conn: asyncpg.Connection, ef_search: int) -> None:
+    """
+    Set HNSW scan parameters for the current transaction.
+
+    Keeps ef_search at least as deep as the requested candidates and, where
+    supported, enables iterative scans so the index keeps producing rows
+    until post-scan filters are satisfied.
+    """
+    await conn.execute(f"SET LOCAL hnsw.ef_search = {int(ef_search)}")
+    if await supports_iterative_scan(conn):
+        # Candidates are re-ranked by distance afterwards, so relaxed order is enough
+        await conn.execute("SET LOCAL hnsw.iterative_scan = relaxed_order")
+
 
 @dataclass
 class HybridSearchResult:
@@ -45,6 +97,9 @@ class HybridSearchResult:
     text_relevance: float
     hybrid_score: float
     rank: int
+    # Reciprocal-rank fusion score the results are ordered by; hybrid_score
+    # stays a 0..1 weighted similarity for threshold checks
+    rrf_score: float = 0.0
 
 
 @dataclass
@@ -56,6 +111,14 @@ class SearchConfig:
     min_text_relevance: float = 0.01
     max_results: int = 100
     rerank_results: bool = True
+    # Reciprocal-rank fusion: score = weight / (rrf_k + rank) summed over lists
+    rrf_k: int = 60
+    # Top-K candidates taken from each of the vector and text indexes
+    candidate_pool: int = 100
+    hnsw_ef_search: int = 100
+    # Dataset scopes with at most this many embedded chunks are searched
+    # exactly instead of through the tenant-wide HNSW index
+    exact_scan_max_rows: int = 10000
 
 
 class PGVectorSearchService:
@@ -73,7 +136,7 @@ class PGVectorSearchService:
         self.tenant_id = tenant_id
         self.user_id = user_id
         self.settings = get_settings()
-        self.embedding_client = BGE_M3_EmbeddingClient()
+        self.embedding_client = get_embedding_client()
 
         # Schema naming for tenant isolation
         self.schema_name = self.settings.postgres_schema
@@ -557,152 +620,173 @@ class PGVectorSearchService:
         config: SearchConfig,
         limit: int
     ) -> List[HybridSearchResult]:
-        """Execute the hybrid search combining vector + text results"""
+        """
+        Execute the hybrid search combining vector + text results.
+
+        Each side produces an index-ordered top-K candidate list (HNSW for
+        vectors, GIN on the stored tsvector for text) and the two lists are
+        fused with reciprocal-rank fusion, so document_chunks is never scanned
+        in full and chunk content is only read for the fused rows.
+
+        RRF only decides the order. hybrid_score keeps its 0..1 meaning (the
+        weighted vector/text similarity) because callers compare it with
+        similarity thresholds.
+        """
         try:
             logger.info(f"🔍 _EXECUTE_HYBRID_QUERY START: query='{query}', user_id='{user_id}', dataset_ids={dataset_ids}")
-            logger.info(f"🔍 _EXECUTE_HYBRID_QUERY CONFIG: vector_weight={config.vector_weight}, text_weight={config.text_weight}, limit={limit}")
+            logger.info(f"🔍 _EXECUTE_HYBRID_QUERY CONFIG: vector_weight={config.vector_weight}, text_weight={config.text_weight}, rrf_k={config.rrf_k}, candidate_pool={config.candidate_pool}, limit={limit}")
+
+            # Handle dataset filtering - REQUIRE dataset_ids for security
+            if isinstance(dataset_ids, str):
+                dataset_ids = [dataset_ids]
+
+            if dataset_ids is None:
+                # SECURITY FIX: No dataset filter when None is NOT ALLOWED
+                logger.error(f"🔍 _EXECUTE_HYBRID_QUERY: SECURITY ERROR - Dataset IDs are required for search operations")
+
+                # More informative error message for debugging
+                error_msg = "Dataset IDs are required for hybrid search operations. This could mean: " \
+                           "1) Agent has no datasets configured, 2) No datasets selected in UI, or " \
+                           "3) Dataset access control failed. Check agent configuration and dataset permissions."
+                raise ValueError(error_msg)
+
+            if len(dataset_ids) == 0:
+                logger.error(f"🔍 _EXECUTE_HYBRID_QUERY: SECURITY ERROR - Empty dataset_ids list not permitted")
+                raise ValueError("Dataset IDs cannot be empty. This could mean the agent has no datasets configured or dataset access control failed.")
 
             client = await get_postgresql_client()
             async with client.get_connection() as conn:
-                logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Got DB connection, resolving user UUID")
-
-                # Resolve user UUID first
+                # Resolve user UUID first (raises if the user does not exist)
                 actual_user_id = await self._resolve_user_uuid(conn, user_id)
                 logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Resolved user_id to '{actual_user_id}'")
 
                 # RLS context removed - using schema-level isolation instead
-                logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Using resolved UUID '{actual_user_id}' for query parameters")
-
-                # Build dataset filter
-                dataset_filter = ""
-                logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Building parameters and dataset filter")
 
                 # Convert embedding list to string format for PostgreSQL vector type
                 embedding_str = "[" + ",".join(map(str, query_embedding)) + "]"
-                logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Converted embedding to PostgreSQL vector string (length: {len(embedding_str)})")
-
-                # Ensure UUID is properly formatted as string for PostgreSQL
-                if isinstance(actual_user_id, str):
-                    try:
-                        # Validate it's a proper UUID and convert back to string
-                        validated_uuid = str(uuid_lib.UUID(actual_user_id))
-                        actual_user_id_str = validated_uuid
-                        logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Validated UUID format: '{actual_user_id_str}'")
-                    except ValueError:
-                        # If it's not a valid UUID string, keep as is
-                        actual_user_id_str = actual_user_id
-                        logger.warning(f"🔍 _EXECUTE_HYBRID_QUERY: UUID validation failed, using as-is: '{actual_user_id_str}'")
-                else:
-                    actual_user_id_str = str(actual_user_id)
-                    logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Converted user_id to string: '{actual_user_id_str}'")
-
-                params = [embedding_str, query, config.min_vector_similarity, config.min_text_relevance, config.max_results]
-                logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Base parameters prepared (count: {len(params)})")
-
-                # Handle dataset filtering - REQUIRE dataset_ids for security
-                if dataset_ids:
-                    logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Processing dataset filter for: {dataset_ids}")
-                    # Ensure dataset_ids is a list
-                    if isinstance(dataset_ids, str):
-                        dataset_ids = [dataset_ids]
-                        logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Converted string to list: {dataset_ids}")
-
-                    if len(dataset_ids) > 0:
-                        # Generate proper placeholders for dataset IDs
-                        placeholders = ",".join(f"${i+6}" for i in range(len(dataset_ids)))
-                        dataset_filter = f"AND dataset_id = ANY(ARRAY[{placeholders}]::uuid[])"
-                        params.extend(dataset_ids)
-                        logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Dataset filter: {dataset_filter}, dataset_ids: {dataset_ids}")
-                        logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Total parameters after dataset filter: {len(params)}")
-                    else:
-                        logger.error(f"🔍 _EXECUTE_HYBRID_QUERY: SECURITY ERROR - Empty dataset_ids list not permitted")
-                        raise ValueError("Dataset IDs cannot be empty. This could mean the agent has no datasets configured or dataset access control failed.")
-                else:
-                    # SECURITY FIX: No dataset filter when None is NOT ALLOWED
-                    logger.error(f"🔍 _EXECUTE_HYBRID_QUERY: SECURITY ERROR - Dataset IDs are required for search operations")
 
-                    # More informative error message for debugging
-                    error_msg = "Dataset IDs are required for hybrid search operations. This could mean: " \
-                               "1) Agent has no datasets configured, 2) No datasets selected in UI, or " \
-                               "3) Dataset access control failed. Check agent configuration and dataset permissions."
-                    raise ValueError(error_msg)
+                # Each list must be at least as deep as the page being returned
+                candidate_pool = max(config.candidate_pool, limit)
+
+                params = [
+                    embedding_str,
+                    query,
+                    config.min_vector_similarity,
+                    config.min_text_relevance,
+                    candidate_pool,
+                    config.rrf_k,
+                    config.vector_weight,
+                    config.text_weight,
+                    limit,
+                ]
 
-                # Hybrid search query combining vector similarity and text relevance
+                placeholders = ",".join(f"${i + len(params) + 1}" for i in range(len(dataset_ids)))
+                dataset_filter = f"AND dataset_id = ANY(ARRAY[{placeholders}]::uuid[])"
+                params.extend(dataset_ids)
+                logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Dataset filter: {dataset_filter}, total parameters: {len(params)}")
+
+                tsv_expr = await self._get_tsvector_expression(conn)
+
+                # The HNSW index spans every dataset of the tenant and the
+                # dataset filter is applied after the scan, so a small scope
+                # can be crowded out of the candidates. Small scopes are
+                # ranked exactly via the dataset_id index instead.
+                scope_placeholders = ",".join(f"${i + 2}" for i in range(len(dataset_ids)))
+                scoped_rows = await conn.fetchval(
+                    f"""
+                    SELECT count(*) FROM (
+                        SELECT 1 FROM {self.schema_name}.document_chunks
+                        WHERE embedding IS NOT NULL
+                          AND dataset_id = ANY(ARRAY[{scope_placeholders}]::uuid[])
+                        LIMIT $1
+                    ) scoped
+                    """,
+                    config.exact_scan_max_rows + 1,
+                    *dataset_ids
+                )
+                exact_scan = scoped_rows <= config.exact_scan_max_rows
+                # "+ 0" makes the sort key non-indexable, so the planner cannot
+                # pick the HNSW index for the exact scan
+                vector_order = "(embedding <=> $1::vector) + 0" if exact_scan else "embedding <=> $1::vector"
+                logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: {scoped_rows} scoped chunks, {'exact' if exact_scan else 'HNSW'} vector scan")
+
+                # Hybrid search: two index-ordered candidate lists fused by RRF.
+                # Similarity thresholds are applied to the candidates, not in the
+                # scan predicate, so the planner can walk the HNSW index.
                 hybrid_query = f"""
-                    WITH vector_search AS (
+                    WITH vector_candidates AS (
                         SELECT
-                            id as chunk_id,
-                            document_id,
-                            dataset_id,
-                            content,
-                            metadata as chunk_metadata,
-                            1 - (embedding <=> $1::vector) as vector_similarity,
-                            0.0 as text_relevance
+                            id,
+                            embedding <=> $1::vector AS distance
                         FROM {self.schema_name}.document_chunks
-                        WHERE 1 - (embedding <=> $1::vector) >= $3
+                        WHERE embedding IS NOT NULL
                             {dataset_filter}
+                        ORDER BY {vector_order}
+                        LIMIT $5
                     ),
-                    text_search AS (
+                    vector_ranked AS (
                         SELECT
-                            id as chunk_id,
-                            document_id,
-                            dataset_id,
-                            content,
-                            metadata as chunk_metadata,
-                            0.0 as vector_similarity,
-                            ts_rank_cd(
-                                to_tsvector('english', content),
-                                plainto_tsquery('english', $2)
-                            ) as text_relevance
-                        FROM {self.schema_name}.document_chunks
-                        WHERE to_tsvector('english', content) @@ plainto_tsquery('english', $2)
-                            AND ts_rank_cd(
-                                to_tsvector('english', content),
-                                plainto_tsquery('english', $2)
-                            ) >= $4
+                            id,
+                            1 - distance AS vector_similarity,
+                            ROW_NUMBER() OVER (ORDER BY distance) AS vector_rank
+                        FROM vector_candidates
+                        WHERE 1 - distance >= $3
+                    ),
+                    text_candidates AS (
+                        SELECT
+                            id,
+                            ts_rank_cd({tsv_expr}, tsq) AS text_relevance
+                        FROM {self.schema_name}.document_chunks,
+                             plainto_tsquery('english', $2) AS tsq
+                        WHERE {tsv_expr} @@ tsq
                             {dataset_filter}
+                        ORDER BY text_relevance DESC
+                        LIMIT $5
                     ),
-                    combined_results AS (
+                    text_ranked AS (
                         SELECT
-                            u.chunk_id,
-                            dc.document_id,
-                            dc.dataset_id,
-                            dc.content,
-                            dc.metadata as chunk_metadata,
-                            COALESCE(v.vector_similarity, 0.0) as vector_similarity,
-                            COALESCE(t.text_relevance, 0.0) as text_relevance,
-                            (COALESCE(v.vector_similarity, 0.0) * {config.vector_weight} +
-                             COALESCE(t.text_relevance, 0.0) * {config.text_weight}) as hybrid_score
-                        FROM (
-                            SELECT chunk_id FROM vector_search
-                            UNION
-                            SELECT chunk_id FROM text_search
-                        ) u
-                        LEFT JOIN vector_search v USING (chunk_id)
-                        LEFT JOIN text_search t USING (chunk_id)
-                        LEFT JOIN {self.schema_name}.document_chunks dc ON (dc.id = u.chunk_id)
+                            id,
+                            text_relevance,
+                            ROW_NUMBER() OVER (ORDER BY text_relevance DESC) AS text_rank
+                        FROM text_candidates
+                        WHERE text_relevance >= $4
+                    ),
+                    fused AS (
+                        SELECT
+                            COALESCE(v.id, t.id) AS chunk_id,
+                            COALESCE(v.vector_similarity, 0.0) AS vector_similarity,
+                            COALESCE(t.text_relevance, 0.0) AS text_relevance,
+                            COALESCE(v.vector_similarity, 0.0) * $7::float8 +
+                            LEAST(COALESCE(t.text_relevance, 0.0), 1.0) * $8::float8 AS hybrid_score,
+                            COALESCE($7::float8 / ($6 + v.vector_rank), 0.0) +
+                            COALESCE($8::float8 / ($6 + t.text_rank), 0.0) AS rrf_score
+                        FROM vector_ranked v
+                        FULL OUTER JOIN text_ranked t ON t.id = v.id
+                        ORDER BY rrf_score DESC
+                        LIMIT $9
                     )
                     SELECT
-                        chunk_id,
-                        document_id,
-                        dataset_id,
-                        content as text,
-                        chunk_metadata as metadata,
-                        vector_similarity,
-                        text_relevance,
-                        hybrid_score,
-                        ROW_NUMBER() OVER (ORDER BY hybrid_score DESC) as rank
-                    FROM combined_results
-                    WHERE hybrid_score > 0.0
-                    ORDER BY hybrid_score DESC
-                    LIMIT $5
+                        f.chunk_id,
+                        dc.document_id,
+                        dc.dataset_id,
+                        dc.content as text,
+                        dc.metadata as metadata,
+                        f.vector_similarity,
+                        f.text_relevance,
+                        f.hybrid_score,
+                        f.rrf_score,
+                        ROW_NUMBER() OVER (ORDER BY f.rrf_score DESC) as rank
+                    FROM fused f
+                    JOIN {self.schema_name}.document_chunks dc ON dc.id = f.chunk_id
+                    ORDER BY f.rrf_score DESC
                 """
 
                 logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Executing hybrid SQL with {len(params)} parameters")
-                logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Parameter types: {[type(p) for p in params]}")
-                logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Query preview: {hybrid_query[:500]}...")
 
-                rows = await conn.fetch(hybrid_query, *params)
+                async with conn.transaction():
+                    if not exact_scan:
+                        await configure_hnsw_scan(conn, max(config.hnsw_ef_search, candidate_pool))
+                    rows = await conn.fetch(hybrid_query, *params)
                 logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: SQL execution successful, got {len(rows)} rows")
 
                 results = []
@@ -716,11 +800,12 @@ class PGVectorSearchService:
                         vector_similarity=float(row['vector_similarity']),
                         text_relevance=float(row['text_relevance']),
                         hybrid_score=float(row['hybrid_score']),
-                        rank=row['rank']
+                        rank=row['rank'],
+                        rrf_score=float(row['rrf_score'])
                     )
                     results.append(result)
                     if i < 3:  # Log first few results for debugging
-                        logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Result {i+1}: chunk_id='{result.chunk_id}', score={result.hybrid_score:.3f}")
+                        logger.info(f"🔍 _EXECUTE_HYBRID_QUERY: Result {i+1}: chunk_id='{result.chunk_id}', score={result.hybrid_score:.3f}, rrf={result.rrf_score:.4f}")
 
                 logger.info(f"🔍 _EXECUTE_HYBRID_QUERY COMPLETE: Processed {len(results)} results")
                 return results
@@ -730,6 +815,37 @@ class PGVectorSearchService:
             logger.exception("Full hybrid query execution error traceback:")
             raise
 
+    async def _get_tsvector_expression(self, conn: asyncpg.Connection) -> str:
+        """
+        Return the tsvector expression for document_chunks full-text matching.
+
+        Uses the stored content_tsv column added by migration T010 when present,
+        falling back to the indexed to_tsvector() expression on schemas that have
+        not been migrated yet. The lookup is cached per schema; a missing column
+        is re-checked after PROBE_TTL_SECONDS so a later migration is picked up.
+        """
+        now = time.monotonic()
+        cached = _content_tsv_available.get(self.schema_name)
+        if cached is not None and (cached[0] or now - cached[1] < PROBE_TTL_SECONDS):
+            available = cached[0]
+        else:
+            available = bool(await conn.fetchval(
+                """
+                SELECT EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_schema = $1
+                      AND table_name = 'document_chunks'
+                      AND column_name = 'content_tsv'
+                )
+                """,
+                self.schema_name
+            ))
+            _content_tsv_available[self.schema_name] = (available, now)
+            if not available:
+                logger.warning(f"document_chunks.content_tsv missing in {self.schema_name}; run migration T010")
+
+        return "content_tsv" if available else "to_tsvector('english', content)"
+
     async def _rerank_results(
         self,
         results: List[HybridSearchResult],
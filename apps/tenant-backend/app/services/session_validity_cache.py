@@ -0,0 +1,248 @@
+"""
+Session Validity Cache for GT 2.0 Tenant Backend
+
+Caches the Control Panel's /internal/sessions/validate answers per worker so
+authenticated requests don't pay a cross-service round trip each time:
+- Valid sessions are cached for session_cache_ttl_seconds, invalid ones for
+  session_negative_cache_ttl_seconds. Unavailability is never cached
+- Calls use one pooled httpx client instead of a new client per request
+- Revocations (logout, password change, expiry) are streamed from
+  /internal/sessions/revocations and evict cached sessions within seconds.
+  While the stream is down the cache is bypassed and every request is
+  validated against the Control Panel, as before
+
+Entries are keyed by the SHA-256 of the session token, which is also how
+the Control Panel identifies sessions in revocation events. Expired entries
+are dropped on insert (at most once per TTL) and the cache holds at most
+MAX_ENTRIES sessions, oldest first out.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY_SECONDS = 5
+MAX_ENTRIES = 10000
+
+
+class SessionValidityCache:
+    """Per-worker cache of Control Panel session validation results"""
+
+    def __init__(
+        self,
+        control_panel_url: str,
+        service_auth_token: str,
+        ttl_seconds: int = 15,
+        negative_ttl_seconds: int = 5
+    ):
+        self.control_panel_url = control_panel_url.rstrip("/")
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._headers = {
+            "X-Service-Auth": service_auth_token,
+            "X-Service-Name": "tenant-backend"
+        }
+
+        # token hash -> (validation result, fetched_at, expires_at), oldest first
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float, float]]" = OrderedDict()
+        self._next_prune = 0.0
+        # Bumped on every eviction so validations racing a revocation aren't cached
+        self._generation = 0
+        self._subscribed = False
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._subscription_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def hash_token(session_token: str) -> str:
+        """Same hash the Control Panel stores and publishes"""
+        return hashlib.sha256(session_token.encode("utf-8")).hexdigest()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Pooled client for all Control Panel session calls"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=5.0,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+            )
+        return self._client
+
+    # Cache maintenance
+
+    def evict_all(self) -> None:
+        """Drop every cached validation"""
+        self._generation += 1
+        self._entries.clear()
+
+    def apply_revocation(self, payload: str) -> None:
+        """Evict for a revocation event: token:<hash>, user:<id> or all"""
+        kind, _, value = payload.partition(":")
+        self._generation += 1
+        if kind == "token":
+            self._entries.pop(value, None)
+        elif kind == "user" and value.isdigit():
+            user_id = int(value)
+            for token_hash in [h for h, (result, _, _) in self._entries.items() if result.get("user_id") == user_id]:
+                del self._entries[token_hash]
+        else:
+            self._entries.clear()
+
+    def _store(self, token_hash: str, result: Dict[str, Any], fetched_at: float, ttl: float) -> None:
+        """Cache a validation, dropping expired and (beyond MAX_ENTRIES) oldest entries"""
+        if fetched_at >= self._next_prune:
+            for expired in [h for h, (_, _, expires_at) in self._entries.items() if expires_at <= fetched_at]:
+                del self._entries[expired]
+            self._next_prune = fetched_at + self.ttl_seconds
+
+        self._entries[token_hash] = (result, fetched_at, fetched_at + ttl)
+        self._entries.move_to_end(token_hash)
+        if len(self._entries) > MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+    # Validation
+
+    async def _fetch(self, session_token: str) -> Optional[Dict[str, Any]]:
+        """Ask the Control Panel; None if it is unavailable"""
+        try:
+            response = await self._get_client().post(
+                f"{self.control_panel_url}/internal/sessions/validate",
+                json={"session_token": session_token},
+                headers=self._headers
+            )
+
+            if response.status_code == 200:
+                return response.json()
+            else:
+                logger.error(f"Session validation failed: {response.status_code} - {response.text}")
+                return None
+
+        except httpx.RequestError as e:
+            logger.error(f"Session validation request failed: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error during session validation: {e}")
+            return None
+
+    async def validate(self, session_token: str) -> Optional[Dict[str, Any]]:
+        """
+        Validate a session, from cache when possible.
+
+        Returns:
+            dict with is_valid, expiry_reason, seconds_remaining, show_warning
+            or None if control panel is unavailable
+        """
+        token_hash = self.hash_token(session_token)
+        now = time.monotonic()
+
+        entry = self._entries.get(token_hash) if self._subscribed else None
+        if entry is not None:
+            result, fetched_at, expires_at = entry
+            if now < expires_at:
+                if not result.get("is_valid"):
+                    return result
+                seconds_remaining = result.get("seconds_remaining")
+                if seconds_remaining is None:
+                    return result
+                seconds_remaining -= int(now - fetched_at)
+                if seconds_remaining > 0:
+                    return {**result, "seconds_remaining": seconds_remaining}
+            del self._entries[token_hash]
+
+        generation = self._generation
+        result = await self._fetch(session_token)
+        if result is None:
+            return None
+
+        if self._subscribed and self._generation == generation:
+            ttl = self.ttl_seconds if result.get("is_valid") else self.negative_ttl_seconds
+            self._store(token_hash, result, time.monotonic(), ttl)
+        return result
+
+    # Revocation stream
+
+    async def _run_subscription(self) -> None:
+        """Keep the revocation stream open; bypass the cache while it is down"""
+        url = f"{self.control_panel_url}/internal/sessions/revocations"
+        timeout = httpx.Timeout(10.0, read=None)
+        while True:
+            try:
+                async with self._get_client().stream("GET", url, headers=self._headers, timeout=timeout) as response:
+                    if response.status_code != 200:
+                        raise RuntimeError(f"status {response.status_code}")
+
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data: "):
+                            continue
+                        payload = line[len("data: "):]
+                        if payload == "ready":
+                            # Revocations may have been missed while disconnected
+                            self.evict_all()
+                            self._subscribed = True
+                            logger.info("Subscribed to Control Panel session revocations")
+                        else:
+                            self.apply_revocation(payload)
+                raise RuntimeError("stream closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Session revocation stream unavailable, cache bypassed: {e}")
+            finally:
+                self._subscribed = False
+                self.evict_all()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def start(self) -> None:
+        """Start the revocation subscription (application startup)"""
+        if self._subscription_task is None:
+            self._subscription_task = asyncio.create_task(self._run_subscription())
+
+    async def stop(self) -> None:
+        """Stop the subscription and close the pooled client (application shutdown)"""
+        if self._subscription_task is not None:
+            self._subscription_task.cancel()
+            try:
+                await self._subscription_task
+            except asyncio.CancelledError:
+                pass
+            self._subscription_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Singleton cache per worker
+_session_validity_cache: Optional[SessionValidityCache] = None
+
+
+def get_session_validity_cache() -> SessionValidityCache:
+    """Get or create the session validity cache"""
+    global _session_validity_cache
+    if _session_validity_cache is None:
+        settings = get_settings()
+        _session_validity_cache = SessionValidityCache(
+            control_panel_url=settings.control_panel_url or "http://control-panel-backend:8001",
+            service_auth_token=settings.service_auth_token or "internal-service-token",
+            ttl_seconds=settings.session_cache_ttl_seconds,
+            negative_ttl_seconds=settings.session_negative_cache_ttl_seconds
+        )
+    return _session_validity_cache
+
+
+async def start_session_validity_cache() -> None:
+    """Start streaming session revocations from the Control Panel"""
+    await get_session_validity_cache().start()
+
+
+async def stop_session_validity_cache() -> None:
+    """Stop the revocation stream and close the pooled client"""
+    if _session_validity_cache is not None:
+        await _session_validity_cache.stop()
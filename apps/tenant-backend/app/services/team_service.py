@@ -1,8 +1,11 @@
 import json
+import time
 import uuid
+from contextvars import ContextVar
 from uuid import UUID
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
+from app.core.cache import get_cache
 from app.core.config import get_settings
 from app.core.postgresql_client import get_postgresql_client
 from app.core.permissions import get_user_role, is_effective_owner
@@ -10,6 +13,44 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+PERMISSION_SNAPSHOT_KEY_PREFIX = "team_permissions_"
+
+# Rank of resource permissions; a user in several teams gets the best grant
+_PERMISSION_RANK = {"none": 0, "read": 1, "edit": 2}
+
+# Snapshots loaded during the current request, shared by every TeamService
+# instance the request creates (dependencies, services, endpoint)
+_request_permission_snapshots: ContextVar[Optional[Dict[str, Dict[str, Any]]]] = ContextVar(
+    "team_permission_snapshots", default=None
+)
+
+
+def _permission_snapshot_key(tenant_domain: str, user_id: str) -> str:
+    return f"{PERMISSION_SNAPSHOT_KEY_PREFIX}{tenant_domain}:{user_id}"
+
+
+def _permission_satisfies(user_permission: Optional[str], required_permission: str) -> bool:
+    """Whether a resource grant ('read'/'edit') covers the required permission"""
+    if required_permission == 'read':
+        return user_permission in ['read', 'edit']
+    if required_permission == 'edit':
+        return user_permission == 'edit'
+    return False
+
+
+def invalidate_team_permissions(tenant_domain: str) -> int:
+    """
+    Drop cached permission snapshots for every user of a tenant.
+
+    Called after sharing and membership changes. A share touches all members
+    of a team, so the whole tenant is invalidated; the broadcast reaches
+    every worker when a shared cache tier is configured. Snapshot loads
+    already in flight when this runs are not cached (see
+    SimpleCache.get_or_load), so a pre-change snapshot cannot outlive it.
+    """
+    _request_permission_snapshots.set(None)
+    return get_cache().delete(f"{PERMISSION_SNAPSHOT_KEY_PREFIX}{tenant_domain}:")
+
 # Import for event logging
 EVENT_LOGGING_AVAILABLE = False
 try:
@@ -432,6 +473,7 @@ class TeamService:
                 logger.warning(f"Team {team_id} not found or already deleted")
                 return False
 
+            invalidate_team_permissions(self.tenant_domain)
             logger.info(f"Deleted team {team_id}")
             return True
 
@@ -514,6 +556,7 @@ class TeamService:
             """
             user_data = await pg_client.fetch_one(user_query, target_user_id)
 
+            invalidate_team_permissions(self.tenant_domain)
             logger.info(f"Sent invitation to {user_email} for team {team_id} with permission {team_permission}")
 
             # Log events for invitation creation and observability request
@@ -670,6 +713,7 @@ class TeamService:
             """
             user_data = await pg_client.fetch_one(user_query, user_id)
 
+            invalidate_team_permissions(self.tenant_domain)
             logger.info(f"Updated member {user_id} permission to {new_permission} in team {team_id}")
 
             # Parse JSONB resource_permissions
@@ -766,6 +810,7 @@ class TeamService:
                 logger.warning(f"Member {target_user_id} not found in team {team_id}")
                 return False
 
+            invalidate_team_permissions(self.tenant_domain)
             logger.info(f"Removed member {target_user_id} from team {team_id}")
             return True
 
@@ -920,6 +965,8 @@ class TeamService:
 
                 logger.info(f"✅ Granted read access to {len(auto_permissions)} resources for new team member")
 
+            invalidate_team_permissions(self.tenant_domain)
+
             # Parse JSONB resource_permissions to dict (same pattern as add_member)
             # Re-fetch to get the updated resource_permissions
             refetch_query = """
@@ -981,6 +1028,7 @@ class TeamService:
             if not result:
                 raise ValueError(f"Invitation {invitation_id} not found or already processed")
 
+            invalidate_team_permissions(self.tenant_domain)
             logger.info(f"User {user_id} declined invitation {invitation_id}")
 
         except Exception as e:
@@ -1016,6 +1064,7 @@ class TeamService:
             if not result:
                 raise ValueError(f"Invitation {invitation_id} not found or already processed")
 
+            invalidate_team_permissions(self.tenant_domain)
             logger.info(f"Team owner {current_user_id} canceled invitation {invitation_id}")
 
         except Exception as e:
@@ -1270,6 +1319,7 @@ class TeamService:
                 if not result:
                     logger.warning(f"Member {member_user_id} not found in team {team_id}, skipping")
 
+            invalidate_team_permissions(self.tenant_domain)
             logger.info(f"Shared {resource_type}:{resource_id} to team {team_id} with {len(user_permissions)} user permissions")
             return True
 
@@ -1314,6 +1364,7 @@ class TeamService:
 
             await pg_client.execute_query(query, resource_key, team_id)
 
+            invalidate_team_permissions(self.tenant_domain)
             logger.info(f"Unshared {resource_type}:{resource_id} from team {team_id}")
             return True
 
@@ -1567,6 +1618,96 @@ class TeamService:
             # Return empty lists for all requested IDs on error
             return {rid: [] for rid in resource_ids}
 
+    async def _load_permission_snapshot(self, user_id: str) -> Dict[str, Any]:
+        """
+        Load a user's role and every team resource grant in one query.
+
+        Grants come from the user_resource_access view (one row per team the
+        resource is shared in) and are folded into the best permission per
+        resource, keyed "resource_type:resource_id".
+        """
+        pg_client = await get_postgresql_client()
+
+        try:
+            member_uuid = str(UUID(str(user_id)))
+        except ValueError:
+            member_uuid = None  # Not a UUID: no team memberships to look up
+
+        query = """
+            SELECT
+                (SELECT role FROM users
+                 WHERE (id::text = $1 OR email = $3)
+                   AND tenant_id = (SELECT id FROM tenants WHERE domain = $4 LIMIT 1)
+                 LIMIT 1) AS role,
+                (SELECT json_agg(json_build_object(
+                    'resource_type', resource_type,
+                    'resource_id', resource_id,
+                    'permission', permission #>> '{}',
+                    'team_id', team_id,
+                    'shared_at', created_at
+                 ))
+                 FROM user_resource_access
+                 WHERE user_id = $2::uuid) AS grants
+        """
+
+        row = await pg_client.fetch_one(query, str(user_id), member_uuid, self.user_email, self.tenant_domain)
+        grant_rows = (row or {}).get("grants") or []
+        if isinstance(grant_rows, str):
+            grant_rows = json.loads(grant_rows)
+
+        grants: Dict[str, Dict[str, Any]] = {}
+        for grant in grant_rows:
+            key = f"{grant['resource_type']}:{grant['resource_id']}"
+            entry = grants.setdefault(key, {
+                "permission": "none",
+                "team_ids": [],
+                "first_shared_at": grant["shared_at"]
+            })
+            if _PERMISSION_RANK.get(grant["permission"], 0) > _PERMISSION_RANK[entry["permission"]]:
+                entry["permission"] = grant["permission"]
+            if grant["team_id"] not in entry["team_ids"]:
+                entry["team_ids"].append(grant["team_id"])
+            if grant["shared_at"] and (not entry["first_shared_at"] or grant["shared_at"] < entry["first_shared_at"]):
+                entry["first_shared_at"] = grant["shared_at"]
+
+        return {
+            "role": (row or {}).get("role") or "student",
+            "grants": grants,
+            "loaded_at": time.time()
+        }
+
+    async def get_permission_snapshot(self, user_id: str) -> Dict[str, Any]:
+        """
+        Get a user's role and team resource grants.
+
+        Served from the current request's snapshots first, then the shared
+        cache (short TTL), and loaded from the database at most once per
+        request otherwise. Sharing and membership changes invalidate it.
+
+        Returns:
+            {"role": str, "grants": {"agent:<uuid>": {"permission", "team_ids", "first_shared_at"}}, "loaded_at": float}
+        """
+        key = _permission_snapshot_key(self.tenant_domain, str(user_id))
+        ttl = self.settings.team_permission_cache_ttl_seconds
+
+        request_snapshots = _request_permission_snapshots.get()
+        if request_snapshots is None:
+            request_snapshots = {}
+            _request_permission_snapshots.set(request_snapshots)
+
+        # Long-lived contexts (WebSockets, background tasks) still honour the TTL
+        snapshot = request_snapshots.get(key)
+        if snapshot is not None and time.time() - snapshot["loaded_at"] < ttl:
+            return snapshot
+
+        snapshot = await get_cache().get_or_load(
+            key,
+            lambda: self._load_permission_snapshot(user_id),
+            ttl=ttl
+        )
+        request_snapshots[key] = snapshot
+        return snapshot
+
     async def get_user_accessible_resources(
         self,
         user_id: str,
@@ -1574,7 +1715,7 @@ class TeamService:
     ) -> List[Dict[str, Any]]:
         """
         Get all resources accessible to user via team memberships.
-        Uses the user_accessible_resources view for efficiency.
+        Answered from the user's permission snapshot.
 
         Args:
             user_id: UUID of the user
@@ -1584,31 +1725,27 @@ class TeamService:
             List of accessible resources with permission metadata
         """
         try:
-            pg_client = await get_postgresql_client()
+            snapshot = await self.get_permission_snapshot(user_id)
 
             # Check if admin/developer (can access all)
-            user_role = await get_user_role(pg_client, self.user_email, self.tenant_domain)
-            is_admin = user_role in ["admin", "developer"]
-
-            if is_admin:
+            if snapshot["role"] in ["admin", "developer"]:
                 logger.info(f"User {user_id} is admin/developer, has access to all {resource_type}s")
                 # Return empty list - admin check happens at agent/dataset service level
                 return []
 
-            query = """
-                SELECT
-                    resource_id,
-                    resource_type,
-                    best_permission,
-                    shared_in_teams,
-                    team_ids,
-                    first_shared_at
-                FROM user_accessible_resources
-                WHERE user_id = $1::uuid
-                  AND resource_type = $2
-            """
-
-            resources = await pg_client.execute_query(query, user_id, resource_type)
+            prefix = f"{resource_type}:"
+            resources = [
+                {
+                    "resource_id": key[len(prefix):],
+                    "resource_type": resource_type,
+                    "best_permission": grant["permission"],
+                    "shared_in_teams": len(grant["team_ids"]),
+                    "team_ids": list(grant["team_ids"]),
+                    "first_shared_at": grant["first_shared_at"]
+                }
+                for key, grant in snapshot["grants"].items()
+                if key.startswith(prefix)
+            ]
             logger.info(f"User {user_id} has access to {len(resources)} {resource_type}s via teams")
             return resources
 
@@ -1625,7 +1762,7 @@ class TeamService:
     ) -> bool:
         """
         Check if user has required permission on resource via team membership.
-        Uses the user_resource_access view for fast lookup.
+        Answered from the user's permission snapshot.
 
         Args:
             user_id: UUID of the user
@@ -1636,47 +1773,48 @@ class TeamService:
         Returns:
             True if user has required permission
         """
-        try:
-            pg_client = await get_postgresql_client()
+        results = await self.check_user_resource_permissions(
+            user_id, resource_type, [resource_id], required_permission
+        )
+        return results[str(resource_id)]
 
-            # Check if admin/developer (can access all)
-            user_role = await get_user_role(pg_client, self.user_email, self.tenant_domain)
-            if user_role in ["admin", "developer"]:
-                logger.info(f"User {user_id} is admin/developer, has full access")
-                return True
-
-            query = """
-                SELECT permission::text as permission
-                FROM user_resource_access
-                WHERE user_id = $1::uuid
-                  AND resource_type = $2
-                  AND resource_id = $3::uuid
-                LIMIT 1
-            """
+    async def check_user_resource_permissions(
+        self,
+        user_id: str,
+        resource_type: str,
+        resource_ids: Iterable[str],
+        required_permission: str = 'read'
+    ) -> Dict[str, bool]:
+        """
+        Batch form of check_user_resource_permission for listing pages.
 
-            result = await pg_client.fetch_scalar(query, user_id, resource_type, resource_id)
+        One snapshot lookup answers every resource, instead of a role and a
+        view query per resource.
 
-            if not result:
-                logger.debug(f"User {user_id} has no access to {resource_type}:{resource_id}")
-                return False
+        Returns:
+            Dict mapping resource_id -> True if user has required permission
+        """
+        resource_ids = [str(resource_id) for resource_id in resource_ids]
 
-            # Remove quotes from JSONB string value
-            user_permission = result.strip('"')
+        try:
+            snapshot = await self.get_permission_snapshot(user_id)
+        except Exception as e:
+            logger.error(f"Error checking permission for user {user_id} on {resource_type}s: {e}")
+            return {resource_id: False for resource_id in resource_ids}
 
-            # Check permission level
-            if required_permission == 'read':
-                has_permission = user_permission in ['read', 'edit']
-            elif required_permission == 'edit':
-                has_permission = user_permission == 'edit'
-            else:
-                has_permission = False
+        # Check if admin/developer (can access all)
+        if snapshot["role"] in ["admin", "developer"]:
+            logger.info(f"User {user_id} is admin/developer, has full access")
+            return {resource_id: True for resource_id in resource_ids}
 
-            logger.debug(f"User {user_id} permission on {resource_type}:{resource_id}: {user_permission} (required: {required_permission}) = {has_permission}")
-            return has_permission
+        results = {}
+        for resource_id in resource_ids:
+            grant = snapshot["grants"].get(f"{resource_type}:{resource_id.lower()}")
+            user_permission = grant["permission"] if grant else None
+            results[resource_id] = _permission_satisfies(user_permission, required_permission)
+            logger.debug(f"User {user_id} permission on {resource_type}:{resource_id}: {user_permission} (required: {required_permission}) = {results[resource_id]}")
 
-        except Exception as e:
-            logger.error(f"Error checking permission for user {user_id} on {resource_type}:{resource_id}: {e}")
-            return False
+        return results
 
     async def share_resource_to_teams(
         self,
@@ -1774,6 +1912,8 @@ class TeamService:
 
                 logger.info(f"Shared {resource_type}:{resource_id} to team {team_id} with {len(user_permissions)} user permissions")
 
+            invalidate_team_permissions(self.tenant_domain)
+
             # Sync agent visibility field when sharing to teams
             if resource_type == 'agent':
                 try:
@@ -1838,6 +1978,7 @@ class TeamService:
             """
 
             await pg_client.execute_query(query, team_id, resource_type, resource_id)
+            invalidate_team_permissions(self.tenant_domain)
             logger.info(f"Unshared {resource_type}:{resource_id} from team {team_id}")
 
             # Check if this was the last team share for this agent
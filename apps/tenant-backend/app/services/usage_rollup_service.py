@@ -0,0 +1,277 @@
+"""
+Usage Rollups for GT 2.0 Observability
+
+Hourly and daily rollup tables (usage_rollup_hourly / usage_rollup_daily,
+migration T013) hold conversations, messages, tokens and content size per
+(tenant, bucket, user, agent, model), so the observability dashboards
+aggregate a few thousand rollup rows instead of scanning conversations and
+messages on every request.
+
+Maintenance is watermark based. Each pass, in one transaction:
+- recomputes hourly buckets from (watermark - grace) onwards, and the daily
+  buckets of those days, from the source tables. Whole buckets are
+  recomputed, so passes are idempotent and pick up messages committed after
+  the previous pass (created_at is the inserting transaction's start time)
+- recomputes days flagged by the AFTER DELETE triggers
+  (usage_rollup_dirty_days), so deleted conversations drop out
+- prunes hourly buckets older than the retention period
+
+Rollup rows are replaced under MVCC, so dashboards keep reading while a
+pass runs and nothing takes more than row locks. An advisory lock keeps
+concurrent workers from running the same pass. The first pass (no
+watermark yet) backfills all history.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from asyncpg import Connection
+from asyncpg.exceptions import UndefinedTableError
+
+from app.core.config import get_settings
+from app.core.postgresql_client import get_postgresql_client
+
+logger = logging.getLogger(__name__)
+
+# agent_id for conversations without an agent (rollup keys can't be NULL)
+NO_AGENT_ID = "00000000-0000-0000-0000-000000000000"
+
+HOURLY_TABLE = "usage_rollup_hourly"
+DAILY_TABLE = "usage_rollup_daily"
+
+# Recompute one table's buckets in [$2, $3) from the source tables.
+# Conversations count in the bucket they were created; messages, tokens and
+# content size in the bucket they were written, under the conversation's
+# user and agent.
+_ROLLUP_SQL = """
+    INSERT INTO {table} (
+        tenant_id, bucket_start, user_id, agent_id, model,
+        conversations, active_conversations, messages, tokens, content_bytes
+    )
+    SELECT
+        tenant_id, bucket_start, user_id, agent_id, model,
+        SUM(conversations), SUM(active_conversations), SUM(messages), SUM(tokens), SUM(content_bytes)
+    FROM (
+        SELECT
+            c.tenant_id,
+            DATE_TRUNC('{unit}', m.created_at) AS bucket_start,
+            c.user_id,
+            COALESCE(c.agent_id, '{no_agent}'::uuid) AS agent_id,
+            COALESCE(m.model_used, '') AS model,
+            0 AS conversations,
+            COUNT(DISTINCT m.conversation_id) AS active_conversations,
+            COUNT(*) AS messages,
+            COALESCE(SUM(m.token_count), 0) AS tokens,
+            COALESCE(SUM(LENGTH(m.content)), 0) AS content_bytes
+        FROM messages m
+        JOIN conversations c ON c.id = m.conversation_id
+        WHERE c.tenant_id = $1
+          AND m.created_at >= $2
+          AND m.created_at < COALESCE($3::timestamptz, 'infinity')
+        GROUP BY 1, 2, 3, 4, 5
+
+        UNION ALL
+
+        SELECT
+            c.tenant_id,
+            DATE_TRUNC('{unit}', c.created_at) AS bucket_start,
+            c.user_id,
+            COALESCE(c.agent_id, '{no_agent}'::uuid) AS agent_id,
+            '' AS model,
+            COUNT(*) AS conversations,
+            0, 0, 0, 0
+        FROM conversations c
+        WHERE c.tenant_id = $1
+          AND c.created_at >= $2
+          AND c.created_at < COALESCE($3::timestamptz, 'infinity')
+        GROUP BY 1, 2, 3, 4
+    ) source
+    GROUP BY tenant_id, bucket_start, user_id, agent_id, model
+"""
+
+
+class UsageRollupService:
+    """Maintains and selects the observability usage rollups for this tenant"""
+
+    def __init__(
+        self,
+        tenant_domain: str,
+        grace_minutes: int = 10,
+        hourly_retention_days: int = 90
+    ):
+        self.tenant_domain = tenant_domain
+        self.grace = timedelta(minutes=grace_minutes)
+        self.hourly_retention = timedelta(days=hourly_retention_days)
+
+    def rollup_for_range(self, date_start: datetime) -> Tuple[str, str]:
+        """
+        Rollup table and bucket unit for a dashboard range starting at date_start.
+
+        Hourly rollups while they are retained, daily rollups otherwise.
+        """
+        cutoff = datetime.now(date_start.tzinfo) - self.hourly_retention
+        if date_start >= cutoff:
+            return HOURLY_TABLE, "hour"
+        return DAILY_TABLE, "day"
+
+    async def _recompute(
+        self,
+        conn: Connection,
+        tenant_id: Any,
+        table: str,
+        unit: str,
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> None:
+        """Replace the buckets of one table in [start, end) (end None = open-ended)"""
+        if end is None:
+            await conn.execute(
+                f"DELETE FROM {table} WHERE tenant_id = $1 AND bucket_start >= $2",
+                tenant_id, start
+            )
+        else:
+            await conn.execute(
+                f"DELETE FROM {table} WHERE tenant_id = $1 AND bucket_start >= $2 AND bucket_start < $3",
+                tenant_id, start, end
+            )
+        await conn.execute(
+            _ROLLUP_SQL.format(table=table, unit=unit, no_agent=NO_AGENT_ID),
+            tenant_id, start, end
+        )
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Run one incremental rollup pass"""
+        pg_client = await get_postgresql_client()
+
+        async with pg_client.get_connection() as conn:
+            async with conn.transaction():
+                locked = await conn.fetchval(
+                    "SELECT pg_try_advisory_xact_lock(hashtext($1))",
+                    f"usage_rollup:{pg_client.schema_name}"
+                )
+                if not locked:
+                    return {"status": "skipped", "reason": "rollup pass already running"}
+
+                tenant_id = await conn.fetchval(
+                    "SELECT id FROM tenants WHERE domain = $1 LIMIT 1", self.tenant_domain
+                )
+                if tenant_id is None:
+                    return {"status": "skipped", "reason": "tenant not found"}
+
+                # Transaction start time: rows committed after this are picked up next pass
+                now = await conn.fetchval("SELECT NOW()")
+                watermark = await conn.fetchval(
+                    "SELECT watermark FROM usage_rollup_state WHERE tenant_id = $1", tenant_id
+                )
+
+                if watermark is None:
+                    # First pass: backfill everything
+                    hourly_start = await conn.fetchval(
+                        "SELECT DATE_TRUNC('hour', $1::timestamptz)", now - self.hourly_retention
+                    )
+                    daily_start = datetime.min.replace(tzinfo=now.tzinfo)
+                else:
+                    hourly_start = await conn.fetchval(
+                        "SELECT DATE_TRUNC('hour', $1::timestamptz)", watermark - self.grace
+                    )
+                    daily_start = await conn.fetchval(
+                        "SELECT DATE_TRUNC('day', $1::timestamptz)", hourly_start
+                    )
+
+                await self._recompute(conn, tenant_id, HOURLY_TABLE, "hour", hourly_start)
+                await self._recompute(conn, tenant_id, DAILY_TABLE, "day", daily_start)
+
+                # Days whose source rows were deleted (outside the window above)
+                dirty_days = await conn.fetch(
+                    "DELETE FROM usage_rollup_dirty_days RETURNING bucket_start"
+                )
+                recomputed_days = 0
+                for row in dirty_days:
+                    day = row["bucket_start"]
+                    next_day = day + timedelta(days=1)
+                    if day < daily_start:
+                        await self._recompute(conn, tenant_id, DAILY_TABLE, "day", day, next_day)
+                        recomputed_days += 1
+                    if day < hourly_start and next_day > now - self.hourly_retention:
+                        await self._recompute(
+                            conn, tenant_id, HOURLY_TABLE, "hour", day, min(next_day, hourly_start)
+                        )
+
+                await conn.execute(
+                    f"DELETE FROM {HOURLY_TABLE} WHERE tenant_id = $1 AND bucket_start < $2",
+                    tenant_id, now - self.hourly_retention
+                )
+
+                await conn.execute("""
+                    INSERT INTO usage_rollup_state (tenant_id, watermark, updated_at)
+                    VALUES ($1, $2, NOW())
+                    ON CONFLICT (tenant_id) DO UPDATE
+                    SET watermark = EXCLUDED.watermark, updated_at = EXCLUDED.updated_at
+                """, tenant_id, now)
+
+        return {
+            "status": "backfilled" if watermark is None else "refreshed",
+            "hourly_from": hourly_start.isoformat(),
+            "daily_from": None if watermark is None else daily_start.isoformat(),
+            "deleted_days_recomputed": recomputed_days,
+            "watermark": now.isoformat()
+        }
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        """Background loop: one rollup pass every interval"""
+        while True:
+            try:
+                result = await self.refresh()
+                logger.debug(f"Usage rollup pass: {result}")
+            except asyncio.CancelledError:
+                raise
+            except UndefinedTableError:
+                logger.warning("Usage rollup tables missing (migration T013 not applied), stopping rollup job")
+                return
+            except Exception as e:
+                logger.error(f"Usage rollup pass failed: {e}")
+            await asyncio.sleep(interval_seconds)
+
+
+# Singleton service and background task per worker
+_usage_rollup_service: Optional[UsageRollupService] = None
+_rollup_task: Optional[asyncio.Task] = None
+
+
+def get_usage_rollup_service() -> UsageRollupService:
+    """Get or create the usage rollup service"""
+    global _usage_rollup_service
+    if _usage_rollup_service is None:
+        settings = get_settings()
+        _usage_rollup_service = UsageRollupService(
+            tenant_domain=settings.tenant_domain,
+            grace_minutes=settings.usage_rollup_grace_minutes,
+            hourly_retention_days=settings.usage_rollup_hourly_retention_days
+        )
+    return _usage_rollup_service
+
+
+async def start_usage_rollups() -> None:
+    """Start the background rollup job (application startup)"""
+    global _rollup_task
+    settings = get_settings()
+    if not settings.usage_rollups_enabled or _rollup_task is not None:
+        return
+    _rollup_task = asyncio.create_task(
+        get_usage_rollup_service().run_periodically(settings.usage_rollup_interval_seconds)
+    )
+    logger.info(f"Usage rollup job started (every {settings.usage_rollup_interval_seconds}s)")
+
+
+async def stop_usage_rollups() -> None:
+    """Stop the background rollup job (application shutdown)"""
+    global _rollup_task
+    if _rollup_task is not None:
+        _rollup_task.cancel()
+        try:
+            await _rollup_task
+        except asyncio.CancelledError:
+            pass
+        _rollup_task = None
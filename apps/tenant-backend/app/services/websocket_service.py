@@ -25,6 +25,7 @@ from app.services.conversation_service import ConversationService
 from app.services.event_service import EventService, EventType
 from app.services.agent_service import AgentService
 from app.websocket import get_websocket_manager, ChatMessage
+from app.websocket.streaming import ResponseStream
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +54,9 @@ class WebSocketService:
     ) -> None:
         """
         Stream AI response to WebSocket connection with real-time updates.
+
+        Chunks are sent as coalesced delta frames with resume checkpoints
+        (see app.websocket.streaming).
         
         Args:
             conversation_id: Target conversation
@@ -61,11 +65,22 @@ class WebSocketService:
             tenant_id: Tenant for isolation
             connection_id: WebSocket connection to stream to
         """
+        message_id = str(uuid.uuid4())
+        stream = ResponseStream(
+            manager=self.websocket_manager,
+            connection_id=connection_id,
+            conversation_id=conversation_id,
+            message_id=message_id,
+            user_id=user_id,
+            tenant_id=tenant_id
+        )
+
         try:
             # Send streaming start notification
             await self.websocket_manager.send_to_connection(connection_id, {
                 "type": "ai_response_start",
                 "conversation_id": conversation_id,
+                "message_id": message_id,
                 "timestamp": datetime.utcnow().isoformat()
             })
             
@@ -100,34 +115,15 @@ class WebSocketService:
             if not conversation:
                 raise ValueError("Conversation not found")
             
-            # Stream AI response
-            full_response = ""
-            message_id = str(uuid.uuid4())
+            # Stream AI response (registered so a reconnecting client can resume)
+            self.websocket_manager.active_streams[message_id] = stream
             
             # Get AI response generator
             async for chunk in self._generate_ai_response_stream(conversation, user_message):
-                full_response += chunk
-                
-                # Send chunk to WebSocket
-                await self.websocket_manager.send_to_connection(connection_id, {
-                    "type": "ai_response_chunk",
-                    "conversation_id": conversation_id,
-                    "message_id": message_id,
-                    "content": chunk,
-                    "full_content_so_far": full_response,
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-                
-                # Broadcast to other conversation participants
-                await self.websocket_manager.broadcast_to_conversation(
-                    conversation_id,
-                    {
-                        "type": "ai_typing",
-                        "conversation_id": conversation_id,
-                        "content_preview": full_response[-50:] if len(full_response) > 50 else full_response
-                    },
-                    exclude_connection=connection_id
-                )
+                await stream.write(chunk)
+            
+            await stream.flush()
+            full_response = stream.content()
             
             # Save complete AI response
             await self.conversation_service.add_message(
@@ -138,12 +134,12 @@ class WebSocketService:
                 message_id=message_id
             )
             
-            # Send completion notification
-            await self.websocket_manager.send_to_connection(connection_id, {
+            # Send completion notification (content was delivered as deltas)
+            await self.websocket_manager.send_to_connection(stream.connection_id, {
                 "type": "ai_response_complete",
                 "conversation_id": conversation_id,
                 "message_id": message_id,
-                "full_content": full_response,
+                "checkpoint": stream.checkpoint(),
                 "timestamp": datetime.utcnow().isoformat()
             })
             
@@ -157,7 +153,7 @@ class WebSocketService:
                     "content": full_response,
                     "timestamp": datetime.utcnow().isoformat()
                 },
-                exclude_connection=connection_id
+                exclude_connection=stream.connection_id
             )
             
             # Emit AI response event
@@ -178,16 +174,23 @@ class WebSocketService:
             
         except Exception as e:
             logger.error(f"Error streaming AI response: {e}")
-            
+
+            # No delta may follow the error frame
+            await stream.close()
+
             # Send error notification
-            await self.websocket_manager.send_to_connection(connection_id, {
+            await self.websocket_manager.send_to_connection(stream.connection_id, {
                 "type": "ai_response_error",
                 "conversation_id": conversation_id,
+                "message_id": message_id,
                 "error": str(e),
                 "timestamp": datetime.utcnow().isoformat()
             })
             
             raise
+        finally:
+            await stream.close()
+            self.websocket_manager.active_streams.pop(message_id, None)
     
     async def _generate_ai_response_stream(
         self,
@@ -1,36 +1,207 @@
 """Token counting and budget management - ensures zero context overflows"""
 
 import logging
-from typing import List, Dict, Any, Tuple
+import os
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
 from collections import defaultdict
 
 logger = logging.getLogger(__name__)
 
 
-def estimate_tokens(text: str) -> int:
+# Tokenizer files live under settings.tokenizer_directory:
+# - <model id>/tokenizer.json: exported for that exact model version; counts are exact
+# - <family>/tokenizer.json: shared by a whole family (e.g. every llama version);
+#   vocabularies differ between versions, so these counts are approximate
+# Model id substring -> tokenizer family directory.
+MODEL_FAMILY_PATTERNS = [
+    ("llama", "llama"),
+    ("mixtral", "mistral"),
+    ("mistral", "mistral"),
+    ("gemma", "gemma"),
+    ("qwen", "qwen"),
+    ("deepseek", "deepseek"),
+    ("gpt-oss", "gpt-oss"),
+    ("gpt", "openai"),
+    ("bge-m3", "bge-m3"),
+]
+
+# CJK, Hangul and kana characters are usually one token (or more) each
+_WIDE_CHARS = re.compile(r"[\u1100-\u11ff\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+
+
+def _model_directory(model: str) -> str:
+    """Directory name for a model id (e.g. meta-llama/Llama-3.1-8B -> meta-llama_llama-3.1-8b)"""
+    return re.sub(r"[^a-z0-9._-]+", "_", model.lower())
+
+
+def _model_family(model: Optional[str]) -> Optional[str]:
+    if not model:
+        return None
+    model_lower = model.lower()
+    for pattern, family in MODEL_FAMILY_PATTERNS:
+        if pattern in model_lower:
+            return family
+    return None
+
+
+class Tokenizer:
+    """Heuristic tokenizer: ~4 chars per token, one token per CJK character"""
+
+    exact = False
+    name = "heuristic"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        wide = len(_WIDE_CHARS.findall(text))
+        return wide + (len(text) - wide) // 4
+
+    def count_many(self, texts: List[str]) -> List[int]:
+        return [self.count(text) for text in texts]
+
+
+class HuggingFaceTokenizer(Tokenizer):
     """
-    Estimate tokens: 1 token ≈ 4 chars (conservative for safety).
+    Counts from a local tokenizer.json (requires the `tokenizers` package).
 
-    This is a rough estimation. For production with critical accuracy needs,
-    consider integrating tiktoken library for model-specific tokenization.
+    exact is only set for a tokenizer exported for the model itself, not for
+    a family tokenizer standing in for other versions.
     """
-    return len(text) // 4 if text else 0
 
+    def __init__(self, path: str, name: str, exact: bool = True):
+        from tokenizers import Tokenizer as _HFTokenizer
+
+        self.name = name
+        self.exact = exact
+        self._tokenizer = _HFTokenizer.from_file(path)
+        self._tokenizer.no_padding()
+        self._tokenizer.no_truncation()
+        # Per-text cache; repeated system prompts and history messages are common
+        self.count = lru_cache(maxsize=4096)(self._count)
+
+    def _count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def count_many(self, texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        # Rust-side batch encoding (parallel) for uncached bulk counting
+        encodings = self._tokenizer.encode_batch(list(texts), add_special_tokens=False)
+        return [len(encoding.ids) for encoding in encodings]
+
+
+_default_tokenizer = Tokenizer()
+# tokenizer.json path -> loaded tokenizer (heuristic if it could not be loaded)
+_tokenizers: Dict[str, Tokenizer] = {}
+# model id -> resolved tokenizer
+_model_tokenizers: Dict[str, Tokenizer] = {}
+
+
+def _load_tokenizer(path: str, name: str, exact: bool) -> Tokenizer:
+    tokenizer = _tokenizers.get(path)
+    if tokenizer is not None:
+        return tokenizer
+
+    tokenizer = _default_tokenizer
+    if os.path.exists(path):
+        try:
+            tokenizer = HuggingFaceTokenizer(path, name, exact=exact)
+            logger.info(f"Loaded {name} tokenizer from {path} ({'exact' if exact else 'family approximation'})")
+        except ImportError:
+            logger.warning("tokenizers package not installed, using heuristic token counts")
+        except Exception as e:
+            logger.warning(f"Failed to load {name} tokenizer from {path}: {e}")
+    else:
+        logger.info(f"No tokenizer file for {name} at {path}, using heuristic token counts")
+
+    _tokenizers[path] = tokenizer
+    return tokenizer
+
+
+def get_tokenizer(model: Optional[str] = None) -> Tokenizer:
+    """
+    Get the tokenizer for a model, loading it lazily.
+
+    Prefers a tokenizer exported for the exact model (exact counts), then the
+    model family's tokenizer (approximate counts), and falls back to the
+    heuristic tokenizer when neither is installed or the `tokenizers` package
+    is missing.
+    """
+    if not model:
+        return _default_tokenizer
 
-def estimate_messages_tokens(messages: list) -> int:
+    tokenizer = _model_tokenizers.get(model)
+    if tokenizer is not None:
+        return tokenizer
+
+    from app.core.config import get_settings
+
+    directory = get_settings().tokenizer_directory
+    model_path = os.path.join(directory, _model_directory(model), "tokenizer.json")
+    family = _model_family(model)
+    if os.path.exists(model_path):
+        tokenizer = _load_tokenizer(model_path, model, exact=True)
+    elif family is not None:
+        tokenizer = _load_tokenizer(os.path.join(directory, family, "tokenizer.json"), family, exact=False)
+    else:
+        tokenizer = _default_tokenizer
+
+    _model_tokenizers[model] = tokenizer
+    return tokenizer
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens in text for the given model"""
+    return get_tokenizer(model).count(text)
+
+
+def count_tokens_many(texts: List[str], model: Optional[str] = None) -> List[int]:
+    """Count tokens for many texts in one batched call"""
+    return get_tokenizer(model).count_many(texts)
+
+
+def _ingest_model() -> str:
+    from app.core.config import get_settings
+    return get_settings().tokenizer_ingest_model
+
+
+def count_tokens_for_ingest(texts: List[str]) -> List[int]:
+    """
+    Token counts stored with chunks at ingest (document_chunks.token_count,
+    conversation_files.chunk_token_counts), using the ingest reference model.
+    """
+    return count_tokens_many(texts, _ingest_model())
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count tokens for budgeting.
+
+    Uses the model's tokenizer when available; otherwise ~4 chars per
+    token with CJK characters counted individually.
+    """
+    return count_tokens(text, model)
+
+
+def estimate_messages_tokens(messages: list, model: Optional[str] = None) -> int:
     """Estimate total tokens in message list"""
-    total = 0
-    for msg in messages:
-        content = msg.get('content', '') if isinstance(msg, dict) else str(msg)
-        total += estimate_tokens(content)
-    return total
+    contents = [
+        msg.get('content', '') if isinstance(msg, dict) else str(msg)
+        for msg in messages
+    ]
+    return sum(count_tokens_many([c for c in contents if isinstance(c, str)], model))
 
 
 def calculate_file_context_budget(
     context_window: int,
     conversation_history_tokens: int,
     model_max_tokens: int,
-    system_overhead_tokens: int = 500
+    system_overhead_tokens: int = 500,
+    model: Optional[str] = None
 ) -> int:
     """
     Calculate exact token budget for file context.
@@ -41,14 +212,20 @@ def calculate_file_context_budget(
         conversation_history_tokens: Tokens used by conversation messages
         model_max_tokens: Maximum tokens reserved for model response (from model config)
         system_overhead_tokens: Tokens for system prompts, tool definitions
+        model: Model id; with a tokenizer exported for this exact model only
+               a small margin is kept for chat template framing
 
     Returns:
         Maximum tokens available for file context (HARD LIMIT)
     """
-    SAFETY_MARGIN = 0.05  # 5% buffer for tokenization variance
+    if get_tokenizer(model).exact:
+        safety_margin = 0.01  # Chat template / message framing only
+    else:
+        from app.core.config import get_settings
+        safety_margin = get_settings().file_context_token_safety_margin  # Heuristic/family variance
 
     # Usable context after safety margin
-    usable_context = int(context_window * (1 - SAFETY_MARGIN))
+    usable_context = int(context_window * (1 - safety_margin))
 
     # Calculate available budget
     available = usable_context - conversation_history_tokens - model_max_tokens - system_overhead_tokens
@@ -57,10 +234,25 @@ def calculate_file_context_budget(
     return max(0, available)
 
 
+def _chunk_token_counts(chunks: List[Dict[str, Any]], model: Optional[str]) -> List[int]:
+    """Use token counts stored at ingest; batch-count only chunks without one"""
+    if get_tokenizer(model) is get_tokenizer(_ingest_model()):
+        counts = [chunk.get('token_count') or 0 for chunk in chunks]
+    else:
+        # Stored counts come from a different tokenizer
+        counts = [0] * len(chunks)
+    missing = [i for i, count in enumerate(counts) if count <= 0]
+    if missing:
+        for i, count in zip(missing, count_tokens_many([chunks[i]['content'] for i in missing], model)):
+            counts[i] = count
+    return counts
+
+
 def fit_chunks_to_budget(
     chunks: List[Dict[str, Any]],
     token_budget: int,
-    preserve_file_boundaries: bool = True
+    preserve_file_boundaries: bool = True,
+    model: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
     Fit chunks to exact token budget.
@@ -73,8 +265,10 @@ def fit_chunks_to_budget(
 
     Args:
         chunks: List of chunk dictionaries with 'content' and 'document_id'
+                (and optionally a precomputed 'token_count')
         token_budget: Maximum tokens allowed
         preserve_file_boundaries: If True, round-robin across files for diversity
+        model: Model id used to count chunks without a stored token_count
 
     Returns:
         List of chunks that fit within budget
@@ -85,10 +279,12 @@ def fit_chunks_to_budget(
     if not chunks:
         return []
 
-    # Group by file
+    counts = _chunk_token_counts(chunks, model)
+
+    # Group by file (chunk index into chunks/counts)
     by_file = defaultdict(list)
-    for chunk in chunks:
-        by_file[chunk['document_id']].append(chunk)
+    for i, chunk in enumerate(chunks):
+        by_file[chunk['document_id']].append(i)
 
     selected_chunks = []
     current_tokens = 0
@@ -105,11 +301,11 @@ def fit_chunks_to_budget(
                 if idx >= len(by_file[file_id]):
                     continue
 
-                chunk = by_file[file_id][idx]
-                chunk_tokens = estimate_tokens(chunk['content'])
+                chunk_pos = by_file[file_id][idx]
+                chunk_tokens = counts[chunk_pos]
 
                 if current_tokens + chunk_tokens <= token_budget:
-                    selected_chunks.append(chunk)
+                    selected_chunks.append(chunks[chunk_pos])
                     current_tokens += chunk_tokens
                     file_indices[file_id] += 1
                     added_any = True
@@ -119,8 +315,7 @@ def fit_chunks_to_budget(
                 break
     else:
         # Single file or no boundary preservation: simple sequential
-        for chunk in chunks:
-            chunk_tokens = estimate_tokens(chunk['content'])
+        for chunk, chunk_tokens in zip(chunks, counts):
             if current_tokens + chunk_tokens <= token_budget:
                 selected_chunks.append(chunk)
                 current_tokens += chunk_tokens
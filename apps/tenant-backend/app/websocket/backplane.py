@@ -0,0 +1,314 @@
+"""
+WebSocket pub/sub backplane for GT 2.0 Tenant Backend.
+
+WebSocketManager and the Socket.IO server only know the sockets of their own
+worker. The backplane carries every conversation, user and tenant broadcast
+to the other workers (and pods), which then deliver it to their local
+sockets, so the tenant backend can run more than one worker.
+
+Socket.IO rooms are fanned out by python-socketio's own AsyncRedisManager on
+the same Redis server (see app.websocket.manager). Socket.IO's HTTP
+long-polling transport still needs every request of a session to reach the
+same worker; only the WebSocket transport works without sticky sessions.
+
+Backends:
+- RedisBackplane: any Redis-protocol server (Redis, Valkey, KeyDB, Dragonfly),
+  one PUBLISH/SUBSCRIBE channel per tenant. Requires the `redis` package.
+- InProcessBackplane: backplanes sharing one InProcessHub (tests, or several
+  managers in one process). It does not reach other worker processes.
+
+Envelopes published within BATCH_WINDOW_SECONDS are sent as one JSON array.
+Each envelope carries a unique id and the publishing worker's id; a worker
+skips its own envelopes (already delivered locally) and any id it has
+already seen.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+BATCH_WINDOW_SECONDS = 0.01
+MAX_BATCH_SIZE = 100
+SEEN_IDS_LIMIT = 10000
+RECONNECT_DELAY_SECONDS = 2
+
+# Raw batch callback: JSON array of envelopes
+PayloadHandler = Callable[[str], Awaitable[None]]
+# Delivery callback for one remote envelope
+EnvelopeHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class Backplane(ABC):
+    """Interface for a channel shared by every worker of a tenant"""
+
+    @abstractmethod
+    async def publish(self, payload: str) -> None:
+        """Send one batch to every subscriber (including this worker)"""
+
+    @abstractmethod
+    async def listen(self, handler: PayloadHandler) -> None:
+        """Run until cancelled, calling handler for each batch"""
+
+    async def close(self) -> None:
+        """Release backend resources"""
+
+
+class RedisBackplane(Backplane):
+    """Redis-protocol pub/sub channel."""
+
+    def __init__(self, url: str, namespace: str):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("websocket_backplane=redis requires the 'redis' package") from e
+
+        self._redis = redis_asyncio.from_url(url, decode_responses=True)
+        self._channel = f"gt2:ws:{namespace}"
+
+    async def publish(self, payload: str) -> None:
+        await self._redis.publish(self._channel, payload)
+
+    async def listen(self, handler: PayloadHandler) -> None:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self._channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    await handler(message["data"])
+        finally:
+            await pubsub.unsubscribe(self._channel)
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class InProcessHub:
+    """Shared channel for InProcessBackplane instances"""
+
+    def __init__(self):
+        self.subscribers: Set[asyncio.Queue] = set()
+
+
+_default_hub = InProcessHub()
+
+
+class InProcessBackplane(Backplane):
+    """
+    Backplane within one process.
+
+    Every backplane on the same hub receives every batch, as separate
+    workers would through Redis.
+    """
+
+    def __init__(self, hub: Optional[InProcessHub] = None):
+        self._hub = hub or _default_hub
+
+    async def publish(self, payload: str) -> None:
+        for queue in self._hub.subscribers:
+            queue.put_nowait(payload)
+
+    async def listen(self, handler: PayloadHandler) -> None:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._hub.subscribers.add(queue)
+        try:
+            while True:
+                await handler(await queue.get())
+        finally:
+            self._hub.subscribers.discard(queue)
+
+
+class WebSocketBackplane:
+    """
+    Batches outgoing envelopes and de-duplicates incoming ones for a worker.
+
+    Envelope: {"id", "origin", "target", "key", "message", ...}; the target
+    specific fields are interpreted by the deliver callback.
+    """
+
+    def __init__(self, backend: Backplane):
+        self.backend = backend
+        self.worker_id = uuid.uuid4().hex
+
+        self._outbox: List[Dict[str, Any]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_immediate = False
+        self._listen_task: Optional[asyncio.Task] = None
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+
+        self.stats: Dict[str, int] = {
+            "published": 0,
+            "batches_published": 0,
+            "received": 0,
+            "duplicates": 0,
+            "publish_errors": 0
+        }
+
+    def publish(self, target: str, key: str, message: Dict[str, Any], **fields: Any) -> None:
+        """Queue an envelope for the next batch (never blocks the caller)"""
+        envelope = {
+            "id": uuid.uuid4().hex,
+            "origin": self.worker_id,
+            "target": target,
+            "key": key,
+            "message": message,
+            **fields
+        }
+        self._outbox.append(envelope)
+
+        full = len(self._outbox) >= MAX_BATCH_SIZE
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after(0 if full else BATCH_WINDOW_SECONDS))
+            self._flush_immediate = full
+        elif full and not self._flush_immediate:
+            # Batch is full: don't wait for the rest of the window
+            self._flush_task.cancel()
+            self._flush_task = asyncio.create_task(self._flush_after(0))
+            self._flush_immediate = True
+
+    async def _flush_after(self, delay: float) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Publish queued envelopes in batches of up to MAX_BATCH_SIZE"""
+        pending, self._outbox = self._outbox, []
+        for start in range(0, len(pending), MAX_BATCH_SIZE):
+            batch = pending[start:start + MAX_BATCH_SIZE]
+            try:
+                await self.backend.publish(json.dumps(batch, default=str))
+                self.stats["published"] += len(batch)
+                self.stats["batches_published"] += 1
+            except Exception as e:
+                self.stats["publish_errors"] += 1
+                logger.error(f"WebSocket backplane publish failed ({len(batch)} envelopes dropped): {e}")
+
+    def _remember(self, envelope_id: str) -> bool:
+        """Record an envelope id; False if it was already seen"""
+        if envelope_id in self._seen:
+            return False
+        self._seen[envelope_id] = None
+        if len(self._seen) > SEEN_IDS_LIMIT:
+            self._seen.popitem(last=False)
+        return True
+
+    async def _run_listener(self, deliver: EnvelopeHandler) -> None:
+        """Receive batches and deliver other workers' envelopes locally"""
+
+        async def handle(payload: str) -> None:
+            try:
+                batch = json.loads(payload)
+            except ValueError as e:
+                logger.warning(f"Ignoring malformed WebSocket backplane batch: {e}")
+                return
+
+            for envelope in batch:
+                if envelope.get("origin") == self.worker_id:
+                    continue
+                if not self._remember(envelope.get("id", "")):
+                    self.stats["duplicates"] += 1
+                    continue
+                self.stats["received"] += 1
+                try:
+                    await deliver(envelope)
+                except Exception as e:
+                    logger.error(f"WebSocket backplane delivery failed: {e}")
+
+        while True:
+            try:
+                await self.backend.listen(handle)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"WebSocket backplane subscription lost, reconnecting: {e}")
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def start(self, deliver: EnvelopeHandler) -> None:
+        """Start receiving remote envelopes"""
+        if self._listen_task is None:
+            self._listen_task = asyncio.create_task(self._run_listener(deliver))
+
+    async def stop(self) -> None:
+        """Flush pending envelopes, stop listening and close the backend"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            try:
+                await self._listen_task
+            except asyncio.CancelledError:
+                pass
+            self._listen_task = None
+        await self.backend.close()
+
+
+_backplane: Optional[WebSocketBackplane] = None
+_backplane_configured = False
+
+
+def get_backplane() -> Optional[WebSocketBackplane]:
+    """Get the backplane configured by settings.websocket_backplane (None = single worker)"""
+    global _backplane, _backplane_configured
+    if _backplane_configured:
+        return _backplane
+    _backplane_configured = True
+
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    backend_name = settings.websocket_backplane.lower()
+
+    try:
+        if backend_name == "redis":
+            url = settings.websocket_backplane_redis_url or settings.cache_redis_url
+            if not url:
+                raise ValueError("websocket_backplane=redis requires websocket_backplane_redis_url or cache_redis_url")
+            backend: Backplane = RedisBackplane(url, namespace=settings.tenant_domain)
+        elif backend_name == "memory":
+            backend = InProcessBackplane()
+        else:
+            return None
+    except Exception as e:
+        logger.error(f"WebSocket backplane '{backend_name}' unavailable, broadcasts stay local to this worker: {e}")
+        return None
+
+    _backplane = WebSocketBackplane(backend)
+    logger.info(f"WebSocket backplane enabled: {backend_name}")
+    return _backplane
+
+
+def check_backplane_configuration() -> None:
+    """
+    Refuse to run several workers without a working Redis backplane.
+
+    Without one, each worker only reaches its own sockets and clients miss
+    updates produced on the other workers.
+    """
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    if settings.web_concurrency <= 1:
+        return
+    if settings.websocket_backplane.lower() != "redis" or get_backplane() is None:
+        raise RuntimeError(
+            f"WEB_CONCURRENCY={settings.web_concurrency} requires websocket_backplane=redis "
+            "with a reachable websocket_backplane_redis_url or cache_redis_url"
+        )
+
+
+async def stop_backplane() -> None:
+    """Stop the configured backplane (application shutdown)"""
+    global _backplane
+    if _backplane is not None:
+        await _backplane.stop()
+        _backplane = None
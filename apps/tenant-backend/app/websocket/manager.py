@@ -7,21 +7,25 @@ Handles real-time chat connections with:
 - Secure authentication
 - Event-driven message broadcasting
 - Resource cleanup on disconnect
+- Serialize-once fan-out through bounded per-connection send queues
+- Cross-worker delivery of broadcasts through the pub/sub backplane
 
 GT 2.0 Security Principles:
 - All connections are user and tenant scoped
 - No cross-tenant message leaking
 - Automatic cleanup on disconnect
 - Rate limiting and connection limits
+- Slow consumers lose typing events first, then get disconnected
 """
 
 import asyncio
 import json
 import logging
 import time
-from typing import Dict, List, Set, Optional, Any
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Set, Optional, Any, Tuple
 from datetime import datetime, timedelta, timezone
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import uuid
 
 from fastapi import WebSocket, WebSocketDisconnect
@@ -31,9 +35,13 @@ from app.core.database import get_db_session
 from app.core.security import verify_jwt_token
 from app.services.conversation_service import ConversationService
 from app.services.event_service import EventService, EventType
+from app.websocket.backplane import get_backplane
 
 logger = logging.getLogger(__name__)
 
+# Message types a slow consumer can miss without losing conversation state
+DROPPABLE_MESSAGE_TYPES = frozenset({"ai_typing", "typing_indicator"})
+
 
 @dataclass
 class WebSocketConnection:
@@ -45,6 +53,12 @@ class WebSocketConnection:
     connected_at: datetime
     last_activity: datetime
     connection_id: str
+    # Encoded frames (text, droppable) waiting for the writer task
+    outbox: Deque[Tuple[str, bool]] = field(default_factory=deque)
+    outbox_ready: asyncio.Event = field(default_factory=asyncio.Event)
+    writer_task: Optional[asyncio.Task] = None
+    frames_dropped: int = 0
+    closing: bool = False
     
     def update_activity(self):
         """Update last activity timestamp"""
@@ -113,6 +127,18 @@ class WebSocketManager:
         self.max_connections_per_tenant = 100
         self.message_rate_limit = 60  # messages per minute
         self.user_message_counts: Dict[str, List[float]] = {}  # user_id -> timestamps
+
+        # Fan-out: frames are encoded once and queued per connection
+        self.send_queue_size = 256  # frames per connection before the slow-consumer policy applies
+        self.fanout_stats: Dict[str, int] = {
+            "frames_queued": 0,
+            "frames_sent": 0,
+            "frames_dropped": 0,
+            "slow_consumer_disconnects": 0
+        }
+
+        # In-progress AI response streams (message_id -> ResponseStream), for resume
+        self.active_streams: Dict[str, Any] = {}
         
         # Background cleanup task
         self.cleanup_task: Optional[asyncio.Task] = None
@@ -190,6 +216,7 @@ class WebSocketManager:
             
             # Store connection with tenant isolation
             self.connections[connection_id] = connection
+            connection.writer_task = asyncio.create_task(self._run_writer(connection))
             
             # Index by tenant
             if tenant_id not in self.tenant_connections:
@@ -261,9 +288,10 @@ class WebSocketManager:
                     exclude_connection=connection_id
                 )
             
-            # Close WebSocket
+            # Let queued frames go out, then close WebSocket
+            await self._drain_outbox(connection)
             try:
-                await connection.websocket.close(code=code, reason=reason)
+                await asyncio.wait_for(connection.websocket.close(code=code, reason=reason), timeout=5)
             except:
                 pass  # Connection may already be closed
             
@@ -281,6 +309,11 @@ class WebSocketManager:
         
         # Remove from main storage
         del self.connections[connection_id]
+
+        # Stop the writer (unless it is the one removing its own connection)
+        if connection.writer_task is not None and connection.writer_task is not asyncio.current_task():
+            connection.writer_task.cancel()
+        connection.outbox.clear()
         
         # Remove from tenant index
         tenant_connections = self.tenant_connections.get(connection.tenant_id, set())
@@ -313,16 +346,154 @@ class WebSocketManager:
         if tenant_connection_count >= self.max_connections_per_tenant:
             raise ConnectionError(f"Tenant connection limit exceeded: {self.max_connections_per_tenant}")
     
+    @staticmethod
+    def _encode(message: Dict[str, Any]) -> Tuple[str, bool]:
+        """Serialize a message once for any number of connections"""
+        return json.dumps(message), message.get("type") in DROPPABLE_MESSAGE_TYPES
+
+    def _enqueue(self, connection: WebSocketConnection, frame: Tuple[str, bool]) -> bool:
+        """
+        Queue an encoded frame for a connection's writer.
+
+        When the queue is full, droppable frames (typing events) are discarded
+        first; if only state-carrying frames are queued, the consumer is too
+        slow and is disconnected.
+
+        Returns:
+            False if the connection is being disconnected
+        """
+        if connection.closing:
+            return False
+
+        outbox = connection.outbox
+        if len(outbox) >= self.send_queue_size:
+            text, droppable = frame
+            if droppable:
+                connection.frames_dropped += 1
+                self.fanout_stats["frames_dropped"] += 1
+                return True
+
+            for index, (_, queued_droppable) in enumerate(outbox):
+                if queued_droppable:
+                    del outbox[index]
+                    connection.frames_dropped += 1
+                    self.fanout_stats["frames_dropped"] += 1
+                    break
+            else:
+                self.fanout_stats["slow_consumer_disconnects"] += 1
+                logger.warning(
+                    f"Disconnecting slow WebSocket consumer {connection.connection_id} "
+                    f"({len(outbox)} frames queued)"
+                )
+                connection.closing = True
+                asyncio.create_task(self._disconnect_slow_consumer(connection))
+                return False
+
+        outbox.append(frame)
+        connection.outbox_ready.set()
+        self.fanout_stats["frames_queued"] += 1
+        return True
+
+    async def _run_writer(self, connection: WebSocketConnection):
+        """Drain a connection's outbox; a failed send removes the connection"""
+        try:
+            while True:
+                if not connection.outbox:
+                    connection.outbox_ready.clear()
+                    await connection.outbox_ready.wait()
+                    continue
+
+                text, _ = connection.outbox.popleft()
+                await connection.websocket.send_text(text)
+                self.fanout_stats["frames_sent"] += 1
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to send message to connection {connection.connection_id}: {e}")
+            # Remove broken connection
+            await self._remove_connection(connection.connection_id)
+
+    async def _drain_outbox(self, connection: WebSocketConnection, timeout: float = 2.0):
+        """Wait (bounded) for a connection's queued frames to be written"""
+        deadline = time.monotonic() + timeout
+        while connection.outbox and time.monotonic() < deadline:
+            if connection.writer_task is None or connection.writer_task.done():
+                return
+            await asyncio.sleep(0.01)
+
+    async def _disconnect_slow_consumer(self, connection: WebSocketConnection):
+        """Close a connection whose send queue stayed full"""
+        connection.outbox.clear()
+        await self.disconnect(connection.connection_id, code=1013, reason="Slow consumer")
+
+    def _fan_out(
+        self,
+        connection_ids: Iterable[str],
+        message: Dict[str, Any],
+        exclude_connection: Optional[str] = None,
+        tenant_id: Optional[str] = None
+    ) -> int:
+        """Encode once and queue for every connection (of tenant_id, if given); returns frames queued"""
+        frame = self._encode(message)
+        queued = 0
+        for connection_id in list(connection_ids):
+            if connection_id == exclude_connection:
+                continue
+            connection = self.connections.get(connection_id)
+            if not connection or (tenant_id is not None and connection.tenant_id != tenant_id):
+                continue
+            connection.update_activity()
+            if self._enqueue(connection, frame):
+                queued += 1
+        return queued
+
+    def _publish_remote(
+        self,
+        target: str,
+        key: str,
+        message: Dict[str, Any],
+        exclude_connection: Optional[str] = None,
+        **fields: Any
+    ):
+        """Hand a broadcast to the backplane for the sockets of other workers"""
+        backplane = get_backplane()
+        if backplane is not None:
+            backplane.publish(target, key, message, exclude=exclude_connection, **fields)
+
+    async def deliver_remote(self, envelope: Dict[str, Any]):
+        """Deliver another worker's broadcast to this worker's sockets"""
+        target = envelope["target"]
+        key = envelope["key"]
+        message = envelope["message"]
+        exclude_connection = envelope.get("exclude")
+
+        if target == "conversation":
+            self._fan_out(self.conversation_connections.get(key, set()), message, exclude_connection)
+        elif target == "user":
+            self._fan_out(
+                self.user_connections.get(key, set()),
+                message,
+                exclude_connection,
+                tenant_id=envelope.get("tenant_id")
+            )
+        elif target == "tenant":
+            self._fan_out(self.tenant_connections.get(key, set()), message, exclude_connection)
+        await asyncio.sleep(0)
+
     async def send_to_connection(self, connection_id: str, message: Dict[str, Any]) -> bool:
         """
         Send message to specific connection.
+
+        The message is queued for the connection's writer task, so a slow
+        client never blocks the caller.
         
         Args:
             connection_id: Target connection
             message: Message to send
             
         Returns:
-            True if sent successfully, False otherwise
+            True if queued successfully, False otherwise
         """
         try:
             connection = self.connections.get(connection_id)
@@ -332,14 +503,12 @@ class WebSocketManager:
             # Update activity timestamp
             connection.update_activity()
             
-            # Send message
-            await connection.websocket.send_text(json.dumps(message))
-            return True
+            queued = self._enqueue(connection, self._encode(message))
+            await asyncio.sleep(0)
+            return queued
             
         except Exception as e:
             logger.error(f"Failed to send message to connection {connection_id}: {e}")
-            # Remove broken connection
-            await self._remove_connection(connection_id)
             return False
     
     async def send_to_user(
@@ -358,19 +527,14 @@ class WebSocketManager:
             message: Message to send
             exclude_connection: Connection to exclude from broadcast
         """
-        user_connections = self.user_connections.get(user_id, set())
-        
-        for connection_id in user_connections.copy():
-            if connection_id == exclude_connection:
-                continue
-                
-            connection = self.connections.get(connection_id)
-            if not connection or connection.tenant_id != tenant_id:
-                continue
-            
-            success = await self.send_to_connection(connection_id, message)
-            if not success:
-                user_connections.discard(connection_id)
+        self._fan_out(
+            self.user_connections.get(user_id, set()),
+            message,
+            exclude_connection,
+            tenant_id=tenant_id
+        )
+        self._publish_remote("user", user_id, message, exclude_connection, tenant_id=tenant_id)
+        await asyncio.sleep(0)
     
     async def broadcast_to_conversation(
         self,
@@ -386,15 +550,14 @@ class WebSocketManager:
             message: Message to broadcast
             exclude_connection: Connection to exclude from broadcast
         """
-        conv_connections = self.conversation_connections.get(conversation_id, set())
-        
-        for connection_id in conv_connections.copy():
-            if connection_id == exclude_connection:
-                continue
-            
-            success = await self.send_to_connection(connection_id, message)
-            if not success:
-                conv_connections.discard(connection_id)
+        self._fan_out(
+            self.conversation_connections.get(conversation_id, set()),
+            message,
+            exclude_connection
+        )
+        self._publish_remote("conversation", conversation_id, message, exclude_connection)
+        # Let writers run between bursts of queued frames
+        await asyncio.sleep(0)
     
     async def broadcast_to_tenant(
         self,
@@ -410,15 +573,13 @@ class WebSocketManager:
             message: Message to broadcast
             exclude_connection: Connection to exclude from broadcast
         """
-        tenant_connections = self.tenant_connections.get(tenant_id, set())
-
-        for connection_id in tenant_connections.copy():
-            if connection_id == exclude_connection:
-                continue
-
-            success = await self.send_to_connection(connection_id, message)
-            if not success:
-                tenant_connections.discard(connection_id)
+        self._fan_out(
+            self.tenant_connections.get(tenant_id, set()),
+            message,
+            exclude_connection
+        )
+        self._publish_remote("tenant", tenant_id, message, exclude_connection)
+        await asyncio.sleep(0)
 
     # Agentic Phase Event Methods
     async def emit_phase_start(
@@ -548,6 +709,8 @@ class WebSocketManager:
                 return await self._handle_leave_conversation(connection, message_data)
             elif message_type == "ping":
                 return await self._handle_ping(connection, message_data)
+            elif message_type == "resume_stream":
+                return await self._handle_resume_stream(connection, message_data)
             else:
                 logger.warning(f"Unknown message type: {message_type}")
                 return False
@@ -791,6 +954,32 @@ class WebSocketManager:
             logger.error(f"Error handling ping: {e}")
             return False
     
+    async def _handle_resume_stream(
+        self,
+        connection: WebSocketConnection,
+        message_data: Dict[str, Any]
+    ) -> bool:
+        """Re-send an in-progress AI response from the client's last offset"""
+        try:
+            stream = self.active_streams.get(message_data.get("message_id"))
+            if (
+                not stream
+                or stream.user_id != connection.user_id
+                or stream.tenant_id != connection.tenant_id
+            ):
+                await self.send_to_connection(connection.connection_id, {
+                    "type": "ai_response_resume_unavailable",
+                    "message_id": message_data.get("message_id")
+                })
+                return False
+
+            await stream.resume(connection.connection_id, int(message_data.get("offset", 0)))
+            return True
+
+        except Exception as e:
+            logger.error(f"Error resuming stream: {e}")
+            return False
+    
     def get_connection_stats(self) -> Dict[str, Any]:
         """Get connection statistics"""
         return {
@@ -803,7 +992,19 @@ class WebSocketManager:
             "connections_by_user": {
                 user_id: len(connections)
                 for user_id, connections in self.user_connections.items()
-            }
+            },
+            "fanout": self.get_fanout_stats(),
+            "backplane": get_backplane().stats if get_backplane() is not None else None
+        }
+
+    def get_fanout_stats(self) -> Dict[str, int]:
+        """Fan-out counters and current send queue depths"""
+        depths = [len(connection.outbox) for connection in self.connections.values()]
+        return {
+            **self.fanout_stats,
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "send_queue_size": self.send_queue_size
         }
 
 
@@ -913,12 +1114,28 @@ def authenticate_websocket_connection(token: str) -> tuple[str, str]:
 import socketio
 from typing import Dict, Any
 
+def _sio_client_manager() -> Optional[socketio.AsyncManager]:
+    """Redis client manager so room emits reach every worker (websocket_backplane=redis)"""
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    url = settings.websocket_backplane_redis_url or settings.cache_redis_url
+    if settings.websocket_backplane.lower() != "redis" or not url:
+        return None
+    try:
+        return socketio.AsyncRedisManager(url, channel=f"gt2:sio:{settings.tenant_domain}")
+    except Exception as e:
+        logger.error(f"Socket.IO Redis manager unavailable, emits stay local to this worker: {e}")
+        return None
+
+
 # Create Socket.IO server instance
 sio = socketio.AsyncServer(
     async_mode='asgi',
     cors_allowed_origins="*",  # Allow all origins for development
     logger=True,
-    engineio_logger=True
+    engineio_logger=True,
+    client_manager=_sio_client_manager()
 )
 
 # Create ASGI app for Socket.IO
@@ -1041,6 +1258,18 @@ async def join_conversation(sid, data):
         return {'error': str(e)}
 
 
+async def _sio_emit(event: str, data: Dict[str, Any], room: str):
+    """Emit to a Socket.IO room (on every worker when the Redis client manager is configured)"""
+    await sio.emit(event, data, room=room)
+
+
+async def start_websocket_backplane():
+    """Start receiving broadcasts from other workers (no-op without a backplane)"""
+    backplane = get_backplane()
+    if backplane is not None:
+        await backplane.start(websocket_manager.deliver_remote)
+
+
 # Enhanced WebSocket Manager with Socket.IO Integration
 class SocketIOWebSocketManager(WebSocketManager):
     """Extended WebSocket manager with Socket.IO support for agentic features"""
@@ -1055,7 +1284,7 @@ class SocketIOWebSocketManager(WebSocketManager):
                 'metadata': metadata or {}
             }
 
-            await sio.emit('phase_start', event_data, room=room)
+            await _sio_emit('phase_start', event_data, room)
             logger.debug(f"Socket.IO phase_start emitted to {room}: {phase}")
 
         except Exception as e:
@@ -1072,7 +1301,7 @@ class SocketIOWebSocketManager(WebSocketManager):
                 'metadata': metadata or {}
             }
 
-            await sio.emit('phase_transition', event_data, room=room)
+            await _sio_emit('phase_transition', event_data, room)
             logger.debug(f"Socket.IO phase_transition emitted to {room}: {from_phase} → {to_phase}")
 
         except Exception as e:
@@ -1087,7 +1316,7 @@ class SocketIOWebSocketManager(WebSocketManager):
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }
 
-            await sio.emit('tool_execution', event_data, room=room)
+            await _sio_emit('tool_execution', event_data, room)
             logger.debug(f"Socket.IO tool_execution emitted to {room}: {tool_execution.get('name')} - {tool_execution.get('status')}")
 
         except Exception as e:
@@ -1102,7 +1331,7 @@ class SocketIOWebSocketManager(WebSocketManager):
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }
 
-            await sio.emit('subagent_status', event_data, room=room)
+            await _sio_emit('subagent_status', event_data, room)
             logger.debug(f"Socket.IO subagent_status emitted to {room}: {subagent_status.get('type')} - {subagent_status.get('status')}")
 
         except Exception as e:
@@ -1117,7 +1346,7 @@ class SocketIOWebSocketManager(WebSocketManager):
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }
 
-            await sio.emit('source_retrieval', event_data, room=room)
+            await _sio_emit('source_retrieval', event_data, room)
             logger.debug(f"Socket.IO source_retrieval emitted to {room}: {source_retrieval.get('type')} - {source_retrieval.get('status')}")
 
         except Exception as e:
@@ -1192,7 +1421,7 @@ async def broadcast_conversation_update(conversation_id: str, event: str, data:
     """
     try:
         room = f"conversation_{conversation_id}"
-        await sio.emit(event, data, room=room)
+        await _sio_emit(event, data, room)
         logger.debug(f"Socket.IO {event} emitted to {room}")
     except Exception as e:
         logger.error(f"Failed to broadcast conversation update via Socket.IO: {e}")
@@ -1211,7 +1440,7 @@ async def broadcast_to_user(user_id: str, tenant_id: str, event: str, data: Dict
     try:
         # Broadcast to user's tenant room (all their devices)
         room = f"tenant_{tenant_id}"
-        await sio.emit(event, data, room=room)
+        await _sio_emit(event, data, room)
         logger.debug(f"Socket.IO {event} emitted to user {user_id} in {room}")
     except Exception as e:
         logger.error(f"Failed to broadcast to user via Socket.IO: {e}")
\ No newline at end of file
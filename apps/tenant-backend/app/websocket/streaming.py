@@ -0,0 +1,222 @@
+"""
+Delta Streaming Protocol for GT 2.0 AI Responses
+
+Streams an AI response to one WebSocket connection as delta-only frames:
+- Small model chunks are coalesced and flushed every FLUSH_INTERVAL_SECONDS,
+  or as soon as MAX_PENDING_CHARS are buffered
+- Every frame carries the offset of its delta, and at least every
+  CHECKPOINT_INTERVAL_CHARS a checkpoint {offset, crc32} of the content so
+  far. A client that reconnects (or detects a gap/mismatch) sends
+  {"type": "resume_stream", "message_id": ..., "offset": n} and receives the
+  content from n onwards
+- ai_typing previews to other conversation participants are rate limited to
+  one per TYPING_PREVIEW_INTERVAL_SECONDS
+
+Offsets count UTF-16 code units, the unit of JavaScript string length and
+slicing, so a client can compare them with the text it holds (characters
+outside the Basic Multilingual Plane, e.g. most emoji, count as two). crc32
+is zlib.crc32 of the UTF-8 encoded content before the offset.
+
+Frames:
+    {"type": "ai_response_delta", "conversation_id", "message_id",
+     "offset", "delta", "checkpoint"?: {"offset", "crc32"}}
+"""
+
+import asyncio
+import logging
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _utf16_length(text: str) -> int:
+    """Length of text in UTF-16 code units (JavaScript string length)"""
+    return len(text.encode("utf-16-le")) // 2
+
+
+FLUSH_INTERVAL_SECONDS = 0.025
+MAX_PENDING_CHARS = 1024
+CHECKPOINT_INTERVAL_CHARS = 4096
+TYPING_PREVIEW_INTERVAL_SECONDS = 0.5
+TYPING_PREVIEW_CHARS = 50
+
+
+class ResponseStream:
+    """
+    Delta-only, coalesced stream of one AI response.
+
+    The response is assembled in a list buffer; the full string is only
+    joined for resume requests and when the stream completes.
+    """
+
+    def __init__(
+        self,
+        manager: Any,
+        connection_id: str,
+        conversation_id: str,
+        message_id: str,
+        user_id: str,
+        tenant_id: str
+    ):
+        self.manager = manager
+        self.connection_id = connection_id
+        self.conversation_id = conversation_id
+        self.message_id = message_id
+        self.user_id = user_id
+        self.tenant_id = tenant_id
+
+        self._parts: List[str] = []
+        # Lengths and offsets are in UTF-16 code units
+        self._length = 0
+        self._crc = 0
+
+        # Content not yet sent to the client
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._sent_length = 0
+        self._sent_crc = 0
+        self._last_checkpoint = 0
+
+        self._last_preview = 0.0
+        self._send_lock = asyncio.Lock()
+        self._flush_timer: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def length(self) -> int:
+        """UTF-16 code units received so far"""
+        return self._length
+
+    def content(self) -> str:
+        """Full response so far"""
+        return "".join(self._parts)
+
+    def checkpoint(self) -> Dict[str, int]:
+        """Offset and crc32 of everything received so far"""
+        return {"offset": self._length, "crc32": self._crc}
+
+    async def write(self, chunk: str) -> None:
+        """Append a model chunk; it is sent with the next coalesced frame"""
+        if not chunk:
+            return
+
+        self._parts.append(chunk)
+        self._length += _utf16_length(chunk)
+        self._crc = zlib.crc32(chunk.encode("utf-8"), self._crc)
+        self._pending.append(chunk)
+        self._pending_chars += len(chunk)
+
+        if self._pending_chars >= MAX_PENDING_CHARS:
+            await self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.create_task(self._flush_later())
+
+        await self._maybe_send_preview()
+
+    async def _flush_later(self) -> None:
+        """Flush whatever is pending at the end of the coalescing window"""
+        await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+        # Cleared before flushing so flush() never cancels a running send
+        self._flush_timer = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Delayed stream flush failed for message {self.message_id}: {e}")
+
+    async def flush(self) -> None:
+        """Send pending content as one delta frame"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        async with self._send_lock:
+            if self._closed or not self._pending:
+                return
+
+            delta = "".join(self._pending)
+            offset = self._sent_length
+            self._pending = []
+            self._pending_chars = 0
+            self._sent_length += _utf16_length(delta)
+            self._sent_crc = zlib.crc32(delta.encode("utf-8"), self._sent_crc)
+
+            frame: Dict[str, Any] = {
+                "type": "ai_response_delta",
+                "conversation_id": self.conversation_id,
+                "message_id": self.message_id,
+                "offset": offset,
+                "delta": delta
+            }
+            if self._sent_length - self._last_checkpoint >= CHECKPOINT_INTERVAL_CHARS:
+                frame["checkpoint"] = {"offset": self._sent_length, "crc32": self._sent_crc}
+                self._last_checkpoint = self._sent_length
+
+            await self.manager.send_to_connection(self.connection_id, frame)
+
+    async def _maybe_send_preview(self) -> None:
+        """Rate-limited ai_typing preview for the other participants"""
+        now = time.monotonic()
+        if now - self._last_preview < TYPING_PREVIEW_INTERVAL_SECONDS:
+            return
+        self._last_preview = now
+
+        # Only the tail is needed; walk back over the last few parts
+        tail: List[str] = []
+        tail_chars = 0
+        for part in reversed(self._parts):
+            tail.append(part)
+            tail_chars += len(part)
+            if tail_chars >= TYPING_PREVIEW_CHARS:
+                break
+        preview = "".join(reversed(tail))[-TYPING_PREVIEW_CHARS:]
+
+        await self.manager.broadcast_to_conversation(
+            self.conversation_id,
+            {
+                "type": "ai_typing",
+                "conversation_id": self.conversation_id,
+                "content_preview": preview
+            },
+            exclude_connection=self.connection_id
+        )
+
+    async def close(self) -> None:
+        """
+        Stop sending frames (the response failed or finished).
+
+        Cancels the pending flush and waits for a send in progress, so no
+        delta can follow the caller's next frame (e.g. ai_response_error).
+        """
+        self._closed = True
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        async with self._send_lock:
+            pass
+
+    async def resume(self, connection_id: str, offset: int) -> None:
+        """
+        Re-send everything from offset (UTF-16 code units) to a (possibly new)
+        connection.
+
+        Later frames go to that connection.
+        """
+        async with self._send_lock:
+            self.connection_id = connection_id
+            content = "".join(self._parts[:len(self._parts) - len(self._pending)])
+            encoded = content.encode("utf-16-le")
+            offset = max(0, min(offset, len(encoded) // 2))
+            # An offset inside a surrogate pair resumes from the whole character
+            unit = encoded[offset * 2:offset * 2 + 2]
+            if unit and 0xDC00 <= int.from_bytes(unit, "little") <= 0xDFFF:
+                offset -= 1
+            await self.manager.send_to_connection(connection_id, {
+                "type": "ai_response_delta",
+                "conversation_id": self.conversation_id,
+                "message_id": self.message_id,
+                "offset": offset,
+                "delta": encoded[offset * 2:].decode("utf-16-le"),
+                "checkpoint": {"offset": self._sent_length, "crc32": self._sent_crc}
+            })
@@ -0,0 +1,29 @@
+"""
+Setup configuration for GT 2.0 Rate Limiting package
+"""
+
+from setuptools import setup, find_packages
+
+setup(
+    name="gt2-rate-limiter",
+    version="1.0.0",
+    description="GT 2.0 GCRA rate limiting engine (per-worker or Redis-protocol shared state)",
+    author="GT Edge AI",
+    author_email="engineering@gtedgeai.com",
+    packages=find_packages(where="src"),
+    package_dir={"": "src"},
+    python_requires=">=3.11",
+    install_requires=[],
+    extras_require={
+        "redis": [
+            "redis>=5.0.1",
+        ]
+    },
+    classifiers=[
+        "Development Status :: 5 - Production/Stable",
+        "Intended Audience :: Developers",
+        "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3.11",
+        "Programming Language :: Python :: 3.12",
+    ],
+)
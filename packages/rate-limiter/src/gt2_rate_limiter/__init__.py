@@ -0,0 +1,29 @@
+"""
+GT 2.0 Rate Limiting
+
+Shared GCRA rate limiting engine used by the Tenant Backend and the
+Resource Cluster. Each service builds its limiter with create_rate_limiter()
+and its own namespace.
+"""
+
+from .gcra import (
+    RateLimitResult,
+    RateLimitStore,
+    MemoryRateLimitStore,
+    RedisRateLimitStore,
+    RateLimiter,
+    retry_after_seconds,
+    create_rate_limiter
+)
+
+__all__ = [
+    'RateLimitResult',
+    'RateLimitStore',
+    'MemoryRateLimitStore',
+    'RedisRateLimitStore',
+    'RateLimiter',
+    'retry_after_seconds',
+    'create_rate_limiter'
+]
+
+__version__ = '1.0.0'
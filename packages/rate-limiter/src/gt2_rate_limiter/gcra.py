@@ -0,0 +1,210 @@
+"""
+GCRA Rate Limiting Engine for GT 2.0 Services
+
+GCRA (generic cell rate algorithm) limiter. Each key stores a single
+"theoretical arrival time" (TAT), so a check is one O(1) read-modify-write
+instead of scanning a list of request timestamps. A limit of N requests per
+period allows a burst of N and then one request every period/N seconds.
+
+Stores:
+- MemoryRateLimitStore: per-worker dict; keys whose TAT has passed carry no
+  state and are evicted by a periodic sweep
+- RedisRateLimitStore: any Redis-protocol server (Redis, Valkey, KeyDB), so
+  limits hold across workers and replicas. The update is one atomic Lua
+  script using the server clock; keys expire when idle. Keys are prefixed
+  with the caller's namespace so services can share one server. Requires
+  the optional `redis` package.
+
+If the shared store is unreachable the limiter falls back to the per-worker
+store rather than rejecting traffic.
+"""
+
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate limit check"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # Seconds until the request would be allowed (0 if allowed)
+    reset_after: float  # Seconds until the full burst is available again
+
+
+def _result(allowed: bool, limit: int, emission_interval: float, slack: float, reset_after: float) -> RateLimitResult:
+    if allowed:
+        return RateLimitResult(
+            allowed=True,
+            limit=limit,
+            remaining=int(slack / emission_interval + 1e-9),
+            retry_after=0.0,
+            reset_after=max(0.0, reset_after)
+        )
+    return RateLimitResult(
+        allowed=False,
+        limit=limit,
+        remaining=0,
+        retry_after=max(0.0, slack),
+        reset_after=max(0.0, reset_after)
+    )
+
+
+class RateLimitStore(ABC):
+    """Storage for GCRA state"""
+
+    @abstractmethod
+    async def acquire(self, key: str, limit: int, period: float, cost: int = 1) -> RateLimitResult:
+        """Consume cost units for key if allowed by limit per period"""
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Per-worker GCRA state with idle-key eviction"""
+
+    def __init__(self, sweep_interval: float = 60.0):
+        self._tats: Dict[str, float] = {}
+        self._sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    async def acquire(self, key: str, limit: int, period: float, cost: int = 1) -> RateLimitResult:
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        emission_interval = period / limit
+        tat = max(self._tats.get(key, now), now)
+        new_tat = tat + emission_interval * cost
+        allow_at = new_tat - period
+
+        if allow_at > now:
+            return _result(False, limit, emission_interval, allow_at - now, tat - now)
+
+        self._tats[key] = new_tat
+        return _result(True, limit, emission_interval, now - allow_at, new_tat - now)
+
+    def _sweep(self, now: float) -> None:
+        # A key whose TAT has passed is equivalent to an absent key
+        idle = [key for key, tat in self._tats.items() if tat <= now]
+        for key in idle:
+            del self._tats[key]
+        self._next_sweep = now + self._sweep_interval
+        if idle:
+            logger.debug(f"Evicted {len(idle)} idle rate limit keys ({len(self._tats)} active)")
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+# KEYS[1] = key; ARGV = emission_interval, period, cost
+# Returns {allowed, slack, reset_after}; floats as strings (Lua numbers are truncated)
+_GCRA_SCRIPT = """
+local emission_interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+  tat = now
+end
+local new_tat = tat + emission_interval * cost
+local allow_at = new_tat - period
+if allow_at > now then
+  return {0, tostring(allow_at - now), tostring(tat - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, tostring(now - allow_at), tostring(new_tat - now)}
+"""
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """GCRA state in a Redis-protocol server, shared across workers and replicas"""
+
+    def __init__(self, url: str, namespace: str):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("rate_limit_backend=redis requires the 'redis' package") from e
+
+        self._redis = redis_asyncio.from_url(url, decode_responses=True)
+        self._script = self._redis.register_script(_GCRA_SCRIPT)
+        self._prefix = f"gt2:ratelimit:{namespace}:"
+
+    async def acquire(self, key: str, limit: int, period: float, cost: int = 1) -> RateLimitResult:
+        emission_interval = period / limit
+        allowed, slack, reset_after = await self._script(
+            keys=[self._prefix + key],
+            args=[emission_interval, period, cost]
+        )
+        return _result(bool(int(allowed)), limit, emission_interval, float(slack), float(reset_after))
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class RateLimiter:
+    """GCRA rate limiter over a (possibly shared) store"""
+
+    def __init__(self, store: RateLimitStore):
+        self.store = store
+        self._fallback = store if isinstance(store, MemoryRateLimitStore) else MemoryRateLimitStore()
+        self._last_store_error = 0.0
+
+    async def hit(self, key: str, limit: int, period: float = 60.0, cost: int = 1) -> RateLimitResult:
+        """
+        Record a request against key and report whether it is allowed.
+
+        Args:
+            key: Limited identity (e.g. "ip:1.2.3.4", "llm:user:model")
+            limit: Requests allowed per period (also the burst size)
+            period: Period in seconds
+            cost: Units consumed by this request
+        """
+        if limit <= 0:
+            return RateLimitResult(allowed=False, limit=limit, remaining=0, retry_after=period, reset_after=period)
+
+        if self.store is not self._fallback:
+            try:
+                return await self.store.acquire(key, limit, period, cost)
+            except Exception as e:
+                now = time.monotonic()
+                if now - self._last_store_error > 30:
+                    # Log at most every 30s while the store is down
+                    logger.warning(f"Shared rate limit store unavailable, using per-worker limits: {e}")
+                    self._last_store_error = now
+
+        return await self._fallback.acquire(key, limit, period, cost)
+
+    async def close(self) -> None:
+        await self.store.close()
+
+
+def retry_after_seconds(result: RateLimitResult) -> int:
+    """Whole seconds for a Retry-After header"""
+    return max(1, math.ceil(result.retry_after))
+
+
+def create_rate_limiter(backend: str, redis_url: Optional[str], namespace: str) -> RateLimiter:
+    """Build a limiter for the configured backend, falling back to per-worker state"""
+    backend = (backend or "memory").lower()
+    if backend == "redis":
+        try:
+            if not redis_url:
+                raise ValueError("rate_limit_backend=redis requires rate_limit_redis_url")
+            store = RedisRateLimitStore(redis_url, namespace=namespace)
+            logger.info("Using shared redis rate limit store")
+            return RateLimiter(store)
+        except Exception as e:
+            logger.error(f"Failed to initialize redis rate limit store, using per-worker limits: {e}")
+    return RateLimiter(MemoryRateLimitStore())
+
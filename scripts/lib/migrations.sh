@@ -358,6 +358,41 @@ check_migration_T009() {
     [ "$exists" != "t" ]
 }
 
+check_migration_T010() {
+    # Returns true (needs migration) if document_chunks.content_tsv column doesn't exist
+    local exists=$(docker exec gentwo-tenant-postgres-primary psql -U postgres -d gt2_tenants -tAc \
+        "SELECT EXISTS (SELECT FROM information_schema.columns WHERE table_schema='tenant_test_company' AND table_name='document_chunks' AND column_name='content_tsv');" 2>/dev/null || echo "false")
+    [ "$exists" != "t" ]
+}
+
+check_migration_T011() {
+    # Returns true (needs migration) if embedding_cache table doesn't exist
+    local exists=$(docker exec gentwo-tenant-postgres-primary psql -U postgres -d gt2_tenants -tAc \
+        "SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_schema='tenant_test_company' AND table_name='embedding_cache');" 2>/dev/null || echo "false")
+    [ "$exists" != "t" ]
+}
+
+check_migration_T012() {
+    # Returns true (needs migration) if conversation_files.chunk_token_counts doesn't exist
+    local exists=$(docker exec gentwo-tenant-postgres-primary psql -U postgres -d gt2_tenants -tAc \
+        "SELECT EXISTS (SELECT FROM information_schema.columns WHERE table_schema='tenant_test_company' AND table_name='conversation_files' AND column_name='chunk_token_counts');" 2>/dev/null || echo "false")
+    [ "$exists" != "t" ]
+}
+
+check_migration_T013() {
+    # Returns true (needs migration) if usage_rollup_daily table doesn't exist
+    local exists=$(docker exec gentwo-tenant-postgres-primary psql -U postgres -d gt2_tenants -tAc \
+        "SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_schema='tenant_test_company' AND table_name='usage_rollup_daily');" 2>/dev/null || echo "false")
+    [ "$exists" != "t" ]
+}
+
+check_migration_T014() {
+    # Returns true (needs migration) if messages.content_tsv column doesn't exist
+    local exists=$(docker exec gentwo-tenant-postgres-primary psql -U postgres -d gt2_tenants -tAc \
+        "SELECT EXISTS (SELECT FROM information_schema.columns WHERE table_schema='tenant_test_company' AND table_name='messages' AND column_name='content_tsv');" 2>/dev/null || echo "false")
+    [ "$exists" != "t" ]
+}
+
 # Run all admin migrations
 run_admin_migrations() {
     log_header "Admin Database Migrations"
@@ -473,6 +508,21 @@ run_tenant_migrations() {
     # T009 - Tenant-scoped agent categories (Issue #215)
     run_tenant_migration "T009" "scripts/postgresql/migrations/T009_tenant_scoped_categories.sql" "check_migration_T009" || return 1
 
+    # T010 - Stored tsvector + HNSW index for single-pass hybrid search
+    run_tenant_migration "T010" "scripts/postgresql/migrations/T010_hybrid_search_indexes.sql" "check_migration_T010" || return 1
+
+    # T011 - Content-hash embedding cache
+    run_tenant_migration "T011" "scripts/postgresql/migrations/T011_embedding_cache.sql" "check_migration_T011" || return 1
+
+    # T012 - Stored per-chunk token counts for conversation files
+    run_tenant_migration "T012" "scripts/postgresql/migrations/T012_chunk_token_counts.sql" "check_migration_T012" || return 1
+
+    # T013 - Incremental usage rollups for observability dashboards
+    run_tenant_migration "T013" "scripts/postgresql/migrations/T013_usage_rollups.sql" "check_migration_T013" || return 1
+
+    # T014 - Stored tsvector for native conversation search
+    run_tenant_migration "T014" "scripts/postgresql/migrations/T014_conversation_search.sql" "check_migration_T014" || return 1
+
     log_success "All tenant migrations complete"
     return 0
 }
@@ -0,0 +1,91 @@
+-- T010_hybrid_search_indexes.sql
+-- Hybrid search: stored tsvector column + ANN index for single-pass RRF retrieval
+--
+-- Changes:
+-- 1. Adds document_chunks.content_tsv (tsvector GENERATED ALWAYS ... STORED) so
+--    full-text ranking no longer recomputes to_tsvector() for every candidate row
+-- 2. Adds a GIN index on content_tsv for the text candidate list
+-- 3. Ensures an HNSW cosine index on document_chunks.embedding exists in every
+--    tenant schema so ORDER BY embedding <=> $1 LIMIT k is served from the index
+-- 4. Adds a dataset_id index used to filter both candidate lists
+--
+-- Used by: PGVectorSearchService._execute_hybrid_query (tenant-backend)
+-- Note: Adding a STORED generated column rewrites document_chunks once.
+--
+-- Rollback: See bottom of file
+
+BEGIN;
+
+-- Apply to all existing tenant schemas
+DO $$
+DECLARE
+    tenant_schema TEXT;
+BEGIN
+    FOR tenant_schema IN
+        SELECT schema_name
+        FROM information_schema.schemata
+        WHERE schema_name LIKE 'tenant_%' AND schema_name != 'tenant_template'
+    LOOP
+        -- Skip schemas that never had document_chunks (e.g. partially provisioned tenants)
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.tables
+            WHERE table_schema = tenant_schema AND table_name = 'document_chunks'
+        ) THEN
+            CONTINUE;
+        END IF;
+
+        -- Stored tsvector column
+        -- Optimizes: ts_rank_cd()/@@ in hybrid search read a precomputed vector
+        EXECUTE format('
+            ALTER TABLE %I.document_chunks
+              ADD COLUMN IF NOT EXISTS content_tsv tsvector
+              GENERATED ALWAYS AS (to_tsvector(''english''::regconfig, content)) STORED
+        ', tenant_schema);
+
+        -- GIN index for the text candidate list
+        EXECUTE format('
+            CREATE INDEX IF NOT EXISTS idx_document_chunks_content_tsv
+              ON %I.document_chunks
+              USING gin (content_tsv)
+        ', tenant_schema);
+
+        -- HNSW index for the vector candidate list (cosine distance, matches <=>)
+        EXECUTE format('
+            CREATE INDEX IF NOT EXISTS idx_document_chunks_embedding_hnsw
+              ON %I.document_chunks
+              USING hnsw (embedding public.vector_cosine_ops)
+        ', tenant_schema);
+
+        -- Dataset filter applied to both candidate lists
+        EXECUTE format('
+            CREATE INDEX IF NOT EXISTS idx_document_chunks_dataset_id
+              ON %I.document_chunks
+              USING btree (dataset_id)
+        ', tenant_schema);
+
+        RAISE NOTICE 'Applied T010 hybrid search indexes to schema: %', tenant_schema;
+    END LOOP;
+END $$;
+
+COMMIT;
+
+-- Performance Notes:
+-- - Hybrid search previously filtered on 1 - (embedding <=> $1) >= threshold, which
+--   cannot use an ANN index and forced a sequential scan of document_chunks
+-- - The new query takes the top-K of each list from its index and fuses them with
+--   reciprocal-rank fusion, so cost is O(K) instead of O(chunks)
+-- - Safe to run multiple times (IF NOT EXISTS)
+--
+-- Rollback (if needed):
+-- DO $$
+-- DECLARE tenant_schema TEXT;
+-- BEGIN
+--     FOR tenant_schema IN
+--         SELECT schema_name FROM information_schema.schemata
+--         WHERE schema_name LIKE 'tenant_%' AND schema_name != 'tenant_template'
+--     LOOP
+--         EXECUTE format('DROP INDEX IF EXISTS %I.idx_document_chunks_content_tsv', tenant_schema);
+--         EXECUTE format('DROP INDEX IF EXISTS %I.idx_document_chunks_dataset_id', tenant_schema);
+--         EXECUTE format('ALTER TABLE %I.document_chunks DROP COLUMN IF EXISTS content_tsv', tenant_schema);
+--     END LOOP;
+-- END $$;
@@ -0,0 +1,66 @@
+-- T011_embedding_cache.sql
+-- Content-hash embedding cache (durable tier)
+--
+-- Changes:
+-- 1. Creates embedding_cache table in each tenant schema, keyed by
+--    (model, content_hash), storing only the hash and the vector (no text)
+--
+-- Used by: app/services/embedding_cache.py (tenant-backend). Re-uploads,
+-- dataset copies and reprocessing reuse cached vectors instead of calling
+-- the embedding service again.
+--
+-- Rollback: See bottom of file
+
+BEGIN;
+
+-- Apply to all existing tenant schemas
+DO $$
+DECLARE
+    tenant_schema TEXT;
+BEGIN
+    FOR tenant_schema IN
+        SELECT schema_name
+        FROM information_schema.schemata
+        WHERE schema_name LIKE 'tenant_%' AND schema_name != 'tenant_template'
+    LOOP
+        EXECUTE format('
+            CREATE TABLE IF NOT EXISTS %I.embedding_cache (
+                model VARCHAR(255) NOT NULL,
+                content_hash VARCHAR(64) NOT NULL,
+                embedding public.vector(1024) NOT NULL,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (model, content_hash)
+            )
+        ', tenant_schema);
+
+        -- Supports age-based pruning of the cache
+        EXECUTE format('
+            CREATE INDEX IF NOT EXISTS idx_embedding_cache_created_at
+              ON %I.embedding_cache
+              USING btree (created_at)
+        ', tenant_schema);
+
+        BEGIN
+            EXECUTE format('GRANT SELECT, INSERT, UPDATE, DELETE ON %I.embedding_cache TO gt2_tenant_user', tenant_schema);
+        EXCEPTION
+            WHEN undefined_object THEN
+                RAISE NOTICE 'Role gt2_tenant_user does not exist (ok for fresh installs)';
+        END;
+
+        RAISE NOTICE 'Applied T011 embedding cache to schema: %', tenant_schema;
+    END LOOP;
+END $$;
+
+COMMIT;
+
+-- Rollback (if needed):
+-- DO $$
+-- DECLARE tenant_schema TEXT;
+-- BEGIN
+--     FOR tenant_schema IN
+--         SELECT schema_name FROM information_schema.schemata
+--         WHERE schema_name LIKE 'tenant_%' AND schema_name != 'tenant_template'
+--     LOOP
+--         EXECUTE format('DROP TABLE IF EXISTS %I.embedding_cache', tenant_schema);
+--     END LOOP;
+-- END $$;
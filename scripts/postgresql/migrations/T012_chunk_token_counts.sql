@@ -0,0 +1,56 @@
+-- T012_chunk_token_counts.sql
+-- Per-chunk token counts for conversation file context budgeting
+--
+-- Changes:
+-- 1. Adds conversation_files.chunk_token_counts (integer[]), aligned with
+--    processed_chunks, filled at processing time by the tokenizer layer
+--
+-- Used by: ConversationFileService / utils.token_counter (tenant-backend).
+-- Chat-time budgeting reads stored counts instead of tokenizing every
+-- attached chunk per message. document_chunks.token_count already exists and
+-- is now written with tokenizer counts at ingest.
+-- Rows processed before this migration have NULL counts and are counted on demand.
+--
+-- Rollback: See bottom of file
+
+BEGIN;
+
+-- Apply to all existing tenant schemas
+DO $$
+DECLARE
+    tenant_schema TEXT;
+BEGIN
+    FOR tenant_schema IN
+        SELECT schema_name
+        FROM information_schema.schemata
+        WHERE schema_name LIKE 'tenant_%' AND schema_name != 'tenant_template'
+    LOOP
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.tables
+            WHERE table_schema = tenant_schema AND table_name = 'conversation_files'
+        ) THEN
+            CONTINUE;
+        END IF;
+
+        EXECUTE format('
+            ALTER TABLE %I.conversation_files
+              ADD COLUMN IF NOT EXISTS chunk_token_counts integer[]
+        ', tenant_schema);
+
+        RAISE NOTICE 'Applied T012 chunk token counts to schema: %', tenant_schema;
+    END LOOP;
+END $$;
+
+COMMIT;
+
+-- Rollback (if needed):
+-- DO $$
+-- DECLARE tenant_schema TEXT;
+-- BEGIN
+--     FOR tenant_schema IN
+--         SELECT schema_name FROM information_schema.schemata
+--         WHERE schema_name LIKE 'tenant_%' AND schema_name != 'tenant_template'
+--     LOOP
+--         EXECUTE format('ALTER TABLE %I.conversation_files DROP COLUMN IF EXISTS chunk_token_counts', tenant_schema);
+--     END LOOP;
+-- END $$;
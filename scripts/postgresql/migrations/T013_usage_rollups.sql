@@ -0,0 +1,133 @@
+-- T013_usage_rollups.sql
+-- Incrementally maintained usage rollups for the observability dashboards
+--
+-- Changes:
+-- 1. Creates usage_rollup_hourly and usage_rollup_daily in each tenant schema:
+--    conversations, messages, tokens and content size per
+--    (tenant, bucket, user, agent, model)
+-- 2. Creates usage_rollup_state (per-tenant watermark of the last rollup pass)
+-- 3. Creates usage_rollup_dirty_days plus statement-level AFTER DELETE
+--    triggers on messages and conversations, so days whose source rows were
+--    deleted are recomputed by the next pass
+--
+-- Used by: app/services/usage_rollup_service.py (tenant-backend). The rollups
+-- are filled by the background rollup job; its first pass backfills all
+-- history, so no data is copied here.
+--
+-- Rollback: See bottom of file
+
+BEGIN;
+
+-- Apply to all existing tenant schemas
+DO $$
+DECLARE
+    tenant_schema TEXT;
+    rollup_table TEXT;
+BEGIN
+    FOR tenant_schema IN
+        SELECT schema_name
+        FROM information_schema.schemata
+        WHERE schema_name LIKE 'tenant_%' AND schema_name != 'tenant_template'
+    LOOP
+        FOREACH rollup_table IN ARRAY ARRAY['usage_rollup_hourly', 'usage_rollup_daily']
+        LOOP
+            -- agent_id is the all-zero UUID for conversations without an agent;
+            -- model is '' for user messages and conversation counts
+            EXECUTE format('
+                CREATE TABLE IF NOT EXISTS %I.%I (
+                    tenant_id UUID NOT NULL,
+                    bucket_start TIMESTAMPTZ NOT NULL,
+                    user_id UUID NOT NULL,
+                    agent_id UUID NOT NULL,
+                    model VARCHAR(100) NOT NULL,
+                    conversations INTEGER NOT NULL DEFAULT 0,
+                    active_conversations INTEGER NOT NULL DEFAULT 0,
+                    messages INTEGER NOT NULL DEFAULT 0,
+                    tokens BIGINT NOT NULL DEFAULT 0,
+                    content_bytes BIGINT NOT NULL DEFAULT 0,
+                    PRIMARY KEY (tenant_id, bucket_start, user_id, agent_id, model)
+                )
+            ', tenant_schema, rollup_table);
+
+            -- Per-user dashboards and storage breakdowns
+            EXECUTE format('
+                CREATE INDEX IF NOT EXISTS %I
+                  ON %I.%I
+                  USING btree (tenant_id, user_id, bucket_start)
+            ', 'idx_' || rollup_table || '_user', tenant_schema, rollup_table);
+        END LOOP;
+
+        EXECUTE format('
+            CREATE TABLE IF NOT EXISTS %I.usage_rollup_state (
+                tenant_id UUID PRIMARY KEY,
+                watermark TIMESTAMPTZ NOT NULL,
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+        ', tenant_schema);
+
+        EXECUTE format('
+            CREATE TABLE IF NOT EXISTS %I.usage_rollup_dirty_days (
+                bucket_start TIMESTAMPTZ PRIMARY KEY,
+                marked_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+        ', tenant_schema);
+
+        EXECUTE format($fn$
+            CREATE OR REPLACE FUNCTION %1$I.mark_usage_rollup_dirty()
+            RETURNS trigger
+            LANGUAGE plpgsql
+            AS $body$
+            BEGIN
+                INSERT INTO %1$I.usage_rollup_dirty_days (bucket_start)
+                SELECT DISTINCT DATE_TRUNC('day', created_at) FROM old_rows
+                ON CONFLICT DO NOTHING;
+                RETURN NULL;
+            END;
+            $body$
+        $fn$, tenant_schema);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS usage_rollup_dirty_messages ON %I.messages', tenant_schema);
+        EXECUTE format('
+            CREATE TRIGGER usage_rollup_dirty_messages
+              AFTER DELETE ON %1$I.messages
+              REFERENCING OLD TABLE AS old_rows
+              FOR EACH STATEMENT EXECUTE FUNCTION %1$I.mark_usage_rollup_dirty()
+        ', tenant_schema);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS usage_rollup_dirty_conversations ON %I.conversations', tenant_schema);
+        EXECUTE format('
+            CREATE TRIGGER usage_rollup_dirty_conversations
+              AFTER DELETE ON %1$I.conversations
+              REFERENCING OLD TABLE AS old_rows
+              FOR EACH STATEMENT EXECUTE FUNCTION %1$I.mark_usage_rollup_dirty()
+        ', tenant_schema);
+
+        BEGIN
+            EXECUTE format('GRANT SELECT, INSERT, UPDATE, DELETE ON %I.usage_rollup_hourly, %I.usage_rollup_daily, %I.usage_rollup_state, %I.usage_rollup_dirty_days TO gt2_tenant_user',
+                tenant_schema, tenant_schema, tenant_schema, tenant_schema);
+        EXCEPTION
+            WHEN undefined_object THEN
+                RAISE NOTICE 'Role gt2_tenant_user does not exist (ok for fresh installs)';
+        END;
+
+        RAISE NOTICE 'Applied T013 usage rollups to schema: %', tenant_schema;
+    END LOOP;
+END $$;
+
+COMMIT;
+
+-- Rollback (if needed):
+-- DO $$
+-- DECLARE tenant_schema TEXT;
+-- BEGIN
+--     FOR tenant_schema IN
+--         SELECT schema_name FROM information_schema.schemata
+--         WHERE schema_name LIKE 'tenant_%' AND schema_name != 'tenant_template'
+--     LOOP
+--         EXECUTE format('DROP TRIGGER IF EXISTS usage_rollup_dirty_messages ON %I.messages', tenant_schema);
+--         EXECUTE format('DROP TRIGGER IF EXISTS usage_rollup_dirty_conversations ON %I.conversations', tenant_schema);
+--         EXECUTE format('DROP FUNCTION IF EXISTS %I.mark_usage_rollup_dirty()', tenant_schema);
+--         EXECUTE format('DROP TABLE IF EXISTS %I.usage_rollup_hourly, %I.usage_rollup_daily, %I.usage_rollup_state, %I.usage_rollup_dirty_days',
+--             tenant_schema, tenant_schema, tenant_schema, tenant_schema);
+--     END LOOP;
+-- END $$;
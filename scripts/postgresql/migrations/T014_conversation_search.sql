@@ -0,0 +1,87 @@
+-- T014_conversation_search.sql
+-- Native conversation search: stored tsvector + ANN index on messages
+--
+-- Changes:
+-- 1. Adds messages.content_tsv (tsvector GENERATED ALWAYS ... STORED) so
+--    conversation search ranks a precomputed vector instead of calling
+--    to_tsvector() for every candidate message
+-- 2. Adds a GIN index on content_tsv for the text candidate list
+-- 3. Ensures a partial HNSW cosine index on messages.embedding exists in every
+--    tenant schema (embeddings are optional and filled by the background
+--    indexer when conversation_search_embeddings_enabled is set)
+--
+-- Used by: ConversationSearchService (tenant-backend), which replaces the MCP
+-- conversation_server round trip for /api/v1/search/conversations
+-- Note: Adding a STORED generated column rewrites messages once. The older
+-- expression index idx_messages_content_fts is kept for unmigrated code paths.
+--
+-- Rollback: See bottom of file
+
+BEGIN;
+
+-- Apply to all existing tenant schemas
+DO $$
+DECLARE
+    tenant_schema TEXT;
+BEGIN
+    FOR tenant_schema IN
+        SELECT schema_name
+        FROM information_schema.schemata
+        WHERE schema_name LIKE 'tenant_%' AND schema_name != 'tenant_template'
+    LOOP
+        -- Skip schemas that never had messages (e.g. partially provisioned tenants)
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.tables
+            WHERE table_schema = tenant_schema AND table_name = 'messages'
+        ) THEN
+            CONTINUE;
+        END IF;
+
+        -- Stored tsvector column
+        -- Optimizes: ts_rank_cd()/@@ in conversation search read a precomputed vector
+        EXECUTE format('
+            ALTER TABLE %I.messages
+              ADD COLUMN IF NOT EXISTS content_tsv tsvector
+              GENERATED ALWAYS AS (to_tsvector(''english''::regconfig, content)) STORED
+        ', tenant_schema);
+
+        -- GIN index for the text candidate list
+        EXECUTE format('
+            CREATE INDEX IF NOT EXISTS idx_messages_content_tsv
+              ON %I.messages
+              USING gin (content_tsv)
+        ', tenant_schema);
+
+        -- HNSW index for the vector candidate list (cosine distance, matches <=>)
+        EXECUTE format('
+            CREATE INDEX IF NOT EXISTS idx_messages_embedding_hnsw
+              ON %I.messages
+              USING hnsw (embedding public.vector_cosine_ops)
+              WHERE embedding IS NOT NULL
+        ', tenant_schema);
+
+        RAISE NOTICE 'Applied T014 conversation search indexes to schema: %', tenant_schema;
+    END LOOP;
+END $$;
+
+COMMIT;
+
+-- Performance Notes:
+-- - Conversation search previously went tenant-backend -> resource cluster MCP
+--   conversation_server -> tenant data; it is now one indexed query in tenant-backend
+-- - The text list is served from the GIN index and restricted to the user's
+--   conversations; snippets (ts_headline) are only computed for the returned page
+-- - Safe to run multiple times (IF NOT EXISTS)
+--
+-- Rollback (if needed):
+-- DO $$
+-- DECLARE tenant_schema TEXT;
+-- BEGIN
+--     FOR tenant_schema IN
+--         SELECT schema_name FROM information_schema.schemata
+--         WHERE schema_name LIKE 'tenant_%' AND schema_name != 'tenant_template'
+--     LOOP
+--         EXECUTE format('DROP INDEX IF EXISTS %I.idx_messages_content_tsv', tenant_schema);
+--         EXECUTE format('ALTER TABLE %I.messages DROP COLUMN IF EXISTS content_tsv', tenant_schema);
+--     END LOOP;
+-- END $$;
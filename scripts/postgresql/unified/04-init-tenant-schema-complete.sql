@@ -242,6 +242,22 @@ END;
 $$;
 
 
+--
+-- Name: mark_usage_rollup_dirty(); Type: FUNCTION; Schema: tenant_test_company; Owner: -
+--
+
+CREATE FUNCTION tenant_test_company.mark_usage_rollup_dirty() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    INSERT INTO tenant_test_company.usage_rollup_dirty_days (bucket_start)
+    SELECT DISTINCT DATE_TRUNC('day', created_at) FROM old_rows
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$;
+
+
 --
 -- Name: search_conversation_history(uuid, text, uuid[], integer, integer); Type: FUNCTION; Schema: tenant_test_company; Owner: -
 --
@@ -690,6 +706,7 @@ CREATE TABLE tenant_test_company.messages (
     attachments jsonb DEFAULT '[]'::jsonb,
     created_at timestamp with time zone DEFAULT now() NOT NULL,
     embedding public.vector(1024),
+    content_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english'::regconfig, content)) STORED,
     CONSTRAINT messages_content_type_check CHECK (((content_type)::text = ANY (ARRAY[('text'::character varying)::text, ('markdown'::character varying)::text, ('json'::character varying)::text, ('code'::character varying)::text]))),
     CONSTRAINT messages_role_check CHECK (((role)::text = ANY (ARRAY[('user'::character varying)::text, ('system'::character varying)::text, ('agent'::character varying)::text, ('tool'::character varying)::text])))
 );
@@ -738,6 +755,7 @@ CREATE TABLE tenant_test_company.conversation_files (
     uploaded_at timestamp without time zone DEFAULT now(),
     processed_at timestamp without time zone,
     embeddings public.vector(1024),
+    chunk_token_counts integer[],
     CONSTRAINT non_empty_filename CHECK ((length(TRIM(BOTH FROM filename)) > 0)),
     CONSTRAINT non_empty_original_filename CHECK ((length(TRIM(BOTH FROM original_filename)) > 0)),
     CONSTRAINT positive_file_size CHECK ((file_size_bytes > 0)),
@@ -761,7 +779,8 @@ CREATE TABLE tenant_test_company.document_chunks (
     token_count integer DEFAULT 0,
     embedding public.vector(1024),
     metadata jsonb DEFAULT '{}'::jsonb,
-    created_at timestamp with time zone DEFAULT now() NOT NULL
+    created_at timestamp with time zone DEFAULT now() NOT NULL,
+    content_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english'::regconfig, content)) STORED
 );
 
 
@@ -1662,6 +1681,20 @@ CREATE INDEX idx_datasets_tenant_id ON tenant_test_company.datasets USING btree
 CREATE INDEX idx_document_chunks_content_fts ON tenant_test_company.document_chunks USING gin (to_tsvector('english'::regconfig, content));
 
 
+--
+-- Name: idx_document_chunks_content_tsv; Type: INDEX; Schema: tenant_test_company; Owner: -
+--
+
+CREATE INDEX idx_document_chunks_content_tsv ON tenant_test_company.document_chunks USING gin (content_tsv);
+
+
+--
+-- Name: idx_document_chunks_dataset_id; Type: INDEX; Schema: tenant_test_company; Owner: -
+--
+
+CREATE INDEX idx_document_chunks_dataset_id ON tenant_test_company.document_chunks USING btree (dataset_id);
+
+
 --
 -- Name: idx_document_chunks_embedding_hnsw; Type: INDEX; Schema: tenant_test_company; Owner: -
 --
@@ -1725,6 +1758,13 @@ CREATE INDEX idx_documents_user_id ON tenant_test_company.documents USING btree
 CREATE INDEX idx_messages_content_fts ON tenant_test_company.messages USING gin (to_tsvector('english'::regconfig, content));
 
 
+--
+-- Name: idx_messages_content_tsv; Type: INDEX; Schema: tenant_test_company; Owner: -
+--
+
+CREATE INDEX idx_messages_content_tsv ON tenant_test_company.messages USING gin (content_tsv);
+
+
 --
 -- Name: idx_messages_conversation_id; Type: INDEX; Schema: tenant_test_company; Owner: -
 --
@@ -1984,6 +2024,101 @@ CREATE INDEX idx_messages_conversation_created ON tenant_test_company.messages U
 CREATE INDEX idx_conversations_user_updated ON tenant_test_company.conversations USING btree (user_id, is_archived, updated_at DESC);
 
 
+--
+-- Name: embedding_cache; Type: TABLE; Schema: tenant_test_company; Owner: -
+--
+
+CREATE TABLE tenant_test_company.embedding_cache (
+    model character varying(255) NOT NULL,
+    content_hash character varying(64) NOT NULL,
+    embedding public.vector(1024) NOT NULL,
+    created_at timestamp with time zone DEFAULT now() NOT NULL,
+    CONSTRAINT embedding_cache_pkey PRIMARY KEY (model, content_hash)
+);
+
+
+--
+-- Name: idx_embedding_cache_created_at; Type: INDEX; Schema: tenant_test_company; Owner: -
+--
+
+CREATE INDEX idx_embedding_cache_created_at ON tenant_test_company.embedding_cache USING btree (created_at);
+
+
+--
+-- Name: usage_rollup_daily; Type: TABLE; Schema: tenant_test_company; Owner: -
+--
+
+CREATE TABLE tenant_test_company.usage_rollup_daily (
+    tenant_id uuid NOT NULL,
+    bucket_start timestamp with time zone NOT NULL,
+    user_id uuid NOT NULL,
+    agent_id uuid NOT NULL,
+    model character varying(100) NOT NULL,
+    conversations integer DEFAULT 0 NOT NULL,
+    active_conversations integer DEFAULT 0 NOT NULL,
+    messages integer DEFAULT 0 NOT NULL,
+    tokens bigint DEFAULT 0 NOT NULL,
+    content_bytes bigint DEFAULT 0 NOT NULL,
+    CONSTRAINT usage_rollup_daily_pkey PRIMARY KEY (tenant_id, bucket_start, user_id, agent_id, model)
+);
+
+
+--
+-- Name: idx_usage_rollup_daily_user; Type: INDEX; Schema: tenant_test_company; Owner: -
+--
+
+CREATE INDEX idx_usage_rollup_daily_user ON tenant_test_company.usage_rollup_daily USING btree (tenant_id, user_id, bucket_start);
+
+
+--
+-- Name: usage_rollup_hourly; Type: TABLE; Schema: tenant_test_company; Owner: -
+--
+
+CREATE TABLE tenant_test_company.usage_rollup_hourly (
+    tenant_id uuid NOT NULL,
+    bucket_start timestamp with time zone NOT NULL,
+    user_id uuid NOT NULL,
+    agent_id uuid NOT NULL,
+    model character varying(100) NOT NULL,
+    conversations integer DEFAULT 0 NOT NULL,
+    active_conversations integer DEFAULT 0 NOT NULL,
+    messages integer DEFAULT 0 NOT NULL,
+    tokens bigint DEFAULT 0 NOT NULL,
+    content_bytes bigint DEFAULT 0 NOT NULL,
+    CONSTRAINT usage_rollup_hourly_pkey PRIMARY KEY (tenant_id, bucket_start, user_id, agent_id, model)
+);
+
+
+--
+-- Name: idx_usage_rollup_hourly_user; Type: INDEX; Schema: tenant_test_company; Owner: -
+--
+
+CREATE INDEX idx_usage_rollup_hourly_user ON tenant_test_company.usage_rollup_hourly USING btree (tenant_id, user_id, bucket_start);
+
+
+--
+-- Name: usage_rollup_dirty_days; Type: TABLE; Schema: tenant_test_company; Owner: -
+--
+
+CREATE TABLE tenant_test_company.usage_rollup_dirty_days (
+    bucket_start timestamp with time zone NOT NULL,
+    marked_at timestamp with time zone DEFAULT now() NOT NULL,
+    CONSTRAINT usage_rollup_dirty_days_pkey PRIMARY KEY (bucket_start)
+);
+
+
+--
+-- Name: usage_rollup_state; Type: TABLE; Schema: tenant_test_company; Owner: -
+--
+
+CREATE TABLE tenant_test_company.usage_rollup_state (
+    tenant_id uuid NOT NULL,
+    watermark timestamp with time zone NOT NULL,
+    updated_at timestamp with time zone DEFAULT now() NOT NULL,
+    CONSTRAINT usage_rollup_state_pkey PRIMARY KEY (tenant_id)
+);
+
+
 --
 -- Name: agents trigger_agents_updated_at; Type: TRIGGER; Schema: tenant_test_company; Owner: -
 --
@@ -2068,6 +2203,20 @@ CREATE TRIGGER update_subagent_executions_updated_at BEFORE UPDATE ON tenant_tes
 CREATE TRIGGER update_workflow_executions_updated_at BEFORE UPDATE ON tenant_test_company.workflow_executions FOR EACH ROW EXECUTE FUNCTION tenant_test_company.update_subagent_updated_at();
 
 
+--
+-- Name: conversations usage_rollup_dirty_conversations; Type: TRIGGER; Schema: tenant_test_company; Owner: -
+--
+
+CREATE TRIGGER usage_rollup_dirty_conversations AFTER DELETE ON tenant_test_company.conversations REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION tenant_test_company.mark_usage_rollup_dirty();
+
+
+--
+-- Name: messages usage_rollup_dirty_messages; Type: TRIGGER; Schema: tenant_test_company; Owner: -
+--
+
+CREATE TRIGGER usage_rollup_dirty_messages AFTER DELETE ON tenant_test_company.messages REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION tenant_test_company.mark_usage_rollup_dirty();
+
+
 --
 -- Name: agent_datasets agent_datasets_agent_id_fkey; Type: FK CONSTRAINT; Schema: tenant_test_company; Owner: -
 --